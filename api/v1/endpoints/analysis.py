@@ -46,6 +46,7 @@ from api.v1.schemas.history import (
 from src.config import Config
 from src.services.task_queue import (
     get_task_queue,
+    AnalysisTaskQueue,
     DuplicateTaskError,
     TaskStatus as TaskStatusEnum,
 )
@@ -328,20 +329,33 @@ async def task_stream():
     Returns:
         StreamingResponse: SSE 事件流
     """
+    return _sse_event_stream(get_task_queue(), "task_created", "task stream")
+
+
+def _sse_event_stream(queue: AnalysisTaskQueue, created_event: str, stream_name: str) -> StreamingResponse:
+    """
+    构造任务队列的 SSE 事件流（分析、回测、回填任务共用）
+
+    先推送 connected 与当前进行中的任务（created_event），再转发队列广播的事件，
+    空闲 30 秒推送一次 heartbeat
+
+    Args:
+        queue: 任务队列单例
+        created_event: 补发进行中任务时使用的事件类型
+        stream_name: connected 消息中的流名称
+    """
     async def event_generator():
-        task_queue = get_task_queue()
         event_queue: asyncio.Queue = asyncio.Queue()
         
         # 发送连接成功事件
-        yield _format_sse_event("connected", {"message": "Connected to task stream"})
+        yield _format_sse_event("connected", {"message": f"Connected to {stream_name}"})
         
         # 发送当前进行中的任务
-        pending_tasks = task_queue.list_pending_tasks()
-        for task in pending_tasks:
-            yield _format_sse_event("task_created", task.to_dict())
+        for task in queue.list_pending_tasks():
+            yield _format_sse_event(created_event, task.to_dict())
         
         # 订阅任务事件
-        task_queue.subscribe(event_queue)
+        queue.subscribe(event_queue)
         
         try:
             while True:
@@ -358,7 +372,7 @@ async def task_stream():
             # 客户端断开连接
             pass
         finally:
-            task_queue.unsubscribe(event_queue)
+            queue.unsubscribe(event_queue)
     
     return StreamingResponse(
         event_generator(),
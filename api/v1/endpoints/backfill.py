@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""Historical daily-bar backfill endpoints."""
+
+from __future__ import annotations
+
+import logging
+from datetime import date
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
+
+from api.v1.endpoints.analysis import _sse_event_stream
+from api.v1.schemas.analysis import DuplicateTaskErrorResponse
+from api.v1.schemas.backfill import BackfillJobInfo, BackfillJobListResponse, BackfillRunRequest
+from api.v1.schemas.common import ErrorResponse
+from src.services.backfill_job_queue import get_backfill_job_queue
+from src.services.task_queue import DuplicateTaskError
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.post(
+    "/run",
+    response_model=BackfillJobInfo,
+    status_code=202,
+    responses={
+        202: {"description": "回填任务已提交"},
+        400: {"description": "参数错误", "model": ErrorResponse},
+        409: {"description": "已有回填任务在运行", "model": DuplicateTaskErrorResponse},
+    },
+    summary="批量回填历史日线",
+    description="后台任务：所有数据源并行获取指定股票（或全部沪深 A 股）的日线并写入数据库，按股票记录检查点",
+)
+def run_backfill(request: BackfillRunRequest):
+    end = request.end_date or date.today()
+    if request.start_date > end:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "validation_error", "message": "start_date 不能晚于 end_date"},
+        )
+    try:
+        job = get_backfill_job_queue().submit_backfill(
+            codes=request.codes,
+            start=request.start_date,
+            end=end,
+            resume=request.resume,
+            raw=request.raw,
+        )
+    except DuplicateTaskError as exc:
+        error_response = DuplicateTaskErrorResponse(
+            error="duplicate_task",
+            message=f"回填任务正在运行 (task_id: {exc.existing_task_id})",
+            stock_code=exc.stock_code,
+            existing_task_id=exc.existing_task_id,
+        )
+        return JSONResponse(status_code=409, content=error_response.model_dump())
+    return JSONResponse(status_code=202, content=BackfillJobInfo(**job.to_dict()).model_dump())
+
+
+@router.get(
+    "/jobs",
+    response_model=BackfillJobListResponse,
+    summary="获取回填任务列表",
+    description="按提交时间倒序返回后台回填任务",
+)
+def list_backfill_jobs(
+    limit: int = Query(20, ge=1, le=100, description="返回数量限制"),
+) -> BackfillJobListResponse:
+    queue = get_backfill_job_queue()
+    jobs = [BackfillJobInfo(**job.to_dict()) for job in queue.list_all_tasks(limit=limit)]
+    return BackfillJobListResponse(total=queue.get_task_stats()["total"], jobs=jobs)
+
+
+@router.get(
+    "/jobs/stream",
+    responses={
+        200: {"description": "SSE 事件流", "content": {"text/event-stream": {}}},
+    },
+    summary="回填任务 SSE 流",
+    description="推送 backfill_created/started/progress/completed/failed/cancelled 事件，每完成一只股票推送一次进度",
+)
+async def backfill_job_stream():
+    return _sse_event_stream(get_backfill_job_queue(), "backfill_created", "backfill job stream")
+
+
+@router.get(
+    "/jobs/{task_id}",
+    response_model=BackfillJobInfo,
+    responses={
+        200: {"description": "任务进度"},
+        404: {"description": "任务不存在", "model": ErrorResponse},
+    },
+    summary="查询回填任务进度",
+)
+def get_backfill_job(task_id: str) -> BackfillJobInfo:
+    job = get_backfill_job_queue().get_task(task_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": "not_found", "message": f"回填任务 {task_id} 不存在或已过期"},
+        )
+    return BackfillJobInfo(**job.to_dict())
+
+
+@router.post(
+    "/jobs/{task_id}/cancel",
+    response_model=BackfillJobInfo,
+    responses={
+        200: {"description": "已请求取消（处理中的股票完成后停止）"},
+        404: {"description": "任务不存在", "model": ErrorResponse},
+    },
+    summary="取消回填任务",
+    description="不再领取新股票，已写入的日线与检查点保留，重新提交时从检查点续跑",
+)
+def cancel_backfill_job(task_id: str) -> BackfillJobInfo:
+    job = get_backfill_job_queue().cancel_task(task_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": "not_found", "message": f"回填任务 {task_id} 不存在或已过期"},
+        )
+    return BackfillJobInfo(**job.to_dict())
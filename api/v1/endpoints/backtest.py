@@ -4,20 +4,29 @@
 from __future__ import annotations
 
 import logging
-from typing import Optional
+from typing import Optional, Union
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
 
 from api.deps import get_database_manager
+from api.v1.endpoints.analysis import _sse_event_stream
+from api.v1.schemas.analysis import DuplicateTaskErrorResponse
 from api.v1.schemas.backtest import (
+    BacktestJobInfo,
+    BacktestJobListResponse,
     BacktestRunRequest,
     BacktestRunResponse,
     BacktestResultItem,
     BacktestResultsResponse,
+    BacktestSweepRequest,
+    BacktestSweepResponse,
     PerformanceMetrics,
 )
 from api.v1.schemas.common import ErrorResponse
+from src.services.backtest_job_queue import get_backtest_job_queue
 from src.services.backtest_service import BacktestService
+from src.services.task_queue import DuplicateTaskError
 from src.storage import DatabaseManager
 
 logger = logging.getLogger(__name__)
@@ -29,16 +38,20 @@ router = APIRouter()
     "/run",
     response_model=BacktestRunResponse,
     responses={
-        200: {"description": "回测执行完成"},
+        200: {"description": "回测执行完成（同步模式）"},
+        202: {"description": "回测任务已提交（后台模式）", "model": BacktestJobInfo},
+        409: {"description": "相同范围的回测任务正在运行", "model": DuplicateTaskErrorResponse},
         500: {"description": "服务器错误", "model": ErrorResponse},
     },
     summary="触发回测",
-    description="对历史分析记录进行回测评估，并写入 backtest_results/backtest_summaries",
+    description="对历史分析记录进行回测评估，并写入 backtest_results/backtest_summaries；async_mode=true 时作为后台任务运行",
 )
 def run_backtest(
     request: BacktestRunRequest,
     db_manager: DatabaseManager = Depends(get_database_manager),
-) -> BacktestRunResponse:
+) -> Union[BacktestRunResponse, JSONResponse]:
+    if request.async_mode:
+        return _submit_backtest_job(request)
     try:
         service = BacktestService(db_manager)
         stats = service.run_backtest(
@@ -57,6 +70,130 @@ def run_backtest(
         )
 
 
+def _submit_backtest_job(request: BacktestRunRequest) -> JSONResponse:
+    """Queue the run as a background job; 409 if the same scope is already running."""
+    try:
+        job = get_backtest_job_queue().submit_backtest(
+            code=request.code,
+            force=request.force,
+            eval_window_days=request.eval_window_days,
+            min_age_days=request.min_age_days,
+            limit=request.limit,
+        )
+    except DuplicateTaskError as exc:
+        error_response = DuplicateTaskErrorResponse(
+            error="duplicate_task",
+            message=f"回测任务正在运行: {exc.stock_code} (task_id: {exc.existing_task_id})",
+            stock_code=exc.stock_code,
+            existing_task_id=exc.existing_task_id,
+        )
+        return JSONResponse(status_code=409, content=error_response.model_dump())
+    return JSONResponse(status_code=202, content=BacktestJobInfo(**job.to_dict()).model_dump())
+
+
+@router.get(
+    "/jobs",
+    response_model=BacktestJobListResponse,
+    summary="获取回测任务列表",
+    description="按提交时间倒序返回后台回测任务",
+)
+def list_backtest_jobs(
+    limit: int = Query(20, ge=1, le=100, description="返回数量限制"),
+) -> BacktestJobListResponse:
+    queue = get_backtest_job_queue()
+    jobs = [BacktestJobInfo(**job.to_dict()) for job in queue.list_all_tasks(limit=limit)]
+    return BacktestJobListResponse(total=queue.get_task_stats()["total"], jobs=jobs)
+
+
+@router.get(
+    "/jobs/stream",
+    responses={
+        200: {"description": "SSE 事件流", "content": {"text/event-stream": {}}},
+    },
+    summary="回测任务 SSE 流",
+    description="推送 backtest_created/started/progress/completed/failed/cancelled 事件，每保存一块结果推送一次进度",
+)
+async def backtest_job_stream():
+    return _sse_event_stream(get_backtest_job_queue(), "backtest_created", "backtest job stream")
+
+
+@router.get(
+    "/jobs/{task_id}",
+    response_model=BacktestJobInfo,
+    responses={
+        200: {"description": "任务进度"},
+        404: {"description": "任务不存在", "model": ErrorResponse},
+    },
+    summary="查询回测任务进度",
+)
+def get_backtest_job(task_id: str) -> BacktestJobInfo:
+    job = get_backtest_job_queue().get_task(task_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": "not_found", "message": f"回测任务 {task_id} 不存在或已过期"},
+        )
+    return BacktestJobInfo(**job.to_dict())
+
+
+@router.post(
+    "/jobs/{task_id}/cancel",
+    response_model=BacktestJobInfo,
+    responses={
+        200: {"description": "已请求取消（任务在当前块保存后停止）"},
+        404: {"description": "任务不存在", "model": ErrorResponse},
+    },
+    summary="取消回测任务",
+    description="在当前块保存后停止，已保存的结果与汇总保留",
+)
+def cancel_backtest_job(task_id: str) -> BacktestJobInfo:
+    job = get_backtest_job_queue().cancel_task(task_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": "not_found", "message": f"回测任务 {task_id} 不存在或已过期"},
+        )
+    return BacktestJobInfo(**job.to_dict())
+
+
+@router.post(
+    "/sweep",
+    response_model=BacktestSweepResponse,
+    responses={
+        200: {"description": "参数扫描完成"},
+        400: {"description": "参数错误", "model": ErrorResponse},
+        500: {"description": "服务器错误", "model": ErrorResponse},
+    },
+    summary="参数扫描回测",
+    description="一次加载候选记录与日线，评估所有评估窗口 × 中性区间组合，按组合分别写入结果并返回对比表",
+)
+def run_backtest_sweep(
+    request: BacktestSweepRequest,
+    db_manager: DatabaseManager = Depends(get_database_manager),
+) -> BacktestSweepResponse:
+    try:
+        service = BacktestService(db_manager)
+        data = service.run_sweep(
+            code=request.code,
+            eval_window_days=request.eval_window_days,
+            neutral_band_pct=request.neutral_band_pct,
+            min_age_days=request.min_age_days,
+            limit=request.limit,
+        )
+        return BacktestSweepResponse(**data)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "validation_error", "message": str(exc)},
+        )
+    except Exception as exc:
+        logger.error(f"参数扫描回测失败: {exc}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail={"error": "internal_error", "message": f"参数扫描回测失败: {str(exc)}"},
+        )
+
+
 @router.get(
     "/results",
     response_model=BacktestResultsResponse,
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Analysis run (checkpoint/resume) endpoints."""
+
+from __future__ import annotations
+
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
+
+from api.deps import get_database_manager
+from api.v1.schemas.common import ErrorResponse
+from api.v1.schemas.runs import RunResumeRequest, RunResumeResponse, RunStatusResponse
+from src.services.run_service import AnalysisRunService, RunInProgressError
+from src.storage import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get(
+    "/{run_id}",
+    response_model=RunStatusResponse,
+    responses={
+        200: {"description": "运行进度"},
+        404: {"description": "运行不存在", "model": ErrorResponse},
+        500: {"description": "服务器错误", "model": ErrorResponse},
+    },
+    summary="获取分析运行进度",
+    description="返回运行状态及每只股票已完成的阶段",
+)
+def get_run_status(
+    run_id: str,
+    db_manager: DatabaseManager = Depends(get_database_manager),
+) -> RunStatusResponse:
+    try:
+        status = AnalysisRunService(db_manager).get_run_status(run_id)
+    except Exception as exc:
+        logger.error(f"查询运行进度失败: {exc}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail={"error": "internal_error", "message": f"查询运行进度失败: {str(exc)}"},
+        )
+    if status is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": "not_found", "message": f"未找到运行 {run_id}"},
+        )
+    return RunStatusResponse(**status)
+
+
+@router.post(
+    "/{run_id}/resume",
+    response_model=RunResumeResponse,
+    status_code=202,
+    responses={
+        202: {"description": "续跑任务已提交"},
+        404: {"description": "运行不存在", "model": ErrorResponse},
+        409: {"description": "运行仍在进行中", "model": ErrorResponse},
+        500: {"description": "服务器错误", "model": ErrorResponse},
+    },
+    summary="续跑中断的分析运行",
+    description="后台续跑：跳过已完成的股票，复用已保存的搜索/分析结果，汇总推送覆盖整个运行",
+)
+def resume_run(
+    run_id: str,
+    request: Optional[RunResumeRequest] = None,
+    db_manager: DatabaseManager = Depends(get_database_manager),
+) -> JSONResponse:
+    notify = request.notify if request is not None else True
+    try:
+        submitted = AnalysisRunService(db_manager).resume_run(run_id, send_notification=notify)
+    except RunInProgressError as exc:
+        raise HTTPException(
+            status_code=409,
+            detail={"error": "run_in_progress", "message": str(exc)},
+        )
+    except Exception as exc:
+        logger.error(f"提交续跑任务失败: {exc}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail={"error": "internal_error", "message": f"提交续跑任务失败: {str(exc)}"},
+        )
+    if not submitted:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": "not_found", "message": f"未找到运行 {run_id}"},
+        )
+    return JSONResponse(
+        status_code=202,
+        content=RunResumeResponse(run_id=run_id, message="续跑任务已提交").model_dump(),
+    )
@@ -11,7 +11,7 @@ API v1 路由聚合
 
 from fastapi import APIRouter
 
-from api.v1.endpoints import analysis, history, stocks, backtest, system_config
+from api.v1.endpoints import analysis, history, stocks, backtest, backfill, system_config, runs
 
 # 创建 v1 版本主路由
 router = APIRouter(prefix="/api/v1")
@@ -40,8 +40,20 @@ router.include_router(
     tags=["Backtest"]
 )
 
+router.include_router(
+    backfill.router,
+    prefix="/backfill",
+    tags=["Backfill"]
+)
+
 router.include_router(
     system_config.router,
     prefix="/system",
     tags=["SystemConfig"]
 )
+
+router.include_router(
+    runs.router,
+    prefix="/runs",
+    tags=["Runs"]
+)
@@ -43,6 +43,17 @@ from api.v1.schemas.backtest import (
     BacktestResultsResponse,
     PerformanceMetrics,
 )
+from api.v1.schemas.backfill import (
+    BackfillRunRequest,
+    BackfillJobInfo,
+    BackfillJobListResponse,
+)
+from api.v1.schemas.runs import (
+    RunStockItem,
+    RunStatusResponse,
+    RunResumeRequest,
+    RunResumeResponse,
+)
 from api.v1.schemas.system_config import (
     SystemConfigFieldSchema,
     SystemConfigCategorySchema,
@@ -90,6 +101,15 @@ __all__ = [
     "BacktestResultItem",
     "BacktestResultsResponse",
     "PerformanceMetrics",
+    # backfill
+    "BackfillRunRequest",
+    "BackfillJobInfo",
+    "BackfillJobListResponse",
+    # runs
+    "RunStockItem",
+    "RunStatusResponse",
+    "RunResumeRequest",
+    "RunResumeResponse",
     # system config
     "SystemConfigFieldSchema",
     "SystemConfigCategorySchema",
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""Historical daily-bar backfill API schemas."""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class BackfillRunRequest(BaseModel):
+    codes: List[str] = Field(default_factory=list, description="股票代码列表；为空或 [\"all\"] 表示全部沪深 A 股")
+    start_date: date = Field(..., description="回填起始日期")
+    end_date: Optional[date] = Field(None, description="回填结束日期（默认今天）")
+    resume: bool = Field(True, description="跳过检查点中已完成该区间的股票")
+    raw: bool = Field(False, description="回填不复权日线与复权因子，前复权日线在本地重建")
+
+
+class BackfillJobInfo(BaseModel):
+    task_id: str = Field(..., description="任务 ID")
+    status: str = Field(..., description="任务状态：pending/processing/completed/failed/cancelled")
+    progress: int = Field(0, ge=0, le=100, description="进度百分比")
+    message: Optional[str] = None
+    params: Dict[str, Any] = Field(default_factory=dict, description="提交时的回填参数")
+    total: int = Field(0, description="股票总数")
+    processed: int = Field(0, description="已处理股票数（含跳过）")
+    done: int = Field(0, description="回填成功股票数")
+    failed: int = Field(0, description="所有数据源均失败的股票数")
+    skipped: int = Field(0, description="检查点中已完成而跳过的股票数")
+    bars: int = Field(0, description="已写入的日线条数")
+    bars_per_second: float = Field(0.0, description="吞吐量（日线条数/秒）")
+    sources: Dict[str, Any] = Field(default_factory=dict, description="分数据源统计（任务结束后提供）")
+    created_at: str
+    started_at: Optional[str] = None
+    completed_at: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BackfillJobListResponse(BaseModel):
+    total: int = Field(..., description="内存中保留的任务数")
+    jobs: List[BackfillJobInfo] = Field(default_factory=list)
@@ -14,6 +14,7 @@ class BacktestRunRequest(BaseModel):
     eval_window_days: Optional[int] = Field(None, ge=1, le=120, description="评估窗口（交易日数）")
     min_age_days: Optional[int] = Field(None, ge=0, le=365, description="分析记录最小天龄（0=不限）")
     limit: int = Field(200, ge=1, le=2000, description="最多处理的分析记录数")
+    async_mode: bool = Field(False, description="后台任务模式：立即返回 202 与任务信息，进度通过 /backtest/jobs 查询或 SSE 订阅")
 
 
 class BacktestRunResponse(BaseModel):
@@ -24,6 +25,58 @@ class BacktestRunResponse(BaseModel):
     errors: int = Field(..., description="错误数")
 
 
+class BacktestJobInfo(BaseModel):
+    task_id: str = Field(..., description="任务 ID")
+    code: Optional[str] = Field(None, description="回测股票（空表示全部）")
+    status: str = Field(..., description="任务状态：pending/processing/completed/failed/cancelled")
+    progress: int = Field(0, ge=0, le=100, description="进度百分比")
+    message: Optional[str] = None
+    params: Dict[str, Any] = Field(default_factory=dict, description="提交时的回测参数")
+    total: int = Field(0, description="候选记录数")
+    processed: int = Field(0, description="已处理记录数")
+    saved: int = Field(0, description="已写入回测结果数")
+    completed: int = Field(0, description="完成回测数")
+    insufficient: int = Field(0, description="数据不足数")
+    errors: int = Field(0, description="错误数")
+    created_at: str
+    started_at: Optional[str] = None
+    completed_at: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BacktestJobListResponse(BaseModel):
+    total: int = Field(..., description="内存中保留的任务数")
+    jobs: List[BacktestJobInfo] = Field(default_factory=list)
+
+
+class BacktestSweepRequest(BaseModel):
+    code: Optional[str] = Field(None, description="仅回测指定股票")
+    eval_window_days: List[int] = Field(..., min_length=1, max_length=20, description="评估窗口列表（交易日数）")
+    neutral_band_pct: List[float] = Field(..., min_length=1, max_length=20, description="中性区间阈值列表（%）")
+    min_age_days: Optional[int] = Field(None, ge=0, le=365, description="分析记录最小天龄（0=不限）")
+    limit: int = Field(200, ge=1, le=2000, description="最多处理的分析记录数")
+
+
+class BacktestSweepItem(BaseModel):
+    eval_window_days: int
+    neutral_band_pct: float
+    engine_version: str = Field(..., description="该参数组合的结果存储键")
+    total_evaluations: int
+    completed_count: int
+    insufficient_count: int
+    win_rate_pct: Optional[float] = None
+    direction_accuracy_pct: Optional[float] = None
+    neutral_rate_pct: Optional[float] = None
+    avg_stock_return_pct: Optional[float] = None
+    avg_simulated_return_pct: Optional[float] = None
+
+
+class BacktestSweepResponse(BaseModel):
+    processed: int = Field(..., description="候选记录数")
+    saved: int = Field(..., description="写入回测结果数（所有参数组合合计）")
+    items: List[BacktestSweepItem] = Field(default_factory=list, description="各参数组合的对比表")
+
+
 class BacktestResultItem(BaseModel):
     analysis_history_id: int
     code: str
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""Analysis run (checkpoint/resume) API schemas."""
+
+from __future__ import annotations
+
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class RunStockItem(BaseModel):
+    code: str = Field(..., description="股票代码")
+    stage: str = Field(..., description="已完成阶段：pending/search/done")
+    query_id: Optional[str] = Field(None, description="该股票分析记录的 query_id")
+
+
+class RunStatusResponse(BaseModel):
+    run_id: str = Field(..., description="运行 ID")
+    status: str = Field(..., description="运行状态：running/completed")
+    query_source: Optional[str] = Field(None, description="触发来源")
+    total: int = Field(..., description="股票总数")
+    completed: int = Field(..., description="已完成股票数")
+    stocks: List[RunStockItem] = Field(default_factory=list)
+    created_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+
+class RunResumeRequest(BaseModel):
+    notify: bool = Field(True, description="是否发送推送通知")
+
+
+class RunResumeResponse(BaseModel):
+    run_id: str = Field(..., description="运行 ID")
+    message: str = Field(..., description="提示信息")
@@ -90,6 +90,10 @@ class MarketCommand(BotCommand):
                     brave_keys=config.brave_api_keys,
                     serpapi_keys=config.serpapi_keys,
                     news_max_age_days=config.news_max_age_days,
+                    intel_timeout=config.search_intel_timeout,
+                    provider_max_concurrency=config.search_provider_max_concurrency,
+                    cache_persist=config.search_cache_persist,
+                    cache_max_entries=config.search_cache_max_entries,
                 )
 
             # 初始化 AI 分析器
@@ -42,7 +42,7 @@ from tenacity import (
 
 from patch.eastmoney_patch import eastmoney_patch
 from src.config import get_config
-from .base import BaseFetcher, DataFetchError, RateLimitError, STANDARD_COLUMNS
+from .base import BaseFetcher, DataFetchError, RateLimitError, STANDARD_COLUMNS, snapshot_cache_status, snapshot_ttl
 from .realtime_types import (
     UnifiedRealtimeQuote, ChipDistribution, RealtimeSource,
     get_realtime_circuit_breaker, get_chip_circuit_breaker,
@@ -73,20 +73,27 @@ USER_AGENTS = [
 # - 批量分析场景：通常 30 只股票在 5 分钟内分析完，20 分钟足够覆盖
 # - 实时性要求：股票分析不需要秒级实时数据，20 分钟延迟可接受
 # - 防封禁：减少 API 调用频率
+# - 休市期间（午休、收盘后、非交易日）写入的缓存有效期延长到下一次开盘
+_REALTIME_CACHE_TTL = 1200
 _realtime_cache: Dict[str, Any] = {
     'data': None,
     'timestamp': 0,
-    'ttl': 1200  # 20分钟缓存有效期
+    'ttl': _REALTIME_CACHE_TTL  # 20分钟缓存有效期
 }
 
 # ETF 实时行情缓存
 _etf_realtime_cache: Dict[str, Any] = {
     'data': None,
     'timestamp': 0,
-    'ttl': 1200  # 20分钟缓存有效期
+    'ttl': _REALTIME_CACHE_TTL  # 20分钟缓存有效期
 }
 
 
+def get_realtime_cache_status() -> Dict[str, Any]:
+    """A股实时行情（东财）全量快照缓存状态（用于缓存就绪报告，不触发网络请求）"""
+    return snapshot_cache_status(_realtime_cache)
+
+
 def _is_etf_code(stock_code: str) -> bool:
     """
     判断代码是否为 ETF 基金
@@ -783,6 +790,7 @@ class AkshareFetcher(BaseFetcher):
                     df = pd.DataFrame()
                 _realtime_cache['data'] = df
                 _realtime_cache['timestamp'] = current_time
+                _realtime_cache['ttl'] = snapshot_ttl(df, current_time, _REALTIME_CACHE_TTL)
                 logger.info(f"[缓存更新] A股实时行情(东财) 缓存已刷新，TTL={_realtime_cache['ttl']}s")
 
             if df is None or df.empty:
@@ -1080,6 +1088,7 @@ class AkshareFetcher(BaseFetcher):
                     df = pd.DataFrame()
                 _etf_realtime_cache['data'] = df
                 _etf_realtime_cache['timestamp'] = current_time
+                _etf_realtime_cache['ttl'] = snapshot_ttl(df, current_time, _REALTIME_CACHE_TTL)
 
             if df is None or df.empty:
                 logger.warning(f"[实时行情] ETF实时行情数据为空，跳过 {stock_code}")
@@ -16,6 +16,7 @@ BaostockFetcher - 备用数据源 2 (Priority 3)
 
 import logging
 import re
+import threading
 from contextlib import contextmanager
 from datetime import datetime
 from typing import Optional, Generator
@@ -30,6 +31,7 @@ from tenacity import (
 )
 
 from .base import BaseFetcher, DataFetchError, STANDARD_COLUMNS
+from src.core.price_adjust import ADJUST_QFQ, ADJUST_RAW
 import os
 
 logger = logging.getLogger(__name__)
@@ -67,6 +69,10 @@ class BaostockFetcher(BaseFetcher):
     
     name = "BaostockFetcher"
     priority = int(os.getenv("BAOSTOCK_PRIORITY", "3"))
+    supports_raw_daily = True
+
+    # bs.login() 是模块级全局会话，并发登录/登出会互相踢掉，所有会话串行执行
+    _session_lock = threading.RLock()
     
     def __init__(self):
         """初始化 BaostockFetcher"""
@@ -92,6 +98,7 @@ class BaostockFetcher(BaseFetcher):
         1. 进入上下文时自动登录
         2. 退出上下文时自动登出
         3. 异常时也能正确登出
+        4. 会话在 _session_lock 内串行执行（多个回填线程不会同时登录）
         
         使用示例：
             with self._baostock_session():
@@ -100,27 +107,28 @@ class BaostockFetcher(BaseFetcher):
         bs = self._get_baostock()
         login_result = None
         
-        try:
-            # 登录 Baostock
-            login_result = bs.login()
-            
-            if login_result.error_code != '0':
-                raise DataFetchError(f"Baostock 登录失败: {login_result.error_msg}")
-            
-            logger.debug("Baostock 登录成功")
-            
-            yield bs
-            
-        finally:
-            # 确保登出，防止连接泄露
+        with self._session_lock:
             try:
-                logout_result = bs.logout()
-                if logout_result.error_code == '0':
-                    logger.debug("Baostock 登出成功")
-                else:
-                    logger.warning(f"Baostock 登出异常: {logout_result.error_msg}")
-            except Exception as e:
-                logger.warning(f"Baostock 登出时发生错误: {e}")
+                # 登录 Baostock
+                login_result = bs.login()
+                
+                if login_result.error_code != '0':
+                    raise DataFetchError(f"Baostock 登录失败: {login_result.error_msg}")
+                
+                logger.debug("Baostock 登录成功")
+                
+                yield bs
+                
+            finally:
+                # 确保登出，防止连接泄露
+                try:
+                    logout_result = bs.logout()
+                    if logout_result.error_code == '0':
+                        logger.debug("Baostock 登出成功")
+                    else:
+                        logger.warning(f"Baostock 登出异常: {logout_result.error_msg}")
+                except Exception as e:
+                    logger.warning(f"Baostock 登出时发生错误: {e}")
     
     def _convert_stock_code(self, stock_code: str) -> str:
         """
@@ -167,11 +175,13 @@ class BaostockFetcher(BaseFetcher):
         retry=retry_if_exception_type((ConnectionError, TimeoutError)),
         before_sleep=before_sleep_log(logger, logging.WARNING),
     )
-    def _fetch_raw_data(self, stock_code: str, start_date: str, end_date: str) -> pd.DataFrame:
+    def _fetch_raw_data(
+        self, stock_code: str, start_date: str, end_date: str, adjust: str = ADJUST_QFQ
+    ) -> pd.DataFrame:
         """
         从 Baostock 获取原始数据
         
-        使用 query_history_k_data_plus() 获取日线数据
+        使用 query_history_k_data_plus() 获取日线数据（默认前复权，adjust='raw' 时不复权）
         
         流程：
         1. 检查是否为美股（不支持）
@@ -199,7 +209,7 @@ class BaostockFetcher(BaseFetcher):
                     start_date=start_date,
                     end_date=end_date,
                     frequency="d",  # 日线
-                    adjustflag="2"  # 前复权
+                    adjustflag="3" if adjust == ADJUST_RAW else "2"
                 )
                 
                 if rs.error_code != '0':
@@ -304,6 +314,44 @@ class BaostockFetcher(BaseFetcher):
         
         return None
     
+    def get_adj_factors(self, stock_code: str) -> Optional[pd.DataFrame]:
+        """
+        获取复权因子
+
+        使用 Baostock 的 query_adjust_factor 接口，取除权除息日的累计后复权因子
+
+        Returns:
+            包含 date, factor 列的 DataFrame，失败返回 None
+        """
+        if _is_us_code(stock_code):
+            return None
+
+        bs_code = self._convert_stock_code(stock_code)
+        try:
+            with self._baostock_session() as bs:
+                rs = bs.query_adjust_factor(
+                    code=bs_code,
+                    start_date='1990-01-01',
+                    end_date=datetime.now().strftime('%Y-%m-%d'),
+                )
+                if rs.error_code != '0':
+                    logger.warning(f"Baostock 查询复权因子失败 {stock_code}: {rs.error_msg}")
+                    return None
+                data_list = []
+                while rs.next():
+                    data_list.append(rs.get_row_data())
+        except Exception as e:
+            logger.warning(f"Baostock 获取复权因子失败 {stock_code}: {e}")
+            return None
+
+        if not data_list:
+            return None
+        df = pd.DataFrame(data_list, columns=rs.fields)
+        return pd.DataFrame({
+            'date': pd.to_datetime(df['dividOperateDate']),
+            'factor': pd.to_numeric(df['backAdjustFactor'], errors='coerce'),
+        })
+
     def get_stock_list(self) -> Optional[pd.DataFrame]:
         """
         获取股票列表
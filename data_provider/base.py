@@ -16,6 +16,7 @@
 
 import logging
 import random
+import re
 import time
 from abc import ABC, abstractmethod
 from datetime import datetime
@@ -30,6 +31,11 @@ from tenacity import (
     retry_if_exception_type,
 )
 
+from src.core.bar_store import get_bar_store
+from src.core.price_adjust import ADJUST_QFQ, ADJUST_RAW
+from src.core.tracing import trace_span
+from src.core.trading_calendar import CN_CALENDAR, get_calendar_for_code
+
 # 配置日志
 logger = logging.getLogger(__name__)
 
@@ -37,6 +43,58 @@ logger = logging.getLogger(__name__)
 # === 标准化列名定义 ===
 STANDARD_COLUMNS = ['date', 'open', 'high', 'low', 'close', 'volume', 'amount', 'pct_chg']
 
+# 本地列式日线存储命中时返回的数据源名称
+BAR_STORE_SOURCE = 'LocalBarStore'
+
+# 沪深 A 股代码（沪市主板 60x / 科创板 688、689，深市主板 00x / 创业板 30x）
+_A_SHARE_CODE_PATTERN = re.compile(r'^(60[0-5]|68[89]|00[0-3]|30[01])\d{3}$')
+
+# 筹码分布缓存（进程内共享，盘前预热后正式运行直接命中）
+# 筹码分布基于日线计算，日内变化很小，1 小时有效期足够覆盖预热到正式运行的间隔
+_chip_cache: Dict[str, Any] = {
+    'data': {},  # {股票代码: (写入时间戳, ChipDistribution)}
+    'ttl': 3600
+}
+
+
+def _get_cached_chip(stock_code: str):
+    """读取未过期的筹码分布缓存（缓存键统一为标准化代码）"""
+    cached = _chip_cache['data'].get(normalize_stock_code(stock_code))
+    if cached is not None and time.time() - cached[0] < _chip_cache['ttl']:
+        return cached[1]
+    return None
+
+
+def _put_cached_chip(stock_code: str, chip) -> None:
+    """写入筹码分布缓存（缓存键统一为标准化代码）"""
+    _chip_cache['data'][normalize_stock_code(stock_code)] = (time.time(), chip)
+
+
+def snapshot_ttl(df: Optional[pd.DataFrame], written_at: float, base_ttl: int) -> int:
+    """
+    A 股全量行情快照的缓存有效期
+
+    失败缓存的空数据保持 base_ttl，非空快照在休市期间有效到下一次开盘
+    """
+    if df is None or df.empty:
+        return base_ttl
+    return CN_CALENDAR.cache_ttl(base_ttl, written_at)
+
+
+def snapshot_cache_status(cache: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    全量行情快照缓存的状态（不触发网络请求）
+
+    Returns:
+        {'age': 缓存年龄秒数（未填充为 None）, 'ttl': 有效期, 'fresh': 是否有效}
+    """
+    age = time.time() - cache['timestamp'] if cache['data'] is not None else None
+    return {
+        'age': int(age) if age is not None else None,
+        'ttl': cache['ttl'],
+        'fresh': age is not None and age < cache['ttl'],
+    }
+
 
 def normalize_stock_code(stock_code: str) -> str:
     """
@@ -105,6 +163,8 @@ class BaseFetcher(ABC):
     
     name: str = "BaseFetcher"
     priority: int = 99  # 优先级数字越小越优先
+    # 是否支持 get_daily_data(adjust='raw') 获取不复权日线
+    supports_raw_daily: bool = False
     
     @abstractmethod
     def _fetch_raw_data(self, stock_code: str, start_date: str, end_date: str) -> pd.DataFrame:
@@ -177,12 +237,22 @@ class BaseFetcher(ABC):
         """
         return None
 
+    def get_adj_factors(self, stock_code: str) -> Optional[pd.DataFrame]:
+        """
+        获取全部历史的累计后复权因子（子类按数据源能力实现）
+
+        Returns:
+            含 date / factor 列的 DataFrame（逐日或仅除权除息日均可）；不支持时返回 None
+        """
+        return None
+
     def get_daily_data(
         self,
         stock_code: str, 
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-        days: int = 30
+        days: int = 30,
+        adjust: str = ADJUST_QFQ,
     ) -> pd.DataFrame:
         """
         获取日线数据（统一入口）
@@ -196,27 +266,34 @@ class BaseFetcher(ABC):
         Args:
             stock_code: 股票代码
             start_date: 开始日期（可选）
-            end_date: 结束日期（可选，默认今天）
-            days: 获取天数（当 start_date 未指定时使用）
+            end_date: 结束日期（可选，默认所属市场最新一根日线的日期）
+            days: 获取交易日数（当 start_date 未指定时使用）
+            adjust: 复权方式，默认前复权；'raw' 获取不复权日线（需 supports_raw_daily）
             
         Returns:
             标准化的 DataFrame，包含技术指标
         """
-        # 计算日期范围
+        if adjust == ADJUST_RAW and not self.supports_raw_daily:
+            raise DataFetchError(f"[{self.name}] 不支持获取不复权日线")
+
+        # 计算日期范围：按所属市场的交易日历取精确区间
+        calendar = get_calendar_for_code(stock_code)
         if end_date is None:
-            end_date = datetime.now().strftime('%Y-%m-%d')
+            end_date = calendar.latest_bar_date().strftime('%Y-%m-%d')
         
         if start_date is None:
-            # 默认获取最近 30 个交易日（按日历日估算，多取一些）
-            from datetime import timedelta
-            start_dt = datetime.strptime(end_date, '%Y-%m-%d') - timedelta(days=days * 2)
-            start_date = start_dt.strftime('%Y-%m-%d')
+            # 以 end_date 为最后一根，回溯 days 个交易日（留出余量，停牌期间的缺口不会导致日线不足）
+            end_day = datetime.strptime(end_date, '%Y-%m-%d').date()
+            start_date = calendar.fetch_start_date(end_day, days).strftime('%Y-%m-%d')
         
         logger.info(f"[{self.name}] 获取 {stock_code} 数据: {start_date} ~ {end_date}")
         
         try:
             # Step 1: 获取原始数据
-            raw_df = self._fetch_raw_data(stock_code, start_date, end_date)
+            if adjust == ADJUST_RAW:
+                raw_df = self._fetch_raw_data(stock_code, start_date, end_date, adjust=ADJUST_RAW)
+            else:
+                raw_df = self._fetch_raw_data(stock_code, start_date, end_date)
             
             if raw_df is None or raw_df.empty:
                 raise DataFetchError(f"[{self.name}] 未获取到 {stock_code} 的数据")
@@ -267,7 +344,8 @@ class BaseFetcher(ABC):
         
         return df
     
-    def _calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+    @staticmethod
+    def _calculate_indicators(df: pd.DataFrame) -> pd.DataFrame:
         """
         计算技术指标
         
@@ -322,12 +400,17 @@ class DataFetcherManager:
     - 所有数据源都失败时抛出异常
     """
     
-    def __init__(self, fetchers: Optional[List[BaseFetcher]] = None):
+    # 股票名称 / 所属行业目录（类级别，进程内所有管理器实例共享，预热结果可被后续流水线复用）
+    _stock_name_cache: Dict[str, str] = {}
+    _stock_industry_cache: Dict[str, Optional[str]] = {}
+
+    def __init__(self, fetchers: Optional[List[BaseFetcher]] = None, config=None):
         """
         初始化管理器
         
         Args:
             fetchers: 数据源列表（可选，默认按优先级自动创建）
+            config: 创建默认数据源时使用的配置（可选，默认使用全局配置；决定各数据源的限速）
         """
         self._fetchers: List[BaseFetcher] = []
         
@@ -336,9 +419,9 @@ class DataFetcherManager:
             self._fetchers = sorted(fetchers, key=lambda f: f.priority)
         else:
             # 默认数据源将在首次使用时延迟加载
-            self._init_default_fetchers()
+            self._init_default_fetchers(config)
     
-    def _init_default_fetchers(self) -> None:
+    def _init_default_fetchers(self, config=None) -> None:
         """
         初始化默认数据源列表
 
@@ -360,12 +443,13 @@ class DataFetcherManager:
         from .yfinance_fetcher import YfinanceFetcher
         from src.config import get_config
 
-        config = get_config()
+        config = config or get_config()
 
         # 创建所有数据源实例（优先级在各 Fetcher 的 __init__ 中确定）
-        efinance = EfinanceFetcher()
-        akshare = AkshareFetcher()
-        tushare = TushareFetcher()  # 会根据 Token 配置自动调整优先级
+        efinance = EfinanceFetcher(sleep_min=config.efinance_sleep_min, sleep_max=config.efinance_sleep_max)
+        akshare = AkshareFetcher(sleep_min=config.akshare_sleep_min, sleep_max=config.akshare_sleep_max)
+        # 会根据 Token 配置自动调整优先级
+        tushare = TushareFetcher(rate_limit_per_minute=config.tushare_rate_limit_per_minute)
         pytdx = PytdxFetcher()      # 通达信数据源（可配 PYTDX_HOST/PYTDX_PORT）
         baostock = BaostockFetcher()
         yfinance = YfinanceFetcher()
@@ -397,7 +481,9 @@ class DataFetcherManager:
         stock_code: str,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-        days: int = 30
+        days: int = 30,
+        adjust: str = ADJUST_QFQ,
+        use_local_store: bool = True,
     ) -> Tuple[pd.DataFrame, str]:
         """
         获取日线数据（自动切换数据源）
@@ -414,9 +500,12 @@ class DataFetcherManager:
             start_date: 开始日期
             end_date: 结束日期
             days: 获取天数
+            adjust: 复权方式，默认前复权；'raw' 只使用支持不复权日线的数据源，且不读取本地存储
+            use_local_store: 是否优先读取本地列式日线存储；强制刷新、补全数据库缺口时传 False 直接回源
             
         Returns:
-            Tuple[DataFrame, str]: (数据, 成功的数据源名称)
+            Tuple[DataFrame, str]: (数据, 成功的数据源名称)；本地存储命中时名称为 BAR_STORE_SOURCE，
+            这些数据本就来自 stock_daily，调用方不应再写回数据库
             
         Raises:
             DataFetchError: 所有数据源都失败时抛出
@@ -426,6 +515,15 @@ class DataFetcherManager:
         # Normalize code (strip SH/SZ prefix etc.)
         stock_code = normalize_stock_code(stock_code)
 
+        if adjust == ADJUST_RAW:
+            return self._get_raw_daily_data(stock_code, start_date, end_date, days)
+
+        # 本地列式日线存储已完整覆盖请求区间时直接返回，不请求数据源
+        local_df = self._load_from_bar_store(stock_code, start_date, end_date, days) if use_local_store else None
+        if local_df is not None:
+            logger.info(f"[{BAR_STORE_SOURCE}] 本地命中 {stock_code}，共 {len(local_df)} 条数据")
+            return local_df, BAR_STORE_SOURCE
+
         errors = []
 
         # 快速路径：美股指数与美股股票直接路由到 YfinanceFetcher
@@ -434,12 +532,13 @@ class DataFetcherManager:
                 if fetcher.name == "YfinanceFetcher":
                     try:
                         logger.info(f"[{fetcher.name}] 美股/美股指数 {stock_code} 直接路由...")
-                        df = fetcher.get_daily_data(
-                            stock_code=stock_code,
-                            start_date=start_date,
-                            end_date=end_date,
-                            days=days,
-                        )
+                        with trace_span('daily_data', source=fetcher.name, code=stock_code):
+                            df = fetcher.get_daily_data(
+                                stock_code=stock_code,
+                                start_date=start_date,
+                                end_date=end_date,
+                                days=days,
+                            )
                         if df is not None and not df.empty:
                             logger.info(f"[{fetcher.name}] 成功获取 {stock_code}")
                             return df, fetcher.name
@@ -456,12 +555,13 @@ class DataFetcherManager:
         for fetcher in self._fetchers:
             try:
                 logger.info(f"尝试使用 [{fetcher.name}] 获取 {stock_code}...")
-                df = fetcher.get_daily_data(
-                    stock_code=stock_code,
-                    start_date=start_date,
-                    end_date=end_date,
-                    days=days
-                )
+                with trace_span('daily_data', source=fetcher.name, code=stock_code):
+                    df = fetcher.get_daily_data(
+                        stock_code=stock_code,
+                        start_date=start_date,
+                        end_date=end_date,
+                        days=days
+                    )
                 
                 if df is not None and not df.empty:
                     logger.info(f"[{fetcher.name}] 成功获取 {stock_code}")
@@ -479,10 +579,138 @@ class DataFetcherManager:
         logger.error(error_summary)
         raise DataFetchError(error_summary)
     
+    def _get_raw_daily_data(
+        self,
+        stock_code: str,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        days: int,
+    ) -> Tuple[pd.DataFrame, str]:
+        """按优先级依次尝试支持不复权日线的数据源"""
+        errors = []
+        for fetcher in self._fetchers:
+            if not fetcher.supports_raw_daily:
+                continue
+            try:
+                with trace_span('daily_data', source=fetcher.name, code=stock_code):
+                    df = fetcher.get_daily_data(
+                        stock_code=stock_code,
+                        start_date=start_date,
+                        end_date=end_date,
+                        days=days,
+                        adjust=ADJUST_RAW,
+                    )
+                if df is not None and not df.empty:
+                    logger.info(f"[{fetcher.name}] 成功获取 {stock_code} 不复权日线")
+                    return df, fetcher.name
+            except Exception as e:
+                error_msg = f"[{fetcher.name}] 失败: {str(e)}"
+                logger.warning(error_msg)
+                errors.append(error_msg)
+        error_summary = f"没有数据源能获取 {stock_code} 的不复权日线:\n" + "\n".join(errors)
+        logger.error(error_summary)
+        raise DataFetchError(error_summary)
+
+    def get_adj_factors(self, stock_code: str) -> Tuple[pd.DataFrame, str]:
+        """
+        获取复权因子（自动切换数据源）
+
+        Returns:
+            Tuple[DataFrame, str]: (含 date / factor 列的因子数据, 成功的数据源名称)
+
+        Raises:
+            DataFetchError: 没有数据源能提供复权因子时抛出
+        """
+        stock_code = normalize_stock_code(stock_code)
+        errors = []
+        for fetcher in self._fetchers:
+            try:
+                df = fetcher.get_adj_factors(stock_code)
+            except Exception as e:
+                error_msg = f"[{fetcher.name}] 失败: {str(e)}"
+                logger.warning(error_msg)
+                errors.append(error_msg)
+                continue
+            if df is not None and not df.empty:
+                logger.info(f"[{fetcher.name}] 成功获取 {stock_code} 复权因子")
+                return df, fetcher.name
+        error_summary = f"没有数据源能获取 {stock_code} 的复权因子:\n" + "\n".join(errors)
+        logger.error(error_summary)
+        raise DataFetchError(error_summary)
+
+    @staticmethod
+    def _load_from_bar_store(
+        stock_code: str,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        days: int,
+    ) -> Optional[pd.DataFrame]:
+        """
+        从本地列式日线存储读取（日期区间与 BaseFetcher.get_daily_data 的推算一致）
+
+        Returns:
+            含技术指标的标准化 DataFrame；未启用、区间未完整覆盖或读取失败时返回 None
+        """
+        try:
+            store = get_bar_store()
+            if store is None:
+                return None
+            calendar = get_calendar_for_code(stock_code)
+            end_day = (
+                datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else calendar.latest_bar_date()
+            )
+            start_day = (
+                datetime.strptime(start_date, '%Y-%m-%d').date() if start_date
+                else calendar.fetch_start_date(end_day, days)
+            )
+            df = store.load(stock_code, start_day, end_day)
+            if df is None:
+                return None
+            df = df.dropna(subset=['close', 'volume']).reset_index(drop=True)
+            if df.empty:
+                return None
+            return BaseFetcher._calculate_indicators(df)
+        except Exception as e:
+            logger.warning(f"[{BAR_STORE_SOURCE}] 读取 {stock_code} 失败，回源获取: {e}")
+            return None
+
     @property
     def available_fetchers(self) -> List[str]:
         """返回可用数据源名称列表"""
         return [f.name for f in self._fetchers]
+
+    @property
+    def fetchers(self) -> List[BaseFetcher]:
+        """返回数据源实例列表（按优先级排序的副本）"""
+        return list(self._fetchers)
+
+    def get_a_share_codes(self) -> List[str]:
+        """
+        获取沪深 A 股全部股票代码（用于全市场回填）
+
+        依次尝试支持 get_stock_list 的数据源，取第一个非空结果，只保留沪深 A 股代码
+
+        Raises:
+            DataFetchError: 所有数据源都无法获取股票列表时抛出
+        """
+        for fetcher in self._fetchers:
+            if not hasattr(fetcher, 'get_stock_list'):
+                continue
+            try:
+                stock_list = fetcher.get_stock_list()
+            except Exception as e:
+                logger.warning(f"[{fetcher.name}] 获取股票列表失败: {e}")
+                continue
+            if stock_list is None or stock_list.empty:
+                continue
+            codes = [
+                code for code in dict.fromkeys(str(c) for c in stock_list['code'])
+                if _A_SHARE_CODE_PATTERN.match(code)
+            ]
+            if codes:
+                logger.info(f"[{fetcher.name}] 获取沪深 A 股列表: {len(codes)} 只")
+                return codes
+        raise DataFetchError("所有数据源都无法获取 A 股股票列表")
     
     def prefetch_realtime_quotes(self, stock_codes: List[str]) -> int:
         """
@@ -559,6 +787,39 @@ class DataFetcherManager:
         except Exception as e:
             logger.error(f"[预取] 批量预取异常: {e}")
             return 0
+
+    @staticmethod
+    def get_realtime_cache_status() -> Dict[str, Dict[str, Any]]:
+        """
+        获取全量实时行情缓存状态（用于缓存就绪报告，不触发网络请求）
+
+        Returns:
+            {数据源: {'age': 缓存年龄秒数（未填充为 None）, 'ttl': 有效期, 'fresh': 是否有效}}
+        """
+        from . import akshare_fetcher, efinance_fetcher
+
+        return {
+            'efinance': efinance_fetcher.get_realtime_cache_status(),
+            'akshare_em': akshare_fetcher.get_realtime_cache_status(),
+        }
+
+    def get_cached_name(self, stock_code: str) -> Optional[str]:
+        """从名称目录读取股票名称（不触发网络请求）"""
+        return self._stock_name_cache.get(normalize_stock_code(stock_code))
+
+    def get_cached_industries(self, stock_codes: List[str]) -> Dict[str, str]:
+        """从行业目录读取已缓存的所属行业（不触发网络请求）"""
+        result = {}
+        for code in stock_codes:
+            industry = self._stock_industry_cache.get(normalize_stock_code(code))
+            if industry:
+                result[code] = industry
+        return result
+
+    @staticmethod
+    def has_cached_chip(stock_code: str) -> bool:
+        """筹码分布是否已在缓存中（不触发网络请求）"""
+        return _get_cached_chip(stock_code) is not None
     
     def get_realtime_quote(self, stock_code: str):
         """
@@ -637,47 +898,48 @@ class DataFetcherManager:
             source = source.strip().lower()
             
             try:
-                quote = None
+                with trace_span('realtime_quote', source=source, code=stock_code):
+                    quote = None
                 
-                if source == "efinance":
-                    # 尝试 EfinanceFetcher
-                    for fetcher in self._fetchers:
-                        if fetcher.name == "EfinanceFetcher":
-                            if hasattr(fetcher, 'get_realtime_quote'):
-                                quote = fetcher.get_realtime_quote(stock_code)
-                            break
+                    if source == "efinance":
+                        # 尝试 EfinanceFetcher
+                        for fetcher in self._fetchers:
+                            if fetcher.name == "EfinanceFetcher":
+                                if hasattr(fetcher, 'get_realtime_quote'):
+                                    quote = fetcher.get_realtime_quote(stock_code)
+                                break
                 
-                elif source == "akshare_em":
-                    # 尝试 AkshareFetcher 东财数据源
-                    for fetcher in self._fetchers:
-                        if fetcher.name == "AkshareFetcher":
-                            if hasattr(fetcher, 'get_realtime_quote'):
-                                quote = fetcher.get_realtime_quote(stock_code, source="em")
-                            break
+                    elif source == "akshare_em":
+                        # 尝试 AkshareFetcher 东财数据源
+                        for fetcher in self._fetchers:
+                            if fetcher.name == "AkshareFetcher":
+                                if hasattr(fetcher, 'get_realtime_quote'):
+                                    quote = fetcher.get_realtime_quote(stock_code, source="em")
+                                break
                 
-                elif source == "akshare_sina":
-                    # 尝试 AkshareFetcher 新浪数据源
-                    for fetcher in self._fetchers:
-                        if fetcher.name == "AkshareFetcher":
-                            if hasattr(fetcher, 'get_realtime_quote'):
-                                quote = fetcher.get_realtime_quote(stock_code, source="sina")
-                            break
+                    elif source == "akshare_sina":
+                        # 尝试 AkshareFetcher 新浪数据源
+                        for fetcher in self._fetchers:
+                            if fetcher.name == "AkshareFetcher":
+                                if hasattr(fetcher, 'get_realtime_quote'):
+                                    quote = fetcher.get_realtime_quote(stock_code, source="sina")
+                                break
                 
-                elif source in ("tencent", "akshare_qq"):
-                    # 尝试 AkshareFetcher 腾讯数据源
-                    for fetcher in self._fetchers:
-                        if fetcher.name == "AkshareFetcher":
-                            if hasattr(fetcher, 'get_realtime_quote'):
-                                quote = fetcher.get_realtime_quote(stock_code, source="tencent")
-                            break
+                    elif source in ("tencent", "akshare_qq"):
+                        # 尝试 AkshareFetcher 腾讯数据源
+                        for fetcher in self._fetchers:
+                            if fetcher.name == "AkshareFetcher":
+                                if hasattr(fetcher, 'get_realtime_quote'):
+                                    quote = fetcher.get_realtime_quote(stock_code, source="tencent")
+                                break
                 
-                elif source == "tushare":
-                    # 尝试 TushareFetcher（需要 Tushare Pro 积分）
-                    for fetcher in self._fetchers:
-                        if fetcher.name == "TushareFetcher":
-                            if hasattr(fetcher, 'get_realtime_quote'):
-                                quote = fetcher.get_realtime_quote(stock_code)
-                            break
+                    elif source == "tushare":
+                        # 尝试 TushareFetcher（需要 Tushare Pro 积分）
+                        for fetcher in self._fetchers:
+                            if fetcher.name == "TushareFetcher":
+                                if hasattr(fetcher, 'get_realtime_quote'):
+                                    quote = fetcher.get_realtime_quote(stock_code)
+                                break
                 
                 if quote is not None and quote.has_basic_data():
                     if primary_quote is None:
@@ -781,6 +1043,11 @@ class DataFetcherManager:
             logger.debug(f"[筹码分布] 功能已禁用，跳过 {stock_code}")
             return None
 
+        cached = _get_cached_chip(stock_code)
+        if cached is not None:
+            logger.debug(f"[缓存命中] 筹码分布 {stock_code}")
+            return cached
+
         circuit_breaker = get_chip_circuit_breaker()
 
         # 定义筹码数据源优先级列表
@@ -800,9 +1067,11 @@ class DataFetcherManager:
                 for fetcher in self._fetchers:
                     if fetcher.name == fetcher_name:
                         if hasattr(fetcher, 'get_chip_distribution'):
-                            chip = fetcher.get_chip_distribution(stock_code)
+                            with trace_span('chip_distribution', source=fetcher_name, code=stock_code):
+                                chip = fetcher.get_chip_distribution(stock_code)
                             if chip is not None:
                                 circuit_breaker.record_success(source_key)
+                                _put_cached_chip(stock_code, chip)
                                 logger.info(f"[筹码分布] {stock_code} 成功获取 (来源: {fetcher_name})")
                                 return chip
                         break
@@ -833,13 +1102,9 @@ class DataFetcherManager:
         stock_code = normalize_stock_code(stock_code)
 
         # 1. 先检查缓存
-        if hasattr(self, '_stock_name_cache') and stock_code in self._stock_name_cache:
+        if stock_code in self._stock_name_cache:
             return self._stock_name_cache[stock_code]
         
-        # 初始化缓存
-        if not hasattr(self, '_stock_name_cache'):
-            self._stock_name_cache = {}
-        
         # 2. 尝试从实时行情中获取（最快）
         quote = self.get_realtime_quote(stock_code)
         if quote and hasattr(quote, 'name') and quote.name:
@@ -882,9 +1147,6 @@ class DataFetcherManager:
         missing_codes = set(stock_codes)
         
         # 1. 先检查缓存
-        if not hasattr(self, '_stock_name_cache'):
-            self._stock_name_cache = {}
-        
         for code in stock_codes:
             if code in self._stock_name_cache:
                 result[code] = self._stock_name_cache[code]
@@ -926,6 +1188,67 @@ class DataFetcherManager:
         logger.info(f"[股票名称] 批量获取完成，成功 {len(result)}/{len(stock_codes)}")
         return result
 
+    def get_stock_industry(self, stock_code: str) -> Optional[str]:
+        """
+        获取股票所属行业（用于按行业分组共享搜索）
+        
+        优先使用基本信息中的「所处行业」，缺失时退回所属板块列表的第一项。
+        仅支持 A 股，港股/美股返回 None。
+        
+        Args:
+            stock_code: 股票代码
+            
+        Returns:
+            行业名称，获取失败返回 None
+        """
+        stock_code = normalize_stock_code(stock_code)
+        if not (stock_code.isdigit() and len(stock_code) == 6):
+            return None
+
+        if stock_code in self._stock_industry_cache:
+            return self._stock_industry_cache[stock_code]
+
+        industry = None
+        for fetcher in self._fetchers:
+            try:
+                if hasattr(fetcher, 'get_base_info'):
+                    info = fetcher.get_base_info(stock_code)
+                    value = (info or {}).get('所处行业')
+                    if value and str(value).strip() not in ('-', 'nan'):
+                        industry = str(value).strip()
+                if not industry and hasattr(fetcher, 'get_belong_board'):
+                    boards = fetcher.get_belong_board(stock_code)
+                    if boards is not None and not boards.empty and '板块名称' in boards.columns:
+                        industry = str(boards.iloc[0]['板块名称']).strip() or None
+            except Exception as e:
+                logger.debug(f"[所属行业] {fetcher.name} 获取失败: {e}")
+                continue
+            if industry:
+                break
+
+        self._stock_industry_cache[stock_code] = industry
+        if industry:
+            logger.debug(f"[所属行业] {stock_code} -> {industry}")
+        return industry
+
+    def batch_get_stock_industries(self, stock_codes: List[str]) -> Dict[str, str]:
+        """
+        批量获取股票所属行业
+        
+        Args:
+            stock_codes: 股票代码列表
+            
+        Returns:
+            {股票代码: 行业名称} 字典（获取失败的股票不包含在内）
+        """
+        result = {}
+        for code in stock_codes:
+            industry = self.get_stock_industry(code)
+            if industry:
+                result[code] = industry
+        logger.info(f"[所属行业] 批量获取完成，成功 {len(result)}/{len(stock_codes)}，共 {len(set(result.values()))} 个行业")
+        return result
+
     def get_main_indices(self, region: str = "cn") -> List[Dict[str, Any]]:
         """获取主要指数实时行情（自动切换数据源）"""
         for fetcher in self._fetchers:
@@ -41,7 +41,7 @@ from tenacity import (
 
 from patch.eastmoney_patch import eastmoney_patch
 from src.config import get_config
-from .base import BaseFetcher, DataFetchError, RateLimitError, STANDARD_COLUMNS
+from .base import BaseFetcher, DataFetchError, RateLimitError, STANDARD_COLUMNS, snapshot_cache_status, snapshot_ttl
 from .realtime_types import (
     UnifiedRealtimeQuote, RealtimeSource,
     get_realtime_circuit_breaker,
@@ -107,20 +107,27 @@ USER_AGENTS = [
 
 # 缓存实时行情数据（避免重复请求）
 # TTL 设为 10 分钟 (600秒)：批量分析场景下避免重复拉取
+# 休市期间（午休、收盘后、非交易日）写入的缓存有效期延长到下一次开盘
+_REALTIME_CACHE_TTL = 600
 _realtime_cache: Dict[str, Any] = {
     'data': None,
     'timestamp': 0,
-    'ttl': 600  # 10分钟缓存有效期
+    'ttl': _REALTIME_CACHE_TTL  # 10分钟缓存有效期
 }
 
 # ETF 实时行情缓存（与股票分开缓存）
 _etf_realtime_cache: Dict[str, Any] = {
     'data': None,
     'timestamp': 0,
-    'ttl': 600  # 10分钟缓存有效期
+    'ttl': _REALTIME_CACHE_TTL  # 10分钟缓存有效期
 }
 
 
+def get_realtime_cache_status() -> Dict[str, Any]:
+    """efinance 实时行情全量快照缓存状态（用于缓存就绪报告，不触发网络请求）"""
+    return snapshot_cache_status(_realtime_cache)
+
+
 def _is_etf_code(stock_code: str) -> bool:
     """
     判断代码是否为 ETF 基金
@@ -508,6 +515,7 @@ class EfinanceFetcher(BaseFetcher):
                 # 更新缓存
                 _realtime_cache['data'] = df
                 _realtime_cache['timestamp'] = current_time
+                _realtime_cache['ttl'] = snapshot_ttl(df, current_time, _REALTIME_CACHE_TTL)
                 logger.info(f"[缓存更新] 实时行情(efinance) 缓存已刷新，TTL={_realtime_cache['ttl']}s")
             
             # 查找指定股票
@@ -610,6 +618,7 @@ class EfinanceFetcher(BaseFetcher):
 
                 _etf_realtime_cache['data'] = df
                 _etf_realtime_cache['timestamp'] = current_time
+                _etf_realtime_cache['ttl'] = snapshot_ttl(df, current_time, _REALTIME_CACHE_TTL)
 
             if df is None or df.empty:
                 logger.warning(f"[实时行情] ETF实时行情数据为空(efinance)，跳过 {stock_code}")
@@ -760,6 +769,7 @@ class EfinanceFetcher(BaseFetcher):
                 df = ef.stock.get_realtime_quotes()
                 _realtime_cache['data'] = df
                 _realtime_cache['timestamp'] = current_time
+                _realtime_cache['ttl'] = snapshot_ttl(df, current_time, _REALTIME_CACHE_TTL)
 
             if df is None or df.empty:
                 logger.warning("[API返回] 市场统计数据为空")
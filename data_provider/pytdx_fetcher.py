@@ -29,6 +29,7 @@ from tenacity import (
 )
 
 from .base import BaseFetcher, DataFetchError, STANDARD_COLUMNS
+from src.core.price_adjust import ADJUST_QFQ
 import os
 
 logger = logging.getLogger(__name__)
@@ -105,6 +106,7 @@ class PytdxFetcher(BaseFetcher):
     
     name = "PytdxFetcher"
     priority = int(os.getenv("PYTDX_PRIORITY", "2"))
+    supports_raw_daily = True  # get_security_bars 返回的就是不复权价格
     
     # 默认通达信行情服务器列表
     DEFAULT_HOSTS = [
@@ -236,11 +238,13 @@ class PytdxFetcher(BaseFetcher):
         retry=retry_if_exception_type((ConnectionError, TimeoutError)),
         before_sleep=before_sleep_log(logger, logging.WARNING),
     )
-    def _fetch_raw_data(self, stock_code: str, start_date: str, end_date: str) -> pd.DataFrame:
+    def _fetch_raw_data(
+        self, stock_code: str, start_date: str, end_date: str, adjust: str = ADJUST_QFQ
+    ) -> pd.DataFrame:
         """
         从通达信获取原始数据
         
-        使用 get_security_bars() 获取日线数据
+        使用 get_security_bars() 获取日线数据（返回不复权价格，adjust 参数不影响请求）
         
         流程：
         1. 检查是否为美股（不支持）
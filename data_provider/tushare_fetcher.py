@@ -32,6 +32,7 @@ from tenacity import (
 )
 
 from .base import BaseFetcher, DataFetchError, RateLimitError, STANDARD_COLUMNS
+from src.core.price_adjust import ADJUST_QFQ
 from .realtime_types import UnifiedRealtimeQuote
 from src.config import get_config
 import os
@@ -90,6 +91,7 @@ class TushareFetcher(BaseFetcher):
     
     name = "TushareFetcher"
     priority = int(os.getenv("TUSHARE_PRIORITY", "2"))  # 默认优先级，会在 __init__ 中根据配置动态调整
+    supports_raw_daily = True  # daily / fund_daily 返回的就是不复权价格
 
     def __init__(self, rate_limit_per_minute: int = 80):
         """
@@ -294,13 +296,17 @@ class TushareFetcher(BaseFetcher):
         retry=retry_if_exception_type((ConnectionError, TimeoutError)),
         before_sleep=before_sleep_log(logger, logging.WARNING),
     )
-    def _fetch_raw_data(self, stock_code: str, start_date: str, end_date: str) -> pd.DataFrame:
+    def _fetch_raw_data(
+        self, stock_code: str, start_date: str, end_date: str, adjust: str = ADJUST_QFQ
+    ) -> pd.DataFrame:
         """
         从 Tushare 获取原始数据
         
         根据代码类型选择不同接口：
         - 普通股票：daily()
         - ETF 基金：fund_daily()
+
+        两个接口返回的都是不复权价格，adjust 参数不影响请求
         
         流程：
         1. 检查 API 是否可用
@@ -455,6 +461,36 @@ class TushareFetcher(BaseFetcher):
         
         return None
     
+    def get_adj_factors(self, stock_code: str) -> Optional[pd.DataFrame]:
+        """
+        获取复权因子
+
+        使用 Tushare 的 adj_factor（股票）/ fund_adj（ETF）接口，返回逐日累计后复权因子
+
+        Returns:
+            包含 date, factor 列的 DataFrame，失败返回 None
+        """
+        if self._api is None or _is_us_code(stock_code):
+            return None
+
+        self._check_rate_limit()
+        ts_code = self._convert_stock_code(stock_code)
+        try:
+            if _is_etf_code(stock_code):
+                df = self._api.fund_adj(ts_code=ts_code)
+            else:
+                df = self._api.adj_factor(ts_code=ts_code)
+        except Exception as e:
+            logger.warning(f"Tushare 获取复权因子失败 {stock_code}: {e}")
+            return None
+
+        if df is None or df.empty:
+            return None
+        return pd.DataFrame({
+            'date': pd.to_datetime(df['trade_date'], format='%Y%m%d'),
+            'factor': pd.to_numeric(df['adj_factor'], errors='coerce'),
+        })
+
     def get_stock_list(self) -> Optional[pd.DataFrame]:
         """
         获取股票列表
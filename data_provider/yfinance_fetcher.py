@@ -16,7 +16,7 @@ YfinanceFetcher - 兜底数据源 (Priority 4)
 
 import logging
 import re
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
 
 import pandas as pd
@@ -153,11 +153,12 @@ class YfinanceFetcher(BaseFetcher):
         logger.debug(f"调用 yfinance.download({yf_code}, {start_date}, {end_date})")
         
         try:
-            # 使用 yfinance 下载数据
+            # 使用 yfinance 下载数据（yfinance 的 end 不含当天，顺延一天使区间包含 end_date）
+            end_exclusive = (datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
             df = yf.download(
                 tickers=yf_code,
                 start=start_date,
-                end=end_date,
+                end=end_exclusive,
                 progress=False,  # 禁止进度条
                 auto_adjust=True,  # 自动调整价格（复权）
             )
@@ -40,12 +40,14 @@ import logging
 import sys
 import time
 import uuid
-from datetime import datetime, timezone, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone, timedelta
 from pathlib import Path
 from typing import List, Optional
 
 from src.core.pipeline import StockAnalysisPipeline
 from src.core.market_review import run_market_review
+from src.core.tracing import bind_context, tracing_run
 
 from src.config import get_config, Config
 from src.logging_config import setup_logging
@@ -68,7 +70,11 @@ def parse_arguments() -> argparse.Namespace:
   python main.py --no-notify        # 不发送推送通知
   python main.py --single-notify    # 启用单股推送模式（每分析完一只立即推送）
   python main.py --schedule         # 启用定时任务模式
+  python main.py --warmup           # 仅执行缓存预热（日线、实时行情、筹码、名称、低波动情报）
   python main.py --market-review    # 仅运行大盘复盘
+  python main.py --resume <run_id>  # 续跑中断的分析（跳过已完成的股票）
+  python main.py --shards 4         # 分片运行：自选股分给 4 个进程并行分析
+  python main.py --join-run <run_id> --shards 4  # 在其他主机上加入分片运行（共享数据库）
         '''
     )
 
@@ -102,6 +108,29 @@ def parse_arguments() -> argparse.Namespace:
         help='启用单股推送模式：每分析完一只股票立即推送，而不是汇总推送'
     )
 
+    parser.add_argument(
+        '--resume',
+        type=str,
+        default=None,
+        metavar='RUN_ID',
+        help='续跑指定运行 ID 的分析：跳过已完成的股票，复用已保存的搜索/分析结果'
+    )
+
+    parser.add_argument(
+        '--shards',
+        type=int,
+        default=None,
+        help='分片数：将自选股分给多个进程并行分析，每个分片使用 1/N 的并发与限速预算（默认使用配置值）'
+    )
+
+    parser.add_argument(
+        '--join-run',
+        type=str,
+        default=None,
+        metavar='RUN_ID',
+        help='作为分片加入指定运行（多主机共享数据库），处理完可领取的股票后退出'
+    )
+
     parser.add_argument(
         '--workers',
         type=int,
@@ -115,6 +144,12 @@ def parse_arguments() -> argparse.Namespace:
         help='启用定时任务模式，每日定时执行'
     )
 
+    parser.add_argument(
+        '--warmup',
+        action='store_true',
+        help='仅执行缓存预热：预取日线、实时行情、筹码、股票名称与低波动情报维度，并输出缓存就绪报告'
+    )
+
     parser.add_argument(
         '--no-run-immediately',
         action='store_true',
@@ -204,18 +239,91 @@ def parse_arguments() -> argparse.Namespace:
         help='强制回测（即使已有回测结果也重新计算）'
     )
 
+    parser.add_argument(
+        '--backtest-sweep-windows',
+        type=str,
+        default=None,
+        help='参数扫描：评估窗口列表（逗号分隔，如 5,10,20），与 --backtest 一起使用'
+    )
+
+    parser.add_argument(
+        '--backtest-sweep-bands',
+        type=str,
+        default=None,
+        help='参数扫描：中性区间阈值列表（%%，逗号分隔，如 1,2,3），与 --backtest 一起使用'
+    )
+
+    parser.add_argument(
+        '--backtest-signals',
+        action='store_true',
+        help='回测规则趋势信号：对已存储日线的每个交易日计算买入信号并评估后续收益（可配合 --backtest-code / --backtest-days）'
+    )
+
+    parser.add_argument(
+        '--backtest-rebuild-summaries',
+        action='store_true',
+        help='从全部回测结果全量重建回测汇总（用于校验增量汇总）'
+    )
+
+    # === Backfill ===
+    parser.add_argument(
+        '--backfill',
+        type=str,
+        default=None,
+        metavar='CODES',
+        help='批量回填历史日线：股票代码（逗号分隔）或 all（全部沪深 A 股），所有数据源并行获取'
+    )
+
+    parser.add_argument(
+        '--backfill-start',
+        type=str,
+        default=None,
+        help='回填起始日期 YYYY-MM-DD（默认结束日期前 10 年）'
+    )
+
+    parser.add_argument(
+        '--backfill-end',
+        type=str,
+        default=None,
+        help='回填结束日期 YYYY-MM-DD（默认今天）'
+    )
+
+    parser.add_argument(
+        '--backfill-no-resume',
+        action='store_true',
+        help='忽略回填检查点，重新获取已完成的股票'
+    )
+
+    parser.add_argument(
+        '--backfill-raw',
+        action='store_true',
+        help='回填不复权日线与复权因子，前复权日线在本地重建（仅 Tushare/Baostock/Pytdx 数据源）'
+    )
+
+    parser.add_argument(
+        '--refresh-adj-factors',
+        type=str,
+        default=None,
+        metavar='CODES',
+        help='刷新复权因子（逗号分隔），因子变化时由本地不复权日线重建前复权日线，不重新下载历史日线'
+    )
+
     return parser.parse_args()
 
 
 def run_full_analysis(
     config: Config,
     args: argparse.Namespace,
-    stock_codes: Optional[List[str]] = None
+    stock_codes: Optional[List[str]] = None,
+    market: Optional[str] = None
 ):
     """
     执行完整的分析流程（个股 + 大盘复盘）
 
     这是定时任务调用的主函数
+
+    Args:
+        market: 按市场调度时的市场（cn / hk / us）；大盘复盘只针对该市场
     """
     try:
         # 命令行参数 --single-notify 覆盖配置（#55）
@@ -234,7 +342,8 @@ def run_full_analysis(
         save_context_snapshot = None
         if getattr(args, 'no_context_snapshot', False):
             save_context_snapshot = False
-        query_id = uuid.uuid4().hex
+        resume_run_id = getattr(args, 'resume', None)
+        query_id = resume_run_id or uuid.uuid4().hex
         pipeline = StockAnalysisPipeline(
             config=config,
             max_workers=args.workers,
@@ -243,34 +352,100 @@ def run_full_analysis(
             save_context_snapshot=save_context_snapshot
         )
 
-        # 1. 运行个股分析
-        results = pipeline.run(
-            stock_codes=stock_codes,
-            dry_run=args.dry_run,
-            send_notification=not args.no_notify,
-            merge_notification=merge_notification
-        )
-
-        # Issue #128: 分析间隔 - 在个股分析和大盘分析之间添加延迟
-        analysis_delay = getattr(config, 'analysis_delay', 0)
-        if analysis_delay > 0 and config.market_review_enabled and not args.no_market_review:
-            logger.info(f"等待 {analysis_delay} 秒后执行大盘复盘（避免API限流）...")
-            time.sleep(analysis_delay)
-
-        # 2. 运行大盘复盘（如果启用且不是仅个股模式）
-        market_report = ""
-        if config.market_review_enabled and not args.no_market_review:
-            # 只调用一次，并获取结果
-            review_result = run_market_review(
-                notifier=pipeline.notifier,
-                analyzer=pipeline.analyzer,
-                search_service=pipeline.search_service,
-                send_notification=not args.no_notify,
-                merge_notification=merge_notification
-            )
-            # 如果有结果，赋值给 market_report 用于后续飞书文档生成
-            if review_result:
-                market_report = review_result
+        # 启用缓存预热时，正式运行前输出缓存就绪报告
+        if getattr(config, 'warmup_enabled', False):
+            from src.core.warmup import log_cache_readiness
+
+            log_cache_readiness(pipeline, stock_codes)
+
+        # 大盘复盘不依赖个股结果：作为并发分支与个股分析同时执行，在合并推送前汇合
+        run_review = config.market_review_enabled and not args.no_market_review
+        review_region = None
+        if run_review and market is not None:
+            # 按市场调度：只复盘本市场（港股暂无大盘复盘）
+            configured = config.market_review_region
+            run_review = market in (('cn', 'us') if configured == 'both' else (configured,))
+            review_region = market
+        review_executor = None
+        review_future = None
+        # 个股分析与并发的大盘复盘分支记录在同一次追踪中，汇合后统一输出性能报告
+        with tracing_run(enabled=getattr(config, 'tracing_enabled', True)) as tracer:
+            try:
+                if run_review and getattr(config, 'market_review_concurrent', False):
+                    logger.info("大盘复盘作为并发分支启动，与个股分析同时执行")
+                    review_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="market_review_branch")
+                    review_future = review_executor.submit(
+                        bind_context(run_market_review),
+                        notifier=pipeline.notifier,
+                        analyzer=pipeline.analyzer,
+                        search_service=pipeline.search_service,
+                        send_notification=not args.no_notify,
+                        merge_notification=merge_notification,
+                        region=review_region
+                    )
+
+                # 1. 运行个股分析（分片模式下由多个进程/主机通过数据库租约分担）
+                shard_count = getattr(args, 'shards', None) or config.analysis_shards
+                if shard_count > 1 and not args.dry_run:
+                    from src.core.sharding import shard_capacity
+
+                    capacity = shard_capacity(config, pipeline.max_workers)
+                    if shard_count > capacity:
+                        # 分片数超过并发配额时，分片合计的并发会超出单进程预算，改为单进程运行
+                        logger.warning(f"分片数 {shard_count} 超过并发配额允许的 {capacity} 个，改为单进程运行")
+                        shard_count = 1
+                if shard_count > 1 and not args.dry_run:
+                    from src.core.sharding import run_sharded
+
+                    results = run_sharded(
+                        stock_codes,
+                        shard_count,
+                        pipeline,
+                        run_id=query_id,
+                        send_notification=not args.no_notify,
+                        merge_notification=merge_notification,
+                        debug=args.debug,
+                    )
+                else:
+                    results = pipeline.run(
+                        stock_codes=stock_codes,
+                        dry_run=args.dry_run,
+                        send_notification=not args.no_notify,
+                        merge_notification=merge_notification,
+                        resume_run_id=resume_run_id
+                    )
+
+                # 2. 大盘复盘（如果启用且不是仅个股模式）
+                market_report = ""
+                if review_future is not None:
+                    # 汇合点：等待并发分支完成，再进行合并推送与飞书文档生成
+                    review_result = review_future.result()
+                    if review_result:
+                        market_report = review_result
+                elif run_review:
+                    # Issue #128: 分析间隔 - 顺序模式下在个股分析和大盘分析之间添加延迟
+                    analysis_delay = getattr(config, 'analysis_delay', 0)
+                    if analysis_delay > 0:
+                        logger.info(f"等待 {analysis_delay} 秒后执行大盘复盘（避免API限流）...")
+                        time.sleep(analysis_delay)
+
+                    # 只调用一次，并获取结果
+                    review_result = run_market_review(
+                        notifier=pipeline.notifier,
+                        analyzer=pipeline.analyzer,
+                        search_service=pipeline.search_service,
+                        send_notification=not args.no_notify,
+                        merge_notification=merge_notification,
+                        region=review_region
+                    )
+                    # 如果有结果，赋值给 market_report 用于后续飞书文档生成
+                    if review_result:
+                        market_report = review_result
+            finally:
+                # 个股分析异常时同样关闭复盘分支的线程池
+                if review_executor is not None:
+                    review_executor.shutdown(wait=False)
+        pipeline.save_trace_report(tracer, query_id)
 
         # Issue #190: 合并推送（个股+大盘复盘）
         if merge_notification and (results or market_report) and not args.no_notify:
@@ -360,6 +535,58 @@ def run_full_analysis(
         logger.exception(f"分析流程执行失败: {e}")
 
 
+def run_per_market_schedule(
+    config: Config,
+    args: argparse.Namespace,
+    stock_codes: Optional[List[str]] = None,
+    run_immediately: bool = True
+) -> None:
+    """
+    按市场调度：A 股 / 港股 / 美股各自在本市场收盘后执行，只分析自选股中本市场的部分
+
+    Args:
+        stock_codes: 股票代码列表（可选，默认每次执行时热读取 STOCK_LIST）
+        run_immediately: 是否立即依次执行一次各市场任务
+    """
+    from src.core.trading_calendar import split_by_market
+    from src.scheduler import MARKET_LABELS, run_with_market_schedule
+
+    def market_codes(market: str) -> List[str]:
+        codes = stock_codes
+        if codes is None:
+            config.refresh_stock_list()
+            codes = config.stock_list
+        return split_by_market(codes).get(market, [])
+
+    def make_task(market: str):
+        def task():
+            codes = market_codes(market)
+            if not codes:
+                logger.info(f"自选股中没有{MARKET_LABELS[market]}，跳过")
+                return
+            logger.info(f"{MARKET_LABELS[market]}分析: {len(codes)} 只股票")
+            run_full_analysis(config, args, codes, market=market)
+        return task
+
+    def make_warmup(market: str):
+        from src.core.warmup import run_warmup
+
+        def warmup():
+            codes = market_codes(market)
+            if codes:
+                run_warmup(config, codes)
+        return warmup
+
+    markets = list(MARKET_LABELS)
+    run_with_market_schedule(
+        market_tasks={market: make_task(market) for market in markets},
+        delay_minutes=config.schedule_market_delay_minutes,
+        run_immediately=run_immediately,
+        warmup_tasks={market: make_warmup(market) for market in markets} if config.warmup_enabled else None,
+        warmup_lead_minutes=config.warmup_lead_minutes
+    )
+
+
 def start_api_server(host: str, port: int, config: Config) -> None:
     """
     在后台线程启动 FastAPI 服务
@@ -504,6 +731,28 @@ def main() -> int:
             from src.services.backtest_service import BacktestService
 
             service = BacktestService()
+            sweep_windows = getattr(args, 'backtest_sweep_windows', None)
+            sweep_bands = getattr(args, 'backtest_sweep_bands', None)
+            if sweep_windows or sweep_bands:
+                windows = [int(w) for w in (sweep_windows or '').split(',') if w.strip()] or \
+                    [getattr(args, 'backtest_days', None) or config.backtest_eval_window_days]
+                bands = [float(b) for b in (sweep_bands or '').split(',') if b.strip()] or \
+                    [config.backtest_neutral_band_pct]
+                report = service.run_sweep(
+                    code=getattr(args, 'backtest_code', None),
+                    eval_window_days=windows,
+                    neutral_band_pct=bands,
+                )
+                logger.info(f"参数扫描完成: processed={report['processed']} saved={report['saved']}")
+                logger.info("窗口 | 中性区间 | 完成数 | 胜率% | 方向准确率% | 平均收益% | 模拟收益%")
+                for item in report['items']:
+                    logger.info(
+                        f"{item['eval_window_days']} | {item['neutral_band_pct']:g} | {item['completed_count']} | "
+                        f"{item['win_rate_pct']} | {item['direction_accuracy_pct']} | "
+                        f"{item['avg_stock_return_pct']} | {item['avg_simulated_return_pct']}"
+                    )
+                return 0
+
             stats = service.run_backtest(
                 code=getattr(args, 'backtest_code', None),
                 force=getattr(args, 'backtest_force', False),
@@ -515,6 +764,108 @@ def main() -> int:
             )
             return 0
 
+        # 模式0.1: 回测汇总全量重建
+        if getattr(args, 'backtest_rebuild_summaries', False):
+            logger.info("模式: 回测汇总全量重建")
+            from src.services.backtest_service import BacktestService
+
+            report = BacktestService().rebuild_summaries(eval_window_days=getattr(args, 'backtest_days', None))
+            logger.info(f"回测汇总重建完成: rebuilt={report['rebuilt']} mismatched={len(report['mismatched'])}")
+            for scope in report['mismatched']:
+                logger.warning(f"增量汇总不一致: {scope}")
+            return 0
+
+        # 模式0.2: 规则信号回测
+        if getattr(args, 'backtest_signals', False):
+            logger.info("模式: 规则信号回测")
+            from src.services.backtest_service import BacktestService
+
+            code = getattr(args, 'backtest_code', None)
+            report = BacktestService().run_signal_backtest(
+                codes=[code] if code else None,
+                eval_window_days=getattr(args, 'backtest_days', None),
+            )
+            logger.info(
+                f"规则信号回测完成: {report['codes']} 只股票，{report['signals']} 个信号，"
+                f"评估窗口 {report['eval_window_days']} 日"
+            )
+            logger.info("信号 | 样本数 | 完成数 | 胜率% | 方向准确率% | 平均收益% | 模拟收益%")
+            for row in report['by_signal'] + [dict(report['overall'], buy_signal='全部')]:
+                logger.info(
+                    f"{row['buy_signal']} | {row['total_evaluations']} | {row['completed_count']} | "
+                    f"{row['win_rate_pct']} | {row['direction_accuracy_pct']} | "
+                    f"{row['avg_stock_return_pct']} | {row['avg_simulated_return_pct']}"
+                )
+            return 0
+
+        # 模式0.3: 历史日线回填
+        if getattr(args, 'backfill', None):
+            logger.info("模式: 历史日线回填")
+            from src.services.backfill_service import BackfillService
+
+            end = date.fromisoformat(args.backfill_end) if args.backfill_end else date.today()
+            start = (
+                date.fromisoformat(args.backfill_start) if args.backfill_start
+                else end - timedelta(days=3653)
+            )
+            report = BackfillService().run(
+                [c for c in args.backfill.split(',') if c.strip()],
+                start,
+                end,
+                resume=not args.backfill_no_resume,
+                raw=args.backfill_raw,
+            )
+            logger.info(
+                f"回填完成: 共 {report['total']} 只，成功 {report['done']}，失败 {report['failed']}，"
+                f"跳过 {report['skipped']}；{report['bars']} 条日线，耗时 {report['elapsed_seconds']}s，"
+                f"{report['bars_per_second']} 条/秒"
+            )
+            logger.info("数据源 | 成功 | 报错 | 日线条数 | 条/秒")
+            for name, item in report['sources'].items():
+                logger.info(
+                    f"{name} | {item['done']} | {item['errors']} | {item['bars']} | {item['bars_per_second']}"
+                    + ("（已退出）" if item['retired'] else "")
+                )
+            return 0
+
+        # 模式0.4: 刷新复权因子
+        if getattr(args, 'refresh_adj_factors', None):
+            logger.info("模式: 刷新复权因子")
+            from src.services.adjustment_service import AdjustmentService
+
+            report = AdjustmentService().refresh_many(args.refresh_adj_factors.split(','))
+            for code, error in report['failed_codes'].items():
+                logger.warning(f"{code} 刷新失败: {error}")
+            for code in report['no_raw_codes']:
+                logger.warning(f"{code} 没有不复权日线，前复权日线未重建")
+            return 0 if report['failed'] == 0 and not report['no_raw_codes'] else 1
+
+        # 模式0.5: 作为分片加入已有运行
+        if getattr(args, 'join_run', None):
+            from dataclasses import replace
+
+            from src.core.sharding import build_shard_pipeline, run_shard_worker, shard_capacity
+
+            shard_count = args.shards or config.analysis_shards
+            logger.info(f"模式: 分片加入运行 {args.join_run}（分片数 {shard_count}）")
+            shard_config = replace(config, max_workers=args.workers or config.max_workers)
+            if getattr(args, 'no_context_snapshot', False):
+                shard_config = replace(shard_config, save_context_snapshot=False)
+            if shard_count > shard_capacity(shard_config):
+                logger.error(f"分片数 {shard_count} 超过并发配额允许的 {shard_capacity(shard_config)} 个，拒绝加入")
+                return 1
+            pipeline = build_shard_pipeline(args.join_run, shard_count, shard_config)
+            run_shard_worker(args.join_run, pipeline, send_notification=not args.no_notify)
+            return 0
+
+        # 模式0.6: 仅缓存预热
+        if getattr(args, 'warmup', False):
+            from src.core.warmup import run_warmup
+
+            logger.info("模式: 缓存预热")
+            run_warmup(config, stock_codes)
+            return 0
+
         # 模式1: 仅大盘复盘
         if args.market_review:
             from src.analyzer import GeminiAnalyzer
@@ -536,6 +887,10 @@ def main() -> int:
                     brave_keys=config.brave_api_keys,
                     serpapi_keys=config.serpapi_keys,
                     news_max_age_days=config.news_max_age_days,
+                    intel_timeout=config.search_intel_timeout,
+                    provider_max_concurrency=config.search_provider_max_concurrency,
+                    cache_persist=config.search_cache_persist,
+                    cache_max_entries=config.search_cache_max_entries,
                 )
 
             if config.gemini_api_key or config.openai_api_key:
@@ -557,7 +912,8 @@ def main() -> int:
         # 模式2: 定时任务模式
         if args.schedule or config.schedule_enabled:
             logger.info("模式: 定时任务")
-            logger.info(f"每日执行时间: {config.schedule_time}")
+            if not config.schedule_per_market:
+                logger.info(f"每日执行时间: {config.schedule_time}")
 
             # Determine whether to run immediately:
             # Command line arg --no-run-immediately overrides config if present.
@@ -568,15 +924,29 @@ def main() -> int:
             
             logger.info(f"启动时立即执行: {should_run_immediately}")
 
+            if config.schedule_per_market:
+                logger.info(f"按市场调度：各市场收盘后 {config.schedule_market_delay_minutes} 分钟执行")
+                run_per_market_schedule(config, args, stock_codes, run_immediately=should_run_immediately)
+                return 0
+
             from src.scheduler import run_with_schedule
 
             def scheduled_task():
                 run_full_analysis(config, args, stock_codes)
 
+            warmup_task = None
+            if config.warmup_enabled:
+                from src.core.warmup import run_warmup
+
+                def warmup_task():
+                    run_warmup(config, stock_codes)
+
             run_with_schedule(
                 task=scheduled_task,
                 schedule_time=config.schedule_time,
-                run_immediately=should_run_immediately
+                run_immediately=should_run_immediately,
+                warmup_task=warmup_task,
+                warmup_lead_minutes=config.warmup_lead_minutes
             )
             return 0
 
@@ -13,11 +13,12 @@ A股自选股智能分析系统 - AI分析层
 import json
 import logging
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
 from typing import Optional, Dict, Any, List
 from json_repair import repair_json
 
 from src.config import get_config
+from src.core.tracing import trace_span, traced
 
 logger = logging.getLogger(__name__)
 
@@ -199,6 +200,10 @@ class AnalysisResult:
     current_price: Optional[float] = None  # 分析时的股价
     change_pct: Optional[float] = None     # 分析时的涨跌幅(%)
 
+    # ========== 运行预算 ==========
+    degraded: List[str] = field(default_factory=list)  # 因截止时间预算跳过的可选步骤
+    reused: bool = False  # 输入无实质变化，复用了上次的分析结果
+
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
         return {
@@ -233,8 +238,16 @@ class AnalysisResult:
             'error_message': self.error_message,
             'current_price': self.current_price,
             'change_pct': self.change_pct,
+            'degraded': self.degraded,
+            'reused': self.reused,
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'AnalysisResult':
+        """从 to_dict() 结果（如历史记录 raw_result）还原，忽略未知字段"""
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
     def get_core_conclusion(self) -> str:
         """获取核心结论（一句话）"""
         if self.dashboard and 'core_conclusion' in self.dashboard:
@@ -719,6 +732,7 @@ class GeminiAnalyzer:
             or self._openai_client is not None
         )
 
+    @traced('llm_api', source='anthropic')
     def _call_anthropic_api(self, prompt: str, generation_config: dict) -> str:
         """
         调用 Anthropic Claude Messages API。
@@ -784,6 +798,7 @@ class GeminiAnalyzer:
                     raise
         raise Exception("Anthropic API failed after max retries")
 
+    @traced('llm_api', source='openai')
     def _call_openai_api(self, prompt: str, generation_config: dict) -> str:
         """
         调用 OpenAI 兼容 API
@@ -919,11 +934,12 @@ class GeminiAnalyzer:
                     logger.info(f"[Gemini] 第 {attempt + 1} 次重试，等待 {delay:.1f} 秒...")
                     time.sleep(delay)
                 
-                response = self._model.generate_content(
-                    prompt,
-                    generation_config=generation_config,
-                    request_options={"timeout": 120}
-                )
+                with trace_span('llm_api', source='gemini'):
+                    response = self._model.generate_content(
+                        prompt,
+                        generation_config=generation_config,
+                        request_options={"timeout": 120}
+                    )
                 
                 if response and response.text:
                     return response.text
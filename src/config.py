@@ -88,6 +88,11 @@ class Config:
     tavily_api_keys: List[str] = field(default_factory=list)  # Tavily API Keys
     brave_api_keys: List[str] = field(default_factory=list)  # Brave Search API Keys
     serpapi_keys: List[str] = field(default_factory=list)  # SerpAPI Keys
+    search_intel_timeout: float = 20.0  # 多维度情报搜索整体超时（秒），超时返回已完成维度
+    search_provider_max_concurrency: int = 2  # 单个搜索引擎最大并发请求数
+    search_cache_persist: bool = True  # 搜索结果缓存持久化到数据库（跨进程/重启复用）
+    search_cache_max_entries: int = 500  # 内存搜索缓存最大条目数（LRU）
+    search_sector_sharing: bool = True  # 同行业自选股共享行业维度搜索
 
     # === 新闻与分析筛选配置 ===
     news_max_age_days: int = 3   # 新闻最大时效（天）
@@ -168,6 +173,14 @@ class Config:
     # === 数据库配置 ===
     database_path: str = "./data/stock_analysis.db"
 
+    # 本地列式日线存储：与 stock_daily 同步，已完整覆盖的区间直接本地读取
+    bar_store_enabled: bool = True
+    bar_store_dir: str = ""  # 为空时使用数据库文件同目录下的 bars/
+
+    # 历史日线回填：各数据源并行，每个数据源独立并发与限速（rpm=0 表示仅依赖数据源自身的限速）
+    backfill_workers_per_source: int = 1
+    backfill_source_rpm: float = 0.0
+
     # 是否保存分析上下文快照（用于历史回溯）
     save_context_snapshot: bool = True
 
@@ -177,6 +190,8 @@ class Config:
     backtest_min_age_days: int = 14
     backtest_engine_version: str = "v1"
     backtest_neutral_band_pct: float = 2.0
+    backtest_batch_enabled: bool = True  # 向量化批量评估（按股票一次性加载日线）
+    backtest_chunk_size: int = 100  # 分块评估与保存的记录数（中断/取消时已完成的块保留）
     
     # === 日志配置 ===
     log_dir: str = "./logs"  # 日志文件目录
@@ -184,6 +199,38 @@ class Config:
     
     # === 系统配置 ===
     max_workers: int = 3  # 低并发防封禁
+    # 分阶段流水线：行情阶段沿用 max_workers，搜索/AI 阶段独立并发；rpm=0 表示不限速
+    pipeline_staged: bool = True
+    pipeline_search_workers: int = 4
+    pipeline_llm_workers: int = 4
+    pipeline_queue_size: int = 8
+    pipeline_data_rpm: float = 0.0
+    pipeline_search_rpm: float = 0.0
+    pipeline_llm_rpm: float = 0.0
+    # 截止时间预算：预计完成时间晚于截止时间时，低优先级股票跳过可选步骤（筹码、扩展情报维度、完整报告）
+    run_deadline: str = ""  # 截止时间（HH:MM，已过当日该时刻时顺延到次日），为空表示不限
+    run_budget_minutes: int = 0  # 相对运行开始的时长预算（分钟），0 表示不限；与 run_deadline 取较早者
+    pipeline_data_budget: float = 20.0  # 各阶段单只股票预估耗时（秒），尚无实测数据时用于推算完成时间
+    pipeline_search_budget: float = 30.0
+    pipeline_llm_budget: float = 60.0
+    deadline_priority_stocks: List[str] = field(default_factory=list)  # 高优先级股票，落后时也不降级
+    # 分析复用（默认关闭）：输入（日线、实时行情、筹码、新闻集合）与上次分析相比无实质变化时直接复用上次结果；
+    # 强制刷新（force_refresh）时不复用
+    analysis_reuse_enabled: bool = False
+    analysis_reuse_max_age_hours: float = 24.0  # 上次分析超过该时长则不复用
+    analysis_reuse_price_tolerance_pct: float = 0.5  # 价格相对变化容差（%），涨跌幅按百分点比较
+    analysis_reuse_volume_tolerance_pct: float = 10.0  # 成交量/量比/换手率相对变化容差（%）
+    analysis_reuse_chip_tolerance: float = 0.02  # 获利比例、集中度绝对变化容差
+    analysis_reuse_news_overlap: float = 1.0  # 新闻 URL 集合最低重合度（0-1，1 表示完全一致）
+    # 运行检查点：记录每只股票的阶段完成情况，中断后可通过 --resume 续跑（仅命令行/定时任务运行）
+    run_checkpoint_enabled: bool = True
+    # 耗时追踪：每次运行使用独立的追踪器，结束后在 reports/ 生成 perf_YYYYMMDD_HHMMSS_<run_id>.md（按步骤/数据源/股票的 p50/p95）
+    tracing_enabled: bool = True
+    trace_export_json: bool = False  # 额外导出 JSON 追踪数据
+    # 分片运行：将自选股分给多个进程/主机（共享数据库租约），各分片合计使用单进程的并发与限速预算
+    analysis_shards: int = 1
+    shard_batch_size: int = 4  # 每次领取的股票数
+    shard_lease_seconds: int = 600  # 租约时长，超时未完成的股票可被其他分片接管
     debug: bool = False
     http_proxy: Optional[str] = None  # HTTP 代理 (例如: http://127.0.0.1:10809)
     https_proxy: Optional[str] = None # HTTPS 代理
@@ -192,9 +239,17 @@ class Config:
     schedule_enabled: bool = False            # 是否启用定时任务
     schedule_time: str = "18:00"              # 每日推送时间（HH:MM 格式）
     schedule_run_immediately: bool = True     # 启动时是否立即执行一次
+    # 按市场调度：A 股 / 港股 / 美股各自在本市场收盘后执行，只分析本市场的股票（忽略 schedule_time）
+    schedule_per_market: bool = False
+    schedule_market_delay_minutes: int = 30   # 收盘后延迟分钟数（等待日线数据落地）
+    # 缓存预热：定时任务提前 N 分钟预取日线、实时行情、筹码、股票名称与低波动情报维度
+    warmup_enabled: bool = False
+    warmup_lead_minutes: int = 10
     market_review_enabled: bool = True        # 是否启用大盘复盘
     # 大盘复盘市场区域：cn(A股)、us(美股)、both(两者)，us 适合仅关注美股的用户
     market_review_region: str = "cn"
+    # 大盘复盘作为并发分支与个股分析同时执行（不依赖个股结果），在合并推送前汇合
+    market_review_concurrent: bool = True
 
     # === 实时行情增强数据配置 ===
     # 实时行情开关（关闭后使用历史收盘价进行分析）
@@ -219,6 +274,11 @@ class Config:
     discord_bot_status: str = "A股智能分析 | /help"
 
     # === 流控配置（防封禁关键参数）===
+    # 以下数据源限速按进程生效，分片运行时由 slice_budget 按分片数切分
+    # Efinance 请求间隔范围（秒）
+    efinance_sleep_min: float = 1.5
+    efinance_sleep_max: float = 3.0
+
     # Akshare 请求间隔范围（秒）
     akshare_sleep_min: float = 2.0
     akshare_sleep_max: float = 5.0
@@ -398,6 +458,11 @@ class Config:
             tavily_api_keys=tavily_api_keys,
             brave_api_keys=brave_api_keys,
             serpapi_keys=serpapi_keys,
+            search_intel_timeout=max(1.0, float(os.getenv('SEARCH_INTEL_TIMEOUT', '20'))),
+            search_provider_max_concurrency=max(1, int(os.getenv('SEARCH_PROVIDER_MAX_CONCURRENCY', '2'))),
+            search_cache_persist=os.getenv('SEARCH_CACHE_PERSIST', 'true').lower() == 'true',
+            search_cache_max_entries=max(1, int(os.getenv('SEARCH_CACHE_MAX_ENTRIES', '500'))),
+            search_sector_sharing=os.getenv('SEARCH_SECTOR_SHARING', 'true').lower() == 'true',
             news_max_age_days=max(1, int(os.getenv('NEWS_MAX_AGE_DAYS', '3'))),
             bias_threshold=max(1.0, float(os.getenv('BIAS_THRESHOLD', '5.0'))),
             wechat_webhook_url=os.getenv('WECHAT_WEBHOOK_URL'),
@@ -437,25 +502,67 @@ class Config:
             ],
             markdown_to_image_max_chars=int(os.getenv('MARKDOWN_TO_IMAGE_MAX_CHARS', '15000')),
             database_path=os.getenv('DATABASE_PATH', './data/stock_analysis.db'),
+            bar_store_enabled=os.getenv('BAR_STORE_ENABLED', 'true').lower() == 'true',
+            bar_store_dir=os.getenv('BAR_STORE_DIR', ''),
+            backfill_workers_per_source=max(1, int(os.getenv('BACKFILL_WORKERS_PER_SOURCE', '1'))),
+            backfill_source_rpm=max(0.0, float(os.getenv('BACKFILL_SOURCE_RPM', '0'))),
             save_context_snapshot=os.getenv('SAVE_CONTEXT_SNAPSHOT', 'true').lower() == 'true',
             backtest_enabled=os.getenv('BACKTEST_ENABLED', 'true').lower() == 'true',
             backtest_eval_window_days=int(os.getenv('BACKTEST_EVAL_WINDOW_DAYS', '10')),
             backtest_min_age_days=int(os.getenv('BACKTEST_MIN_AGE_DAYS', '14')),
             backtest_engine_version=os.getenv('BACKTEST_ENGINE_VERSION', 'v1'),
             backtest_neutral_band_pct=float(os.getenv('BACKTEST_NEUTRAL_BAND_PCT', '2.0')),
+            backtest_batch_enabled=os.getenv('BACKTEST_BATCH_ENABLED', 'true').lower() == 'true',
+            backtest_chunk_size=max(1, int(os.getenv('BACKTEST_CHUNK_SIZE', '100'))),
             log_dir=os.getenv('LOG_DIR', './logs'),
             log_level=os.getenv('LOG_LEVEL', 'INFO'),
             max_workers=int(os.getenv('MAX_WORKERS', '3')),
+            pipeline_staged=os.getenv('PIPELINE_STAGED', 'true').lower() == 'true',
+            pipeline_search_workers=max(1, int(os.getenv('PIPELINE_SEARCH_WORKERS', '4'))),
+            pipeline_llm_workers=max(1, int(os.getenv('PIPELINE_LLM_WORKERS', '4'))),
+            pipeline_queue_size=max(1, int(os.getenv('PIPELINE_QUEUE_SIZE', '8'))),
+            pipeline_data_rpm=max(0.0, float(os.getenv('PIPELINE_DATA_RPM', '0'))),
+            pipeline_search_rpm=max(0.0, float(os.getenv('PIPELINE_SEARCH_RPM', '0'))),
+            pipeline_llm_rpm=max(0.0, float(os.getenv('PIPELINE_LLM_RPM', '0'))),
+            run_deadline=os.getenv('RUN_DEADLINE', '').strip(),
+            run_budget_minutes=max(0, int(os.getenv('RUN_BUDGET_MINUTES', '0'))),
+            pipeline_data_budget=max(0.1, float(os.getenv('PIPELINE_DATA_BUDGET', '20'))),
+            pipeline_search_budget=max(0.1, float(os.getenv('PIPELINE_SEARCH_BUDGET', '30'))),
+            pipeline_llm_budget=max(0.1, float(os.getenv('PIPELINE_LLM_BUDGET', '60'))),
+            deadline_priority_stocks=[
+                code.strip() for code in os.getenv('DEADLINE_PRIORITY_STOCKS', '').split(',') if code.strip()
+            ],
+            analysis_reuse_enabled=os.getenv('ANALYSIS_REUSE_ENABLED', 'false').lower() == 'true',
+            analysis_reuse_max_age_hours=max(0.0, float(os.getenv('ANALYSIS_REUSE_MAX_AGE_HOURS', '24'))),
+            analysis_reuse_price_tolerance_pct=max(
+                0.0, float(os.getenv('ANALYSIS_REUSE_PRICE_TOLERANCE_PCT', '0.5'))
+            ),
+            analysis_reuse_volume_tolerance_pct=max(
+                0.0, float(os.getenv('ANALYSIS_REUSE_VOLUME_TOLERANCE_PCT', '10'))
+            ),
+            analysis_reuse_chip_tolerance=max(0.0, float(os.getenv('ANALYSIS_REUSE_CHIP_TOLERANCE', '0.02'))),
+            analysis_reuse_news_overlap=min(1.0, max(0.0, float(os.getenv('ANALYSIS_REUSE_NEWS_OVERLAP', '1.0')))),
+            run_checkpoint_enabled=os.getenv('RUN_CHECKPOINT_ENABLED', 'true').lower() == 'true',
+            tracing_enabled=os.getenv('TRACING_ENABLED', 'true').lower() == 'true',
+            trace_export_json=os.getenv('TRACE_EXPORT_JSON', 'false').lower() == 'true',
+            analysis_shards=max(1, int(os.getenv('ANALYSIS_SHARDS', '1'))),
+            shard_batch_size=max(1, int(os.getenv('SHARD_BATCH_SIZE', '4'))),
+            shard_lease_seconds=max(30, int(os.getenv('SHARD_LEASE_SECONDS', '600'))),
             debug=os.getenv('DEBUG', 'false').lower() == 'true',
             http_proxy=os.getenv('HTTP_PROXY'),
             https_proxy=os.getenv('HTTPS_PROXY'),
             schedule_enabled=os.getenv('SCHEDULE_ENABLED', 'false').lower() == 'true',
             schedule_time=os.getenv('SCHEDULE_TIME', '18:00'),
             schedule_run_immediately=os.getenv('SCHEDULE_RUN_IMMEDIATELY', 'true').lower() == 'true',
+            schedule_per_market=os.getenv('SCHEDULE_PER_MARKET', 'false').lower() == 'true',
+            schedule_market_delay_minutes=max(0, int(os.getenv('SCHEDULE_MARKET_DELAY_MINUTES', '30'))),
+            warmup_enabled=os.getenv('WARMUP_ENABLED', 'false').lower() == 'true',
+            warmup_lead_minutes=max(1, int(os.getenv('WARMUP_LEAD_MINUTES', '10'))),
             market_review_enabled=os.getenv('MARKET_REVIEW_ENABLED', 'true').lower() == 'true',
             market_review_region=cls._parse_market_review_region(
                 os.getenv('MARKET_REVIEW_REGION', 'cn')
             ),
+            market_review_concurrent=os.getenv('MARKET_REVIEW_CONCURRENT', 'true').lower() == 'true',
             webui_enabled=os.getenv('WEBUI_ENABLED', 'false').lower() == 'true',
             webui_host=os.getenv('WEBUI_HOST', '127.0.0.1'),
             webui_port=int(os.getenv('WEBUI_PORT', '8000')),
@@ -7,9 +7,11 @@ objects that look like daily OHLC bars.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import date
-from typing import Any, Dict, Iterable, List, Optional, Protocol, Sequence
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, Optional, Protocol, Sequence
+
+import numpy as np
 
 
 OVERALL_SENTINEL_CODE = "__overall__"
@@ -47,6 +49,51 @@ class EvaluationConfig:
     engine_version: str = "v1"
 
 
+@dataclass(frozen=True)
+class BarArrays:
+    """Columnar daily bars of one code, sorted by date (missing prices are NaN)."""
+
+    dates: np.ndarray  # datetime64[D]
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+
+    @classmethod
+    def split_panel(cls, panel: Mapping[str, np.ndarray]) -> Dict[str, "BarArrays"]:
+        """Split a (code, date)-sorted columnar panel (code/date/high/low/close) per code."""
+        codes = panel["code"]
+        if len(codes) == 0:
+            return {}
+        # Rows are grouped by code, so each code is one contiguous slice
+        bounds = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [len(codes)]))
+        return {
+            str(codes[start]): cls(
+                dates=panel["date"][start:end],
+                high=panel["high"][start:end],
+                low=panel["low"][start:end],
+                close=panel["close"][start:end],
+            )
+            for start, end in zip(starts, ends)
+        }
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+
+@dataclass(frozen=True)
+class BatchCandidate:
+    """One analysis to evaluate in batch mode."""
+
+    key: Hashable
+    code: str
+    operation_advice: Optional[str]
+    analysis_date: date
+    stop_loss: Optional[float]
+    take_profit: Optional[float]
+
+
 class BacktestEngine:
     """Long-only daily-bar backtesting engine."""
 
@@ -233,6 +280,176 @@ class BacktestEngine:
             "simulated_return_pct": simulated_return_pct,
         }
 
+    @classmethod
+    def locate_start(cls, bars: BarArrays, analysis_date: date) -> int:
+        """Index of the bar on analysis_date or the nearest previous one (-1 if none)."""
+        return int(np.searchsorted(bars.dates, np.datetime64(analysis_date, "D"), side="right")) - 1
+
+    @classmethod
+    def evaluate_batch(
+        cls,
+        *,
+        candidates: Sequence[BatchCandidate],
+        bars: Dict[str, BarArrays],
+        config: EvaluationConfig,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Evaluate many analyses at once with array operations.
+
+        Produces exactly what evaluate_single returns for each candidate, using
+        the bar on/before analysis_date as the start and the following bars as
+        the forward window. Returns None for candidates without a usable start
+        bar (no bar on/before analysis_date, or its close is missing).
+        """
+        eval_days = int(config.eval_window_days)
+        if eval_days <= 0:
+            raise ValueError("eval_window_days must be positive")
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(candidates)
+
+        # Concatenate every code's bars into one panel; candidates index into it by offset.
+        codes = sorted({c.code for c in candidates if c.code in bars})
+        offsets: Dict[str, int] = {}
+        total = 0
+        for code in codes:
+            offsets[code] = total
+            total += len(bars[code])
+        if codes:
+            panel_dates = np.concatenate([bars[c].dates for c in codes])
+            panel_high = np.concatenate([bars[c].high for c in codes])
+            panel_low = np.concatenate([bars[c].low for c in codes])
+            panel_close = np.concatenate([bars[c].close for c in codes])
+
+        rows: List[int] = []
+        starts: List[int] = []
+        start_prices: List[float] = []
+        for i, cand in enumerate(candidates):
+            code_bars = bars.get(cand.code)
+            if code_bars is None:
+                continue
+            start = cls.locate_start(code_bars, cand.analysis_date)
+            if start < 0 or np.isnan(code_bars.close[start]):
+                continue
+            start_date = code_bars.dates[start].astype(object)
+            start_price = float(code_bars.close[start])
+            if start_price <= 0 or len(code_bars) - start - 1 < eval_days:
+                # Outcome does not depend on the bars: reuse the scalar path for error/insufficient rows.
+                results[i] = cls.evaluate_single(
+                    operation_advice=cand.operation_advice,
+                    analysis_date=start_date,
+                    start_price=start_price,
+                    forward_bars=(),
+                    stop_loss=cand.stop_loss,
+                    take_profit=cand.take_profit,
+                    config=config,
+                )
+                continue
+            rows.append(i)
+            starts.append(offsets[cand.code] + start)
+            start_prices.append(start_price)
+
+        if not rows:
+            return results
+
+        # (n, eval_days) window matrices
+        window_idx = np.asarray(starts)[:, None] + 1 + np.arange(eval_days)
+        highs = panel_high[window_idx]
+        lows = panel_low[window_idx]
+        closes = panel_close[window_idx]
+        start_arr = np.asarray(start_prices, dtype=np.float64)
+
+        end_close = closes[:, -1]
+        max_high = np.fmax.reduce(highs, axis=1)
+        min_low = np.fmin.reduce(lows, axis=1)
+        stock_return = (end_close - start_arr) / start_arr * 100
+
+        stop_arr = np.array(
+            [np.nan if candidates[i].stop_loss is None else float(candidates[i].stop_loss) for i in rows]
+        )
+        take_arr = np.array(
+            [np.nan if candidates[i].take_profit is None else float(candidates[i].take_profit) for i in rows]
+        )
+        # NaN comparisons are False, matching the scalar "is not None" guards
+        stop_hits = lows <= stop_arr[:, None]
+        take_hits = highs >= take_arr[:, None]
+        any_hit = stop_hits | take_hits
+        has_hit = any_hit.any(axis=1)
+        first_idx = np.argmax(any_hit, axis=1)
+        arange_n = np.arange(len(rows))
+        first_stop = stop_hits[arange_n, first_idx] & has_hit
+        first_take = take_hits[arange_n, first_idx] & has_hit
+        first_dates = panel_dates[window_idx[arange_n, first_idx]]
+
+        for n, i in enumerate(rows):
+            cand = candidates[i]
+            start_price = start_prices[n]
+            end = cls._optional_float(end_close[n])
+            ret = None if end is None else float(stock_return[n])
+            direction_expected = cls.infer_direction_expected(cand.operation_advice)
+            position = cls.infer_position_recommendation(cand.operation_advice)
+            outcome, direction_correct = cls._classify_outcome(
+                stock_return_pct=ret,
+                direction_expected=direction_expected,
+                neutral_band_pct=config.neutral_band_pct,
+            )
+
+            hit_sl: Optional[bool] = None
+            hit_tp: Optional[bool] = None
+            first_hit_date: Optional[date] = None
+            first_hit_days: Optional[int] = None
+            if position != "long":
+                first_hit, exit_price, exit_reason = "not_applicable", None, "cash"
+            elif cand.stop_loss is None and cand.take_profit is None:
+                first_hit, exit_price, exit_reason = "neither", end, "window_end"
+            else:
+                hit_sl = None if cand.stop_loss is None else bool(first_stop[n])
+                hit_tp = None if cand.take_profit is None else bool(first_take[n])
+                first_hit, exit_price, exit_reason = "neither", end, "window_end"
+                if has_hit[n]:
+                    first_hit_date = first_dates[n].astype(object)
+                    first_hit_days = int(first_idx[n]) + 1
+                    if first_stop[n] and first_take[n]:
+                        first_hit, exit_price, exit_reason = "ambiguous", cand.stop_loss, "ambiguous_stop_loss"
+                    elif first_stop[n]:
+                        first_hit, exit_price, exit_reason = "stop_loss", cand.stop_loss, "stop_loss"
+                    else:
+                        first_hit, exit_price, exit_reason = "take_profit", cand.take_profit, "take_profit"
+
+            if position != "long":
+                simulated_return_pct: Optional[float] = 0.0
+            elif exit_price is None:
+                simulated_return_pct = None
+            else:
+                simulated_return_pct = (exit_price - start_price) / start_price * 100
+
+            results[i] = {
+                "analysis_date": panel_dates[starts[n]].astype(object),
+                "eval_window_days": eval_days,
+                "engine_version": config.engine_version,
+                "eval_status": "completed",
+                "operation_advice": cand.operation_advice,
+                "position_recommendation": position,
+                "start_price": start_price,
+                "end_close": end,
+                "max_high": cls._optional_float(max_high[n]),
+                "min_low": cls._optional_float(min_low[n]),
+                "stock_return_pct": ret,
+                "direction_expected": direction_expected,
+                "direction_correct": direction_correct,
+                "outcome": outcome,
+                "stop_loss": cand.stop_loss,
+                "take_profit": cand.take_profit,
+                "hit_stop_loss": hit_sl,
+                "hit_take_profit": hit_tp,
+                "first_hit": first_hit,
+                "first_hit_date": first_hit_date,
+                "first_hit_trading_days": first_hit_days,
+                "simulated_entry_price": start_price if position == "long" else None,
+                "simulated_exit_price": exit_price,
+                "simulated_exit_reason": exit_reason,
+                "simulated_return_pct": simulated_return_pct,
+            }
+        return results
+
     @classmethod
     def compute_summary(
         cls,
@@ -244,110 +461,16 @@ class BacktestEngine:
         engine_version: str,
     ) -> Dict[str, Any]:
         """Aggregate BacktestResult rows into summary metrics."""
-        results_list = list(results)
-
-        total = len(results_list)
-        completed = [r for r in results_list if (r.eval_status or "") == "completed"]
-        insufficient_count = sum(1 for r in results_list if (r.eval_status or "") == "insufficient_data")
-
-        long_count = sum(1 for r in completed if (r.position_recommendation or "") == "long")
-        cash_count = sum(1 for r in completed if (r.position_recommendation or "") == "cash")
-
-        win_count = sum(1 for r in completed if (r.outcome or "") == "win")
-        loss_count = sum(1 for r in completed if (r.outcome or "") == "loss")
-        neutral_count = sum(1 for r in completed if (r.outcome or "") == "neutral")
-
-        direction_denominator = sum(1 for r in completed if r.direction_correct is not None)
-        direction_numerator = sum(1 for r in completed if r.direction_correct is True)
-        direction_accuracy_pct = (
-            round(direction_numerator / direction_denominator * 100, 2) if direction_denominator else None
-        )
-
-        win_loss_denominator = win_count + loss_count
-        win_rate_pct = round(win_count / win_loss_denominator * 100, 2) if win_loss_denominator else None
-        neutral_rate_pct = round(neutral_count / len(completed) * 100, 2) if completed else None
-
-        avg_stock_return_pct = cls._average([r.stock_return_pct for r in completed])
-        avg_simulated_return_pct = cls._average([r.simulated_return_pct for r in completed])
-
-        stop_applicable = [
-            r
-            for r in completed
-            if (r.position_recommendation or "") == "long" and r.hit_stop_loss is not None
-        ]
-        stop_loss_trigger_rate = (
-            round(sum(1 for r in stop_applicable if r.hit_stop_loss is True) / len(stop_applicable) * 100, 2)
-            if stop_applicable
-            else None
-        )
-
-        take_profit_applicable = [
-            r
-            for r in completed
-            if (r.position_recommendation or "") == "long" and r.hit_take_profit is not None
-        ]
-        take_profit_trigger_rate = (
-            round(
-                sum(1 for r in take_profit_applicable if r.hit_take_profit is True) / len(take_profit_applicable) * 100,
-                2,
-            )
-            if take_profit_applicable
-            else None
-        )
-
-        any_target_applicable = [
-            r
-            for r in completed
-            if (r.position_recommendation or "") == "long"
-            and (r.hit_stop_loss is not None or r.hit_take_profit is not None)
-        ]
-        ambiguous_rate = (
-            round(
-                sum(1 for r in any_target_applicable if (r.first_hit or "") == "ambiguous")
-                / len(any_target_applicable)
-                * 100,
-                2,
-            )
-            if any_target_applicable
-            else None
-        )
-        avg_days_to_first_hit = cls._average(
-            [
-                float(r.first_hit_trading_days)
-                for r in any_target_applicable
-                if r.first_hit_trading_days is not None and (r.first_hit or "") in ("stop_loss", "take_profit", "ambiguous")
-            ]
+        accumulator = SummaryAccumulator()
+        for row in results:
+            accumulator.add(row)
+        return accumulator.to_summary(
+            scope=scope,
+            code=code,
+            eval_window_days=eval_window_days,
+            engine_version=engine_version,
         )
 
-        advice_breakdown = cls._compute_advice_breakdown(completed)
-        diagnostics = cls._compute_diagnostics(results_list)
-
-        return {
-            "scope": scope,
-            "code": code,
-            "eval_window_days": int(eval_window_days),
-            "engine_version": engine_version,
-            "total_evaluations": total,
-            "completed_count": len(completed),
-            "insufficient_count": insufficient_count,
-            "long_count": long_count,
-            "cash_count": cash_count,
-            "win_count": win_count,
-            "loss_count": loss_count,
-            "neutral_count": neutral_count,
-            "direction_accuracy_pct": direction_accuracy_pct,
-            "win_rate_pct": win_rate_pct,
-            "neutral_rate_pct": neutral_rate_pct,
-            "avg_stock_return_pct": avg_stock_return_pct,
-            "avg_simulated_return_pct": avg_simulated_return_pct,
-            "stop_loss_trigger_rate": stop_loss_trigger_rate,
-            "take_profit_trigger_rate": take_profit_trigger_rate,
-            "ambiguous_rate": ambiguous_rate,
-            "avg_days_to_first_hit": avg_days_to_first_hit,
-            "advice_breakdown": advice_breakdown,
-            "diagnostics": diagnostics,
-        }
-
     @staticmethod
     def _normalize_text(value: Optional[str]) -> str:
         return str(value or "").strip().lower()
@@ -513,42 +636,199 @@ class BacktestEngine:
         )
 
     @staticmethod
-    def _average(values: Iterable[Optional[float]]) -> Optional[float]:
-        items = [float(v) for v in values if v is not None]
-        if not items:
-            return None
-        return round(sum(items) / len(items), 4)
+    def _optional_float(value: float) -> Optional[float]:
+        return None if np.isnan(value) else float(value)
+
+
+_SUMMARY_COUNTERS = (
+    "total",
+    "completed",
+    "insufficient",
+    "long",
+    "cash",
+    "win",
+    "loss",
+    "neutral",
+    "direction_denominator",
+    "direction_numerator",
+    "stock_return_count",
+    "simulated_return_count",
+    "stop_applicable",
+    "stop_hits",
+    "take_profit_applicable",
+    "take_profit_hits",
+    "target_applicable",
+    "ambiguous",
+    "first_hit_days_count",
+)
+_SUMMARY_SUMS = ("stock_return_sum", "simulated_return_sum", "first_hit_days_sum")
+
+
+@dataclass
+class SummaryAccumulator:
+    """Mergeable state behind a backtest summary.
+
+    Holds the counts, sums and denominators compute_summary needs, so a summary
+    can be updated by adding new rows (and removing replaced ones) instead of
+    re-reading every stored result. Percentages are derived on to_summary().
+    """
+
+    counters: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(_SUMMARY_COUNTERS, 0))
+    sums: Dict[str, float] = field(default_factory=lambda: dict.fromkeys(_SUMMARY_SUMS, 0.0))
+    advice: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    eval_status: Dict[str, int] = field(default_factory=dict)
+    first_hit: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, row: BacktestResultLike, sign: int = 1) -> None:
+        """Account for one result row (sign=-1 removes a previously added row)."""
+        c = self.counters
+        c["total"] += sign
+        _bump(self.eval_status, (row.eval_status or "").strip() or "(unknown)", sign)
+        _bump(self.first_hit, (row.first_hit or "").strip() or "(none)", sign)
+
+        if (row.eval_status or "") == "insufficient_data":
+            c["insufficient"] += sign
+        if (row.eval_status or "") != "completed":
+            return
+
+        c["completed"] += sign
+        position = row.position_recommendation or ""
+        outcome = row.outcome or ""
+        if position == "long":
+            c["long"] += sign
+        elif position == "cash":
+            c["cash"] += sign
+        if outcome in ("win", "loss", "neutral"):
+            c[outcome] += sign
+        if row.direction_correct is not None:
+            c["direction_denominator"] += sign
+            if row.direction_correct is True:
+                c["direction_numerator"] += sign
+        if row.stock_return_pct is not None:
+            c["stock_return_count"] += sign
+            self.sums["stock_return_sum"] += sign * float(row.stock_return_pct)
+        if row.simulated_return_pct is not None:
+            c["simulated_return_count"] += sign
+            self.sums["simulated_return_sum"] += sign * float(row.simulated_return_pct)
+
+        if position == "long":
+            if row.hit_stop_loss is not None:
+                c["stop_applicable"] += sign
+                c["stop_hits"] += sign if row.hit_stop_loss is True else 0
+            if row.hit_take_profit is not None:
+                c["take_profit_applicable"] += sign
+                c["take_profit_hits"] += sign if row.hit_take_profit is True else 0
+            if row.hit_stop_loss is not None or row.hit_take_profit is not None:
+                c["target_applicable"] += sign
+                first_hit = row.first_hit or ""
+                c["ambiguous"] += sign if first_hit == "ambiguous" else 0
+                if row.first_hit_trading_days is not None and first_hit in ("stop_loss", "take_profit", "ambiguous"):
+                    c["first_hit_days_count"] += sign
+                    self.sums["first_hit_days_sum"] += sign * float(row.first_hit_trading_days)
+
+        bucket_key = (row.operation_advice or "").strip() or "(unknown)"
+        bucket = self.advice.setdefault(bucket_key, {"total": 0, "win": 0, "loss": 0, "neutral": 0})
+        bucket["total"] += sign
+        if outcome.strip() in ("win", "loss", "neutral"):
+            bucket[outcome.strip()] += sign
+        if bucket["total"] == 0:
+            del self.advice[bucket_key]
+
+    def remove(self, row: BacktestResultLike) -> None:
+        self.add(row, sign=-1)
+
+    def merge(self, other: "SummaryAccumulator") -> None:
+        for name, value in other.counters.items():
+            self.counters[name] += value
+        for name, value in other.sums.items():
+            self.sums[name] += value
+        for key, bucket in other.advice.items():
+            target = self.advice.setdefault(key, {"total": 0, "win": 0, "loss": 0, "neutral": 0})
+            for field_name, value in bucket.items():
+                target[field_name] += value
+            if target["total"] == 0:
+                del self.advice[key]
+        for key, value in other.eval_status.items():
+            _bump(self.eval_status, key, value)
+        for key, value in other.first_hit.items():
+            _bump(self.first_hit, key, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "counters": dict(self.counters),
+            "sums": dict(self.sums),
+            "advice": {k: dict(v) for k, v in self.advice.items()},
+            "eval_status": dict(self.eval_status),
+            "first_hit": dict(self.first_hit),
+        }
 
-    @staticmethod
-    def _compute_advice_breakdown(results: List[BacktestResultLike]) -> Dict[str, Any]:
-        breakdown: Dict[str, Dict[str, int]] = {}
-        for row in results:
-            advice = (row.operation_advice or "").strip() or "(unknown)"
-            bucket = breakdown.setdefault(advice, {"total": 0, "win": 0, "loss": 0, "neutral": 0})
-            bucket["total"] += 1
-            outcome = (row.outcome or "").strip()
-            if outcome in ("win", "loss", "neutral"):
-                bucket[outcome] += 1
-
-        enriched: Dict[str, Any] = {}
-        for advice, bucket in breakdown.items():
-            win = bucket["win"]
-            loss = bucket["loss"]
-            denom = win + loss
-            win_rate = round(win / denom * 100, 2) if denom else None
-            enriched[advice] = {**bucket, "win_rate_pct": win_rate}
-        return enriched
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SummaryAccumulator":
+        acc = cls()
+        acc.counters.update({k: int(v) for k, v in (data.get("counters") or {}).items()})
+        acc.sums.update({k: float(v) for k, v in (data.get("sums") or {}).items()})
+        acc.advice = {k: {f: int(n) for f, n in v.items()} for k, v in (data.get("advice") or {}).items()}
+        acc.eval_status = {k: int(v) for k, v in (data.get("eval_status") or {}).items()}
+        acc.first_hit = {k: int(v) for k, v in (data.get("first_hit") or {}).items()}
+        return acc
+
+    def to_summary(
+        self,
+        *,
+        scope: str,
+        code: Optional[str],
+        eval_window_days: int,
+        engine_version: str,
+    ) -> Dict[str, Any]:
+        c = self.counters
+        win_loss = c["win"] + c["loss"]
+        advice_breakdown: Dict[str, Any] = {}
+        for advice, bucket in self.advice.items():
+            denom = bucket["win"] + bucket["loss"]
+            win_rate = round(bucket["win"] / denom * 100, 2) if denom else None
+            advice_breakdown[advice] = {**bucket, "win_rate_pct": win_rate}
 
-    @staticmethod
-    def _compute_diagnostics(results: List[BacktestResultLike]) -> Dict[str, Any]:
-        status_counts: Dict[str, int] = {}
-        first_hit_counts: Dict[str, int] = {}
-        for row in results:
-            status = (row.eval_status or "").strip() or "(unknown)"
-            status_counts[status] = status_counts.get(status, 0) + 1
-            first_hit = (row.first_hit or "").strip() or "(none)"
-            first_hit_counts[first_hit] = first_hit_counts.get(first_hit, 0) + 1
         return {
-            "eval_status": status_counts,
-            "first_hit": first_hit_counts,
+            "scope": scope,
+            "code": code,
+            "eval_window_days": int(eval_window_days),
+            "engine_version": engine_version,
+            "total_evaluations": c["total"],
+            "completed_count": c["completed"],
+            "insufficient_count": c["insufficient"],
+            "long_count": c["long"],
+            "cash_count": c["cash"],
+            "win_count": c["win"],
+            "loss_count": c["loss"],
+            "neutral_count": c["neutral"],
+            "direction_accuracy_pct": _rate(c["direction_numerator"], c["direction_denominator"]),
+            "win_rate_pct": _rate(c["win"], win_loss),
+            "neutral_rate_pct": _rate(c["neutral"], c["completed"]),
+            "avg_stock_return_pct": _mean(self.sums["stock_return_sum"], c["stock_return_count"]),
+            "avg_simulated_return_pct": _mean(self.sums["simulated_return_sum"], c["simulated_return_count"]),
+            "stop_loss_trigger_rate": _rate(c["stop_hits"], c["stop_applicable"]),
+            "take_profit_trigger_rate": _rate(c["take_profit_hits"], c["take_profit_applicable"]),
+            "ambiguous_rate": _rate(c["ambiguous"], c["target_applicable"]),
+            "avg_days_to_first_hit": _mean(self.sums["first_hit_days_sum"], c["first_hit_days_count"]),
+            "advice_breakdown": advice_breakdown,
+            "diagnostics": {
+                "eval_status": dict(self.eval_status),
+                "first_hit": dict(self.first_hit),
+            },
         }
+
+
+def _bump(counts: Dict[str, int], key: str, delta: int) -> None:
+    value = counts.get(key, 0) + delta
+    if value:
+        counts[key] = value
+    else:
+        counts.pop(key, None)
+
+
+def _rate(numerator: int, denominator: int) -> Optional[float]:
+    return round(numerator / denominator * 100, 2) if denominator else None
+
+
+def _mean(total: float, count: int) -> Optional[float]:
+    return round(total / count, 4) if count else None
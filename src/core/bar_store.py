@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+本地列式日线存储
+===================================
+
+职责：
+1. 按 股票/年份 保存日线列式文件（{root}/{code}/{year}.npy），读取时内存映射，只复制请求区间的切片
+2. 记录每只股票已完整覆盖的日期区间（coverage.json），只有请求区间被完整覆盖时才直接返回本地数据
+3. 由 DatabaseManager.save_daily_data 在写入 stock_daily 后同步，保持与数据库一致
+
+文件格式：
+- 每个 .npy 为 float64 的二维数组，形状 (8, N)，按列存放：
+  第 0 行为日期（1970-01-01 起的天数），其余依次为 open/high/low/close/volume/amount/pct_chg
+- 各列在文件中连续存放，按列读取即为零拷贝的内存映射视图
+
+覆盖区间说明：
+- 一次保存的 DataFrame 覆盖其首尾日期之间的所有交易日（数据源返回的是连续区间）
+- 区间终点不超过最近一根已收盘的日线：交易时段内的当日日线仍会变化，必须回源获取
+- 判断区间衔接时按交易日历跳过周末/节假日；节假日表未覆盖的年份可能误判为缺口，最坏情况下多回源一次
+- 已覆盖的日线被写入不同价格时（前复权数据在除权后整体重算）清除该股票的全部覆盖记录，
+  只保留本次写入的区间，不会把新旧两种价格基准拼在一起返回
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.config import get_config
+from src.core.trading_calendar import TradingCalendar, get_calendar_for_code
+
+logger = logging.getLogger(__name__)
+
+# 价格/成交列（文件中第 1 行起的顺序）
+BAR_COLUMNS = ('open', 'high', 'low', 'close', 'volume', 'amount', 'pct_chg')
+
+_EPOCH = date(1970, 1, 1)
+_COVERAGE_FILE = 'coverage.json'
+
+
+def _day_number(day: date) -> int:
+    return (day - _EPOCH).days
+
+
+class BarStore:
+    """
+    本地列式日线存储（线程安全）
+
+    写入：write_year() 整年覆盖写入，mark_covered() 登记覆盖区间
+    读取：load() 在请求区间被完整覆盖时返回 DataFrame，否则返回 None
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._lock = threading.RLock()
+
+    # ========== 读取 ==========
+
+    def load(self, code: str, start: date, end: date) -> Optional[pd.DataFrame]:
+        """
+        读取 [start, end] 区间的日线
+
+        Returns:
+            列为 code/date + BAR_COLUMNS 的 DataFrame（按日期升序）；
+            区间未被完整覆盖或没有数据时返回 None
+        """
+        calendar = get_calendar_for_code(code)
+        settled = calendar.latest_settled_bar_date()
+        if end > settled:
+            # 当日日线尚在变化（交易时段内）时必须回源
+            if calendar.latest_bar_date() > settled:
+                return None
+            end = settled
+        if start > end or not self.is_covered(code, start, end, calendar):
+            return None
+
+        slices = []
+        for year in range(start.year, end.year + 1):
+            path = self._year_path(code, year)
+            if not path.exists():
+                continue
+            data = np.load(path, mmap_mode='r')
+            lo = int(np.searchsorted(data[0], _day_number(start), side='left'))
+            hi = int(np.searchsorted(data[0], _day_number(end), side='right'))
+            if hi > lo:
+                slices.append(np.array(data[:, lo:hi]))
+        if not slices:
+            return None
+
+        data = np.concatenate(slices, axis=1)
+        frame = pd.DataFrame({
+            'code': code,
+            'date': pd.to_datetime(data[0].astype('int64').astype('datetime64[D]')),
+        })
+        for i, name in enumerate(BAR_COLUMNS, start=1):
+            frame[name] = data[i]
+        return frame
+
+    def is_covered(self, code: str, start: date, end: date, calendar: Optional[TradingCalendar] = None) -> bool:
+        """[start, end] 内的所有交易日是否都已同步到本地"""
+        calendar = calendar or get_calendar_for_code(code)
+        for range_start, range_end in self._read_coverage(code):
+            if range_start > end or range_end < start:
+                continue
+            if not _has_trading_day(calendar, start, range_start - timedelta(days=1)) \
+                    and not _has_trading_day(calendar, range_end + timedelta(days=1), end):
+                return True
+        return False
+
+    # ========== 写入 ==========
+
+    def write_year(self, code: str, year: int, rows: Iterable[Sequence]) -> bool:
+        """
+        覆盖写入某只股票一整年的日线
+
+        已覆盖区间内的日线价格与新数据不一致时（如数据源的前复权价格在除权后整体重算），
+        先清除该股票的覆盖记录再写入，避免按覆盖区间拼出不同价格基准的序列
+
+        Args:
+            rows: (date, open, high, low, close, volume, amount, pct_chg) 按日期升序
+
+        Returns:
+            是否因价格变化清除了覆盖记录
+        """
+        records = [
+            [_day_number(r[0])] + [np.nan if v is None else float(v) for v in r[1:1 + len(BAR_COLUMNS)]]
+            for r in rows
+        ]
+        data = np.array(records, dtype=np.float64).reshape(-1, 1 + len(BAR_COLUMNS)).T
+        path = self._year_path(code, year)
+        with self._lock:
+            rebased = self._covered_prices_changed(code, path, data)
+            if rebased:
+                logger.info(f"[BarStore] {code} {year} 年已同步的日线价格发生变化，清除覆盖记录")
+                self.invalidate(code)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + '.tmp')
+            with open(tmp, 'wb') as f:
+                np.save(f, np.ascontiguousarray(data))
+            # 原子替换：已打开的内存映射继续读取旧文件
+            os.replace(tmp, path)
+        return rebased
+
+    def mark_covered(self, code: str, start: date, end: date) -> None:
+        """登记 [start, end] 已完整同步（终点截断到最近一根已收盘的日线）"""
+        calendar = get_calendar_for_code(code)
+        end = min(end, calendar.latest_settled_bar_date())
+        if start > end:
+            return
+        with self._lock:
+            ranges = self._read_coverage(code) + [(start, end)]
+            self._write_coverage(code, _merge_ranges(ranges, calendar))
+
+    def invalidate(self, code: str) -> None:
+        """清除覆盖记录（同步失败时调用，之后的读取全部回源）"""
+        with self._lock:
+            try:
+                (self.root / code / _COVERAGE_FILE).unlink()
+            except FileNotFoundError:
+                pass
+
+    # ========== 内部方法 ==========
+
+    def _year_path(self, code: str, year: int) -> Path:
+        return self.root / code / f'{year}.npy'
+
+    def _covered_prices_changed(self, code: str, path: Path, data: np.ndarray) -> bool:
+        """已覆盖区间内与新数据同日的 open/high/low/close 是否有变化（未覆盖的日期不比较）"""
+        ranges = self._read_coverage(code)
+        if not ranges or not path.exists():
+            return False
+        old = np.load(path, mmap_mode='r')
+        days, old_idx, new_idx = np.intersect1d(old[0], data[0], assume_unique=True, return_indices=True)
+        covered = np.zeros(len(days), dtype=bool)
+        for start, end in ranges:
+            covered |= (days >= _day_number(start)) & (days <= _day_number(end))
+        if not covered.any():
+            return False
+        # 第 1~4 行为 open/high/low/close
+        old_prices = old[1:5, old_idx[covered]]
+        new_prices = data[1:5, new_idx[covered]]
+        return not np.allclose(old_prices, new_prices, rtol=1e-9, atol=0.0, equal_nan=True)
+
+    def _read_coverage(self, code: str) -> List[Tuple[date, date]]:
+        path = self.root / code / _COVERAGE_FILE
+        try:
+            payload = json.loads(path.read_text(encoding='utf-8'))
+            return [(date.fromisoformat(a), date.fromisoformat(b)) for a, b in payload.get('ranges', [])]
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            logger.warning(f"[BarStore] 覆盖记录损坏，忽略 {code}: {e}")
+            return []
+
+    def _write_coverage(self, code: str, ranges: List[Tuple[date, date]]) -> None:
+        path = self.root / code / _COVERAGE_FILE
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.tmp')
+        tmp.write_text(
+            json.dumps({'ranges': [[a.isoformat(), b.isoformat()] for a, b in ranges]}),
+            encoding='utf-8',
+        )
+        os.replace(tmp, path)
+
+
+def _has_trading_day(calendar: TradingCalendar, start: date, end: date) -> bool:
+    """[start, end] 内是否存在交易日（空区间为 False）"""
+    day = start
+    while day <= end:
+        if calendar.is_trading_day(day):
+            return True
+        day += timedelta(days=1)
+    return False
+
+
+def _merge_ranges(ranges: List[Tuple[date, date]], calendar: TradingCalendar) -> List[Tuple[date, date]]:
+    """合并重叠或之间只隔非交易日的区间"""
+    merged: List[Tuple[date, date]] = []
+    for start, end in sorted(ranges):
+        if merged and not _has_trading_day(calendar, merged[-1][1] + timedelta(days=1), start - timedelta(days=1)):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+_stores: Dict[str, BarStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_bar_store() -> Optional[BarStore]:
+    """
+    获取当前配置对应的本地日线存储
+
+    目录为 BAR_STORE_DIR，未配置时为数据库文件同目录下的 bars/；BAR_STORE_ENABLED=false 时返回 None
+    """
+    config = get_config()
+    if not getattr(config, 'bar_store_enabled', True):
+        return None
+    root = getattr(config, 'bar_store_dir', '') or str(Path(config.database_path).parent / 'bars')
+    key = str(Path(root).absolute())
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = BarStore(Path(key))
+        return store
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+分析输入变化检测
+===================================
+
+职责：
+1. 从增强上下文与情报搜索结果中提取输入指纹：最新日线、实时行情、筹码分布、新闻 URL 集合
+2. 按可配置的容差比较本次与上次分析的指纹，判断输入是否发生实质变化
+
+同一天重复分析、或非交易日再次分析时，输入通常与上次完全一致，此时可直接复用上次的分析结果，
+省去情报整理与 AI 调用。
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+@dataclass
+class ReuseTolerance:
+    """复用判定容差"""
+    price_pct: float = 0.5  # 价格（收盘价/现价/平均成本）相对变化（%）；涨跌幅按百分点比较
+    volume_pct: float = 10.0  # 成交量、量比、换手率相对变化（%）
+    chip: float = 0.02  # 获利比例、集中度绝对变化
+    news_overlap: float = 1.0  # 新闻 URL 集合的 Jaccard 相似度下限（1.0 表示完全一致）
+
+    @classmethod
+    def from_config(cls, config) -> 'ReuseTolerance':
+        return cls(
+            price_pct=config.analysis_reuse_price_tolerance_pct,
+            volume_pct=config.analysis_reuse_volume_tolerance_pct,
+            chip=config.analysis_reuse_chip_tolerance,
+            news_overlap=config.analysis_reuse_news_overlap,
+        )
+
+
+# (特征分组, 字段) -> 比较方式
+_PRICE_FIELDS = [('bar', 'close'), ('realtime', 'price'), ('chip', 'avg_cost')]
+_POINT_FIELDS = [('bar', 'pct_chg'), ('realtime', 'change_pct')]
+_VOLUME_FIELDS = [('bar', 'volume'), ('realtime', 'volume_ratio'), ('realtime', 'turnover_rate')]
+_CHIP_FIELDS = [('chip', 'profit_ratio'), ('chip', 'concentration_90')]
+
+
+def _pick(source: Optional[Dict[str, Any]], keys: Iterable[str]) -> Dict[str, Any]:
+    source = source or {}
+    return {key: source.get(key) for key in keys}
+
+
+def collect_news_urls(intel_results: Optional[Dict[str, Any]]) -> List[str]:
+    """多维度情报搜索结果中的新闻 URL（去重、排序）"""
+    urls = set()
+    for response in (intel_results or {}).values():
+        if not getattr(response, 'success', False):
+            continue
+        for item in getattr(response, 'results', None) or []:
+            if getattr(item, 'url', None):
+                urls.add(item.url)
+    return sorted(urls)
+
+
+def build_fingerprint(
+    enhanced_context: Dict[str, Any],
+    news_urls: Optional[List[str]],
+) -> Dict[str, Any]:
+    """
+    提取分析输入指纹
+
+    Args:
+        enhanced_context: 增强后的分析上下文（含 today / realtime / chip）
+        news_urls: 情报搜索得到的新闻 URL 列表；None 表示本次未知（如复用了检查点中的情报文本）
+
+    Returns:
+        指纹特征字典（可 JSON 序列化）
+    """
+    return {
+        'bar_date': enhanced_context.get('date'),
+        'bar': _pick(enhanced_context.get('today'), ('close', 'pct_chg', 'volume')),
+        'realtime': _pick(enhanced_context.get('realtime'), ('price', 'change_pct', 'volume_ratio', 'turnover_rate')),
+        'chip': _pick(enhanced_context.get('chip'), ('profit_ratio', 'avg_cost', 'concentration_90')),
+        'news_urls': news_urls,
+    }
+
+
+def _relative_change_pct(current: float, previous: float) -> float:
+    if previous == 0:
+        return 0.0 if current == 0 else float('inf')
+    return abs(current - previous) / abs(previous) * 100
+
+
+def _within(current: Any, previous: Any, tolerance: float, relative: bool) -> bool:
+    if current is None or previous is None:
+        return current is None and previous is None
+    try:
+        current, previous = float(current), float(previous)
+    except (TypeError, ValueError):
+        return current == previous
+    diff = _relative_change_pct(current, previous) if relative else abs(current - previous)
+    return diff <= tolerance
+
+
+def compare_fingerprints(
+    current: Dict[str, Any],
+    previous: Dict[str, Any],
+    tolerance: ReuseTolerance,
+) -> Tuple[bool, str]:
+    """
+    比较两次分析的输入指纹
+
+    Returns:
+        (是否无实质变化, 首个变化项的说明；无变化时为空字符串)
+    """
+    if current.get('bar_date') != previous.get('bar_date'):
+        return False, f"日线日期 {previous.get('bar_date')} → {current.get('bar_date')}"
+
+    checks = (
+        [(group, key, tolerance.price_pct, True) for group, key in _PRICE_FIELDS]
+        + [(group, key, tolerance.price_pct, False) for group, key in _POINT_FIELDS]
+        + [(group, key, tolerance.volume_pct, True) for group, key in _VOLUME_FIELDS]
+        + [(group, key, tolerance.chip, False) for group, key in _CHIP_FIELDS]
+    )
+    for group, key, limit, relative in checks:
+        now_value = (current.get(group) or {}).get(key)
+        last_value = (previous.get(group) or {}).get(key)
+        if not _within(now_value, last_value, limit, relative):
+            return False, f"{group}.{key} {last_value} → {now_value}"
+
+    current_urls, previous_urls = current.get('news_urls'), previous.get('news_urls')
+    if current_urls is None or previous_urls is None:
+        return False, "新闻集合未知"
+    union = set(current_urls) | set(previous_urls)
+    overlap = len(set(current_urls) & set(previous_urls)) / len(union) if union else 1.0
+    if overlap < tolerance.news_overlap:
+        return False, f"新闻重合度 {overlap:.0%}"
+    return True, ""
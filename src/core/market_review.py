@@ -11,10 +11,12 @@
 """
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Optional
 
 from src.config import get_config
+from src.core.tracing import bind_context
 from src.notification import NotificationService
 from src.market_analyzer import MarketAnalyzer
 from src.search_service import SearchService
@@ -29,7 +31,8 @@ def run_market_review(
     analyzer: Optional[GeminiAnalyzer] = None,
     search_service: Optional[SearchService] = None,
     send_notification: bool = True,
-    merge_notification: bool = False
+    merge_notification: bool = False,
+    region: Optional[str] = None
 ) -> Optional[str]:
     """
     执行大盘复盘分析
@@ -40,29 +43,33 @@ def run_market_review(
         search_service: 搜索服务（可选）
         send_notification: 是否发送通知
         merge_notification: 是否合并推送（跳过本次推送，由 main 层合并个股+大盘后统一发送，Issue #190）
+        region: 市场区域（可选，覆盖 MARKET_REVIEW_REGION；按市场调度时只复盘对应市场）
 
     Returns:
         复盘报告文本
     """
     logger.info("开始执行大盘复盘分析...")
     config = get_config()
-    region = getattr(config, 'market_review_region', 'cn') or 'cn'
+    region_override = region
+    region = region or getattr(config, 'market_review_region', 'cn') or 'cn'
     if region not in ('cn', 'us', 'both'):
         region = 'cn'
 
     try:
         if region == 'both':
-            # 顺序执行 A 股 + 美股，合并报告
+            # 并发执行 A 股 + 美股，合并报告
             cn_analyzer = MarketAnalyzer(
                 search_service=search_service, analyzer=analyzer, region='cn'
             )
             us_analyzer = MarketAnalyzer(
                 search_service=search_service, analyzer=analyzer, region='us'
             )
-            logger.info("生成 A 股大盘复盘报告...")
-            cn_report = cn_analyzer.run_daily_review()
-            logger.info("生成美股大盘复盘报告...")
-            us_report = us_analyzer.run_daily_review()
+            logger.info("并发生成 A 股 / 美股大盘复盘报告...")
+            with ThreadPoolExecutor(max_workers=2, thread_name_prefix="market_review_region") as executor:
+                cn_future = executor.submit(bind_context(cn_analyzer.run_daily_review))
+                us_future = executor.submit(bind_context(us_analyzer.run_daily_review))
+                cn_report = cn_future.result()
+                us_report = us_future.result()
             review_report = ''
             if cn_report:
                 review_report = f"# A股大盘复盘\n\n{cn_report}"
@@ -83,7 +90,8 @@ def run_market_review(
         if review_report:
             # 保存报告到文件
             date_str = datetime.now().strftime('%Y%m%d')
-            report_filename = f"market_review_{date_str}.md"
+            suffix = f"_{region}" if region_override else ""
+            report_filename = f"market_review_{date_str}{suffix}.md"
             filepath = notifier.save_report_to_file(
                 f"# 🎯 大盘复盘\n\n{review_report}", 
                 report_filename
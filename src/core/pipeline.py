@@ -11,21 +11,39 @@ A股自选股智能分析系统 - 核心分析流水线
 4. 提供股票分析的核心功能
 """
 
+import json
 import logging
+import os
 import time
 import uuid
 from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import date
+from dataclasses import dataclass, field
+from datetime import date, datetime
 from typing import List, Dict, Any, Optional, Tuple
 
 from src.config import get_config, Config
 from src.storage import get_db
+from src.repositories.fingerprint_repo import AnalysisFingerprintRepository
+from src.repositories.run_repo import AnalysisRunRepository
 from data_provider import DataFetcherManager
+from data_provider.base import BAR_STORE_SOURCE
 from data_provider.realtime_types import ChipDistribution
 from src.analyzer import GeminiAnalyzer, AnalysisResult, STOCK_NAME_MAP
 from src.notification import NotificationService, NotificationChannel
 from src.search_service import SearchService
+from src.services.adjustment_service import AdjustmentService
+from src.core.change_detection import ReuseTolerance, build_fingerprint, collect_news_urls, compare_fingerprints
+from src.core.run_budget import (
+    DEGRADE_CHIP,
+    DEGRADE_REPORT,
+    DEGRADE_SEARCH,
+    DEGRADED_INTEL_MAX_SEARCHES,
+    RunBudget,
+)
+from src.core.staged_pipeline import Stage, StagedPipelineRunner
+from src.core.tracing import Tracer, active_tracer, bind_context, get_tracer, trace_span, tracing_run
+from src.core.trading_calendar import get_calendar_for_code
 from src.enums import ReportType
 from src.stock_analyzer import StockTrendAnalyzer, TrendAnalysisResult
 from bot.models import BotMessage
@@ -33,6 +51,34 @@ from bot.models import BotMessage
 
 logger = logging.getLogger(__name__)
 
+# 单只股票多维度情报搜索的维度数上限（缓存预热使用相同取值，保证缓存键一致）
+INTEL_MAX_SEARCHES = 5
+
+# 记录运行检查点的触发来源（命令行与定时任务；API/机器人的临时查询不记录）
+CHECKPOINT_QUERY_SOURCES = ('cli', 'system')
+
+
+@dataclass
+class _StockJob:
+    """单只股票在分析各步骤（流水线各阶段）之间传递的中间状态"""
+    code: str
+    query_id: str
+    report_type: ReportType = ReportType.SIMPLE
+    single_stock_notify: bool = False
+    skip_analysis: bool = False
+    stock_name: str = ''
+    realtime_quote: Any = None
+    chip_data: Optional[ChipDistribution] = None
+    trend_result: Optional[TrendAnalysisResult] = None
+    intel_results: Optional[Dict[str, Any]] = None
+    news_context: Optional[str] = None
+    enhanced_context: Optional[Dict[str, Any]] = None
+    result: Optional[AnalysisResult] = None
+    degraded: List[str] = field(default_factory=list)  # 因截止时间预算跳过的可选步骤
+    fingerprint: Optional[Dict[str, Any]] = None  # 本次分析的输入指纹（复用上次结果时为 None）
+    run_id: Optional[str] = None  # 启用运行检查点时所属的运行 ID
+    force_refresh: bool = False  # 强制刷新：不复用上次的分析结果
+
 
 class StockAnalysisPipeline:
     """
@@ -43,7 +89,7 @@ class StockAnalysisPipeline:
     2. 协调数据获取、存储、搜索、分析、通知等模块
     3. 实现并发控制和异常处理
     """
-    
+
     def __init__(
         self,
         config: Optional[Config] = None,
@@ -68,10 +114,17 @@ class StockAnalysisPipeline:
         self.save_context_snapshot = (
             self.config.save_context_snapshot if save_context_snapshot is None else save_context_snapshot
         )
+        # 最近一次分阶段运行的各阶段统计（处理量、耗时、队列深度）
+        self.last_stage_stats: List[Dict[str, Any]] = []
+        # 本次运行的截止时间预算（仅在 run() 期间设置，未配置截止时间时为 None）
+        self._run_budget: Optional[RunBudget] = None
         
         # 初始化各模块
         self.db = get_db()
-        self.fetcher_manager = DataFetcherManager()
+        self.run_repo = AnalysisRunRepository(self.db)
+        self.fingerprint_repo = AnalysisFingerprintRepository(self.db)
+        self.fetcher_manager = DataFetcherManager(config=self.config)
+        self.adjustment_service = AdjustmentService(self.db, self.fetcher_manager)
         # 不再单独创建 akshare_fetcher，统一使用 fetcher_manager 获取增强数据
         self.trend_analyzer = StockTrendAnalyzer()  # 趋势分析器
         self.analyzer = GeminiAnalyzer()
@@ -84,6 +137,10 @@ class StockAnalysisPipeline:
             brave_keys=self.config.brave_api_keys,
             serpapi_keys=self.config.serpapi_keys,
             news_max_age_days=self.config.news_max_age_days,
+            intel_timeout=self.config.search_intel_timeout,
+            provider_max_concurrency=self.config.search_provider_max_concurrency,
+            cache_persist=self.config.search_cache_persist,
+            cache_max_entries=self.config.search_cache_max_entries,
         )
         
         logger.info(f"调度器初始化完成，最大并发数: {self.max_workers}")
@@ -111,9 +168,10 @@ class StockAnalysisPipeline:
         获取并保存单只股票数据
         
         断点续传逻辑：
-        1. 检查数据库是否已有今日数据
+        1. 检查数据库是否已有最新交易日的数据（按所属市场的交易日历，周末/节假日为上一个交易日）
         2. 如果有且不强制刷新，则跳过网络请求
-        3. 否则从数据源获取并保存
+        3. 已做过不复权回填的股票增量同步不复权日线，前复权日线在本地重建
+        4. 否则从数据源获取并保存
         
         Args:
             code: 股票代码
@@ -122,33 +180,62 @@ class StockAnalysisPipeline:
         Returns:
             Tuple[是否成功, 错误信息]
         """
-        try:
-            today = date.today()
+        with trace_span('fetch_and_save_stock_data', code=code):
+            try:
+                latest_bar_date = get_calendar_for_code(code).latest_bar_date()
             
-            # 断点续传检查：如果今日数据已存在，跳过
-            if not force_refresh and self.db.has_today_data(code, today):
-                logger.info(f"[{code}] 今日数据已存在，跳过获取（断点续传）")
-                return True, None
+                # 断点续传检查：如果最新交易日数据已存在，跳过
+                if not force_refresh and self.db.has_today_data(code, latest_bar_date):
+                    logger.info(f"[{code}] 最新交易日 {latest_bar_date} 数据已存在，跳过获取（断点续传）")
+                    return True, None
             
-            # 从数据源获取数据
-            logger.info(f"[{code}] 开始从数据源获取数据...")
-            df, source_name = self.fetcher_manager.get_daily_data(code, days=30)
+                # 已做过不复权回填的股票：增量同步不复权日线并在本地重建前复权日线，
+                # 不写入数据源的前复权日线（除权后两种复权基准会混在同一序列中）
+                with trace_span('raw_sync', code=code):
+                    raw_sync = self.adjustment_service.sync_raw_daily(code)
+                if raw_sync is not None:
+                    logger.info(
+                        f"[{code}] 不复权日线同步成功（来源: {raw_sync['data_source']}，"
+                        f"新增 {raw_sync['saved']} 条，重建 {raw_sync['rebuilt']} 条前复权日线）"
+                    )
+                    return True, None
+
+                # 从数据源获取数据
+                logger.info(f"[{code}] 开始从数据源获取数据...")
+                # 强制刷新时跳过本地列式日线存储，直接从数据源获取
+                df, source_name = self.fetcher_manager.get_daily_data(
+                    code, days=30, use_local_store=not force_refresh
+                )
             
-            if df is None or df.empty:
-                return False, "获取数据为空"
+                if df is None or df.empty:
+                    return False, "获取数据为空"
+
+                # 本地存储命中的数据本就来自 stock_daily，不写回（避免覆盖真实的 data_source）
+                if source_name == BAR_STORE_SOURCE:
+                    logger.info(f"[{code}] 本地日线存储已覆盖，无需写入数据库")
+                    return True, None
             
-            # 保存到数据库
-            saved_count = self.db.save_daily_data(df, code, source_name)
-            logger.info(f"[{code}] 数据保存成功（来源: {source_name}，新增 {saved_count} 条）")
+                # 保存到数据库
+                with trace_span('db_write', code=code):
+                    saved_count = self.db.save_daily_data(df, code, source_name)
+                logger.info(f"[{code}] 数据保存成功（来源: {source_name}，新增 {saved_count} 条）")
             
-            return True, None
+                return True, None
             
-        except Exception as e:
-            error_msg = f"获取/保存数据失败: {str(e)}"
-            logger.error(f"[{code}] {error_msg}")
-            return False, error_msg
+            except Exception as e:
+                error_msg = f"获取/保存数据失败: {str(e)}"
+                logger.error(f"[{code}] {error_msg}")
+                return False, error_msg
     
-    def analyze_stock(self, code: str, report_type: ReportType, query_id: str) -> Optional[AnalysisResult]:
+    def analyze_stock(
+        self,
+        code: str,
+        report_type: ReportType,
+        query_id: str,
+        run_id: Optional[str] = None,
+        news_context: Optional[str] = None,
+        force_refresh: bool = False,
+    ) -> Optional[AnalysisResult]:
         """
         分析单只股票（增强版：含量比、换手率、筹码分析、多维度情报）
         
@@ -160,167 +247,281 @@ class StockAnalysisPipeline:
         5. 从数据库获取分析上下文
         6. 调用 AI 进行综合分析
         
+        分阶段流水线（run）按相同步骤拆分到不同阶段执行。
+        
         Args:
             query_id: 查询链路关联 id
             code: 股票代码
             report_type: 报告类型
+            run_id: 启用运行检查点时所属的运行 ID
+            news_context: 续跑时检查点中已保存的情报搜索结果
+            force_refresh: 是否强制刷新（不复用上次的分析结果）
             
         Returns:
             AnalysisResult 或 None（如果分析失败）
         """
         try:
-            # 获取股票名称（优先从实时行情获取真实名称）
-            stock_name = STOCK_NAME_MAP.get(code, '')
+            job = _StockJob(
+                code=code, query_id=query_id, report_type=report_type, news_context=news_context, run_id=run_id,
+                force_refresh=force_refresh,
+            )
+            self._collect_market_data(job)
+            self._search_intel(job)
+            self._save_news_intel(job)
+            self._run_llm(job)
+            self._save_analysis_history(job)
+            return job.result
             
-            # Step 1: 获取实时行情（量比、换手率等）- 使用统一入口，自动故障切换
-            realtime_quote = None
-            try:
+        except Exception as e:
+            logger.error(f"[{code}] 分析失败: {e}")
+            logger.exception(f"[{code}] 详细错误信息:")
+            return None
+
+    def _collect_market_data(self, job: '_StockJob') -> None:
+        """Step 1-3: 实时行情、筹码分布、趋势分析"""
+        code = job.code
+        step_start = time.time()
+        # 获取股票名称（优先从实时行情获取真实名称）
+        stock_name = STOCK_NAME_MAP.get(code, '')
+        
+        # Step 1: 获取实时行情（量比、换手率等）- 使用统一入口，自动故障切换
+        realtime_quote = None
+        try:
+            with trace_span('get_realtime_quote', code=code):
                 realtime_quote = self.fetcher_manager.get_realtime_quote(code)
-                if realtime_quote:
-                    # 使用实时行情返回的真实股票名称
-                    if realtime_quote.name:
-                        stock_name = realtime_quote.name
-                    # 兼容不同数据源的字段（有些数据源可能没有 volume_ratio）
-                    volume_ratio = getattr(realtime_quote, 'volume_ratio', None)
-                    turnover_rate = getattr(realtime_quote, 'turnover_rate', None)
-                    logger.info(f"[{code}] {stock_name} 实时行情: 价格={realtime_quote.price}, "
-                              f"量比={volume_ratio}, 换手率={turnover_rate}% "
-                              f"(来源: {realtime_quote.source.value if hasattr(realtime_quote, 'source') else 'unknown'})")
-                else:
-                    logger.info(f"[{code}] 实时行情获取失败或已禁用，将使用历史数据进行分析")
-            except Exception as e:
-                logger.warning(f"[{code}] 获取实时行情失败: {e}")
-            
-            # 如果还是没有名称，使用代码作为名称
-            if not stock_name:
-                stock_name = f'股票{code}'
-            
-            # Step 2: 获取筹码分布 - 使用统一入口，带熔断保护
-            chip_data = None
-            try:
-                chip_data = self.fetcher_manager.get_chip_distribution(code)
+            if realtime_quote:
+                # 使用实时行情返回的真实股票名称
+                if realtime_quote.name:
+                    stock_name = realtime_quote.name
+                # 兼容不同数据源的字段（有些数据源可能没有 volume_ratio）
+                volume_ratio = getattr(realtime_quote, 'volume_ratio', None)
+                turnover_rate = getattr(realtime_quote, 'turnover_rate', None)
+                logger.info(f"[{code}] {stock_name} 实时行情: 价格={realtime_quote.price}, "
+                          f"量比={volume_ratio}, 换手率={turnover_rate}% "
+                          f"(来源: {realtime_quote.source.value if hasattr(realtime_quote, 'source') else 'unknown'})")
+            else:
+                logger.info(f"[{code}] 实时行情获取失败或已禁用，将使用历史数据进行分析")
+        except Exception as e:
+            logger.warning(f"[{code}] 获取实时行情失败: {e}")
+        
+        # 如果还是没有名称，使用代码作为名称
+        if not stock_name:
+            stock_name = f'股票{code}'
+        
+        # Step 2: 获取筹码分布 - 使用统一入口，带熔断保护（落后于截止时间时低优先级股票跳过）
+        chip_data = None
+        try:
+            if self._degrade(job, DEGRADE_CHIP):
+                logger.info(f"[{code}] 截止时间预算不足，跳过筹码分布")
+            else:
+                with trace_span('get_chip_distribution', code=code):
+                    chip_data = self.fetcher_manager.get_chip_distribution(code)
                 if chip_data:
                     logger.info(f"[{code}] 筹码分布: 获利比例={chip_data.profit_ratio:.1%}, "
                               f"90%集中度={chip_data.concentration_90:.2%}")
                 else:
                     logger.debug(f"[{code}] 筹码分布获取失败或已禁用")
-            except Exception as e:
-                logger.warning(f"[{code}] 获取筹码分布失败: {e}")
-            
-            # Step 3: 趋势分析（基于交易理念）
-            trend_result: Optional[TrendAnalysisResult] = None
-            try:
-                # 获取历史数据进行趋势分析
-                context = self.db.get_analysis_context(code)
-                if context and 'raw_data' in context:
-                    import pandas as pd
-                    raw_data = context['raw_data']
-                    if isinstance(raw_data, list) and len(raw_data) > 0:
-                        df = pd.DataFrame(raw_data)
-                        trend_result = self.trend_analyzer.analyze(df, code)
-                        logger.info(f"[{code}] 趋势分析: {trend_result.trend_status.value}, "
-                                  f"买入信号={trend_result.buy_signal.value}, 评分={trend_result.signal_score}")
-            except Exception as e:
-                logger.warning(f"[{code}] 趋势分析失败: {e}")
-            
-            # Step 4: 多维度情报搜索（最新消息+风险排查+业绩预期）
-            news_context = None
-            if self.search_service.is_available:
-                logger.info(f"[{code}] 开始多维度情报搜索...")
-                
-                # 使用多维度搜索（最多5次搜索）
-                intel_results = self.search_service.search_comprehensive_intel(
-                    stock_code=code,
-                    stock_name=stock_name,
-                    max_searches=5
-                )
-                
-                # 格式化情报报告
-                if intel_results:
-                    news_context = self.search_service.format_intel_report(intel_results, stock_name)
-                    total_results = sum(
-                        len(r.results) for r in intel_results.values() if r.success
-                    )
-                    logger.info(f"[{code}] 情报搜索完成: 共 {total_results} 条结果")
-                    logger.debug(f"[{code}] 情报搜索结果:\n{news_context}")
-
-                    # 保存新闻情报到数据库（用于后续复盘与查询）
-                    try:
-                        query_context = self._build_query_context(query_id=query_id)
-                        for dim_name, response in intel_results.items():
-                            if response and response.success and response.results:
-                                self.db.save_news_intel(
-                                    code=code,
-                                    name=stock_name,
-                                    dimension=dim_name,
-                                    query=response.query,
-                                    response=response,
-                                    query_context=query_context
-                                )
-                    except Exception as e:
-                        logger.warning(f"[{code}] 保存新闻情报失败: {e}")
-            else:
-                logger.info(f"[{code}] 搜索服务不可用，跳过情报搜索")
-            
-            # Step 5: 获取分析上下文（技术面数据）
+        except Exception as e:
+            logger.warning(f"[{code}] 获取筹码分布失败: {e}")
+        
+        # Step 3: 趋势分析（基于交易理念）
+        trend_result: Optional[TrendAnalysisResult] = None
+        try:
+            # 获取历史数据进行趋势分析
             context = self.db.get_analysis_context(code)
-            
-            if context is None:
-                logger.warning(f"[{code}] 无法获取历史行情数据，将仅基于新闻和实时行情分析")
-                from datetime import date
-                context = {
-                    'code': code,
-                    'stock_name': stock_name,
-                    'date': date.today().isoformat(),
-                    'data_missing': True,
-                    'today': {},
-                    'yesterday': {}
-                }
-            
-            # Step 6: 增强上下文数据（添加实时行情、筹码、趋势分析结果、股票名称）
-            enhanced_context = self._enhance_context(
-                context, 
-                realtime_quote, 
-                chip_data, 
-                trend_result,
-                stock_name  # 传入股票名称
+            if context and 'raw_data' in context:
+                import pandas as pd
+                raw_data = context['raw_data']
+                if isinstance(raw_data, list) and len(raw_data) > 0:
+                    df = pd.DataFrame(raw_data)
+                    trend_result = self.trend_analyzer.analyze(df, code)
+                    logger.info(f"[{code}] 趋势分析: {trend_result.trend_status.value}, "
+                              f"买入信号={trend_result.buy_signal.value}, 评分={trend_result.signal_score}")
+        except Exception as e:
+            logger.warning(f"[{code}] 趋势分析失败: {e}")
+
+        job.stock_name = stock_name
+        job.realtime_quote = realtime_quote
+        job.chip_data = chip_data
+        job.trend_result = trend_result
+        self._record_budget('data', code, step_start)
+
+    def _search_intel(self, job: '_StockJob') -> None:
+        """Step 4: 多维度情报搜索（最新消息+风险排查+业绩预期）"""
+        code = job.code
+        if job.news_context is not None:
+            logger.info(f"[{code}] 复用运行检查点中的情报搜索结果")
+            return
+        if not self.search_service.is_available:
+            logger.info(f"[{code}] 搜索服务不可用，跳过情报搜索")
+            return
+
+        logger.info(f"[{code}] 开始多维度情报搜索...")
+        
+        # 使用多维度搜索（最多5次搜索；落后于截止时间时低优先级股票只保留核心维度）
+        max_searches = INTEL_MAX_SEARCHES
+        if self._degrade(job, DEGRADE_SEARCH):
+            max_searches = DEGRADED_INTEL_MAX_SEARCHES
+            logger.info(f"[{code}] 截止时间预算不足，情报搜索减少为 {max_searches} 个维度")
+        step_start = time.time()
+        with trace_span('search_comprehensive_intel', code=code):
+            intel_results = self.search_service.search_comprehensive_intel(
+                stock_code=code,
+                stock_name=job.stock_name,
+                max_searches=max_searches
             )
-            
-            # Step 7: 调用 AI 分析（传入增强的上下文和新闻）
-            result = self.analyzer.analyze(enhanced_context, news_context=news_context)
+        self._record_budget('search', code, step_start)
+        
+        # 格式化情报报告
+        if intel_results:
+            job.intel_results = intel_results
+            job.news_context = self.search_service.format_intel_report(intel_results, job.stock_name)
+            total_results = sum(
+                len(r.results) for r in intel_results.values() if r.success
+            )
+            logger.info(f"[{code}] 情报搜索完成: 共 {total_results} 条结果")
+            logger.debug(f"[{code}] 情报搜索结果:\n{job.news_context}")
 
-            # Step 7.5: 填充分析时的价格信息到 result
-            if result:
-                realtime_data = enhanced_context.get('realtime', {})
-                result.current_price = realtime_data.get('price')
-                result.change_pct = realtime_data.get('change_pct')
+        # 运行检查点：保存搜索结果，续跑时不再重复搜索
+        if job.run_id:
+            self.run_repo.save_checkpoint(
+                job.run_id, code, AnalysisRunRepository.STAGE_SEARCH,
+                query_id=job.query_id, news_context=job.news_context or '',
+            )
 
-            # Step 8: 保存分析历史记录
-            if result:
-                try:
-                    context_snapshot = self._build_context_snapshot(
-                        enhanced_context=enhanced_context,
-                        news_content=news_context,
-                        realtime_quote=realtime_quote,
-                        chip_data=chip_data
-                    )
-                    self.db.save_analysis_history(
-                        result=result,
-                        query_id=query_id,
-                        report_type=report_type.value,
-                        news_content=news_context,
-                        context_snapshot=context_snapshot,
-                        save_snapshot=self.save_context_snapshot
-                    )
-                except Exception as e:
-                    logger.warning(f"[{code}] 保存分析历史失败: {e}")
+    def _save_news_intel(self, job: '_StockJob') -> None:
+        """保存新闻情报到数据库（用于后续复盘与查询）"""
+        if not job.intel_results:
+            return
+        try:
+            query_context = self._build_query_context(query_id=job.query_id)
+            with trace_span('db_write', code=job.code):
+                for dim_name, response in job.intel_results.items():
+                    if response and response.success and response.results:
+                        self.db.save_news_intel(
+                            code=job.code,
+                            name=job.stock_name,
+                            dimension=dim_name,
+                            query=response.query,
+                            response=response,
+                            query_context=query_context
+                        )
+        except Exception as e:
+            logger.warning(f"[{job.code}] 保存新闻情报失败: {e}")
 
-            return result
-            
+    def _run_llm(self, job: '_StockJob') -> None:
+        """Step 5-7: 构建分析上下文并调用 AI 分析"""
+        code = job.code
+        step_start = time.time()
+        if job.report_type == ReportType.FULL and self._degrade(job, DEGRADE_REPORT):
+            logger.info(f"[{code}] 截止时间预算不足，完整报告改为精简报告")
+            job.report_type = ReportType.SIMPLE
+        # Step 5: 获取分析上下文（技术面数据）
+        context = self.db.get_analysis_context(code)
+        
+        if context is None:
+            logger.warning(f"[{code}] 无法获取历史行情数据，将仅基于新闻和实时行情分析")
+            context = {
+                'code': code,
+                'stock_name': job.stock_name,
+                'date': date.today().isoformat(),
+                'data_missing': True,
+                'today': {},
+                'yesterday': {}
+            }
+        
+        # Step 6: 增强上下文数据（添加实时行情、筹码、趋势分析结果、股票名称）
+        enhanced_context = self._enhance_context(
+            context, 
+            job.realtime_quote, 
+            job.chip_data, 
+            job.trend_result,
+            job.stock_name  # 传入股票名称
+        )
+        job.enhanced_context = enhanced_context
+        
+        # Step 7: 输入与上次分析相比无实质变化时复用上次结果，否则调用 AI 分析（传入增强的上下文和新闻）
+        result = self._reuse_previous_result(job)
+        if result is None:
+            with trace_span('llm_analyze', code=code):
+                result = self.analyzer.analyze(enhanced_context, news_context=job.news_context)
+
+        # Step 7.5: 填充分析时的价格信息到 result
+        if result:
+            realtime_data = enhanced_context.get('realtime', {})
+            result.current_price = realtime_data.get('price')
+            result.change_pct = realtime_data.get('change_pct')
+            result.degraded = list(job.degraded)
+
+        job.result = result
+        self._record_budget('llm', code, step_start)
+
+    def _save_analysis_history(self, job: '_StockJob') -> None:
+        """Step 8: 保存分析历史记录"""
+        if not job.result:
+            return
+        try:
+            context_snapshot = self._build_context_snapshot(
+                enhanced_context=job.enhanced_context,
+                news_content=job.news_context,
+                realtime_quote=job.realtime_quote,
+                chip_data=job.chip_data
+            )
+            with trace_span('db_write', code=job.code):
+                self.db.save_analysis_history(
+                    result=job.result,
+                    query_id=job.query_id,
+                    report_type=job.report_type.value,
+                    news_content=job.news_context,
+                    context_snapshot=context_snapshot,
+                    save_snapshot=self.save_context_snapshot
+                )
+                if job.fingerprint is not None and job.result.success:
+                    self.fingerprint_repo.save(job.code, job.query_id, job.fingerprint)
         except Exception as e:
-            logger.error(f"[{code}] 分析失败: {e}")
-            logger.exception(f"[{code}] 详细错误信息:")
+            logger.warning(f"[{job.code}] 保存分析历史失败: {e}")
+
+    def _reuse_previous_result(self, job: '_StockJob') -> Optional[AnalysisResult]:
+        """
+        计算本次输入指纹，与上次分析的指纹比较
+
+        日线、实时行情、筹码与新闻集合均在容差内时，返回上次的分析结果（标记为复用），否则返回 None。
+        复用时不刷新指纹，使容差始终相对于真正调用 AI 的那次分析，且超过有效期后必然重新分析。
+        强制刷新时不复用（仍记录指纹）。
+        """
+        if not self.config.analysis_reuse_enabled:
             return None
+        code = job.code
+        # 情报文本来自运行检查点时无法得知新闻集合，不参与复用
+        news_urls = None if job.intel_results is None and job.news_context is not None else (
+            collect_news_urls(job.intel_results)
+        )
+        job.fingerprint = build_fingerprint(job.enhanced_context, news_urls)
+        if job.force_refresh:
+            return None
+        try:
+            previous = self.fingerprint_repo.get_latest(code, self.config.analysis_reuse_max_age_hours)
+            if previous is None:
+                return None
+            unchanged, reason = compare_fingerprints(
+                job.fingerprint, previous.get_features(), ReuseTolerance.from_config(self.config)
+            )
+            if not unchanged:
+                logger.debug(f"[{code}] 输入较上次分析有变化（{reason}），重新分析")
+                return None
+            records = self.db.get_analysis_history(code=code, query_id=previous.query_id, limit=1)
+            if not records or not records[0].raw_result:
+                return None
+            result = AnalysisResult.from_dict(json.loads(records[0].raw_result))
+        except Exception as e:
+            logger.warning(f"[{code}] 分析复用检查失败，重新分析: {e}")
+            return None
+        if not result.success:
+            return None
+        result.reused = True
+        job.fingerprint = None
+        logger.info(f"[{code}] 输入较上次分析（{previous.created_at:%m-%d %H:%M}）无实质变化，复用上次分析结果")
+        return result
     
     def _enhance_context(
         self,
@@ -422,6 +623,21 @@ class StockAnalysisPipeline:
         else:
             return "巨量"
 
+    def _record_budget(self, stage: str, code: str, start: float) -> None:
+        """向截止时间预算记录阶段耗时"""
+        if self._run_budget is not None:
+            self._run_budget.record(stage, code, time.time() - start)
+
+    def _degrade(self, job: '_StockJob', step: str) -> bool:
+        """落后于截止时间时，判断该股票是否跳过可选步骤 step，并记录降级"""
+        budget = self._run_budget
+        if budget is None or not budget.should_degrade(job.code):
+            return False
+        budget.mark_degraded(job.code, step)
+        if step not in job.degraded:
+            job.degraded.append(step)
+        return True
+
     def _build_context_snapshot(
         self,
         enhanced_context: Dict[str, Any],
@@ -512,6 +728,9 @@ class StockAnalysisPipeline:
         single_stock_notify: bool = False,
         report_type: ReportType = ReportType.SIMPLE,
         analysis_query_id: Optional[str] = None,
+        run_id: Optional[str] = None,
+        news_context: Optional[str] = None,
+        force_refresh: bool = False,
     ) -> Optional[AnalysisResult]:
         """
         处理单只股票的完整流程
@@ -530,6 +749,9 @@ class StockAnalysisPipeline:
             skip_analysis: 是否跳过 AI 分析
             single_stock_notify: 是否启用单股推送模式（每分析完一只立即推送）
             report_type: 报告类型枚举（从配置读取，Issue #119）
+            run_id: 启用运行检查点时所属的运行 ID
+            news_context: 续跑时检查点中已保存的情报搜索结果
+            force_refresh: 是否强制刷新（忽略本地日线缓存，不复用上次的分析结果）
 
         Returns:
             AnalysisResult 或 None
@@ -538,7 +760,9 @@ class StockAnalysisPipeline:
         
         try:
             # Step 1: 获取并保存数据
-            success, error = self.fetch_and_save_stock_data(code)
+            step_start = time.time()
+            success, error = self.fetch_and_save_stock_data(code, force_refresh=force_refresh)
+            self._record_budget('data', code, step_start)
             
             if not success:
                 logger.warning(f"[{code}] 数据获取失败: {error}")
@@ -550,7 +774,10 @@ class StockAnalysisPipeline:
                 return None
             
             effective_query_id = analysis_query_id or self.query_id or uuid.uuid4().hex
-            result = self.analyze_stock(code, report_type, query_id=effective_query_id)
+            result = self.analyze_stock(
+                code, report_type, query_id=effective_query_id, run_id=run_id, news_context=news_context,
+                force_refresh=force_refresh,
+            )
             
             if result:
                 logger.info(
@@ -559,24 +786,10 @@ class StockAnalysisPipeline:
                 )
                 
                 # 单股推送模式（#55）：每分析完一只股票立即推送
-                if single_stock_notify and self.notifier.is_available():
-                    try:
-                        # 根据报告类型选择生成方法
-                        if report_type == ReportType.FULL:
-                            # 完整报告：使用决策仪表盘格式
-                            report_content = self.notifier.generate_dashboard_report([result])
-                            logger.info(f"[{code}] 使用完整报告格式")
-                        else:
-                            # 精简报告：使用单股报告格式（默认）
-                            report_content = self.notifier.generate_single_stock_report(result)
-                            logger.info(f"[{code}] 使用精简报告格式")
-                        
-                        if self.notifier.send(report_content, email_stock_codes=[code]):
-                            logger.info(f"[{code}] 单股推送成功")
-                        else:
-                            logger.warning(f"[{code}] 单股推送失败")
-                    except Exception as e:
-                        logger.error(f"[{code}] 单股推送异常: {e}")
+                if single_stock_notify:
+                    if DEGRADE_REPORT in result.degraded:
+                        report_type = ReportType.SIMPLE
+                    self._notify_single_stock(result, report_type)
             
             return result
             
@@ -585,12 +798,38 @@ class StockAnalysisPipeline:
             logger.exception(f"[{code}] 处理过程发生未知异常: {e}")
             return None
     
+    def _notify_single_stock(self, result: AnalysisResult, report_type: ReportType) -> None:
+        """单股推送模式（#55）：推送单只股票的分析报告"""
+        if not self.notifier.is_available():
+            return
+        code = result.code
+        try:
+            # 根据报告类型选择生成方法
+            if report_type == ReportType.FULL:
+                # 完整报告：使用决策仪表盘格式
+                report_content = self.notifier.generate_dashboard_report([result])
+                logger.info(f"[{code}] 使用完整报告格式")
+            else:
+                # 精简报告：使用单股报告格式（默认）
+                report_content = self.notifier.generate_single_stock_report(result)
+                logger.info(f"[{code}] 使用精简报告格式")
+            
+            with trace_span('notify', code=code):
+                sent = self.notifier.send(report_content, email_stock_codes=[code])
+            if sent:
+                logger.info(f"[{code}] 单股推送成功")
+            else:
+                logger.warning(f"[{code}] 单股推送失败")
+        except Exception as e:
+            logger.error(f"[{code}] 单股推送异常: {e}")
+
     def run(
         self,
         stock_codes: Optional[List[str]] = None,
         dry_run: bool = False,
         send_notification: bool = True,
-        merge_notification: bool = False
+        merge_notification: bool = False,
+        resume_run_id: Optional[str] = None
     ) -> List[AnalysisResult]:
         """
         运行完整的分析流程
@@ -606,11 +845,28 @@ class StockAnalysisPipeline:
             dry_run: 是否仅获取数据不分析
             send_notification: 是否发送推送通知
             merge_notification: 是否合并推送（跳过本次推送，由 main 层合并个股+大盘后统一发送，Issue #190）
+            resume_run_id: 续跑的运行 ID（跳过已完成的股票，复用已保存的搜索/分析结果）
 
         Returns:
             分析结果列表
         """
         start_time = time.time()
+
+        # 运行检查点：以 run_id 记录每只股票的阶段完成情况，中断后可续跑
+        # （只记录命令行/定时任务的运行，API/机器人的临时查询不写检查点；显式续跑总是生效）
+        run_id: Optional[str] = None
+        checkpoint_enabled = (
+            getattr(self.config, 'run_checkpoint_enabled', False)
+            and self.query_source in CHECKPOINT_QUERY_SOURCES
+        )
+        if not dry_run and (resume_run_id or checkpoint_enabled):
+            run_id = resume_run_id or self.query_id or uuid.uuid4().hex
+            if resume_run_id:
+                stored_run = self.run_repo.get_run(resume_run_id)
+                if stored_run is None:
+                    logger.warning(f"未找到运行 {resume_run_id}，将作为新运行开始")
+                elif stock_codes is None:
+                    stock_codes = stored_run.get_stock_codes()
         
         # 使用配置中的股票列表
         if stock_codes is None:
@@ -620,10 +876,56 @@ class StockAnalysisPipeline:
         if not stock_codes:
             logger.error("未配置自选股列表，请在 .env 文件中设置 STOCK_LIST")
             return []
-        
+
+        if run_id and self.run_repo.start_run(run_id, stock_codes, query_source=self.query_source) is None:
+            logger.error(f"运行 {run_id} 正在由其他进程执行，拒绝重复续跑")
+            return []
+        # 每次运行使用独立的追踪器；已在外层运行中（如 main 层并发大盘复盘）时由外层输出报告
+        owns_trace = active_tracer() is None
+        with tracing_run(enabled=getattr(self.config, 'tracing_enabled', True)) as tracer:
+            try:
+                results = self._run_claimed(
+                    stock_codes,
+                    dry_run=dry_run,
+                    send_notification=send_notification,
+                    merge_notification=merge_notification,
+                    run_id=run_id,
+                    start_time=start_time,
+                )
+            except BaseException:
+                # 异常/中断（如 Ctrl+C）：释放运行，便于立即续跑
+                if run_id:
+                    self.run_repo.finish_run(run_id, AnalysisRunRepository.RUN_INCOMPLETE)
+                raise
+            if owns_trace:
+                self.save_trace_report(tracer, run_id)
+        return results
+
+    def _run_claimed(
+        self,
+        stock_codes: List[str],
+        dry_run: bool,
+        send_notification: bool,
+        merge_notification: bool,
+        run_id: Optional[str],
+        start_time: float,
+    ) -> List[AnalysisResult]:
+        """run() 的主体：已解析股票列表，启用检查点时已认领运行"""
         logger.info(f"===== 开始分析 {len(stock_codes)} 只股票 =====")
         logger.info(f"股票列表: {', '.join(stock_codes)}")
         logger.info(f"并发数: {self.max_workers}, 模式: {'仅获取数据' if dry_run else '完整分析'}")
+
+        # 续跑：已完成的股票直接从分析历史还原结果，汇总推送仍覆盖整个运行
+        checkpoints: Dict[str, Any] = {}
+        restored_results: List[AnalysisResult] = []
+        if run_id:
+            logger.info(f"运行 ID: {run_id}（中断后可使用 --resume {run_id} 续跑）")
+            checkpoints = self.run_repo.get_checkpoints(run_id)
+            restored_results = self._restore_completed_results(checkpoints)
+            if restored_results:
+                restored_codes = {r.code for r in restored_results}
+                logger.info(f"续跑：跳过已完成的 {len(restored_codes)} 只股票: {', '.join(sorted(restored_codes))}")
+        pending_codes = [c for c in stock_codes if c not in {r.code for r in restored_results}]
         
         # === 批量预取实时行情（优化：避免每只股票都触发全量拉取）===
         # 只有股票数量 >= 5 时才进行预取，少量股票直接逐个查询更高效
@@ -632,58 +934,120 @@ class StockAnalysisPipeline:
             if prefetch_count > 0:
                 logger.info(f"已启用批量预取架构：一次拉取全市场数据，{len(stock_codes)} 只股票共享缓存")
         
+        self.search_service.reset_dedup_stats()
+
+        # === 按行业分组共享行业维度搜索（同行业股票只搜索一次）===
+        if (
+            not dry_run
+            and len(stock_codes) > 1
+            and getattr(self.config, 'search_sector_sharing', False)
+            and self.search_service.is_available
+        ):
+            stock_sectors = self.fetcher_manager.batch_get_stock_industries(stock_codes)
+            if stock_sectors:
+                self.search_service.set_stock_sectors(stock_sectors)
+                logger.info(
+                    f"已启用行业共享搜索：{len(stock_sectors)} 只股票归入 "
+                    f"{len(set(stock_sectors.values()))} 个行业"
+                )
+        
         # 单股推送模式（#55）：从配置读取
         single_stock_notify = getattr(self.config, 'single_stock_notify', False)
         # Issue #119: 从配置读取报告类型
-        report_type_str = getattr(self.config, 'report_type', 'simple').lower()
-        report_type = ReportType.FULL if report_type_str == 'full' else ReportType.SIMPLE
+        report_type = self._resolve_report_type()
         # Issue #128: 从配置读取分析间隔
         analysis_delay = getattr(self.config, 'analysis_delay', 0)
 
         if single_stock_notify:
-            logger.info(f"已启用单股推送模式：每分析完一只股票立即推送（报告类型: {report_type_str}）")
+            logger.info(f"已启用单股推送模式：每分析完一只股票立即推送（报告类型: {report_type.value}）")
+
+        # 截止时间预算：推算完成时间，落后时对低优先级股票跳过可选步骤
+        self._run_budget = None if dry_run else RunBudget.from_config(
+            self.config,
+            total=len(pending_codes),
+            max_workers=self.max_workers,
+            staged=getattr(self.config, 'pipeline_staged', False),
+        )
+        if self._run_budget is not None:
+            logger.info(
+                f"已启用截止时间预算：截止 {self._run_budget.deadline.strftime('%H:%M')}，"
+                f"预计完成 {self._run_budget.projected_finish().strftime('%H:%M:%S')}"
+            )
         
         results: List[AnalysisResult] = []
         
-        # 使用线程池并发处理
-        # 注意：max_workers 设置较低（默认3）以避免触发反爬
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # 提交任务
-            future_to_code = {
-                executor.submit(
-                    self.process_single_stock,
-                    code,
-                    skip_analysis=dry_run,
-                    single_stock_notify=single_stock_notify and send_notification,
-                    report_type=report_type,  # Issue #119: 传递报告类型
-                    analysis_query_id=uuid.uuid4().hex,
-                ): code
-                for code in stock_codes
-            }
+        if getattr(self.config, 'pipeline_staged', False):
+            # 分阶段流水线：行情/搜索/AI/持久化/通知各自独立并发与限速
+            results = self._run_staged(
+                pending_codes,
+                dry_run=dry_run,
+                single_stock_notify=single_stock_notify and send_notification,
+                report_type=report_type,
+                analysis_delay=analysis_delay,
+                run_id=run_id,
+                checkpoints=checkpoints,
+            )
+        else:
+            # 使用线程池并发处理
+            # 注意：max_workers 设置较低（默认3）以避免触发反爬
+            query_ids = {code: self._checkpoint_query_id(checkpoints, code) for code in pending_codes}
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                # 提交任务
+                future_to_code = {
+                    executor.submit(
+                        bind_context(self.process_single_stock),
+                        code,
+                        skip_analysis=dry_run,
+                        single_stock_notify=single_stock_notify and send_notification,
+                        report_type=report_type,  # Issue #119: 传递报告类型
+                        analysis_query_id=query_ids[code],
+                        run_id=run_id,
+                        news_context=self._checkpoint_news_context(checkpoints, code),
+                    ): code
+                    for code in pending_codes
+                }
             
-            # 收集结果
-            for idx, future in enumerate(as_completed(future_to_code)):
-                code = future_to_code[future]
-                try:
-                    result = future.result()
-                    if result:
-                        results.append(result)
-
-                    # Issue #128: 分析间隔 - 在个股分析和大盘分析之间添加延迟
-                    if idx < len(stock_codes) - 1 and analysis_delay > 0:
-                        logger.debug(f"等待 {analysis_delay} 秒后继续下一只股票...")
-                        time.sleep(analysis_delay)
-
-                except Exception as e:
-                    logger.error(f"[{code}] 任务执行失败: {e}")
+                # 收集结果
+                for idx, future in enumerate(as_completed(future_to_code)):
+                    code = future_to_code[future]
+                    try:
+                        result = future.result()
+                        if result:
+                            results.append(result)
+                            if run_id:
+                                self.run_repo.save_checkpoint(
+                                    run_id, code, AnalysisRunRepository.STAGE_DONE, query_id=query_ids[code]
+                                )
+
+                        # Issue #128: 分析间隔 - 在个股分析和大盘分析之间添加延迟
+                        if idx < len(pending_codes) - 1 and analysis_delay > 0:
+                            logger.debug(f"等待 {analysis_delay} 秒后继续下一只股票...")
+                            time.sleep(analysis_delay)
+
+                    except Exception as e:
+                        logger.error(f"[{code}] 任务执行失败: {e}")
+
+        results = restored_results + results
+        if self._run_budget is not None:
+            logger.info(self._run_budget.format_summary())
+            self._run_budget = None
+        if run_id:
+            all_done = {r.code for r in results} >= set(stock_codes)
+            self.run_repo.finish_run(
+                run_id,
+                AnalysisRunRepository.RUN_COMPLETED if all_done else AnalysisRunRepository.RUN_INCOMPLETE,
+            )
         
         # 统计
         elapsed_time = time.time() - start_time
         
         # dry-run 模式下，数据获取成功即视为成功
         if dry_run:
-            # 检查哪些股票的数据今天已存在
-            success_count = sum(1 for code in stock_codes if self.db.has_today_data(code))
+            # 检查哪些股票的最新交易日数据已存在
+            success_count = sum(
+                1 for code in stock_codes
+                if self.db.has_today_data(code, get_calendar_for_code(code).latest_bar_date())
+            )
             fail_count = len(stock_codes) - success_count
         else:
             success_count = len(results)
@@ -691,22 +1055,259 @@ class StockAnalysisPipeline:
         
         logger.info("===== 分析完成 =====")
         logger.info(f"成功: {success_count}, 失败: {fail_count}, 耗时: {elapsed_time:.2f} 秒")
+        if self.search_service.is_available:
+            cache_stats = self.search_service.get_cache_stats()
+            logger.info(
+                f"搜索缓存命中率: {cache_stats['hit_rate']:.1%} "
+                f"(内存 {cache_stats['memory_hits']}, 持久化 {cache_stats['persistent_hits']}, "
+                f"未命中 {cache_stats['misses']})"
+            )
+            dedup_stats = self.search_service.get_dedup_stats()
+            logger.info(
+                f"新闻去重率: {dedup_stats['ratio']:.1%} "
+                f"(折叠 {dedup_stats['removed']}/{dedup_stats['total']} 条近似重复新闻)"
+            )
         
         # 发送通知（单股推送模式下跳过汇总推送，避免重复）
         if results and send_notification and not dry_run:
-            if single_stock_notify:
-                # 单股推送模式：只保存汇总报告，不再重复推送
-                logger.info("单股推送模式：跳过汇总推送，仅保存报告到本地")
-                self._send_notifications(results, skip_push=True)
-            elif merge_notification:
-                # 合并模式（Issue #190）：仅保存，不推送，由 main 层合并个股+大盘后统一发送
-                logger.info("合并推送模式：跳过本次推送，将在个股+大盘复盘后统一发送")
-                self._send_notifications(results, skip_push=True)
-            else:
-                self._send_notifications(results)
+            self.dispatch_summary(results, single_stock_notify, merge_notification)
         
         return results
+
+    def _resolve_report_type(self) -> ReportType:
+        """Issue #119: 从配置读取报告类型"""
+        report_type_str = getattr(self.config, 'report_type', 'simple').lower()
+        return ReportType.FULL if report_type_str == 'full' else ReportType.SIMPLE
+
+    def dispatch_summary(
+        self,
+        results: List[AnalysisResult],
+        single_stock_notify: bool,
+        merge_notification: bool = False,
+    ) -> None:
+        """保存并推送汇总日报"""
+        if single_stock_notify:
+            # 单股推送模式：只保存汇总报告，不再重复推送
+            logger.info("单股推送模式：跳过汇总推送，仅保存报告到本地")
+            self._send_notifications(results, skip_push=True)
+        elif merge_notification:
+            # 合并模式（Issue #190）：仅保存，不推送，由 main 层合并个股+大盘后统一发送
+            logger.info("合并推送模式：跳过本次推送，将在个股+大盘复盘后统一发送")
+            self._send_notifications(results, skip_push=True)
+        else:
+            self._send_notifications(results)
+
+    def analyze_shard(
+        self,
+        stock_codes: List[str],
+        run_id: str,
+        send_notification: bool = True,
+    ) -> List[AnalysisResult]:
+        """
+        分片模式：分析本进程领取到的一批股票
+
+        结果与检查点写入 run_id 对应的运行，汇总推送由协调进程统一发送（见 src/core/sharding.py）。
+
+        Args:
+            stock_codes: 本批股票代码
+            run_id: 所属运行 ID
+            send_notification: 是否允许单股推送
+
+        Returns:
+            本批分析结果
+        """
+        checkpoints = self.run_repo.get_checkpoints(run_id)
+        single_stock_notify = getattr(self.config, 'single_stock_notify', False) and send_notification
+        report_type = self._resolve_report_type()
+
+        if getattr(self.config, 'pipeline_staged', False):
+            return self._run_staged(
+                stock_codes,
+                dry_run=False,
+                single_stock_notify=single_stock_notify,
+                report_type=report_type,
+                analysis_delay=getattr(self.config, 'analysis_delay', 0),
+                run_id=run_id,
+                checkpoints=checkpoints,
+            )
+
+        results: List[AnalysisResult] = []
+        for code in stock_codes:
+            query_id = self._checkpoint_query_id(checkpoints, code)
+            result = self.process_single_stock(
+                code,
+                single_stock_notify=single_stock_notify,
+                report_type=report_type,
+                analysis_query_id=query_id,
+                run_id=run_id,
+                news_context=self._checkpoint_news_context(checkpoints, code),
+            )
+            if result:
+                results.append(result)
+                self.run_repo.save_checkpoint(run_id, code, AnalysisRunRepository.STAGE_DONE, query_id=query_id)
+        return results
     
+    def save_trace_report(self, tracer: Tracer, run_id: Optional[str] = None) -> None:
+        """
+        输出本次运行的耗时分布，并将性能报告（及可选 JSON 追踪）保存到日报目录
+
+        文件名带时间与运行 ID，并发运行各自输出，互不覆盖
+        """
+        if not tracer.enabled or not tracer.get_spans():
+            return
+        logger.info(tracer.format_summary())
+        try:
+            suffix = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{(run_id or uuid.uuid4().hex)[:8]}"
+            filepath = self.notifier.save_report_to_file(
+                tracer.format_report(), filename=f"perf_{suffix}.md"
+            )
+            logger.info(f"运行性能报告已保存: {filepath}")
+            if getattr(self.config, 'trace_export_json', False):
+                trace_path = os.path.join(os.path.dirname(filepath), f"trace_{suffix}.json")
+                logger.info(f"追踪数据已导出: {tracer.export_json(trace_path)}")
+        except Exception as e:
+            logger.warning(f"保存运行性能报告失败: {e}")
+
+    def _run_staged(
+        self,
+        stock_codes: List[str],
+        dry_run: bool,
+        single_stock_notify: bool,
+        report_type: ReportType,
+        analysis_delay: float = 0,
+        run_id: Optional[str] = None,
+        checkpoints: Optional[Dict[str, Any]] = None,
+    ) -> List[AnalysisResult]:
+        """
+        分阶段流水线执行
+
+        行情数据 → 情报搜索 → AI 分析 → 持久化 → 单股推送，阶段之间用有界队列连接。
+        行情阶段沿用 max_workers（低并发防封禁），搜索与 AI 阶段可单独放宽并发。
+        传入 run_id 时，搜索与持久化阶段完成后记录检查点；checkpoints 中已完成搜索的股票复用保存的情报。
+
+        Returns:
+            分析结果列表（按完成顺序）
+        """
+        cfg = self.config
+        llm_rpm = cfg.pipeline_llm_rpm
+        if not llm_rpm and analysis_delay > 0:
+            # 兼容 ANALYSIS_DELAY（Issue #128）：换算为 AI 阶段的限速
+            llm_rpm = 60.0 / analysis_delay
+
+        stages = [
+            Stage('data', self._stage_market_data, workers=self.max_workers, rate_per_minute=cfg.pipeline_data_rpm),
+        ]
+        if not dry_run:
+            stages += [
+                Stage('search', self._stage_search, workers=cfg.pipeline_search_workers,
+                      rate_per_minute=cfg.pipeline_search_rpm),
+                Stage('llm', self._stage_llm, workers=cfg.pipeline_llm_workers, rate_per_minute=llm_rpm),
+                # SQLite 写入串行，避免锁竞争
+                Stage('persist', self._stage_persist, workers=1),
+                Stage('notify', self._stage_notify, workers=1),
+            ]
+
+        checkpoints = checkpoints or {}
+        jobs = (
+            _StockJob(
+                code=code,
+                query_id=self._checkpoint_query_id(checkpoints, code),
+                report_type=report_type,
+                single_stock_notify=single_stock_notify,
+                skip_analysis=dry_run,
+                news_context=self._checkpoint_news_context(checkpoints, code),
+                run_id=run_id,
+            )
+            for code in stock_codes
+        )
+        runner = StagedPipelineRunner(stages, queue_size=cfg.pipeline_queue_size)
+        outputs = runner.run(jobs)
+
+        self.last_stage_stats = runner.get_stats()
+        logger.info(runner.format_stats())
+        return [o for o in outputs if isinstance(o, AnalysisResult)]
+
+    @staticmethod
+    def _checkpoint_query_id(checkpoints: Dict[str, Any], code: str) -> str:
+        """续跑时沿用检查点中的 query_id，使分析记录与首次运行关联"""
+        checkpoint = checkpoints.get(code)
+        return (checkpoint.query_id if checkpoint is not None else None) or uuid.uuid4().hex
+
+    @staticmethod
+    def _checkpoint_news_context(checkpoints: Dict[str, Any], code: str) -> Optional[str]:
+        """获取检查点中已保存的情报搜索结果（未完成搜索时返回 None）"""
+        checkpoint = checkpoints.get(code)
+        if checkpoint is None or checkpoint.stage == AnalysisRunRepository.STAGE_PENDING:
+            return None
+        return checkpoint.news_context
+
+    def _restore_completed_results(self, checkpoints: Dict[str, Any]) -> List[AnalysisResult]:
+        """从分析历史还原检查点中已完成股票的分析结果"""
+        restored: List[AnalysisResult] = []
+        for code, checkpoint in checkpoints.items():
+            if checkpoint.stage != AnalysisRunRepository.STAGE_DONE or not checkpoint.query_id:
+                continue
+            try:
+                records = self.db.get_analysis_history(code=code, query_id=checkpoint.query_id, limit=1)
+                if not records or not records[0].raw_result:
+                    continue
+                restored.append(AnalysisResult.from_dict(json.loads(records[0].raw_result)))
+            except Exception as e:
+                logger.warning(f"[{code}] 还原已完成的分析结果失败，将重新分析: {e}")
+        return restored
+
+    def restore_run_results(self, run_id: str) -> List[AnalysisResult]:
+        """还原运行中全部已完成股票的分析结果（分片运行合并结果时使用）"""
+        return self._restore_completed_results(self.run_repo.get_checkpoints(run_id))
+
+    def _stage_market_data(self, job: '_StockJob') -> Optional['_StockJob']:
+        """流水线阶段：获取并保存日线数据，采集实时行情、筹码、趋势"""
+        logger.info(f"========== 开始处理 {job.code} ==========")
+        step_start = time.time()
+        success, error = self.fetch_and_save_stock_data(job.code)
+        self._record_budget('data', job.code, step_start)
+        if not success:
+            logger.warning(f"[{job.code}] 数据获取失败: {error}")
+            # 即使获取失败，也尝试用已有数据分析
+        if job.skip_analysis:
+            logger.info(f"[{job.code}] 跳过 AI 分析（dry-run 模式）")
+            return None
+        self._collect_market_data(job)
+        return job
+
+    def _stage_search(self, job: '_StockJob') -> '_StockJob':
+        """流水线阶段：多维度情报搜索"""
+        self._search_intel(job)
+        return job
+
+    def _stage_llm(self, job: '_StockJob') -> '_StockJob':
+        """流水线阶段：AI 分析（分析失败也继续传递，以便保存新闻情报）"""
+        self._run_llm(job)
+        return job
+
+    def _stage_persist(self, job: '_StockJob') -> Optional['_StockJob']:
+        """流水线阶段：保存新闻情报与分析历史"""
+        self._save_news_intel(job)
+        self._save_analysis_history(job)
+        if not job.result:
+            logger.warning(f"[{job.code}] AI 分析未返回结果")
+            return None
+        if job.run_id:
+            self.run_repo.save_checkpoint(
+                job.run_id, job.code, AnalysisRunRepository.STAGE_DONE, query_id=job.query_id
+            )
+        logger.info(
+            f"[{job.code}] 分析完成: {job.result.operation_advice}, "
+            f"评分 {job.result.sentiment_score}"
+        )
+        return job
+
+    def _stage_notify(self, job: '_StockJob') -> AnalysisResult:
+        """流水线阶段：单股推送（#55）"""
+        if job.single_stock_notify:
+            self._notify_single_stock(job.result, job.report_type)
+        return job.result
+
     def _send_notifications(self, results: List[AnalysisResult], skip_push: bool = False) -> None:
         """
         发送分析结果通知
@@ -733,6 +1334,7 @@ class StockAnalysisPipeline:
             
             # 推送通知
             if self.notifier.is_available():
+                push_start = time.time()
                 channels = self.notifier.get_available_channels()
                 context_success = self.notifier.send_to_context(report)
 
@@ -742,7 +1344,8 @@ class StockAnalysisPipeline:
                     dashboard_content = self.notifier.generate_wechat_dashboard(results)
                     logger.info(f"企业微信仪表盘长度: {len(dashboard_content)} 字符")
                     logger.debug(f"企业微信推送内容:\n{dashboard_content}")
-                    wechat_success = self.notifier.send_to_wechat(dashboard_content)
+                    with trace_span('notify_channel', source=NotificationChannel.WECHAT.value):
+                        wechat_success = self.notifier.send_to_wechat(dashboard_content)
 
                 # 其他渠道：发完整报告（避免自定义 Webhook 被 wechat 截断逻辑污染）
                 non_wechat_success = False
@@ -750,52 +1353,54 @@ class StockAnalysisPipeline:
                 for channel in channels:
                     if channel == NotificationChannel.WECHAT:
                         continue
-                    if channel == NotificationChannel.FEISHU:
-                        non_wechat_success = self.notifier.send_to_feishu(report) or non_wechat_success
-                    elif channel == NotificationChannel.TELEGRAM:
-                        non_wechat_success = self.notifier.send_to_telegram(report) or non_wechat_success
-                    elif channel == NotificationChannel.EMAIL:
-                        if stock_email_groups:
-                            code_to_emails: Dict[str, Optional[List[str]]] = {}
-                            for r in results:
-                                if r.code not in code_to_emails:
-                                    emails = []
-                                    for stocks, emails_list in stock_email_groups:
-                                        if r.code in stocks:
-                                            emails.extend(emails_list)
-                                    code_to_emails[r.code] = list(dict.fromkeys(emails)) if emails else None
-                            emails_to_results: Dict[Optional[Tuple], List] = defaultdict(list)
-                            for r in results:
-                                recs = code_to_emails.get(r.code)
-                                key = tuple(recs) if recs else None
-                                emails_to_results[key].append(r)
-                            for key, group_results in emails_to_results.items():
-                                grp_report = self.notifier.generate_dashboard_report(group_results)
-                                if key is None:
-                                    non_wechat_success = self.notifier.send_to_email(grp_report) or non_wechat_success
-                                else:
-                                    non_wechat_success = (
-                                        self.notifier.send_to_email(grp_report, receivers=list(key))
-                                        or non_wechat_success
-                                    )
+                    with trace_span('notify_channel', source=channel.value):
+                        if channel == NotificationChannel.FEISHU:
+                            non_wechat_success = self.notifier.send_to_feishu(report) or non_wechat_success
+                        elif channel == NotificationChannel.TELEGRAM:
+                            non_wechat_success = self.notifier.send_to_telegram(report) or non_wechat_success
+                        elif channel == NotificationChannel.EMAIL:
+                            if stock_email_groups:
+                                code_to_emails: Dict[str, Optional[List[str]]] = {}
+                                for r in results:
+                                    if r.code not in code_to_emails:
+                                        emails = []
+                                        for stocks, emails_list in stock_email_groups:
+                                            if r.code in stocks:
+                                                emails.extend(emails_list)
+                                        code_to_emails[r.code] = list(dict.fromkeys(emails)) if emails else None
+                                emails_to_results: Dict[Optional[Tuple], List] = defaultdict(list)
+                                for r in results:
+                                    recs = code_to_emails.get(r.code)
+                                    key = tuple(recs) if recs else None
+                                    emails_to_results[key].append(r)
+                                for key, group_results in emails_to_results.items():
+                                    grp_report = self.notifier.generate_dashboard_report(group_results)
+                                    if key is None:
+                                        non_wechat_success = self.notifier.send_to_email(grp_report) or non_wechat_success
+                                    else:
+                                        non_wechat_success = (
+                                            self.notifier.send_to_email(grp_report, receivers=list(key))
+                                            or non_wechat_success
+                                        )
+                            else:
+                                non_wechat_success = self.notifier.send_to_email(report) or non_wechat_success
+                        elif channel == NotificationChannel.CUSTOM:
+                            non_wechat_success = self.notifier.send_to_custom(report) or non_wechat_success
+                        elif channel == NotificationChannel.PUSHPLUS:
+                            non_wechat_success = self.notifier.send_to_pushplus(report) or non_wechat_success
+                        elif channel == NotificationChannel.SERVERCHAN3:
+                            non_wechat_success = self.notifier.send_to_serverchan3(report) or non_wechat_success
+                        elif channel == NotificationChannel.DISCORD:
+                            non_wechat_success = self.notifier.send_to_discord(report) or non_wechat_success
+                        elif channel == NotificationChannel.PUSHOVER:
+                            non_wechat_success = self.notifier.send_to_pushover(report) or non_wechat_success
+                        elif channel == NotificationChannel.ASTRBOT:
+                            non_wechat_success = self.notifier.send_to_astrbot(report) or non_wechat_success
                         else:
-                            non_wechat_success = self.notifier.send_to_email(report) or non_wechat_success
-                    elif channel == NotificationChannel.CUSTOM:
-                        non_wechat_success = self.notifier.send_to_custom(report) or non_wechat_success
-                    elif channel == NotificationChannel.PUSHPLUS:
-                        non_wechat_success = self.notifier.send_to_pushplus(report) or non_wechat_success
-                    elif channel == NotificationChannel.SERVERCHAN3:
-                        non_wechat_success = self.notifier.send_to_serverchan3(report) or non_wechat_success
-                    elif channel == NotificationChannel.DISCORD:
-                        non_wechat_success = self.notifier.send_to_discord(report) or non_wechat_success
-                    elif channel == NotificationChannel.PUSHOVER:
-                        non_wechat_success = self.notifier.send_to_pushover(report) or non_wechat_success
-                    elif channel == NotificationChannel.ASTRBOT:
-                        non_wechat_success = self.notifier.send_to_astrbot(report) or non_wechat_success
-                    else:
-                        logger.warning(f"未知通知渠道: {channel}")
+                            logger.warning(f"未知通知渠道: {channel}")
 
                 success = wechat_success or non_wechat_success or context_success
+                get_tracer().record('notify', time.time() - push_start, ok=success)
                 if success:
                     logger.info("决策仪表盘推送成功")
                 else:
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+复权因子与复权价格计算
+===================================
+
+职责：
+1. 定义日线的复权方式（前复权 / 后复权 / 不复权）
+2. 将数据源返回的复权因子压缩为阶梯（只保留因子变化的日期）
+3. 由不复权价格与复权因子向量化计算前复权 / 后复权价格
+
+说明：
+- 复权因子为累计后复权因子 F(d)：后复权价 = 原始价 × F(d)，前复权价 = 原始价 × F(d) / F(最新)
+- 因子只在除权除息日变化，按阶梯存储；某日的因子取该日及之前最近一次变化的值，
+  早于第一次变化的日期取 1.0
+- 发生分红送转后只需更新因子阶梯，历史原始价格不变，前复权价格在读取时重新计算
+- 成交量、成交额、涨跌幅不做复权处理（与各数据源前复权数据的口径一致）
+"""
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+ADJUST_QFQ = 'qfq'  # 前复权（各数据源默认）
+ADJUST_HFQ = 'hfq'  # 后复权
+ADJUST_RAW = 'raw'  # 不复权
+
+# 随复权因子缩放的价格列
+PRICE_COLUMNS = ('open', 'high', 'low', 'close')
+
+
+def compress_factors(frame: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    将逐日（或按事件）的复权因子压缩为阶梯
+
+    Args:
+        frame: 含 date / factor 列的 DataFrame（顺序不限，空值忽略）
+
+    Returns:
+        (dates, factors)：datetime64[D] 日期数组与对应的因子，只保留因子变化的日期
+    """
+    if frame is None or frame.empty:
+        return np.array([], dtype='datetime64[D]'), np.array([], dtype=np.float64)
+    data = frame[['date', 'factor']].dropna()
+    data = data.assign(date=pd.to_datetime(data['date']).values.astype('datetime64[D]'))
+    data = data.sort_values('date').drop_duplicates('date', keep='last')
+    dates = data['date'].to_numpy(dtype='datetime64[D]')
+    factors = data['factor'].to_numpy(dtype=np.float64)
+    if len(factors) == 0:
+        return dates, factors
+    changed = np.concatenate(([True], ~np.isclose(factors[1:], factors[:-1], rtol=1e-9, atol=0.0)))
+    return dates[changed], factors[changed]
+
+
+def factors_on(dates: np.ndarray, factor_dates: np.ndarray, factors: np.ndarray) -> np.ndarray:
+    """
+    查询每个日期适用的复权因子（阶梯查找，早于第一次变化的日期为 1.0）
+
+    Args:
+        dates: 待查询日期（datetime64）
+        factor_dates: 因子阶梯日期（升序）
+        factors: 因子阶梯取值
+    """
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    if len(factors) == 0:
+        return np.ones(len(dates), dtype=np.float64)
+    idx = np.searchsorted(np.asarray(factor_dates, dtype='datetime64[D]'), dates, side='right') - 1
+    return np.where(idx >= 0, np.asarray(factors, dtype=np.float64)[np.clip(idx, 0, None)], 1.0)
+
+
+def apply_adjustment(
+    frame: pd.DataFrame,
+    factor_dates: np.ndarray,
+    factors: np.ndarray,
+    adjust: str = ADJUST_QFQ,
+) -> pd.DataFrame:
+    """
+    由不复权日线计算复权日线
+
+    Args:
+        frame: 不复权日线（含 date 与 open/high/low/close 列）
+        factor_dates: 因子阶梯日期（升序）
+        factors: 因子阶梯取值
+        adjust: qfq（以最新因子为基准）/ hfq / raw
+
+    Returns:
+        价格列已复权的新 DataFrame
+    """
+    if adjust == ADJUST_RAW or frame.empty:
+        return frame.copy()
+    if adjust not in (ADJUST_QFQ, ADJUST_HFQ):
+        raise ValueError(f"不支持的复权方式: {adjust}")
+
+    scale = factors_on(pd.to_datetime(frame['date']).values, factor_dates, factors)
+    if adjust == ADJUST_QFQ and len(factors):
+        scale = scale / factors[-1]
+    result = frame.copy()
+    for name in PRICE_COLUMNS:
+        if name in result.columns:
+            result[name] = result[name].to_numpy(dtype=np.float64) * scale
+    return result
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+运行截止时间预算
+===================================
+
+职责：
+1. 根据截止时间（RUN_DEADLINE / RUN_BUDGET_MINUTES）与各阶段耗时推算本次运行的预计完成时间
+2. 落后于截止时间时，对低优先级股票降级：跳过筹码分布、减少情报维度、完整报告改为精简报告
+3. 记录被降级的股票与跳过的步骤，写入分析结果与日报
+
+推算方式：
+- 每个阶段的单股耗时优先使用本次运行的实测均值，尚无实测数据时使用 PIPELINE_*_BUDGET 预估值
+- 分阶段流水线各阶段并行，剩余耗时取瓶颈阶段（剩余股票数 × 单股耗时 / 线程数）的最大值；
+  传统线程池模式每只股票依次经过各阶段，剩余耗时为各阶段之和
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 降级时跳过的可选步骤（同时作为日报中的说明文字）
+DEGRADE_CHIP = '筹码分布'
+DEGRADE_SEARCH = '扩展情报维度'
+DEGRADE_REPORT = '完整报告'
+
+# 降级后情报搜索保留的维度数（最新消息、机构分析、风险排查）
+DEGRADED_INTEL_MAX_SEARCHES = 3
+
+
+def parse_deadline(value: str, now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    解析截止时间
+
+    Args:
+        value: HH:MM 格式的时间，为空返回 None
+        now: 当前时间（默认 datetime.now()）
+
+    Returns:
+        下一个该时刻对应的 datetime（当日该时刻已过时顺延到次日，如 23:00 开始的运行截止到次日 01:00），
+        格式无效时返回 None
+    """
+    if not value:
+        return None
+    now = now or datetime.now()
+    try:
+        parsed = datetime.strptime(value.strip(), '%H:%M')
+    except ValueError:
+        logger.warning(f"RUN_DEADLINE 格式无效（应为 HH:MM）: {value}")
+        return None
+    deadline = now.replace(hour=parsed.hour, minute=parsed.minute, second=0, microsecond=0)
+    if deadline <= now:
+        deadline += timedelta(days=1)
+    return deadline
+
+
+class RunBudget:
+    """
+    运行截止时间预算（线程安全）
+
+    使用示例:
+        budget = RunBudget(deadline, total=30, stage_budgets={'data': 20, 'llm': 60},
+                           stage_workers={'data': 3, 'llm': 4})
+        budget.record('llm', '600519', 42.0)
+        if budget.should_degrade('600519'):
+            ...
+    """
+
+    def __init__(
+        self,
+        deadline: datetime,
+        total: int,
+        stage_budgets: Dict[str, float],
+        stage_workers: Dict[str, int],
+        sequential: bool = False,
+        priority_codes: Iterable[str] = (),
+    ):
+        """
+        Args:
+            deadline: 截止时间
+            total: 本次运行的股票数
+            stage_budgets: 各阶段单只股票预估耗时（秒）
+            stage_workers: 各阶段并发线程数
+            sequential: 各阶段是否在同一线程内依次执行（传统线程池模式）
+            priority_codes: 高优先级股票，落后时也不降级
+        """
+        self.deadline = deadline
+        self.total = max(0, total)
+        self.stage_budgets = dict(stage_budgets)
+        self.stage_workers = {stage: max(1, int(stage_workers.get(stage, 1))) for stage in stage_budgets}
+        self.sequential = sequential
+        self.priority_codes = set(priority_codes)
+        # {阶段: {股票代码: 累计耗时}}
+        self._durations: Dict[str, Dict[str, float]] = {stage: {} for stage in stage_budgets}
+        self._degraded: Dict[str, List[str]] = {}
+        self._behind_logged = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(
+        cls,
+        config,
+        total: int,
+        max_workers: int,
+        staged: bool,
+        now: Optional[datetime] = None,
+    ) -> Optional['RunBudget']:
+        """
+        按配置创建预算；未配置截止时间时返回 None
+
+        Args:
+            config: 配置对象
+            total: 本次运行的股票数
+            max_workers: 行情阶段（传统模式下为整体）并发数
+            staged: 是否为分阶段流水线
+            now: 运行开始时间（默认 datetime.now()）
+        """
+        now = now or datetime.now()
+        candidates = []
+        deadline = parse_deadline(getattr(config, 'run_deadline', ''), now)
+        if deadline is not None:
+            candidates.append(deadline)
+        budget_minutes = getattr(config, 'run_budget_minutes', 0)
+        if budget_minutes and budget_minutes > 0:
+            candidates.append(now + timedelta(minutes=budget_minutes))
+        if not candidates or total <= 0:
+            return None
+
+        stage_budgets = {
+            'data': config.pipeline_data_budget,
+            'search': config.pipeline_search_budget,
+            'llm': config.pipeline_llm_budget,
+        }
+        if staged:
+            stage_workers = {
+                'data': max_workers,
+                'search': config.pipeline_search_workers,
+                'llm': config.pipeline_llm_workers,
+            }
+        else:
+            stage_workers = {stage: max_workers for stage in stage_budgets}
+        return cls(
+            min(candidates),
+            total,
+            stage_budgets,
+            stage_workers,
+            sequential=not staged,
+            priority_codes=getattr(config, 'deadline_priority_stocks', []) or [],
+        )
+
+    def record(self, stage: str, code: str, seconds: float) -> None:
+        """记录某只股票在某阶段的耗时（同一股票多次记录会累加）"""
+        with self._lock:
+            per_code = self._durations.setdefault(stage, {})
+            per_code[code] = per_code.get(code, 0.0) + max(0.0, seconds)
+
+    def _stage_estimate(self, stage: str) -> float:
+        """阶段单股耗时：有实测数据时取均值，否则使用预估值"""
+        observed = self._durations.get(stage) or {}
+        if observed:
+            return sum(observed.values()) / len(observed)
+        return self.stage_budgets.get(stage, 0.0)
+
+    def projected_finish(self, now: Optional[float] = None) -> datetime:
+        """推算预计完成时间"""
+        now = time.time() if now is None else now
+        with self._lock:
+            remaining = []
+            for stage in self.stage_budgets:
+                left = max(0, self.total - len(self._durations.get(stage) or {}))
+                remaining.append(left * self._stage_estimate(stage) / self.stage_workers[stage])
+        seconds = sum(remaining) if self.sequential else max(remaining, default=0.0)
+        return datetime.fromtimestamp(now + seconds)
+
+    def is_behind(self, now: Optional[float] = None) -> bool:
+        """预计完成时间是否晚于截止时间"""
+        projected = self.projected_finish(now)
+        behind = projected > self.deadline
+        if behind and not self._behind_logged:
+            self._behind_logged = True
+            logger.warning(
+                f"[截止时间] 预计完成 {projected.strftime('%H:%M:%S')}，晚于截止时间 "
+                f"{self.deadline.strftime('%H:%M')}，开始对低优先级股票降级"
+            )
+        return behind
+
+    def should_degrade(self, code: str, now: Optional[float] = None) -> bool:
+        """该股票是否需要降级（高优先级股票始终不降级）"""
+        if code in self.priority_codes:
+            return False
+        return self.is_behind(now)
+
+    def mark_degraded(self, code: str, step: str) -> None:
+        """记录被降级的步骤"""
+        with self._lock:
+            steps = self._degraded.setdefault(code, [])
+            if step not in steps:
+                steps.append(step)
+
+    def get_degraded(self) -> Dict[str, List[str]]:
+        """{股票代码: [跳过的步骤]}"""
+        with self._lock:
+            return {code: list(steps) for code, steps in self._degraded.items()}
+
+    def format_summary(self) -> str:
+        """单行摘要（用于日志）"""
+        degraded = self.get_degraded()
+        head = (
+            f"截止时间 {self.deadline.strftime('%H:%M')}，"
+            f"实际完成 {datetime.now().strftime('%H:%M:%S')}"
+        )
+        if not degraded:
+            return f"{head}，无降级"
+        items = ", ".join(f"{code}({'/'.join(steps)})" for code, steps in degraded.items())
+        return f"{head}，降级 {len(degraded)} 只: {items}"
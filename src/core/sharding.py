@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+自选股分片运行（多进程 / 多主机）
+===================================
+
+职责：
+1. 协调进程登记运行与股票租约，启动 N 个本地分片进程
+2. 各分片（本机子进程或 --join-run 加入的其他主机）通过数据库租约领取股票并分析
+3. 全部完成后由协调进程从检查点还原结果，统一生成并推送汇总日报
+
+限速预算：N 个分片合计使用单进程的并发与限速配额（MAX_WORKERS、PIPELINE_*_WORKERS、
+PIPELINE_*_RPM、ANALYSIS_DELAY、SEARCH_PROVIDER_MAX_CONCURRENCY 以及各数据源自身的请求间隔），
+整体访问频率与单进程一致；分片数超过并发配额时不做分片。
+"""
+
+import logging
+import multiprocessing
+import os
+import socket
+import time
+import uuid
+from dataclasses import replace
+from typing import List, Optional
+
+from src.analyzer import AnalysisResult
+from src.config import Config, get_config
+from src.repositories.lease_repo import AnalysisLeaseRepository
+from src.repositories.run_repo import AnalysisRunRepository
+
+logger = logging.getLogger(__name__)
+
+# 协调进程等待其他分片时的轮询间隔（秒）
+WAIT_POLL_SECONDS = 5.0
+
+
+def shard_capacity(config: Config, max_workers: Optional[int] = None) -> int:
+    """
+    并发配额允许的最大分片数（每个分片的每项并发配额至少为 1）
+
+    Args:
+        config: 原始配置
+        max_workers: 命令行覆盖的并发数（可选）
+    """
+    budgets = [max_workers or config.max_workers, config.search_provider_max_concurrency]
+    if getattr(config, 'pipeline_staged', False):
+        budgets += [config.pipeline_search_workers, config.pipeline_llm_workers]
+    return max(1, min(int(b) for b in budgets))
+
+
+def slice_budget(config: Config, shard_count: int, shard_index: int = 0) -> Config:
+    """
+    按分片数切分并发与限速预算
+
+    整数配额的余数分给编号靠前的分片，N 个分片的配额之和等于原配额；
+    数据源自身的请求间隔放大 N 倍，使各分片合计的请求频率与单进程一致。
+
+    Args:
+        config: 原始配置（不修改）
+        shard_count: 分片数
+        shard_index: 分片编号（0 ~ shard_count-1）
+
+    Returns:
+        切分后的配置副本
+
+    Raises:
+        ValueError: 分片数超过并发配额（某个分片会分到 0 个并发）
+    """
+    if shard_count <= 1:
+        return config
+    if shard_count > shard_capacity(config):
+        raise ValueError(f"分片数 {shard_count} 超过并发配额允许的 {shard_capacity(config)} 个")
+
+    def _share(value: int) -> int:
+        quotient, remainder = divmod(int(value), shard_count)
+        return quotient + (1 if shard_index < remainder else 0)
+
+    def _rate(value: float) -> float:
+        return value / shard_count if value and value > 0 else value
+
+    return replace(
+        config,
+        max_workers=_share(config.max_workers),
+        pipeline_search_workers=_share(config.pipeline_search_workers),
+        pipeline_llm_workers=_share(config.pipeline_llm_workers),
+        pipeline_data_rpm=_rate(config.pipeline_data_rpm),
+        pipeline_search_rpm=_rate(config.pipeline_search_rpm),
+        pipeline_llm_rpm=_rate(config.pipeline_llm_rpm),
+        # 间隔按分片数放大，换算后的 AI 限速同样为 1/N
+        analysis_delay=config.analysis_delay * shard_count,
+        search_provider_max_concurrency=_share(config.search_provider_max_concurrency),
+        # 数据源自身的限速按进程生效，同样切分
+        efinance_sleep_min=config.efinance_sleep_min * shard_count,
+        efinance_sleep_max=config.efinance_sleep_max * shard_count,
+        akshare_sleep_min=config.akshare_sleep_min * shard_count,
+        akshare_sleep_max=config.akshare_sleep_max * shard_count,
+        tushare_rate_limit_per_minute=_share(config.tushare_rate_limit_per_minute),
+    )
+
+
+def shard_owner() -> str:
+    """租约持有者标识（主机名:进程号）"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_shard_worker(run_id: str, pipeline, send_notification: bool = True) -> int:
+    """
+    分片工作循环：持续领取租约并分析，直到没有可领取的股票
+
+    Args:
+        run_id: 运行 ID
+        pipeline: StockAnalysisPipeline（其配置应已按分片切分预算）
+        send_notification: 是否允许单股推送
+
+    Returns:
+        本分片处理的股票数
+    """
+    config = pipeline.config
+    repo = AnalysisLeaseRepository(pipeline.db)
+    owner = shard_owner()
+    processed = 0
+
+    while True:
+        codes = repo.claim(
+            run_id,
+            owner,
+            limit=config.shard_batch_size,
+            lease_seconds=config.shard_lease_seconds,
+        )
+        if not codes:
+            break
+        logger.info(f"[分片 {owner}] 领取 {len(codes)} 只股票: {', '.join(codes)}")
+        try:
+            results = pipeline.analyze_shard(codes, run_id, send_notification=send_notification)
+        except Exception as e:
+            logger.exception(f"[分片 {owner}] 分析失败: {e}")
+            results = []
+        done_codes = {r.code for r in results}
+        for code in codes:
+            if not repo.complete(run_id, code, owner, success=code in done_codes):
+                logger.warning(f"[分片 {owner}] {code} 租约已被其他分片接管")
+        processed += len(codes)
+
+    logger.info(f"[分片 {owner}] 无可领取的股票，共处理 {processed} 只")
+    return processed
+
+
+def build_shard_pipeline(
+    run_id: str,
+    shard_count: int,
+    config: Optional[Config] = None,
+    shard_index: Optional[int] = None,
+):
+    """
+    创建按分片切分预算的分析流水线
+
+    Args:
+        shard_index: 分片编号；未指定时（如 --join-run 加入的分片）使用最小份额
+    """
+    from src.core.pipeline import StockAnalysisPipeline
+
+    index = shard_count - 1 if shard_index is None else shard_index
+    return StockAnalysisPipeline(
+        config=slice_budget(config or get_config(), shard_count, index),
+        query_id=run_id,
+        query_source="shard",
+    )
+
+
+def _shard_process_main(run_id: str, config: Config, send_notification: bool, debug: bool, shard_index: int) -> None:
+    """
+    本地分片子进程入口（spawn 启动，需重新初始化日志）
+
+    config 为协调进程切分后的配置（已包含 --workers 等命令行覆盖），同时设为子进程的全局配置，
+    使数据源、搜索与 AI 模块读取到同一份分片预算
+    """
+    from src.core.pipeline import StockAnalysisPipeline
+    from src.logging_config import setup_logging
+
+    Config._instance = config
+    setup_logging(log_prefix=f"stock_analysis_shard{shard_index}", debug=debug, log_dir=config.log_dir)
+    pipeline = StockAnalysisPipeline(config=config, query_id=run_id, query_source="shard")
+    run_shard_worker(run_id, pipeline, send_notification=send_notification)
+
+
+def run_sharded(
+    stock_codes: Optional[List[str]],
+    shard_count: int,
+    pipeline,
+    run_id: Optional[str] = None,
+    local_shards: Optional[int] = None,
+    send_notification: bool = True,
+    merge_notification: bool = False,
+    debug: bool = False,
+) -> List[AnalysisResult]:
+    """
+    分片运行（协调进程）
+
+    流程：
+    1. 登记运行与股票租约
+    2. 启动 local_shards 个本地分片子进程（其他主机可通过 --join-run 加入同一运行）
+    3. 子进程结束后接管过期租约，并等待其他主机上的分片完成
+    4. 从检查点还原全部结果，统一生成汇总日报
+
+    Args:
+        stock_codes: 股票代码列表（None 时使用配置中的自选股，续跑时使用已登记的列表）
+        shard_count: 分片总数（决定每个分片的限速预算）
+        pipeline: 协调进程使用的流水线（用于还原结果与发送汇总推送）
+        run_id: 运行 ID（可选，默认自动生成；传入已有运行 ID 即续跑）
+        local_shards: 本机启动的分片进程数（默认等于 shard_count）
+        send_notification: 是否发送推送
+        merge_notification: 是否合并推送（由 main 层合并个股+大盘后统一发送）
+        debug: 子进程是否启用调试日志
+
+    Returns:
+        全部分片的分析结果
+
+    Raises:
+        ValueError: 分片数超过并发配额（调用方应改为单进程运行）
+    """
+    config = pipeline.config
+    if shard_count > shard_capacity(config, pipeline.max_workers):
+        raise ValueError(
+            f"分片数 {shard_count} 超过并发配额允许的 {shard_capacity(config, pipeline.max_workers)} 个"
+        )
+    run_id = run_id or uuid.uuid4().hex
+    run_repo = pipeline.run_repo
+    lease_repo = AnalysisLeaseRepository(pipeline.db)
+
+    if stock_codes is None:
+        stored_run = run_repo.get_run(run_id)
+        if stored_run is not None:
+            stock_codes = stored_run.get_stock_codes()
+        else:
+            config.refresh_stock_list()
+            stock_codes = config.stock_list
+    if not stock_codes:
+        logger.error("未配置自选股列表，请在 .env 文件中设置 STOCK_LIST")
+        return []
+
+    start_time = time.time()
+    if run_repo.start_run(run_id, stock_codes, query_source=pipeline.query_source) is None:
+        logger.error(f"运行 {run_id} 正在由其他协调进程执行，拒绝重复启动")
+        return []
+    lease_repo.register(run_id, stock_codes)
+    local_shards = shard_count if local_shards is None else local_shards
+    logger.info(
+        f"===== 分片运行 {run_id}: {len(stock_codes)} 只股票，{shard_count} 个分片"
+        f"（本机 {local_shards} 个进程；其他主机可用 --join-run {run_id} --shards {shard_count} 加入）====="
+    )
+
+    # 子进程使用协调进程的配置（含命令行覆盖），而非重新读取环境变量
+    shard_base = replace(
+        config,
+        max_workers=pipeline.max_workers,
+        save_context_snapshot=pipeline.save_context_snapshot,
+    )
+    ctx = multiprocessing.get_context("spawn")
+    processes = [
+        ctx.Process(
+            target=_shard_process_main,
+            args=(run_id, slice_budget(shard_base, shard_count, index), send_notification, debug, index),
+            name=f"shard_{index}",
+        )
+        for index in range(local_shards)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        if process.exitcode:
+            logger.warning(f"分片进程 {process.name} 异常退出 (exitcode={process.exitcode})")
+
+    # 接管过期租约（如分片进程崩溃），并等待其他主机持有的租约完成
+    deadline = time.time() + config.shard_lease_seconds * 2
+    while True:
+        run_shard_worker(run_id, pipeline, send_notification=send_notification)
+        outstanding = lease_repo.count_outstanding(run_id)
+        if outstanding == 0:
+            break
+        if time.time() > deadline:
+            logger.warning(f"分片运行 {run_id} 等待超时，仍有 {outstanding} 只股票未完成")
+            break
+        logger.info(f"等待其他分片完成剩余 {outstanding} 只股票...")
+        time.sleep(WAIT_POLL_SECONDS)
+
+    # 合并结果：从检查点还原各分片保存的分析结果，按原顺序排列
+    restored = pipeline.restore_run_results(run_id)
+    order = {code: index for index, code in enumerate(stock_codes)}
+    results = sorted(restored, key=lambda r: order.get(r.code, len(order)))
+    run_repo.finish_run(
+        run_id,
+        AnalysisRunRepository.RUN_COMPLETED if len(results) == len(stock_codes)
+        else AnalysisRunRepository.RUN_INCOMPLETE,
+    )
+
+    logger.info(
+        f"===== 分片运行完成: 成功 {len(results)}, 失败 {len(stock_codes) - len(results)}, "
+        f"耗时 {time.time() - start_time:.2f} 秒 ====="
+    )
+
+    if results and send_notification:
+        pipeline.dispatch_summary(
+            results,
+            single_stock_notify=getattr(config, 'single_stock_notify', False),
+            merge_notification=merge_notification,
+        )
+    return results
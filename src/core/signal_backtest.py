@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""Walk-forward backtest of the rule-based trend signals.
+
+Computes StockTrendAnalyzer's buy signal for every stock and every historical
+day in one vectorized pass (each day only sees bars up to that day), then
+scores the forward window of each signal with BacktestEngine semantics, using
+the signal text (e.g. "买入", "观望") as the operation advice.
+"""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any, Dict, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.core.backtest_engine import (
+    OVERALL_SENTINEL_CODE,
+    BacktestEngine,
+    BarArrays,
+    BatchCandidate,
+    EvaluationConfig,
+    SummaryAccumulator,
+)
+from src.stock_analyzer import BuySignal, StockTrendAnalyzer
+
+# Fields of BacktestResultLike; evaluation dicts without them (insufficient data) default to None
+_RESULT_FIELDS = (
+    "eval_status",
+    "position_recommendation",
+    "outcome",
+    "direction_correct",
+    "stock_return_pct",
+    "simulated_return_pct",
+    "hit_stop_loss",
+    "hit_take_profit",
+    "first_hit",
+    "first_hit_trading_days",
+    "operation_advice",
+)
+
+_REPORT_METRICS = (
+    "total_evaluations",
+    "completed_count",
+    "insufficient_count",
+    "win_rate_pct",
+    "direction_accuracy_pct",
+    "avg_stock_return_pct",
+    "avg_simulated_return_pct",
+)
+
+
+def backtest_signals(
+    frames: Mapping[str, pd.DataFrame],
+    *,
+    config: EvaluationConfig,
+    analyzer: Optional[StockTrendAnalyzer] = None,
+) -> Dict[str, Any]:
+    """Backtest the trend signals of every day in the given daily bars.
+
+    Args:
+        frames: code -> daily bars (date/high/low/close/volume), any order
+        config: forward window / neutral band used to score each signal
+        analyzer: analyzer whose rules are evaluated (default StockTrendAnalyzer())
+
+    Returns:
+        dict with signal counts and one metrics row per BuySignal plus overall
+    """
+    analyzer = analyzer or StockTrendAnalyzer()
+    bars: Dict[str, BarArrays] = {}
+    candidates: List[BatchCandidate] = []
+
+    for code, frame in frames.items():
+        signals = analyzer.generate_signal_series(frame)
+        if signals.empty:
+            continue
+        clean = frame.dropna(subset=["close"]).sort_values("date")
+        bars[code] = BarArrays(
+            dates=np.asarray(pd.to_datetime(clean["date"]).to_numpy(), dtype="datetime64[D]"),
+            high=clean["high"].to_numpy(dtype=float),
+            low=clean["low"].to_numpy(dtype=float),
+            close=clean["close"].to_numpy(dtype=float),
+        )
+        for day, signal in zip(pd.to_datetime(signals["date"]).dt.date, signals["buy_signal"]):
+            candidates.append(
+                BatchCandidate(
+                    key=len(candidates),
+                    code=code,
+                    operation_advice=signal,
+                    analysis_date=day,
+                    stop_loss=None,
+                    take_profit=None,
+                )
+            )
+
+    evaluations = BacktestEngine.evaluate_batch(candidates=candidates, bars=bars, config=config)
+
+    accumulators: Dict[str, SummaryAccumulator] = {OVERALL_SENTINEL_CODE: SummaryAccumulator()}
+    for cand, evaluation in zip(candidates, evaluations):
+        if evaluation is None:
+            continue
+        row = SimpleNamespace(**{name: evaluation.get(name) for name in _RESULT_FIELDS})
+        accumulators[OVERALL_SENTINEL_CODE].add(row)
+        accumulators.setdefault(cand.operation_advice, SummaryAccumulator()).add(row)
+
+    def metrics(key: str) -> Dict[str, Any]:
+        summary = accumulators.get(key, SummaryAccumulator()).to_summary(
+            scope="signal",
+            code=key,
+            eval_window_days=config.eval_window_days,
+            engine_version=config.engine_version,
+        )
+        return {name: summary[name] for name in _REPORT_METRICS}
+
+    return {
+        "codes": len(bars),
+        "signals": len(candidates),
+        "eval_window_days": config.eval_window_days,
+        "neutral_band_pct": config.neutral_band_pct,
+        "by_signal": [{"buy_signal": s.value, **metrics(s.value)} for s in BuySignal],
+        "overall": metrics(OVERALL_SENTINEL_CODE),
+    }
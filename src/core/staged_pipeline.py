@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+分阶段流水线执行器
+===================================
+
+职责：
+1. 将处理流程拆分为多个阶段，阶段之间通过有界队列连接（天然背压）
+2. 每个阶段独立配置工作线程数与限速（次/分钟）
+3. 统计每个阶段的处理量、失败数、耗时与队列深度
+"""
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, List
+
+from src.core.tracing import bind_context
+
+logger = logging.getLogger(__name__)
+
+# 队列结束标记
+_SENTINEL = object()
+
+
+class RateLimiter:
+    """
+    简单的匀速限流器（线程安全）
+
+    按 rate_per_minute 计算最小请求间隔，多个线程共享同一个限流器时依次排队取号。
+    rate_per_minute <= 0 表示不限速。
+    """
+
+    def __init__(self, rate_per_minute: float = 0.0):
+        self.min_interval = 60.0 / rate_per_minute if rate_per_minute and rate_per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        等待直到允许下一次请求
+
+        Returns:
+            实际等待的秒数
+        """
+        if self.min_interval <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        wait_seconds = slot - now
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+        return wait_seconds
+
+
+@dataclass
+class Stage:
+    """流水线阶段定义"""
+    name: str
+    handler: Callable[[Any], Any]  # 返回 None 表示该条目在本阶段结束，不再向下游传递
+    workers: int = 1
+    rate_per_minute: float = 0.0  # 0 表示不限速
+
+
+@dataclass
+class StageStats:
+    """阶段运行统计"""
+    name: str
+    workers: int
+    processed: int = 0
+    dropped: int = 0  # handler 返回 None
+    failed: int = 0  # handler 抛出异常
+    busy_seconds: float = 0.0
+    throttled_seconds: float = 0.0
+    max_queue_depth: int = 0
+    _depth_sum: int = field(default=0, repr=False)
+    _depth_samples: int = field(default=0, repr=False)
+
+    @property
+    def avg_queue_depth(self) -> float:
+        return self._depth_sum / self._depth_samples if self._depth_samples else 0.0
+
+    def record_depth(self, depth: int) -> None:
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+        self._depth_sum += depth
+        self._depth_samples += 1
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'workers': self.workers,
+            'processed': self.processed,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'throttled_seconds': round(self.throttled_seconds, 3),
+            'max_queue_depth': self.max_queue_depth,
+            'avg_queue_depth': round(self.avg_queue_depth, 2),
+        }
+
+
+class StagedPipelineRunner:
+    """
+    分阶段流水线执行器
+
+    每个阶段拥有独立的线程组与输入队列，上游处理完的条目放入下游队列；
+    队列有界，下游处理不过来时上游自动阻塞，避免积压。
+
+    使用示例:
+        runner = StagedPipelineRunner([
+            Stage("fetch", fetch, workers=2, rate_per_minute=60),
+            Stage("llm", analyze, workers=6),
+        ])
+        outputs = runner.run(items)
+        logger.info(runner.format_stats())
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 8):
+        if not stages:
+            raise ValueError("至少需要一个阶段")
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.stats: List[StageStats] = [StageStats(name=s.name, workers=max(1, s.workers)) for s in stages]
+        self._stats_lock = threading.Lock()
+
+    def run(self, items: Iterable[Any]) -> List[Any]:
+        """
+        执行流水线
+
+        Args:
+            items: 输入条目
+
+        Returns:
+            最后一个阶段输出的非 None 结果（按完成顺序）
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        limiters = [RateLimiter(stage.rate_per_minute) for stage in self.stages]
+        outputs: List[Any] = []
+        outputs_lock = threading.Lock()
+
+        def worker(index: int) -> None:
+            stage = self.stages[index]
+            stats = self.stats[index]
+            in_queue = queues[index]
+            is_last = index == len(self.stages) - 1
+            while True:
+                item = in_queue.get()
+                if item is _SENTINEL:
+                    break
+                throttled = limiters[index].acquire()
+                start = time.time()
+                try:
+                    out = stage.handler(item)
+                    failed = False
+                except Exception as e:
+                    logger.exception(f"[流水线:{stage.name}] 处理失败: {e}")
+                    out = None
+                    failed = True
+                elapsed = time.time() - start
+                with self._stats_lock:
+                    stats.busy_seconds += elapsed
+                    stats.throttled_seconds += throttled
+                    if failed:
+                        stats.failed += 1
+                    else:
+                        stats.processed += 1
+                        if out is None:
+                            stats.dropped += 1
+                if out is None:
+                    continue
+                if is_last:
+                    with outputs_lock:
+                        outputs.append(out)
+                else:
+                    self._put(queues, index + 1, out)
+
+        threads: List[List[threading.Thread]] = []
+        for index, stage in enumerate(self.stages):
+            group = [
+                threading.Thread(
+                    target=bind_context(worker),
+                    args=(index,),
+                    name=f"stage_{stage.name}_{n}",
+                    daemon=True,
+                )
+                for n in range(self.stats[index].workers)
+            ]
+            for t in group:
+                t.start()
+            threads.append(group)
+
+        for item in items:
+            self._put(queues, 0, item)
+
+        # 逐个阶段关闭：上游线程全部退出后，其输出已全部进入下游队列
+        for index, group in enumerate(threads):
+            for _ in group:
+                queues[index].put(_SENTINEL)
+            for t in group:
+                t.join()
+
+        return outputs
+
+    def _put(self, queues: List[queue.Queue], index: int, item: Any) -> None:
+        queues[index].put(item)
+        depth = queues[index].qsize()
+        with self._stats_lock:
+            self.stats[index].record_depth(depth)
+
+    def get_stats(self) -> List[dict]:
+        """获取各阶段统计"""
+        with self._stats_lock:
+            return [s.to_dict() for s in self.stats]
+
+    def format_stats(self) -> str:
+        """格式化各阶段统计，用于日志输出"""
+        lines = ["流水线阶段统计:"]
+        for s in self.get_stats():
+            lines.append(
+                f"  {s['name']:<8} 线程={s['workers']} 处理={s['processed']} 中止={s['dropped']} "
+                f"失败={s['failed']} 耗时={s['busy_seconds']:.1f}s 限速等待={s['throttled_seconds']:.1f}s "
+                f"队列深度(最大/平均)={s['max_queue_depth']}/{s['avg_queue_depth']:.1f}"
+            )
+        return "\n".join(lines)
+
@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+轻量级耗时追踪
+===================================
+
+职责：
+1. 以 span 记录各步骤耗时（阶段 / 数据源 / 股票），线程安全
+2. 汇总 p50/p95 等统计，生成运行性能报告（Markdown）
+3. 可选导出 JSON 追踪数据，便于离线分析
+
+约定：
+- 不带 source 的 span 为流程级步骤（如 fetch_and_save_stock_data、llm_analyze）
+- 带 source 的 span 为具体数据源/服务商的调用（如 daily_data/EfinanceFetcher、search_provider/Tavily）
+- 每次运行通过 tracing_run() 创建独立的追踪器（contextvar 作用域），并发运行互不干扰；
+  不在运行中时 trace_span / get_tracer() 不记录任何 span，长驻进程（API、机器人）不会累积
+- 运行中提交到线程池/新线程的任务需用 bind_context() 包装，才能记录到本次运行
+
+使用示例:
+    with tracing_run() as tracer:
+        with trace_span('get_realtime_quote', code='600519'):
+            quote = manager.get_realtime_quote('600519')
+
+        get_tracer().record('notify_channel', 0.8, source='wechat', ok=False)
+        executor.submit(bind_context(worker), item)
+        print(tracer.format_report())
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Span:
+    """单次调用的耗时记录"""
+    stage: str
+    duration: float
+    source: str = ''
+    code: str = ''
+    ok: bool = True
+    error: str = ''
+    parent: str = ''  # 同一线程内外层 span 的阶段名（为空表示顶层）
+    start: float = 0.0  # Unix 时间戳
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """线性插值百分位（sorted_values 须已升序）"""
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    pos = (len(sorted_values) - 1) * pct / 100.0
+    lower = int(pos)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (pos - lower)
+
+
+def _summarize(durations: List[float]) -> Dict[str, float]:
+    values = sorted(durations)
+    return {
+        'count': len(values),
+        'total': round(sum(values), 3),
+        'p50': round(_percentile(values, 50), 3),
+        'p95': round(_percentile(values, 95), 3),
+        'max': round(values[-1], 3) if values else 0.0,
+    }
+
+
+class Tracer:
+    """
+    耗时追踪器（线程安全）
+
+    每次运行由 tracing_run() 创建一个实例，运行结束后通过 format_report() / export_json() 输出。
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started_at = time.time()
+
+    def _stack(self) -> List[str]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, stage: str, source: str = '', code: str = '') -> Iterator[None]:
+        """记录一段代码的耗时；异常会标记为失败并继续抛出"""
+        if not self.enabled:
+            yield
+            return
+        stack = self._stack()
+        parent = stack[-1] if stack else ''
+        stack.append(stage)
+        start = time.time()
+        error = ''
+        try:
+            yield
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"[:200]
+            raise
+        finally:
+            stack.pop()
+            self._append(Span(
+                stage=stage,
+                duration=time.time() - start,
+                source=source,
+                code=code,
+                ok=not error,
+                error=error,
+                parent=parent,
+                start=start,
+            ))
+
+    def record(
+        self,
+        stage: str,
+        duration: float,
+        source: str = '',
+        code: str = '',
+        ok: bool = True,
+        error: str = '',
+    ) -> None:
+        """直接记录一次已完成调用的耗时（适用于不便包裹 with 的代码）"""
+        if not self.enabled:
+            return
+        stack = self._stack()
+        self._append(Span(
+            stage=stage,
+            duration=duration,
+            source=source,
+            code=code,
+            ok=ok,
+            error=error,
+            parent=stack[-1] if stack else '',
+            start=time.time() - duration,
+        ))
+
+    def _append(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def get_spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    # === 汇总 ===
+
+    def _group(self, key: Callable[[Span], Any], spans: List[Span]) -> Dict[Any, List[Span]]:
+        groups: Dict[Any, List[Span]] = {}
+        for s in spans:
+            groups.setdefault(key(s), []).append(s)
+        return groups
+
+    def summarize_by_stage(self) -> List[Dict[str, Any]]:
+        """流程级步骤统计（不含数据源级 span）"""
+        spans = [s for s in self.get_spans() if not s.source]
+        rows = []
+        for stage, items in self._group(lambda s: s.stage, spans).items():
+            row = {'stage': stage, **_summarize([s.duration for s in items])}
+            row['errors'] = sum(1 for s in items if not s.ok)
+            rows.append(row)
+        return sorted(rows, key=lambda r: r['total'], reverse=True)
+
+    def summarize_by_source(self) -> List[Dict[str, Any]]:
+        """数据源/服务商级统计"""
+        spans = [s for s in self.get_spans() if s.source]
+        rows = []
+        for (stage, source), items in self._group(lambda s: (s.stage, s.source), spans).items():
+            row = {'stage': stage, 'source': source, **_summarize([s.duration for s in items])}
+            row['errors'] = sum(1 for s in items if not s.ok)
+            rows.append(row)
+        return sorted(rows, key=lambda r: r['total'], reverse=True)
+
+    def summarize_by_stock(self) -> List[Dict[str, Any]]:
+        """
+        单股统计：累计耗时仅计顶层流程级 span，避免嵌套重复计算
+
+        slowest 为该股票耗时最长的流程级步骤
+        """
+        spans = [s for s in self.get_spans() if s.code and not s.source]
+        rows = []
+        for code, items in self._group(lambda s: s.code, spans).items():
+            per_stage: Dict[str, float] = {}
+            for s in items:
+                per_stage[s.stage] = per_stage.get(s.stage, 0.0) + s.duration
+            slowest_stage, slowest = max(per_stage.items(), key=lambda kv: kv[1])
+            rows.append({
+                'code': code,
+                'spans': len(items),
+                'total': round(sum(s.duration for s in items if not s.parent), 3),
+                'slowest_stage': slowest_stage,
+                'slowest': round(slowest, 3),
+                'errors': sum(1 for s in items if not s.ok),
+            })
+        return sorted(rows, key=lambda r: r['total'], reverse=True)
+
+    def format_report(self, title: str = '运行性能报告') -> str:
+        """生成 Markdown 性能报告"""
+        elapsed = time.time() - self._started_at
+        lines = [
+            f"# ⏱️ {title}",
+            "",
+            f"> 生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | "
+            f"运行时长: {elapsed:.1f}s | span 数: {len(self.get_spans())}",
+            "",
+            "## 按步骤",
+            "",
+            "| 步骤 | 次数 | 失败 | 累计(s) | p50(s) | p95(s) | 最大(s) |",
+            "|------|------|------|---------|--------|--------|---------|",
+        ]
+        for r in self.summarize_by_stage():
+            lines.append(
+                f"| {r['stage']} | {r['count']} | {r['errors']} | {r['total']:.2f} | "
+                f"{r['p50']:.2f} | {r['p95']:.2f} | {r['max']:.2f} |"
+            )
+        lines += [
+            "",
+            "## 按数据源",
+            "",
+            "| 调用 | 数据源 | 次数 | 失败 | 累计(s) | p50(s) | p95(s) | 最大(s) |",
+            "|------|--------|------|------|---------|--------|--------|---------|",
+        ]
+        for r in self.summarize_by_source():
+            lines.append(
+                f"| {r['stage']} | {r['source']} | {r['count']} | {r['errors']} | {r['total']:.2f} | "
+                f"{r['p50']:.2f} | {r['p95']:.2f} | {r['max']:.2f} |"
+            )
+        lines += [
+            "",
+            "## 按股票",
+            "",
+            "| 股票 | 累计(s) | 最慢步骤 | 最慢步骤耗时(s) | 失败 |",
+            "|------|---------|----------|-----------------|------|",
+        ]
+        for r in self.summarize_by_stock():
+            lines.append(
+                f"| {r['code']} | {r['total']:.2f} | {r['slowest_stage']} | {r['slowest']:.2f} | {r['errors']} |"
+            )
+        return "\n".join(lines) + "\n"
+
+    def format_summary(self, top: int = 5) -> str:
+        """单行摘要（用于日志）：耗时最多的步骤及其 p50/p95"""
+        parts = [
+            f"{r['stage']}(p50={r['p50']:.1f}s,p95={r['p95']:.1f}s)"
+            for r in self.summarize_by_stage()[:top]
+        ]
+        return "耗时分布: " + ", ".join(parts) if parts else "耗时分布: 无记录"
+
+    def export_json(self, path: str) -> str:
+        """导出全部 span 与汇总为 JSON 文件"""
+        payload = {
+            'generated_at': datetime.now().isoformat(),
+            'started_at': datetime.fromtimestamp(self._started_at).isoformat(),
+            'spans': [asdict(s) for s in self.get_spans()],
+            'by_stage': self.summarize_by_stage(),
+            'by_source': self.summarize_by_source(),
+            'by_stock': self.summarize_by_stock(),
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        return path
+
+
+# 当前运行的追踪器（由 tracing_run() 设置）
+_current_tracer: contextvars.ContextVar[Optional[Tracer]] = contextvars.ContextVar('current_tracer', default=None)
+
+# 不在运行中时使用：不记录任何 span
+_NOOP_TRACER = Tracer(enabled=False)
+
+
+def active_tracer() -> Optional[Tracer]:
+    """当前运行的追踪器；不在运行中时返回 None"""
+    return _current_tracer.get()
+
+
+def get_tracer() -> Tracer:
+    """获取当前运行的追踪器；不在运行中时返回不记录的空追踪器"""
+    tracer = _current_tracer.get()
+    return tracer if tracer is not None else _NOOP_TRACER
+
+
+@contextmanager
+def tracing_run(enabled: bool = True) -> Iterator[Tracer]:
+    """
+    为一次运行创建独立的追踪器，with 块内的 span 记录到该追踪器
+
+    已在运行中时沿用外层追踪器（如 main 层把个股分析与大盘复盘汇总到同一份报告），
+    报告由创建追踪器的一方输出
+    """
+    outer = _current_tracer.get()
+    if outer is not None:
+        yield outer
+        return
+    tracer = Tracer(enabled=enabled)
+    token = _current_tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current_tracer.reset(token)
+
+
+def bind_context(func: Callable) -> Callable:
+    """
+    将 func 绑定到当前上下文的副本，在线程池/新线程中执行时沿用当前运行的追踪器
+
+    每次提交任务时调用一次（同一个上下文副本不能被多个线程同时进入）
+    """
+    ctx = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return ctx.run(func, *args, **kwargs)
+    return wrapper
+
+
+def trace_span(stage: str, source: str = '', code: str = ''):
+    """当前运行追踪器的 span 快捷方式（不在运行中时不记录）"""
+    return get_tracer().span(stage, source=source, code=code)
+
+
+def traced(stage: str, source: str = '') -> Callable:
+    """装饰器：记录被装饰函数的耗时（调用时不在运行中则不记录）"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_tracer().span(stage, source=source):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+交易日历与交易时段
+===================================
+
+职责：
+1. 按市场（A 股 / 港股 / 美股）判断交易日、交易时段，推算最近一根日线的日期与下一次开盘时间
+2. 为数据获取提供精确的日线区间（按交易日回溯，而非按日历日估算）
+3. 休市期间将缓存有效期延长到下一次开盘（行情在此期间不会变化）
+
+说明：
+- 交易时段按交易所当地时区计算，与运行主机的时区无关
+- 节假日表内置当前覆盖年份的交易所休市日（不含周末），每年需随交易所公告更新；
+  未覆盖的年份仅按周末判断（每个市场每年首次遇到时记录一条警告），最坏情况下多发起一次请求，不影响正确性
+- 按交易日回溯取日线区间时额外留出余量，停牌或节假日表缺失时仍能取满所需根数
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from functools import cached_property
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple, Union
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+# 休市日（不含周末）
+_CN_HOLIDAYS = (
+    # 2025
+    '2025-01-01', '2025-01-28', '2025-01-29', '2025-01-30', '2025-01-31', '2025-02-03', '2025-02-04',
+    '2025-04-04', '2025-05-01', '2025-05-02', '2025-05-05', '2025-06-02',
+    '2025-10-01', '2025-10-02', '2025-10-03', '2025-10-06', '2025-10-07', '2025-10-08',
+    # 2026
+    '2026-01-01', '2026-01-02', '2026-02-16', '2026-02-17', '2026-02-18', '2026-02-19', '2026-02-20',
+    '2026-02-23', '2026-04-06', '2026-05-01', '2026-05-04', '2026-05-05', '2026-06-19', '2026-09-25',
+    '2026-10-01', '2026-10-02', '2026-10-05', '2026-10-06', '2026-10-07',
+)
+
+_HK_HOLIDAYS = (
+    # 2025
+    '2025-01-01', '2025-01-29', '2025-01-30', '2025-01-31', '2025-04-04', '2025-04-18', '2025-04-21',
+    '2025-05-01', '2025-05-05', '2025-07-01', '2025-10-01', '2025-10-07', '2025-10-29',
+    '2025-12-25', '2025-12-26',
+    # 2026
+    '2026-01-01', '2026-02-17', '2026-02-18', '2026-02-19', '2026-04-03', '2026-04-06', '2026-04-07',
+    '2026-05-01', '2026-05-25', '2026-06-19', '2026-07-01', '2026-10-01', '2026-10-19', '2026-12-25',
+)
+
+_US_HOLIDAYS = (
+    # 2025
+    '2025-01-01', '2025-01-09', '2025-01-20', '2025-02-17', '2025-04-18', '2025-05-26', '2025-06-19',
+    '2025-07-04', '2025-09-01', '2025-11-27', '2025-12-25',
+    # 2026
+    '2026-01-01', '2026-01-19', '2026-02-16', '2026-04-03', '2026-05-25', '2026-06-19', '2026-07-03',
+    '2026-09-07', '2026-11-26', '2026-12-25',
+)
+
+# 推算前后交易日时最多跨越的自然日（防止节假日表异常导致死循环）
+_MAX_SCAN_DAYS = 30
+
+# 获取日线时在所需根数之外多回溯的交易日：按比例留出余量，至少 _FETCH_PADDING_MIN 根
+_FETCH_PADDING_RATIO = 0.2
+_FETCH_PADDING_MIN = 5
+
+# 已警告过节假日表未覆盖的 (市场, 年份)
+_warned_years: Set[Tuple[str, int]] = set()
+_warned_lock = threading.Lock()
+
+TimeLike = Union[None, float, int, datetime]
+
+
+def _parse_holidays(values: Iterable[str]) -> FrozenSet[date]:
+    return frozenset(date.fromisoformat(v) for v in values)
+
+
+@dataclass(frozen=True)
+class TradingCalendar:
+    """单个市场的交易日历"""
+
+    market: str  # "cn" | "hk" | "us"
+    timezone: str  # 交易所时区
+    sessions: Tuple[Tuple[time, time], ...]  # 交易时段（开盘, 收盘），按时间排序
+    holidays: FrozenSet[date]
+
+    def _to_local(self, now: TimeLike = None) -> datetime:
+        """将时间戳 / datetime（无时区视为主机本地时间）转换为交易所当地时间"""
+        tz = ZoneInfo(self.timezone)
+        if now is None:
+            return datetime.now(tz)
+        if isinstance(now, (int, float)):
+            return datetime.fromtimestamp(now, tz)
+        return now.astimezone(tz)
+
+    @cached_property
+    def covered_years(self) -> FrozenSet[int]:
+        """节假日表覆盖的年份"""
+        return frozenset(day.year for day in self.holidays)
+
+    def is_trading_day(self, day: date) -> bool:
+        """是否为交易日（节假日表未覆盖的年份仅按周末判断）"""
+        if day.year not in self.covered_years:
+            self._warn_uncovered(day.year)
+        return day.weekday() < 5 and day not in self.holidays
+
+    def _warn_uncovered(self, year: int) -> None:
+        """节假日表未覆盖该年份时记录一次警告"""
+        key = (self.market, year)
+        if key in _warned_years:
+            return
+        with _warned_lock:
+            if key in _warned_years:
+                return
+            _warned_years.add(key)
+        logger.warning(
+            f"[交易日历] {self.market} 节假日表未覆盖 {year} 年，该年仅按周末判断交易日，请更新 trading_calendar.py"
+        )
+
+    def previous_trading_day(self, day: date) -> date:
+        """day 之前（不含当天）的最近一个交易日"""
+        for offset in range(1, _MAX_SCAN_DAYS + 1):
+            candidate = day - timedelta(days=offset)
+            if self.is_trading_day(candidate):
+                return candidate
+        return day - timedelta(days=1)
+
+    def next_trading_day(self, day: date) -> date:
+        """day 之后（不含当天）的最近一个交易日"""
+        for offset in range(1, _MAX_SCAN_DAYS + 1):
+            candidate = day + timedelta(days=offset)
+            if self.is_trading_day(candidate):
+                return candidate
+        return day + timedelta(days=1)
+
+    def latest_bar_date(self, now: TimeLike = None) -> date:
+        """
+        当前可获取到的最新日线日期
+
+        交易日开盘后为当天，否则（开盘前、周末、节假日）为上一个交易日。
+        """
+        local = self._to_local(now)
+        today = local.date()
+        if self.is_trading_day(today) and local.time() >= self.sessions[0][0]:
+            return today
+        return self.previous_trading_day(today)
+
+    def latest_settled_bar_date(self, now: TimeLike = None) -> date:
+        """
+        最近一根已定型（收盘后不再变化）的日线日期
+
+        交易日收盘后为当天，否则为上一个交易日；交易时段内当天的日线仍在变化，不计入。
+        """
+        local = self._to_local(now)
+        today = local.date()
+        if self.is_trading_day(today) and local.time() >= self.sessions[-1][1]:
+            return today
+        return self.previous_trading_day(today)
+
+    def bars_start_date(self, end: date, bars: int) -> date:
+        """以 end（非交易日时取之前最近的交易日）为最后一根，回溯 bars 根日线的起始日期"""
+        day = end if self.is_trading_day(end) else self.previous_trading_day(end)
+        for _ in range(max(1, bars) - 1):
+            day = self.previous_trading_day(day)
+        return day
+
+    def fetch_start_date(self, end: date, bars: int) -> date:
+        """
+        获取 bars 根日线时请求的起始日期
+
+        在 bars_start_date 的基础上多回溯一定余量，停牌或节假日表缺失时仍能取满 bars 根
+        """
+        padding = max(_FETCH_PADDING_MIN, int(bars * _FETCH_PADDING_RATIO))
+        return self.bars_start_date(end, max(1, bars) + padding)
+
+    def is_open(self, now: TimeLike = None) -> bool:
+        """当前是否处于交易时段（午间休市视为休市）"""
+        local = self._to_local(now)
+        if not self.is_trading_day(local.date()):
+            return False
+        current = local.time()
+        return any(start <= current < end for start, end in self.sessions)
+
+    def next_open(self, now: TimeLike = None) -> datetime:
+        """下一次开盘时间（交易所当地时间；处于交易时段内时返回下一个时段的开盘）"""
+        local = self._to_local(now)
+        tz = local.tzinfo
+        today = local.date()
+        if self.is_trading_day(today):
+            for start, _ in self.sessions:
+                if local.time() < start:
+                    return datetime.combine(today, start, tzinfo=tz)
+        return datetime.combine(self.next_trading_day(today), self.sessions[0][0], tzinfo=tz)
+
+    def next_close(self, now: TimeLike = None) -> datetime:
+        """下一次（当日最后一个时段的）收盘时间；当日已收盘或休市时为下一个交易日的收盘"""
+        local = self._to_local(now)
+        tz = local.tzinfo
+        today = local.date()
+        close = self.sessions[-1][1]
+        if self.is_trading_day(today) and local.time() < close:
+            return datetime.combine(today, close, tzinfo=tz)
+        return datetime.combine(self.next_trading_day(today), close, tzinfo=tz)
+
+    def next_after_close(self, offset_minutes: int, now: TimeLike = None) -> datetime:
+        """
+        下一个“交易日收盘 + offset_minutes”的时间点（晚于 now）
+
+        Args:
+            offset_minutes: 相对收盘的分钟数（负数表示收盘前）
+            now: 当前时间（默认当前时间）
+        """
+        local = self._to_local(now)
+        offset = timedelta(minutes=offset_minutes)
+        return self.next_close(local - offset) + offset
+
+    def cache_ttl(self, base_ttl: int, now: TimeLike = None) -> int:
+        """
+        行情缓存有效期：交易时段内使用 base_ttl，休市期间延长到下一次开盘
+
+        Args:
+            base_ttl: 交易时段内的有效期（秒）
+            now: 写入缓存的时间（默认当前时间）
+        """
+        if self.is_open(now):
+            return base_ttl
+        local = self._to_local(now)
+        return max(base_ttl, int((self.next_open(local) - local).total_seconds()))
+
+
+CN_CALENDAR = TradingCalendar(
+    market="cn",
+    timezone="Asia/Shanghai",
+    sessions=((time(9, 30), time(11, 30)), (time(13, 0), time(15, 0))),
+    holidays=_parse_holidays(_CN_HOLIDAYS),
+)
+
+HK_CALENDAR = TradingCalendar(
+    market="hk",
+    timezone="Asia/Hong_Kong",
+    sessions=((time(9, 30), time(12, 0)), (time(13, 0), time(16, 0))),
+    holidays=_parse_holidays(_HK_HOLIDAYS),
+)
+
+US_CALENDAR = TradingCalendar(
+    market="us",
+    timezone="America/New_York",
+    sessions=((time(9, 30), time(16, 0)),),
+    holidays=_parse_holidays(_US_HOLIDAYS),
+)
+
+
+def get_calendar(market: str) -> TradingCalendar:
+    """根据市场返回对应的交易日历（未知市场按 A 股处理）"""
+    if market == "us":
+        return US_CALENDAR
+    if market == "hk":
+        return HK_CALENDAR
+    return CN_CALENDAR
+
+
+def get_market_for_code(stock_code: str) -> str:
+    """
+    根据股票代码判断所属市场
+
+    Returns:
+        "us"（美股及美股指数）、"hk"（5 位数字或 hk 前缀）或 "cn"
+    """
+    # 延迟导入：data_provider 在模块加载时依赖本模块
+    from data_provider.us_index_mapping import is_us_index_code, is_us_stock_code
+
+    code = (stock_code or '').strip()
+    if is_us_index_code(code) or is_us_stock_code(code):
+        return "us"
+    lowered = code.lower()
+    if lowered.startswith('hk'):
+        lowered = lowered[2:]
+        if lowered.isdigit() and 1 <= len(lowered) <= 5:
+            return "hk"
+    elif lowered.isdigit() and len(lowered) == 5:
+        return "hk"
+    return "cn"
+
+
+def get_calendar_for_code(stock_code: str) -> TradingCalendar:
+    """根据股票代码返回其所属市场的交易日历"""
+    return get_calendar(get_market_for_code(stock_code))
+
+
+def split_by_market(stock_codes: Iterable[str]) -> Dict[str, List[str]]:
+    """按所属市场拆分股票列表（保持原有顺序）"""
+    groups: Dict[str, List[str]] = {}
+    for code in stock_codes:
+        groups.setdefault(get_market_for_code(code), []).append(code)
+    return groups
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+盘前缓存预热
+===================================
+
+职责：
+1. 在正式运行前（定时任务提前 WARMUP_LEAD_MINUTES 分钟，或 --warmup 单独执行）预取上游数据：
+   日线（写入数据库）、全量实时行情快照、筹码分布、股票名称/行业目录、低波动情报维度的搜索结果
+2. 行情与搜索分两个阶段并发执行，分别沿用 PIPELINE_DATA_RPM / PIPELINE_SEARCH_RPM 限速预算
+3. 正式运行开始前输出缓存就绪报告
+
+缓存层级：
+- 日线（stock_daily 表）与搜索结果（SEARCH_CACHE_PERSIST 开启时的 search_cache 表）持久化，跨进程可用
+- 实时行情快照、筹码分布、名称/行业目录为进程内缓存，仅在同一进程内（定时任务模式）对正式运行生效
+"""
+
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+from data_provider import DataFetcherManager
+from src.analyzer import STOCK_NAME_MAP
+from src.config import Config, get_config
+from src.core.staged_pipeline import Stage, StagedPipelineRunner
+from src.core.trading_calendar import get_calendar_for_code
+
+logger = logging.getLogger(__name__)
+
+# 参与预热的情报维度最短缓存有效期（秒）：新闻类维度时效性强，留给正式运行实时搜索
+LOW_VOLATILITY_MIN_TTL = 3600
+
+
+@dataclass
+class WarmupStats:
+    """预热结果统计"""
+    stocks: int = 0
+    bars: int = 0  # 日线已就绪（含已存在的）
+    realtime: int = 0
+    chips: int = 0
+    names: int = 0
+    intel_dimensions: int = 0  # 实际搜索并写入缓存的维度数
+    failed: int = 0
+    elapsed: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class _WarmItem:
+    """预热条目：行情阶段解析出的名称传给搜索阶段"""
+    code: str
+    stock_name: str = ''
+
+
+def _resolve_stock_name(code: str, quote: Any) -> str:
+    """与正式运行一致的名称解析：实时行情名称 > 名称目录 > 占位名（决定搜索缓存键）"""
+    if quote is not None and getattr(quote, 'name', None):
+        return quote.name
+    return STOCK_NAME_MAP.get(code) or f'股票{code}'
+
+
+def warm_caches(pipeline, stock_codes: List[str]) -> WarmupStats:
+    """
+    预热正式运行会用到的各级缓存
+
+    Args:
+        pipeline: StockAnalysisPipeline（复用其数据源管理器、数据库与搜索服务）
+        stock_codes: 股票代码列表
+
+    Returns:
+        WarmupStats
+    """
+    from src.core.pipeline import INTEL_MAX_SEARCHES
+
+    config = pipeline.config
+    fetcher_manager = pipeline.fetcher_manager
+    search_service = pipeline.search_service
+    stats = WarmupStats(stocks=len(stock_codes))
+    stats_lock = threading.Lock()
+    start_time = time.time()
+
+    # 1. 名称 / 行业目录：优先走批量接口，一次填充整个自选股列表
+    try:
+        names = fetcher_manager.batch_get_stock_names(stock_codes)
+        for code, name in names.items():
+            STOCK_NAME_MAP.setdefault(code, name)
+        stats.names = len(names)
+    except Exception as e:
+        logger.warning(f"[缓存预热] 股票名称目录获取失败: {e}")
+
+    search_enabled = search_service.is_available
+    if search_enabled and len(stock_codes) > 1 and getattr(config, 'search_sector_sharing', False):
+        try:
+            stock_sectors = fetcher_manager.batch_get_stock_industries(stock_codes)
+            if stock_sectors:
+                search_service.set_stock_sectors(stock_sectors)
+        except Exception as e:
+            logger.warning(f"[缓存预热] 所属行业获取失败: {e}")
+
+    # 2. 全量实时行情快照（efinance / 东财为一次拉取全市场，后续单股查询直接命中）
+    fetcher_manager.prefetch_realtime_quotes(stock_codes)
+
+    # 3. 行情阶段（日线 + 实时行情 + 筹码）与搜索阶段并发执行，各自沿用限速预算
+    def warm_market_data(item: _WarmItem) -> Optional[_WarmItem]:
+        code = item.code
+        success, error = pipeline.fetch_and_save_stock_data(code)
+        quote = None
+        chip = None
+        try:
+            quote = fetcher_manager.get_realtime_quote(code)
+        except Exception as e:
+            logger.debug(f"[缓存预热] {code} 实时行情获取失败: {e}")
+        try:
+            chip = fetcher_manager.get_chip_distribution(code)
+        except Exception as e:
+            logger.debug(f"[缓存预热] {code} 筹码分布获取失败: {e}")
+        with stats_lock:
+            stats.bars += int(success)
+            stats.realtime += int(quote is not None)
+            stats.chips += int(chip is not None)
+            stats.failed += int(not success)
+        if not success:
+            logger.warning(f"[缓存预热] {code} 日线预取失败: {error}")
+        item.stock_name = _resolve_stock_name(code, quote)
+        return item if search_enabled else None
+
+    def warm_intel(item: _WarmItem) -> _WarmItem:
+        warmed = search_service.warm_intel_cache(
+            item.code,
+            item.stock_name,
+            max_searches=INTEL_MAX_SEARCHES,
+            min_ttl=LOW_VOLATILITY_MIN_TTL,
+        )
+        with stats_lock:
+            stats.intel_dimensions += warmed
+        return item
+
+    stages = [
+        Stage('warm_data', warm_market_data, workers=pipeline.max_workers, rate_per_minute=config.pipeline_data_rpm),
+    ]
+    if search_enabled:
+        stages.append(
+            Stage('warm_search', warm_intel, workers=config.pipeline_search_workers,
+                  rate_per_minute=config.pipeline_search_rpm)
+        )
+    runner = StagedPipelineRunner(stages, queue_size=config.pipeline_queue_size)
+    runner.run(_WarmItem(code=code) for code in stock_codes)
+    logger.info(runner.format_stats())
+
+    stats.elapsed = round(time.time() - start_time, 2)
+    logger.info(
+        f"[缓存预热] 完成: {stats.stocks} 只股票，日线 {stats.bars}，实时行情 {stats.realtime}，"
+        f"筹码 {stats.chips}，名称 {stats.names}，情报维度 {stats.intel_dimensions}，耗时 {stats.elapsed:.1f}s"
+    )
+    return stats
+
+
+def check_cache_readiness(pipeline, stock_codes: List[str]) -> Dict[str, Any]:
+    """
+    检查正式运行将用到的缓存是否就绪（不触发任何网络请求）
+
+    Returns:
+        {'stocks': [每只股票的就绪情况], 'realtime_snapshot': 全量快照状态, 'chip_enabled', 'search_enabled'}
+    """
+    from src.core.pipeline import INTEL_MAX_SEARCHES
+
+    config = pipeline.config
+    search_service = pipeline.search_service
+    search_enabled = search_service.is_available
+
+    if search_enabled and getattr(config, 'search_sector_sharing', False):
+        # 行业维度的查询取决于行业目录，使用已缓存的行业保证与正式运行一致
+        search_service.set_stock_sectors(pipeline.fetcher_manager.get_cached_industries(stock_codes))
+
+    rows = []
+    for code in stock_codes:
+        name = STOCK_NAME_MAP.get(code) or pipeline.fetcher_manager.get_cached_name(code)
+        row = {
+            'code': code,
+            'name': bool(name),
+            'bars': pipeline.db.has_today_data(code, get_calendar_for_code(code).latest_bar_date()),
+            'chip': DataFetcherManager.has_cached_chip(code),
+            'intel_cached': 0,
+            'intel_total': 0,
+        }
+        if search_enabled:
+            row['intel_cached'], row['intel_total'] = search_service.count_cached_intel(
+                code,
+                name or f'股票{code}',
+                max_searches=INTEL_MAX_SEARCHES,
+                min_ttl=LOW_VOLATILITY_MIN_TTL,
+            )
+        rows.append(row)
+
+    return {
+        'stocks': rows,
+        'realtime_snapshot': DataFetcherManager.get_realtime_cache_status(),
+        'chip_enabled': config.enable_chip_distribution,
+        'search_enabled': search_enabled,
+    }
+
+
+def format_readiness_report(readiness: Dict[str, Any]) -> str:
+    """将就绪情况格式化为多行日志文本"""
+    rows = readiness['stocks']
+    total = len(rows)
+    parts = [
+        f"日线 {sum(r['bars'] for r in rows)}/{total}",
+        f"名称 {sum(r['name'] for r in rows)}/{total}",
+    ]
+    if readiness['chip_enabled']:
+        parts.append(f"筹码 {sum(r['chip'] for r in rows)}/{total}")
+    if readiness['search_enabled']:
+        parts.append(
+            f"低波动情报 {sum(r['intel_cached'] for r in rows)}/{sum(r['intel_total'] for r in rows)} 维度"
+        )
+
+    snapshots = []
+    for source, status in readiness['realtime_snapshot'].items():
+        if status['age'] is None:
+            snapshots.append(f"{source} 未填充")
+        else:
+            mark = '✓' if status['fresh'] else '已过期'
+            snapshots.append(f"{source} {status['age']}s/{status['ttl']}s {mark}")
+
+    lines = [
+        f"===== 缓存就绪报告（{total} 只股票）=====",
+        " | ".join(parts),
+        "实时行情快照: " + ", ".join(snapshots),
+    ]
+    missing = []
+    for r in rows:
+        gaps = []
+        if not r['bars']:
+            gaps.append('日线')
+        if readiness['chip_enabled'] and not r['chip']:
+            gaps.append('筹码')
+        if r['intel_cached'] < r['intel_total']:
+            gaps.append(f"情报{r['intel_cached']}/{r['intel_total']}")
+        if gaps:
+            missing.append(f"{r['code']}({','.join(gaps)})")
+    if missing:
+        lines.append("未命中: " + ", ".join(missing))
+    return "\n".join(lines)
+
+
+def log_cache_readiness(pipeline, stock_codes: Optional[List[str]] = None) -> Dict[str, Any]:
+    """检查并输出缓存就绪报告（正式运行开始前调用）"""
+    if stock_codes is None:
+        pipeline.config.refresh_stock_list()
+        stock_codes = pipeline.config.stock_list
+    readiness = check_cache_readiness(pipeline, stock_codes or [])
+    logger.info(format_readiness_report(readiness))
+    return readiness
+
+
+def run_warmup(config: Optional[Config] = None, stock_codes: Optional[List[str]] = None) -> WarmupStats:
+    """
+    执行一次缓存预热（--warmup 模式与定时任务预热钩子的入口）
+
+    Args:
+        config: 配置对象（可选，默认使用全局配置）
+        stock_codes: 股票代码列表（可选，默认使用配置中的自选股）
+
+    Returns:
+        WarmupStats
+    """
+    from src.core.pipeline import StockAnalysisPipeline
+
+    config = config or get_config()
+    if stock_codes is None:
+        config.refresh_stock_list()
+        stock_codes = config.stock_list
+    if not stock_codes:
+        logger.error("未配置自选股列表，请在 .env 文件中设置 STOCK_LIST")
+        return WarmupStats()
+
+    logger.info(f"===== 开始缓存预热: {len(stock_codes)} 只股票 =====")
+    pipeline = StockAnalysisPipeline(config=config, query_source="system")
+    stats = warm_caches(pipeline, stock_codes)
+    log_cache_readiness(pipeline, stock_codes)
+    return stats
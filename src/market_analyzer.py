@@ -12,6 +12,7 @@
 
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional, Dict, Any, List
@@ -21,6 +22,7 @@ import pandas as pd
 from src.config import get_config
 from src.search_service import SearchService
 from src.core.market_profile import get_profile, MarketProfile
+from src.core.tracing import bind_context
 from data_provider.base import DataFetcherManager
 
 logger = logging.getLogger(__name__)
@@ -686,11 +688,12 @@ Output the report content directly, no extra commentary.
         """
         logger.info("========== 开始大盘复盘分析 ==========")
         
-        # 1. 获取市场概览
-        overview = self.get_market_overview()
-        
-        # 2. 搜索市场新闻
-        news = self.search_market_news()
+        # 1-2. 市场概览（指数/涨跌统计/板块）与市场新闻互不依赖，并发获取
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="market_review") as executor:
+            overview_future = executor.submit(bind_context(self.get_market_overview))
+            news_future = executor.submit(bind_context(self.search_market_news))
+            overview = overview_future.result()
+            news = news_future.result()
         
         # 3. 生成复盘报告
         report = self.generate_market_review(overview, news)
@@ -40,6 +40,7 @@ except ImportError:
 
 from src.config import get_config
 from src.analyzer import AnalysisResult
+from src.core.tracing import get_tracer
 from src.formatters import format_feishu_markdown, markdown_to_html_document
 from bot.models import BotMessage
 
@@ -930,6 +931,32 @@ class NotificationService:
                     "",
                 ])
         
+        # 截止时间降级说明：列出为按时推送而跳过可选步骤的股票
+        degraded_results = [r for r in sorted_results if getattr(r, 'degraded', None)]
+        if degraded_results:
+            report_lines.extend([
+                "### ⏱️ 降级说明",
+                "",
+                "为在截止时间前完成推送，以下股票跳过了部分可选步骤：",
+                "",
+            ])
+            for r in degraded_results:
+                report_lines.append(f"- {self._escape_md(r.name)}({r.code})：跳过{'、'.join(r.degraded)}")
+            report_lines.append("")
+
+        # 分析复用说明：输入与上次分析相比无实质变化，沿用上次结论
+        reused_results = [r for r in sorted_results if getattr(r, 'reused', False)]
+        if reused_results:
+            report_lines.extend([
+                "### ♻️ 复用说明",
+                "",
+                "以下股票行情、筹码与新闻较上次分析无实质变化，沿用上次分析结论：",
+                "",
+            ])
+            for r in reused_results:
+                report_lines.append(f"- {self._escape_md(r.name)}({r.code})")
+            report_lines.append("")
+
         # 底部（去除免责声明）
         report_lines.extend([
             "",
@@ -3252,6 +3279,7 @@ class NotificationService:
         for channel in self._available_channels:
             channel_name = ChannelDetector.get_channel_name(channel)
             use_image = self._should_use_image_for_channel(channel, image_bytes)
+            start_time = time.time()
             try:
                 if channel == NotificationChannel.WECHAT:
                     if use_image:
@@ -3302,10 +3330,14 @@ class NotificationService:
                     success_count += 1
                 else:
                     fail_count += 1
+                get_tracer().record('notify_channel', time.time() - start_time, source=channel.value, ok=bool(result))
 
             except Exception as e:
                 logger.error(f"{channel_name} 发送失败: {e}")
                 fail_count += 1
+                get_tracer().record(
+                    'notify_channel', time.time() - start_time, source=channel.value, ok=False, error=str(e)[:200]
+                )
 
         logger.info(f"通知发送完成：成功 {success_count} 个，失败 {fail_count} 个")
         return success_count > 0 or context_success
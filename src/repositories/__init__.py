@@ -9,11 +9,23 @@
 """
 
 from src.repositories.analysis_repo import AnalysisRepository
+from src.repositories.backfill_repo import BackfillRepository
 from src.repositories.backtest_repo import BacktestRepository
+from src.repositories.fingerprint_repo import AnalysisFingerprintRepository
+from src.repositories.lease_repo import AnalysisLeaseRepository
+from src.repositories.run_repo import AnalysisRunRepository
+from src.repositories.search_cache_repo import SearchCacheRepository
 from src.repositories.stock_repo import StockRepository
+from src.repositories.url_content_repo import UrlContentRepository
 
 __all__ = [
+    "AnalysisFingerprintRepository",
+    "AnalysisLeaseRepository",
     "AnalysisRepository",
+    "AnalysisRunRepository",
+    "BackfillRepository",
     "BacktestRepository",
+    "SearchCacheRepository",
     "StockRepository",
+    "UrlContentRepository",
 ]
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+历史日线回填检查点数据访问层
+===================================
+
+职责：
+1. 记录每只股票在回填区间上的完成情况（done/failed）
+2. 查询已完成的股票，支持中断后续跑
+"""
+
+import logging
+from datetime import date, datetime
+from typing import Iterable, Optional, Set
+
+from sqlalchemy import and_, select
+
+from src.storage import BackfillCheckpoint, DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+
+class BackfillRepository:
+    """
+    历史日线回填检查点数据访问层
+
+    封装 BackfillCheckpoint 表的数据库操作
+    """
+
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    # IN 查询每批的股票数
+    _CODES_PER_QUERY = 500
+
+    def __init__(self, db_manager: Optional[DatabaseManager] = None):
+        """
+        初始化数据访问层
+
+        Args:
+            db_manager: 数据库管理器（可选，默认使用单例）
+        """
+        self.db = db_manager or DatabaseManager.get_instance()
+
+    def get_done_codes(self, codes: Iterable[str], start: date, end: date) -> Set[str]:
+        """
+        获取 [start, end] 已回填完成的股票（检查点区间覆盖请求区间即视为完成）
+
+        Args:
+            codes: 待检查的股票代码
+            start: 回填起始日期
+            end: 回填结束日期
+        """
+        codes = list(dict.fromkeys(codes))
+        done: Set[str] = set()
+        with self.db.get_session() as session:
+            for i in range(0, len(codes), self._CODES_PER_QUERY):
+                rows = session.execute(
+                    select(BackfillCheckpoint.code).where(and_(
+                        BackfillCheckpoint.code.in_(codes[i:i + self._CODES_PER_QUERY]),
+                        BackfillCheckpoint.status == self.STATUS_DONE,
+                        BackfillCheckpoint.start_date <= start,
+                        BackfillCheckpoint.end_date >= end,
+                    ))
+                ).scalars().all()
+                done.update(rows)
+        return done
+
+    def save_checkpoint(
+        self,
+        code: str,
+        start: date,
+        end: date,
+        status: str,
+        bars: int = 0,
+        data_source: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """
+        记录股票在 [start, end] 上的回填结果
+
+        Args:
+            code: 股票代码
+            start: 回填起始日期
+            end: 回填结束日期
+            status: done/failed
+            bars: 写入的日线条数
+            data_source: 成功获取数据的数据源
+            error: 失败原因（status=failed 时）
+        """
+        with self.db.get_session() as session:
+            try:
+                row = session.execute(
+                    select(BackfillCheckpoint).where(and_(
+                        BackfillCheckpoint.code == code,
+                        BackfillCheckpoint.start_date == start,
+                        BackfillCheckpoint.end_date == end,
+                    ))
+                ).scalar_one_or_none()
+                if row is None:
+                    row = BackfillCheckpoint(code=code, start_date=start, end_date=end)
+                    session.add(row)
+                row.status = status
+                row.bars = bars
+                row.data_source = data_source
+                row.error = error[:500] if error else None
+                row.updated_at = datetime.now()
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.warning(f"[{code}] 保存回填检查点失败: {e}")
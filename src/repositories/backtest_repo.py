@@ -8,19 +8,41 @@ from __future__ import annotations
 
 import json
 import logging
+import threading
 from datetime import date, datetime, timedelta
-from typing import List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
-from sqlalchemy import and_, delete, desc, func, select
+from sqlalchemy import and_, delete, desc, exists, func, select, text
+from sqlalchemy.orm import Session
 
-from src.storage import BacktestResult, BacktestSummary, DatabaseManager, AnalysisHistory
+from src.storage import BacktestResult, BacktestSummary, BacktestSummaryState, DatabaseManager, AnalysisHistory
 
 logger = logging.getLogger(__name__)
 
+# Summary merge: (stored state or None, reader of the scope's rows) -> (new state, summary row)
+SummaryMerge = Callable[
+    [Optional[Dict[str, Any]], Callable[[], Iterator[BacktestResult]]],
+    Tuple[Dict[str, Any], BacktestSummary],
+]
+
+# AnalysisHistory columns read when evaluating a candidate
+_CANDIDATE_COLUMNS = (
+    AnalysisHistory.id,
+    AnalysisHistory.code,
+    AnalysisHistory.operation_advice,
+    AnalysisHistory.stop_loss,
+    AnalysisHistory.take_profit,
+    AnalysisHistory.context_snapshot,
+    AnalysisHistory.created_at,
+)
+
 
 class BacktestRepository:
     """DB access layer for backtesting."""
 
+    # Serializes summary-state read-merge-write (and the result saves feeding it) within the process
+    summary_lock = threading.RLock()
+
     def __init__(self, db_manager: Optional[DatabaseManager] = None):
         self.db = db_manager or DatabaseManager.get_instance()
 
@@ -33,8 +55,15 @@ class BacktestRepository:
         eval_window_days: int,
         engine_version: str,
         force: bool,
-    ) -> List[AnalysisHistory]:
-        """Return AnalysisHistory rows eligible for backtest."""
+    ) -> List[Any]:
+        """Return analyses eligible for backtest as lightweight rows.
+
+        Rows carry only the AnalysisHistory columns the backtest reads
+        (_CANDIDATE_COLUMNS), accessed by attribute like the ORM object.
+        Already evaluated analyses are excluded with a correlated NOT EXISTS
+        that probes the (analysis_history_id, eval_window_days, engine_version)
+        unique index instead of materializing every result id.
+        """
         cutoff_dt = datetime.now() - timedelta(days=min_age_days)
 
         with self.db.get_session() as session:
@@ -42,20 +71,23 @@ class BacktestRepository:
             if code:
                 conditions.append(AnalysisHistory.code == code)
 
-            query = select(AnalysisHistory).where(and_(*conditions))
-
             if not force:
-                existing_ids = select(BacktestResult.analysis_history_id).where(
+                evaluated = select(BacktestResult.id).where(
                     and_(
+                        BacktestResult.analysis_history_id == AnalysisHistory.id,
                         BacktestResult.eval_window_days == eval_window_days,
                         BacktestResult.engine_version == engine_version,
                     )
                 )
-                query = query.where(AnalysisHistory.id.not_in(existing_ids))
+                conditions.append(~exists(evaluated))
 
-            query = query.order_by(desc(AnalysisHistory.created_at)).limit(limit)
-            rows = session.execute(query).scalars().all()
-            return list(rows)
+            query = (
+                select(*_CANDIDATE_COLUMNS)
+                .where(and_(*conditions))
+                .order_by(desc(AnalysisHistory.created_at))
+                .limit(limit)
+            )
+            return list(session.execute(query).all())
 
     def save_result(self, result: BacktestResult) -> None:
         with self.db.get_session() as session:
@@ -68,23 +100,75 @@ class BacktestRepository:
 
         with self.db.get_session() as session:
             try:
+                if replace_existing:
+                    self._delete_replaced_results(session, results)
+
+                session.add_all(results)
+                session.commit()
+                return len(results)
+            except Exception as exc:
+                session.rollback()
+                logger.error(f"批量保存回测结果失败: {exc}")
+                raise
+
+    def save_results_with_summaries(
+        self,
+        results: List[BacktestResult],
+        *,
+        replace_existing: bool,
+        eval_window_days: int,
+        engine_version: str,
+        summary_merges: Callable[[List[BacktestResult]], Dict[Tuple[str, str], SummaryMerge]],
+    ) -> int:
+        """Save results and merge them into their summary states in one transaction.
+
+        ``summary_merges`` receives the stored rows this save replaces and returns one
+        merge per (scope, code). Each merge receives the stored state (None if never
+        built) and a reader of the scope's rows, this save included, and returns the new
+        state plus its summary row. The replaced-row read, the save and every merge share
+        one transaction, serialized in-process by ``summary_lock`` and across processes
+        by ``BEGIN IMMEDIATE`` on SQLite, so concurrent writers never make the
+        subtracted rows stale or lose each other's deltas.
+        """
+        if not results:
+            return 0
+
+        with self.summary_lock, self.db.get_session() as session:
+            try:
+                if session.get_bind().dialect.name == "sqlite":
+                    session.execute(text("BEGIN IMMEDIATE"))
+                replaced: List[BacktestResult] = []
                 if replace_existing:
                     analysis_ids = sorted({r.analysis_history_id for r in results if r.analysis_history_id is not None})
-                    key_pairs = sorted({(r.eval_window_days, r.engine_version) for r in results})
-
-                    if analysis_ids and key_pairs:
-                        for window_days, engine_version in key_pairs:
-                            session.execute(
-                                delete(BacktestResult).where(
-                                    and_(
-                                        BacktestResult.analysis_history_id.in_(analysis_ids),
-                                        BacktestResult.eval_window_days == window_days,
-                                        BacktestResult.engine_version == engine_version,
-                                    )
-                                )
+                    if analysis_ids:
+                        replaced = list(session.execute(
+                            self._results_query(eval_window_days, engine_version).where(
+                                BacktestResult.analysis_history_id.in_(analysis_ids)
                             )
+                        ).scalars().all())
+                merges = summary_merges(replaced)
 
+                if replace_existing:
+                    self._delete_replaced_results(session, results)
                 session.add_all(results)
+                session.flush()
+
+                for (scope, code), merge in merges.items():
+                    row = session.execute(
+                        self._summary_state_query(scope, code, eval_window_days, engine_version)
+                    ).scalar_one_or_none()
+
+                    def scope_rows(row_code: Optional[str] = None if scope == "overall" else code):
+                        return iter(session.execute(
+                            self._results_query(eval_window_days, engine_version, row_code)
+                        ).scalars())
+
+                    state, summary = merge(self._load_state(row), scope_rows)
+                    self._write_summary_state(
+                        session, row, scope=scope, code=code, eval_window_days=eval_window_days,
+                        engine_version=engine_version, state=state,
+                    )
+                    self._write_summary(session, summary)
                 session.commit()
                 return len(results)
             except Exception as exc:
@@ -92,6 +176,57 @@ class BacktestRepository:
                 logger.error(f"批量保存回测结果失败: {exc}")
                 raise
 
+    @staticmethod
+    def _delete_replaced_results(session: Session, results: List[BacktestResult]) -> None:
+        analysis_ids = sorted({r.analysis_history_id for r in results if r.analysis_history_id is not None})
+        key_pairs = sorted({(r.eval_window_days, r.engine_version) for r in results})
+
+        if analysis_ids and key_pairs:
+            for window_days, engine_version in key_pairs:
+                session.execute(
+                    delete(BacktestResult).where(
+                        and_(
+                            BacktestResult.analysis_history_id.in_(analysis_ids),
+                            BacktestResult.eval_window_days == window_days,
+                            BacktestResult.engine_version == engine_version,
+                        )
+                    )
+                )
+
+    @staticmethod
+    def _results_query(eval_window_days: int, engine_version: str, code: Optional[str] = None):
+        conditions = [
+            BacktestResult.eval_window_days == eval_window_days,
+            BacktestResult.engine_version == engine_version,
+        ]
+        if code is not None:
+            conditions.append(BacktestResult.code == code)
+        return select(BacktestResult).where(and_(*conditions))
+
+    def iter_results(
+        self,
+        *,
+        eval_window_days: int,
+        engine_version: str,
+        code: Optional[str] = None,
+        chunk_size: int = 1000,
+    ) -> Iterator[BacktestResult]:
+        """Stream all results of a window/engine (optionally one code) in chunks."""
+        with self.db.get_session() as session:
+            stream = session.execute(
+                self._results_query(eval_window_days, engine_version, code).execution_options(yield_per=chunk_size)
+            ).scalars()
+            for row in stream:
+                yield row
+
+    def get_result_keys(self) -> List[Tuple[int, str]]:
+        """Return distinct (eval_window_days, engine_version) pairs that have results."""
+        with self.db.get_session() as session:
+            rows = session.execute(
+                select(BacktestResult.eval_window_days, BacktestResult.engine_version).distinct()
+            ).all()
+            return [(int(r[0]), str(r[1])) for r in rows]
+
     def get_results_paginated(
         self,
         *,
@@ -126,47 +261,131 @@ class BacktestRepository:
     def upsert_summary(self, summary: BacktestSummary) -> None:
         """Insert or replace summary row by unique key."""
         with self.db.get_session() as session:
-            existing = session.execute(
-                select(BacktestSummary)
-                .where(
-                    and_(
-                        BacktestSummary.scope == summary.scope,
-                        BacktestSummary.code == summary.code,
-                        BacktestSummary.eval_window_days == summary.eval_window_days,
-                        BacktestSummary.engine_version == summary.engine_version,
-                    )
-                )
-                .limit(1)
-            ).scalar_one_or_none()
+            self._write_summary(session, summary)
+            session.commit()
 
-            if existing:
-                for attr in (
-                    "computed_at",
-                    "total_evaluations",
-                    "completed_count",
-                    "insufficient_count",
-                    "long_count",
-                    "cash_count",
-                    "win_count",
-                    "loss_count",
-                    "neutral_count",
-                    "direction_accuracy_pct",
-                    "win_rate_pct",
-                    "neutral_rate_pct",
-                    "avg_stock_return_pct",
-                    "avg_simulated_return_pct",
-                    "stop_loss_trigger_rate",
-                    "take_profit_trigger_rate",
-                    "ambiguous_rate",
-                    "avg_days_to_first_hit",
-                    "advice_breakdown_json",
-                    "diagnostics_json",
-                ):
-                    setattr(existing, attr, getattr(summary, attr))
-                session.commit()
-                return
+    @staticmethod
+    def _write_summary(session: Session, summary: BacktestSummary) -> None:
+        existing = session.execute(
+            select(BacktestSummary)
+            .where(
+                and_(
+                    BacktestSummary.scope == summary.scope,
+                    BacktestSummary.code == summary.code,
+                    BacktestSummary.eval_window_days == summary.eval_window_days,
+                    BacktestSummary.engine_version == summary.engine_version,
+                )
+            )
+            .limit(1)
+        ).scalar_one_or_none()
 
+        if existing is None:
             session.add(summary)
+            return
+        for attr in (
+            "computed_at",
+            "total_evaluations",
+            "completed_count",
+            "insufficient_count",
+            "long_count",
+            "cash_count",
+            "win_count",
+            "loss_count",
+            "neutral_count",
+            "direction_accuracy_pct",
+            "win_rate_pct",
+            "neutral_rate_pct",
+            "avg_stock_return_pct",
+            "avg_simulated_return_pct",
+            "stop_loss_trigger_rate",
+            "take_profit_trigger_rate",
+            "ambiguous_rate",
+            "avg_days_to_first_hit",
+            "advice_breakdown_json",
+            "diagnostics_json",
+        ):
+            setattr(existing, attr, getattr(summary, attr))
+
+    @staticmethod
+    def _summary_state_query(scope: str, code: Optional[str], eval_window_days: int, engine_version: str):
+        return select(BacktestSummaryState).where(
+            and_(
+                BacktestSummaryState.scope == scope,
+                BacktestSummaryState.code == code,
+                BacktestSummaryState.eval_window_days == eval_window_days,
+                BacktestSummaryState.engine_version == engine_version,
+            )
+        )
+
+    @staticmethod
+    def _load_state(row: Optional[BacktestSummaryState]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        try:
+            return json.loads(row.state_json)
+        except Exception:
+            logger.warning(f"回测汇总状态损坏，将重新构建: {row.scope}/{row.code}")
+            return None
+
+    @staticmethod
+    def _write_summary_state(
+        session: Session,
+        row: Optional[BacktestSummaryState],
+        *,
+        scope: str,
+        code: Optional[str],
+        eval_window_days: int,
+        engine_version: str,
+        state: Dict[str, Any],
+    ) -> None:
+        state_json = json.dumps(state, ensure_ascii=False, sort_keys=True)
+        if row is not None:
+            row.state_json = state_json
+            row.updated_at = datetime.now()
+            return
+        session.add(
+            BacktestSummaryState(
+                scope=scope,
+                code=code,
+                eval_window_days=eval_window_days,
+                engine_version=engine_version,
+                state_json=state_json,
+            )
+        )
+
+    def get_summary_state(
+        self,
+        *,
+        scope: str,
+        code: Optional[str],
+        eval_window_days: int,
+        engine_version: str,
+    ) -> Optional[Dict[str, Any]]:
+        """Return the stored summary accumulator state, or None if never built."""
+        with self.db.get_session() as session:
+            row = session.execute(
+                self._summary_state_query(scope, code, eval_window_days, engine_version)
+            ).scalar_one_or_none()
+            return self._load_state(row)
+
+    def upsert_summary_state(
+        self,
+        *,
+        scope: str,
+        code: Optional[str],
+        eval_window_days: int,
+        engine_version: str,
+        state: Dict[str, Any],
+    ) -> None:
+        """Insert or replace the summary accumulator state by unique key."""
+        with self.db.get_session() as session:
+            row = session.execute(
+                self._summary_state_query(scope, code, eval_window_days, engine_version)
+            ).scalar_one_or_none()
+            self._write_summary_state(
+                session, row, scope=scope, code=code, eval_window_days=eval_window_days,
+                engine_version=engine_version, state=state,
+            )
             session.commit()
 
     def get_summary(
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+分析输入指纹数据访问层
+===================================
+
+职责：
+1. 保存每次分析的输入指纹
+2. 查询股票最近一次分析的指纹，用于判断输入是否发生实质变化
+"""
+
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import and_, delete, select
+
+from src.storage import AnalysisFingerprint, DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisFingerprintRepository:
+    """
+    分析输入指纹数据访问层
+
+    封装 AnalysisFingerprint 表的数据库操作
+    """
+
+    def __init__(self, db_manager: Optional[DatabaseManager] = None):
+        """
+        初始化数据访问层
+
+        Args:
+            db_manager: 数据库管理器（可选，默认使用单例）
+        """
+        self.db = db_manager or DatabaseManager.get_instance()
+
+    @staticmethod
+    def make_digest(features: Dict[str, Any]) -> str:
+        """特征的规范化 SHA1"""
+        payload = json.dumps(features, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def save(self, code: str, query_id: str, features: Dict[str, Any]) -> None:
+        """
+        保存指纹（同一股票只保留最近一条）
+
+        Args:
+            code: 股票代码
+            query_id: 对应分析历史的 query_id
+            features: 指纹特征
+        """
+        with self.db.get_session() as session:
+            session.execute(delete(AnalysisFingerprint).where(AnalysisFingerprint.code == code))
+            session.add(AnalysisFingerprint(
+                code=code,
+                query_id=query_id,
+                digest=self.make_digest(features),
+                features=json.dumps(features, ensure_ascii=False, default=str),
+                created_at=datetime.now(),
+            ))
+            session.commit()
+
+    def get_latest(self, code: str, max_age_hours: float = 24) -> Optional[AnalysisFingerprint]:
+        """
+        获取股票最近一次分析的指纹
+
+        Args:
+            code: 股票代码
+            max_age_hours: 最长有效时间（小时），更早的指纹不返回
+
+        Returns:
+            AnalysisFingerprint 或 None
+        """
+        cutoff = datetime.now() - timedelta(hours=max_age_hours)
+        with self.db.get_session() as session:
+            return session.execute(
+                select(AnalysisFingerprint)
+                .where(and_(AnalysisFingerprint.code == code, AnalysisFingerprint.created_at >= cutoff))
+                .order_by(AnalysisFingerprint.created_at.desc())
+                .limit(1)
+            ).scalar_one_or_none()
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+分片租约数据访问层
+===================================
+
+职责：
+1. 登记分片运行的待分析股票
+2. 以条件更新实现原子领取（多进程/多主机共享数据库）
+3. 记录完成状态，统计未完成数量
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import and_, func, or_, select, update
+
+from src.storage import AnalysisLease, DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisLeaseRepository:
+    """
+    分片租约数据访问层
+
+    封装 AnalysisLease 表的数据库操作
+    """
+
+    STATUS_PENDING = 'pending'
+    STATUS_LEASED = 'leased'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    def __init__(self, db_manager: Optional[DatabaseManager] = None):
+        """
+        初始化数据访问层
+
+        Args:
+            db_manager: 数据库管理器（可选，默认使用单例）
+        """
+        self.db = db_manager or DatabaseManager.get_instance()
+
+    def register(self, run_id: str, stock_codes: List[str]) -> int:
+        """
+        登记待分析股票（已登记的跳过）
+
+        Returns:
+            新登记数量
+        """
+        now = datetime.now()
+        with self.db.get_session() as session:
+            existing = set(session.execute(
+                select(AnalysisLease.code).where(AnalysisLease.run_id == run_id)
+            ).scalars().all())
+            new_codes = [c for c in dict.fromkeys(stock_codes) if c not in existing]
+            for code in new_codes:
+                session.add(AnalysisLease(
+                    run_id=run_id,
+                    code=code,
+                    status=self.STATUS_PENDING,
+                    attempts=0,
+                    updated_at=now,
+                ))
+            session.commit()
+            return len(new_codes)
+
+    @classmethod
+    def _claimable(cls, now: datetime, max_attempts: int):
+        return and_(
+            AnalysisLease.attempts < max_attempts,
+            or_(
+                AnalysisLease.status == cls.STATUS_PENDING,
+                and_(AnalysisLease.status == cls.STATUS_LEASED, AnalysisLease.lease_until < now),
+            ),
+        )
+
+    def claim(
+        self,
+        run_id: str,
+        owner: str,
+        limit: int = 1,
+        lease_seconds: int = 600,
+        max_attempts: int = 3,
+    ) -> List[str]:
+        """
+        领取最多 limit 只股票（含租约已过期的股票）
+
+        每只股票通过带条件的 UPDATE 领取，rowcount 为 1 才算领取成功，
+        多个进程并发领取时不会重复。
+
+        Args:
+            run_id: 运行 ID
+            owner: 领取者标识（主机名:进程号）
+            limit: 最多领取数量
+            lease_seconds: 租约时长（秒），超时未完成可被其他分片接管
+            max_attempts: 单只股票最多领取次数（防止反复失败的股票无限重试）
+
+        Returns:
+            领取到的股票代码列表
+        """
+        now = datetime.now()
+        claimed: List[str] = []
+        with self.db.get_session() as session:
+            candidates = session.execute(
+                select(AnalysisLease.id, AnalysisLease.code)
+                .where(and_(AnalysisLease.run_id == run_id, self._claimable(now, max_attempts)))
+                .order_by(AnalysisLease.id)
+                .limit(max(1, limit) * 2)
+            ).all()
+            for row_id, code in candidates:
+                if len(claimed) >= limit:
+                    break
+                try:
+                    result = session.execute(
+                        update(AnalysisLease)
+                        .where(and_(AnalysisLease.id == row_id, self._claimable(now, max_attempts)))
+                        .values(
+                            status=self.STATUS_LEASED,
+                            owner=owner,
+                            lease_until=now + timedelta(seconds=lease_seconds),
+                            attempts=AnalysisLease.attempts + 1,
+                            updated_at=now,
+                        )
+                    )
+                    session.commit()
+                except Exception as e:
+                    session.rollback()
+                    logger.warning(f"[{code}] 领取租约失败: {e}")
+                    continue
+                if result.rowcount == 1:
+                    claimed.append(code)
+        return claimed
+
+    def complete(self, run_id: str, code: str, owner: str, success: bool = True) -> bool:
+        """
+        标记股票完成（仅租约持有者可标记）
+
+        Returns:
+            是否更新成功（租约已被他人接管时返回 False）
+        """
+        with self.db.get_session() as session:
+            result = session.execute(
+                update(AnalysisLease)
+                .where(and_(
+                    AnalysisLease.run_id == run_id,
+                    AnalysisLease.code == code,
+                    AnalysisLease.owner == owner,
+                ))
+                .values(
+                    status=self.STATUS_DONE if success else self.STATUS_FAILED,
+                    lease_until=None,
+                    updated_at=datetime.now(),
+                )
+            )
+            session.commit()
+            return result.rowcount == 1
+
+    def count_outstanding(self, run_id: str, max_attempts: int = 3) -> int:
+        """统计尚未完成的股票数（待领取或租约中；重试次数耗尽且租约过期的不计入）"""
+        now = datetime.now()
+        with self.db.get_session() as session:
+            return int(session.execute(
+                select(func.count(AnalysisLease.id)).where(and_(
+                    AnalysisLease.run_id == run_id,
+                    or_(
+                        self._claimable(now, max_attempts),
+                        and_(AnalysisLease.status == self.STATUS_LEASED, AnalysisLease.lease_until >= now),
+                    ),
+                ))
+            ).scalar() or 0)
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+分析运行检查点数据访问层
+===================================
+
+职责：
+1. 记录批量分析运行（run_id）及其股票列表
+2. 记录每只股票的阶段完成情况，支持中断后续跑
+"""
+
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from src.storage import AnalysisRun, AnalysisRunStock, DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisRunRepository:
+    """
+    分析运行检查点数据访问层
+
+    封装 AnalysisRun / AnalysisRunStock 表的数据库操作
+    """
+
+    # 阶段顺序
+    STAGE_PENDING = 'pending'
+    STAGE_SEARCH = 'search'
+    STAGE_DONE = 'done'
+
+    # 运行状态
+    RUN_RUNNING = 'running'
+    RUN_COMPLETED = 'completed'
+    RUN_INCOMPLETE = 'incomplete'  # 有股票未完成（失败或被中断），可续跑
+
+    # 状态为 running 但超过该时长没有任何进度（进程被强制终止）时视为已中断，可被续跑认领
+    STALE_AFTER = timedelta(minutes=30)
+
+    def __init__(self, db_manager: Optional[DatabaseManager] = None):
+        """
+        初始化数据访问层
+
+        Args:
+            db_manager: 数据库管理器（可选，默认使用单例）
+        """
+        self.db = db_manager or DatabaseManager.get_instance()
+
+    def start_run(self, run_id: str, stock_codes: List[str], query_source: str = "") -> Optional[AnalysisRun]:
+        """
+        创建或认领一次运行（已存在时保留原股票列表，状态置为 running）
+
+        认领使用条件更新：同一运行仍在进行中（状态为 running 且未超过 STALE_AFTER 无进度）时
+        认领失败，避免同一运行被两个进程同时续跑
+
+        Args:
+            run_id: 运行 ID
+            stock_codes: 股票代码列表
+            query_source: 触发来源
+
+        Returns:
+            AnalysisRun；运行正在由其他进程执行时返回 None
+        """
+        now = datetime.now()
+        with self.db.get_session() as session:
+            created = session.execute(
+                sqlite_insert(AnalysisRun).values(
+                    run_id=run_id,
+                    query_source=query_source,
+                    stock_codes=json.dumps(list(stock_codes), ensure_ascii=False),
+                    status=self.RUN_RUNNING,
+                    created_at=now,
+                    updated_at=now,
+                ).on_conflict_do_nothing(index_elements=['run_id'])
+            ).rowcount
+            if not created:
+                claimed = session.execute(
+                    update(AnalysisRun)
+                    .where(and_(
+                        AnalysisRun.run_id == run_id,
+                        or_(
+                            AnalysisRun.status != self.RUN_RUNNING,
+                            AnalysisRun.updated_at < now - self.STALE_AFTER,
+                        ),
+                    ))
+                    .values(status=self.RUN_RUNNING, updated_at=now, finished_at=None)
+                ).rowcount
+                if not claimed:
+                    session.rollback()
+                    return None
+            session.commit()
+            run = session.execute(
+                select(AnalysisRun).where(AnalysisRun.run_id == run_id)
+            ).scalar_one()
+            session.expunge(run)
+            return run
+
+    def get_run(self, run_id: str) -> Optional[AnalysisRun]:
+        """按 run_id 获取运行记录"""
+        with self.db.get_session() as session:
+            run = session.execute(
+                select(AnalysisRun).where(AnalysisRun.run_id == run_id)
+            ).scalar_one_or_none()
+            if run is not None:
+                session.expunge(run)
+            return run
+
+    def is_active(self, run: AnalysisRun) -> bool:
+        """运行是否仍在进行中（状态为 running 且最近有进度）"""
+        return run.status == self.RUN_RUNNING and (
+            run.updated_at is None or run.updated_at >= datetime.now() - self.STALE_AFTER
+        )
+
+    def finish_run(self, run_id: str, status: str = RUN_COMPLETED) -> None:
+        """标记运行结束（completed：全部股票完成；incomplete：有股票未完成，可续跑）"""
+        now = datetime.now()
+        with self.db.get_session() as session:
+            run = session.execute(
+                select(AnalysisRun).where(AnalysisRun.run_id == run_id)
+            ).scalar_one_or_none()
+            if run is None:
+                return
+            run.status = status
+            run.updated_at = now
+            run.finished_at = now
+            session.commit()
+
+    def get_checkpoints(self, run_id: str) -> Dict[str, AnalysisRunStock]:
+        """
+        获取运行中各股票的检查点
+
+        Returns:
+            {股票代码: AnalysisRunStock}
+        """
+        with self.db.get_session() as session:
+            rows = session.execute(
+                select(AnalysisRunStock).where(AnalysisRunStock.run_id == run_id)
+            ).scalars().all()
+            for row in rows:
+                session.expunge(row)
+            return {row.code: row for row in rows}
+
+    def save_checkpoint(
+        self,
+        run_id: str,
+        code: str,
+        stage: str,
+        query_id: Optional[str] = None,
+        news_context: Optional[str] = None,
+    ) -> None:
+        """
+        记录股票的阶段完成情况
+
+        Args:
+            run_id: 运行 ID
+            code: 股票代码
+            stage: 已完成的阶段（search/done）
+            query_id: 该股票分析记录的 query_id
+            news_context: 情报搜索结果（stage=search 时保存，续跑时复用）
+        """
+        with self.db.get_session() as session:
+            try:
+                row = session.execute(
+                    select(AnalysisRunStock).where(
+                        and_(AnalysisRunStock.run_id == run_id, AnalysisRunStock.code == code)
+                    )
+                ).scalar_one_or_none()
+                if row is None:
+                    row = AnalysisRunStock(run_id=run_id, code=code)
+                    session.add(row)
+                row.stage = stage
+                if query_id:
+                    row.query_id = query_id
+                if news_context is not None:
+                    row.news_context = news_context
+                row.updated_at = datetime.now()
+                # 同时刷新运行的更新时间，作为仍在进行中的心跳
+                session.execute(
+                    update(AnalysisRun).where(AnalysisRun.run_id == run_id).values(updated_at=row.updated_at)
+                )
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.warning(f"[{code}] 保存运行检查点失败: {e}")
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+搜索缓存数据访问层
+===================================
+
+职责：
+1. 封装 search_cache 表的读写
+2. 提供过期清理与 LRU 淘汰
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, select
+
+from src.storage import DatabaseManager, SearchCacheEntry
+
+logger = logging.getLogger(__name__)
+
+
+class SearchCacheRepository:
+    """
+    搜索缓存数据访问层
+
+    封装 SearchCacheEntry 表的数据库操作
+    """
+
+    def __init__(self, db_manager: Optional[DatabaseManager] = None):
+        """
+        初始化数据访问层
+
+        Args:
+            db_manager: 数据库管理器（可选，默认使用单例）
+        """
+        self.db = db_manager or DatabaseManager.get_instance()
+
+    def get(self, cache_key: str) -> Optional[SearchCacheEntry]:
+        """
+        读取未过期的缓存条目，命中时更新访问时间与命中次数
+
+        Args:
+            cache_key: 缓存键
+
+        Returns:
+            SearchCacheEntry 或 None（不存在或已过期）
+        """
+        now = datetime.now()
+        with self.db.get_session() as session:
+            row = session.execute(
+                select(SearchCacheEntry).where(SearchCacheEntry.cache_key == cache_key)
+            ).scalar_one_or_none()
+            if row is None:
+                return None
+            if row.expires_at <= now:
+                session.delete(row)
+                session.commit()
+                return None
+            row.last_accessed_at = now
+            row.hit_count = (row.hit_count or 0) + 1
+            session.commit()
+            session.refresh(row)
+            session.expunge(row)
+            return row
+
+    def put(
+        self,
+        cache_key: str,
+        payload: str,
+        ttl_seconds: int,
+        dimension: Optional[str] = None,
+        query: Optional[str] = None,
+    ) -> None:
+        """
+        写入或覆盖缓存条目
+
+        Args:
+            cache_key: 缓存键
+            payload: 序列化后的搜索结果
+            ttl_seconds: 有效期（秒）
+            dimension: 搜索维度
+            query: 原始查询（截断到 255 字符）
+        """
+        now = datetime.now()
+        expires_at = now + timedelta(seconds=ttl_seconds)
+        with self.db.get_session() as session:
+            try:
+                row = session.execute(
+                    select(SearchCacheEntry).where(SearchCacheEntry.cache_key == cache_key)
+                ).scalar_one_or_none()
+                if row is None:
+                    row = SearchCacheEntry(cache_key=cache_key, hit_count=0, created_at=now)
+                    session.add(row)
+                row.dimension = dimension
+                row.query = (query or '')[:255]
+                row.payload = payload
+                row.expires_at = expires_at
+                row.last_accessed_at = now
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.warning(f"写入搜索缓存失败: {e}")
+
+    def evict(self, max_entries: int) -> int:
+        """
+        删除过期条目，并按最近访问时间淘汰超出上限的条目（LRU）
+
+        Args:
+            max_entries: 保留的最大条目数
+
+        Returns:
+            删除的条目数
+        """
+        now = datetime.now()
+        with self.db.get_session() as session:
+            try:
+                removed = session.execute(
+                    delete(SearchCacheEntry).where(SearchCacheEntry.expires_at <= now)
+                ).rowcount or 0
+
+                total = session.execute(select(func.count(SearchCacheEntry.id))).scalar() or 0
+                excess = total - max_entries
+                if excess > 0:
+                    lru_ids = select(SearchCacheEntry.id).order_by(
+                        SearchCacheEntry.last_accessed_at.asc()
+                    ).limit(excess)
+                    removed += session.execute(
+                        delete(SearchCacheEntry).where(SearchCacheEntry.id.in_(lru_ids))
+                    ).rowcount or 0
+                session.commit()
+                return removed
+            except Exception as e:
+                session.rollback()
+                logger.warning(f"清理搜索缓存失败: {e}")
+                return 0
@@ -11,15 +11,20 @@
 
 import logging
 from datetime import date
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Mapping, Tuple
 
+import numpy as np
 import pandas as pd
-from sqlalchemy import and_, desc, select
+from sqlalchemy import Date, and_, desc, func, literal, select, union_all
+from sqlalchemy.orm import aliased
 
 from src.storage import DatabaseManager, StockDaily
 
 logger = logging.getLogger(__name__)
 
+# 单条面板查询最多携带的股票数（每只股票一个 UNION ALL 分支，SQLite 默认上限 500）
+_PANEL_CODES_PER_QUERY = 400
+
 
 class StockRepository:
     """
@@ -138,6 +143,30 @@ class StockRepository:
             logger.error(f"获取分析上下文失败: {e}")
             return None
 
+    def get_codes(self) -> List[str]:
+        """Return every code that has daily bars stored."""
+        with self.db.get_session() as session:
+            rows = session.execute(select(StockDaily.code).distinct().order_by(StockDaily.code)).scalars().all()
+            return list(rows)
+
+    def get_ohlcv_frame(
+        self,
+        *,
+        code: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> pd.DataFrame:
+        """Return date/open/high/low/close/volume bars of one code as a DataFrame, ascending by date."""
+        columns = [StockDaily.date, StockDaily.open, StockDaily.high, StockDaily.low, StockDaily.close, StockDaily.volume]
+        conditions = [StockDaily.code == code]
+        if start_date is not None:
+            conditions.append(StockDaily.date >= start_date)
+        if end_date is not None:
+            conditions.append(StockDaily.date <= end_date)
+        with self.db.get_session() as session:
+            rows = session.execute(select(*columns).where(and_(*conditions)).order_by(StockDaily.date)).all()
+        return pd.DataFrame(rows, columns=["date", "open", "high", "low", "close", "volume"])
+
     def get_start_daily(self, *, code: str, analysis_date: date) -> Optional[StockDaily]:
         """Return StockDaily for analysis_date (preferred) or nearest previous date."""
         with self.db.get_session() as session:
@@ -149,6 +178,81 @@ class StockRepository:
             ).scalar_one_or_none()
             return row
 
+    def get_bar_panel(
+        self, *, ranges: Mapping[str, Tuple[date, date]], forward_bars: int = 0
+    ) -> Dict[str, np.ndarray]:
+        """Load bars of many codes at once as columns (code/date/high/low/close).
+
+        ranges maps each code to (since, until), usually its earliest and latest
+        analysis date. Rows start at the start bar of since (that date or the
+        nearest previous stored date, as get_start_daily picks) and end at the
+        forward_bars-th stored bar after until, so the forward window of every
+        analysis up to until is complete; when fewer bars are stored, rows run to
+        the latest one. The (code, since, until) triples are joined as a UNION ALL
+        derived table, so each chunk of codes is one indexed query; rows come
+        back sorted by (code, date) without ORM objects.
+        """
+        items = sorted(ranges.items())
+        codes: List[str] = []
+        dates: List[date] = []
+        prices: List[Any] = []
+        for offset in range(0, len(items), _PANEL_CODES_PER_QUERY):
+            bounds = union_all(*(
+                select(
+                    literal(code).label("code"),
+                    literal(since, Date).label("since"),
+                    literal(until, Date).label("until"),
+                )
+                for code, (since, until) in items[offset:offset + _PANEL_CODES_PER_QUERY]
+            )).subquery("bar_ranges")
+            prior = aliased(StockDaily)
+            start_date = (
+                select(func.max(prior.date))
+                .where(and_(prior.code == bounds.c.code, prior.date <= bounds.c.since))
+                .correlate(bounds)
+                .scalar_subquery()
+            )
+            if forward_bars > 0:
+                later = aliased(StockDaily)
+                window_end = (
+                    select(later.date)
+                    .where(and_(later.code == bounds.c.code, later.date > bounds.c.until))
+                    .order_by(later.date)
+                    .offset(forward_bars - 1)
+                    .limit(1)
+                    .correlate(bounds)
+                    .scalar_subquery()
+                )
+                end_date = func.coalesce(window_end, literal(date.max, Date))
+            else:
+                end_date = bounds.c.until
+            query = (
+                select(StockDaily.code, StockDaily.date, StockDaily.high, StockDaily.low, StockDaily.close)
+                .join(
+                    bounds,
+                    and_(
+                        StockDaily.code == bounds.c.code,
+                        StockDaily.date >= func.coalesce(start_date, bounds.c.since),
+                        StockDaily.date <= end_date,
+                    ),
+                )
+                .order_by(StockDaily.code, StockDaily.date)
+            )
+            with self.db.get_session() as session:
+                for code, day, high, low, close in session.execute(query):
+                    codes.append(code)
+                    dates.append(day)
+                    prices.append((high, low, close))
+
+        price_matrix = np.array(prices, dtype=np.float64).reshape(-1, 3)
+        return {
+            "code": np.array(codes, dtype=object),
+            "date": np.array(dates, dtype="datetime64[D]"),
+            "high": price_matrix[:, 0],
+            "low": price_matrix[:, 1],
+            "close": price_matrix[:, 2],
+        }
+
     def get_forward_bars(self, *, code: str, analysis_date: date, eval_window_days: int) -> List[StockDaily]:
         """Return forward daily bars after analysis_date, up to eval_window_days."""
         with self.db.get_session() as session:
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+网页正文缓存数据访问层
+===================================
+
+职责：
+1. 封装 url_content 表的读写
+2. 保存 ETag / Last-Modified 供条件请求使用
+"""
+
+import logging
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select
+
+from src.storage import DatabaseManager, UrlContent
+
+logger = logging.getLogger(__name__)
+
+
+class UrlContentRepository:
+    """
+    网页正文缓存数据访问层
+
+    封装 UrlContent 表的数据库操作
+    """
+
+    def __init__(self, db_manager: Optional[DatabaseManager] = None):
+        """
+        初始化数据访问层
+
+        Args:
+            db_manager: 数据库管理器（可选，默认使用单例）
+        """
+        self.db = db_manager or DatabaseManager.get_instance()
+
+    def get(self, url: str) -> Optional[UrlContent]:
+        """
+        按 URL 读取缓存的正文
+
+        Args:
+            url: 网页 URL
+
+        Returns:
+            UrlContent 或 None
+        """
+        with self.db.get_session() as session:
+            row = session.execute(
+                select(UrlContent).where(UrlContent.url == url)
+            ).scalar_one_or_none()
+            if row is not None:
+                session.expunge(row)
+            return row
+
+    def save(
+        self,
+        url: str,
+        content: Optional[str] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        refreshed: bool = True,
+    ) -> None:
+        """
+        写入或更新正文缓存
+
+        Args:
+            url: 网页 URL
+            content: 正文（refreshed=False 时忽略）
+            etag: 响应头 ETag
+            last_modified: 响应头 Last-Modified
+            refreshed: True 表示重新下载了正文；False 表示条件请求返回 304，仅更新校验时间
+        """
+        now = datetime.now()
+        with self.db.get_session() as session:
+            try:
+                row = session.execute(
+                    select(UrlContent).where(UrlContent.url == url)
+                ).scalar_one_or_none()
+                if row is None:
+                    row = UrlContent(url=url)
+                    session.add(row)
+                if refreshed:
+                    row.content = content
+                    row.fetched_at = now
+                if etag:
+                    row.etag = etag
+                if last_modified:
+                    row.last_modified = last_modified
+                row.checked_at = now
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.warning(f"保存网页正文缓存失败: {e}")
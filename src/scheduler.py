@@ -7,7 +7,9 @@
 职责：
 1. 支持每日定时执行股票分析
 2. 支持定时执行大盘复盘
-3. 优雅处理信号，确保可靠退出
+3. 支持在正式任务前提前执行缓存预热
+4. 支持按市场拆分的任务：A 股 / 港股 / 美股各自在本市场收盘后执行（按交易日历，休市日不执行）
+5. 优雅处理信号，确保可靠退出
 
 依赖：
 - schedule: 轻量级定时任务库
@@ -18,11 +20,31 @@ import signal
 import sys
 import time
 import threading
-from datetime import datetime
-from typing import Callable, Optional
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from src.core.trading_calendar import get_calendar
 
 logger = logging.getLogger(__name__)
 
+# 市场任务名称（日志使用）
+MARKET_LABELS = {'cn': 'A股', 'hk': '港股', 'us': '美股'}
+
+
+@dataclass
+class _MarketJob:
+    """绑定市场收盘时间的任务：每个交易日在收盘后 offset_minutes 分钟执行"""
+    market: str
+    task: Callable
+    offset_minutes: int
+    label: str
+    is_warmup: bool = False
+    next_run: Optional[datetime] = None  # 带时区（交易所当地时间）
+
+    def schedule_next(self, now: Optional[datetime] = None) -> None:
+        self.next_run = get_calendar(self.market).next_after_close(self.offset_minutes, now)
+
 
 class GracefulShutdown:
     """
@@ -80,6 +102,7 @@ class Scheduler:
         self.schedule_time = schedule_time
         self.shutdown_handler = GracefulShutdown()
         self._task_callback: Optional[Callable] = None
+        self._market_jobs: List[_MarketJob] = []
         self._running = False
         
     def set_daily_task(self, task: Callable, run_immediately: bool = True):
@@ -100,6 +123,93 @@ class Scheduler:
             logger.info("立即执行一次任务...")
             self._safe_run_task()
     
+    def set_warmup_task(self, task: Callable, lead_minutes: int = 10):
+        """
+        设置预热任务：每日在正式任务前 lead_minutes 分钟执行
+
+        Args:
+            task: 预热任务函数（无参数）
+            lead_minutes: 提前分钟数
+        """
+        warmup_time = (
+            datetime.strptime(self.schedule_time, "%H:%M") - timedelta(minutes=lead_minutes)
+        ).strftime("%H:%M")
+        self.schedule.every().day.at(warmup_time).do(self._safe_run_warmup, task)
+        logger.info(f"已设置缓存预热任务，执行时间: {warmup_time}（提前 {lead_minutes} 分钟）")
+
+    def add_market_task(
+        self,
+        market: str,
+        task: Callable,
+        delay_minutes: int = 30,
+        warmup_task: Optional[Callable] = None,
+        warmup_lead_minutes: int = 10,
+    ):
+        """
+        设置绑定市场收盘的任务：每个交易日在该市场收盘后 delay_minutes 分钟执行
+
+        执行时间按交易所时区推算（美股夏令时自动生效），非交易日不执行。
+
+        Args:
+            market: 市场（cn / hk / us）
+            task: 任务函数（无参数）
+            delay_minutes: 收盘后延迟分钟数（等待日线数据落地）
+            warmup_task: 缓存预热任务（可选，在正式任务前 warmup_lead_minutes 分钟执行）
+            warmup_lead_minutes: 预热提前分钟数
+        """
+        name = MARKET_LABELS.get(market, market)
+        job = _MarketJob(market, task, delay_minutes, f"{name}收盘任务")
+        job.schedule_next()
+        self._market_jobs.append(job)
+        logger.info(
+            f"已设置{job.label}：收盘后 {delay_minutes} 分钟执行，"
+            f"下次执行: {self._format_local(job.next_run)}"
+        )
+        if warmup_task is not None:
+            warmup = _MarketJob(
+                market, warmup_task, delay_minutes - warmup_lead_minutes, f"{name}缓存预热", is_warmup=True
+            )
+            warmup.schedule_next()
+            self._market_jobs.append(warmup)
+
+    def run_market_tasks_now(self):
+        """立即依次执行一次各市场任务（不含预热，不影响下次执行时间）"""
+        for job in self._market_jobs:
+            if not job.is_warmup:
+                self._safe_run_market_job(job)
+
+    def _run_pending_market_jobs(self, now: Optional[datetime] = None):
+        """执行已到时间的市场任务，并推算下次执行时间"""
+        for job in self._market_jobs:
+            if (now or datetime.now(job.next_run.tzinfo)) >= job.next_run:
+                self._safe_run_market_job(job)
+                # 按任务结束后的时间推算，耗时较长的任务不会在同一交易日重复执行
+                job.schedule_next(now)
+
+    @staticmethod
+    def _safe_run_market_job(job: _MarketJob):
+        """安全执行市场任务（单个市场失败不影响其他市场）"""
+        try:
+            logger.info(f"{job.label}开始执行 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            job.task()
+            logger.info(f"{job.label}执行完成 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        except Exception as e:
+            logger.exception(f"{job.label}执行失败: {e}")
+
+    @staticmethod
+    def _format_local(moment: datetime) -> str:
+        """带时区的时间转为主机本地时间字符串"""
+        return moment.astimezone().strftime('%Y-%m-%d %H:%M:%S')
+
+    @staticmethod
+    def _safe_run_warmup(task: Callable):
+        """安全执行预热任务（失败不影响正式任务）"""
+        try:
+            logger.info(f"缓存预热开始 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            task()
+        except Exception as e:
+            logger.exception(f"缓存预热失败: {e}")
+
     def _safe_run_task(self):
         """安全执行任务（带异常捕获）"""
         if self._task_callback is None:
@@ -129,6 +239,7 @@ class Scheduler:
         
         while self._running and not self.shutdown_handler.should_shutdown:
             self.schedule.run_pending()
+            self._run_pending_market_jobs()
             time.sleep(30)  # 每30秒检查一次
             
             # 每小时打印一次心跳
@@ -139,10 +250,12 @@ class Scheduler:
     
     def _get_next_run_time(self) -> str:
         """获取下次执行时间"""
-        jobs = self.schedule.get_jobs()
-        if jobs:
-            next_run = min(job.next_run for job in jobs)
-            return next_run.strftime('%Y-%m-%d %H:%M:%S')
+        candidates = [job.next_run for job in self.schedule.get_jobs()]
+        candidates.extend(
+            job.next_run.astimezone().replace(tzinfo=None) for job in self._market_jobs if job.next_run
+        )
+        if candidates:
+            return min(candidates).strftime('%Y-%m-%d %H:%M:%S')
         return "未设置"
     
     def stop(self):
@@ -153,7 +266,9 @@ class Scheduler:
 def run_with_schedule(
     task: Callable,
     schedule_time: str = "18:00",
-    run_immediately: bool = True
+    run_immediately: bool = True,
+    warmup_task: Optional[Callable] = None,
+    warmup_lead_minutes: int = 10
 ):
     """
     便捷函数：使用定时调度运行任务
@@ -162,12 +277,49 @@ def run_with_schedule(
         task: 要执行的任务函数
         schedule_time: 每日执行时间
         run_immediately: 是否立即执行一次
+        warmup_task: 缓存预热任务（可选，在 schedule_time 前 warmup_lead_minutes 分钟执行）
+        warmup_lead_minutes: 预热提前分钟数
     """
     scheduler = Scheduler(schedule_time=schedule_time)
+    if warmup_task is not None:
+        scheduler.set_warmup_task(warmup_task, lead_minutes=warmup_lead_minutes)
     scheduler.set_daily_task(task, run_immediately=run_immediately)
     scheduler.run()
 
 
+def run_with_market_schedule(
+    market_tasks: Dict[str, Callable],
+    delay_minutes: int = 30,
+    run_immediately: bool = True,
+    warmup_tasks: Optional[Dict[str, Callable]] = None,
+    warmup_lead_minutes: int = 10
+):
+    """
+    便捷函数：按市场收盘时间分别调度任务
+
+    Args:
+        market_tasks: {市场: 任务函数}，每个任务只处理本市场的股票
+        delay_minutes: 收盘后延迟分钟数
+        run_immediately: 是否立即依次执行一次各市场任务
+        warmup_tasks: {市场: 缓存预热任务}（可选）
+        warmup_lead_minutes: 预热提前分钟数
+    """
+    scheduler = Scheduler()
+    warmup_tasks = warmup_tasks or {}
+    for market, task in market_tasks.items():
+        scheduler.add_market_task(
+            market,
+            task,
+            delay_minutes=delay_minutes,
+            warmup_task=warmup_tasks.get(market),
+            warmup_lead_minutes=warmup_lead_minutes,
+        )
+    if run_immediately:
+        logger.info("立即依次执行一次各市场任务...")
+        scheduler.run_market_tasks_now()
+    scheduler.run()
+
+
 if __name__ == "__main__":
     # 测试定时调度
     logging.basicConfig(
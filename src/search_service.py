@@ -11,48 +11,256 @@ A股自选股智能分析系统 - 搜索服务模块
 4. 搜索结果缓存和格式化
 """
 
+import atexit
+import hashlib
+import json
 import logging
 import random
+import threading
 import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field, replace
 from datetime import datetime
 from typing import List, Dict, Any, Optional, Tuple
 from itertools import cycle
+from urllib.parse import urlparse
+
 import requests
 from newspaper import Article, Config
 
+from src.core.tracing import bind_context, get_tracer
+
 logger = logging.getLogger(__name__)
 
 
-def fetch_url_content(url: str, timeout: int = 5) -> str:
+_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+
+def _parse_article_text(url: str, html: str, timeout: int = 5) -> str:
+    """使用 newspaper3k 从 HTML 中解析正文（不发起网络请求）"""
+    # 配置 newspaper3k
+    config = Config()
+    config.browser_user_agent = _USER_AGENT
+    config.request_timeout = timeout
+    config.fetch_images = False  # 不下载图片
+    config.memoize_articles = False  # 缓存由 ArticleExtractor 负责
+
+    article = Article(url, config=config, language='zh')  # 默认中文，但也支持其他
+    article.download(input_html=html)
+    article.parse()
+
+    # 获取正文，简单的后处理，去除空行
+    text = (article.text or '').strip()
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    return '\n'.join(lines)
+
+
+class ArticleExtractor:
     """
-    获取 URL 网页正文内容 (使用 newspaper3k)
+    网页正文并发抽取器
+
+    - 有界线程池并发下载，每个域名单独限制并发数
+    - 按 URL 缓存正文（内存 + 可选数据库 url_content 表）
+    - 缓存超过 revalidate_after 秒后，通过 ETag / Last-Modified 条件请求校验，
+      返回 304 时直接复用缓存正文
     """
-    try:
-        # 配置 newspaper3k
-        config = Config()
-        config.browser_user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        config.request_timeout = timeout
-        config.fetch_images = False  # 不下载图片
-        config.memoize_articles = False # 不缓存
 
-        article = Article(url, config=config, language='zh') # 默认中文，但也支持其他
-        article.download()
-        article.parse()
+    # 缓存中保存的正文最大长度，调用方再按需截断
+    MAX_STORED_CHARS = 8000
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        per_domain_limit: int = 2,
+        revalidate_after: int = 6 * 3600,
+        persist: bool = False,
+        max_memory_entries: int = 1000,
+    ):
+        """
+        Args:
+            max_workers: 线程池大小
+            per_domain_limit: 单个域名最大并发下载数
+            revalidate_after: 缓存正文多久后需要条件请求校验（秒）
+            persist: 是否持久化到数据库
+            max_memory_entries: 内存缓存最大条目数
+        """
+        self.per_domain_limit = max(1, per_domain_limit)
+        self.revalidate_after = revalidate_after
+        self.max_memory_entries = max(1, max_memory_entries)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="article_fetch")
+        self._lock = threading.Lock()
+        self._domain_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        # {url: {'content', 'etag', 'last_modified', 'checked_at'}}
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._repo = None
+        if persist:
+            try:
+                from src.repositories.url_content_repo import UrlContentRepository
+                self._repo = UrlContentRepository()
+            except Exception as e:
+                logger.warning(f"网页正文缓存持久层初始化失败，仅使用内存缓存: {e}")
+
+    def _domain_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        domain = urlparse(url).netloc.lower()
+        with self._lock:
+            sem = self._domain_semaphores.get(domain)
+            if sem is None:
+                sem = threading.BoundedSemaphore(self.per_domain_limit)
+                self._domain_semaphores[domain] = sem
+            return sem
+
+    def _load_cached(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._memory.get(url)
+            if entry is not None:
+                self._memory.move_to_end(url)
+                return entry
+        if self._repo is None:
+            return None
+        try:
+            row = self._repo.get(url)
+        except Exception as e:
+            logger.debug(f"读取网页正文缓存失败: {e}")
+            return None
+        if row is None or row.content is None:
+            return None
+        entry = {
+            'content': row.content,
+            'etag': row.etag,
+            'last_modified': row.last_modified,
+            'checked_at': row.checked_at.timestamp() if row.checked_at else 0.0,
+        }
+        self._remember(url, entry)
+        return entry
+
+    def _remember(self, url: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[url] = entry
+            self._memory.move_to_end(url)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def _persist(self, url: str, entry: Dict[str, Any], refreshed: bool) -> None:
+        if self._repo is None:
+            return
+        try:
+            self._repo.save(
+                url,
+                content=entry['content'],
+                etag=entry.get('etag'),
+                last_modified=entry.get('last_modified'),
+                refreshed=refreshed,
+            )
+        except Exception as e:
+            logger.debug(f"保存网页正文缓存失败: {e}")
+
+    def fetch(self, url: str, timeout: int = 5) -> str:
+        """
+        获取单个 URL 的正文（命中缓存时不重新解析）
+
+        Returns:
+            正文文本，失败返回空字符串
+        """
+        cached = self._load_cached(url)
+        if cached is not None and time.time() - cached['checked_at'] < self.revalidate_after:
+            return cached['content']
+
+        headers = {'User-Agent': _USER_AGENT}
+        if cached is not None:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        try:
+            with self._domain_semaphore(url):
+                resp = requests.get(url, headers=headers, timeout=timeout)
+
+            if resp.status_code == 304 and cached is not None:
+                cached['checked_at'] = time.time()
+                self._remember(url, cached)
+                self._persist(url, cached, refreshed=False)
+                return cached['content']
+
+            if resp.status_code != 200:
+                logger.debug(f"Fetch content failed for {url}: HTTP {resp.status_code}")
+                return cached['content'] if cached is not None else ""
+
+            text = _parse_article_text(url, resp.text, timeout=timeout)[:self.MAX_STORED_CHARS]
+            entry = {
+                'content': text,
+                'etag': resp.headers.get('ETag'),
+                'last_modified': resp.headers.get('Last-Modified'),
+                'checked_at': time.time(),
+            }
+            self._remember(url, entry)
+            self._persist(url, entry, refreshed=True)
+            return text
+        except Exception as e:
+            logger.debug(f"Fetch content failed for {url}: {e}")
+            return cached['content'] if cached is not None else ""
+
+    def fetch_many(self, urls: List[str], timeout: int = 5) -> Dict[str, str]:
+        """
+        并发获取多个 URL 的正文，整体耗时约等于最慢的一次请求
+
+        Args:
+            urls: URL 列表（自动去重，忽略空值）
+            timeout: 单个请求超时，同时作为整体等待上限
+
+        Returns:
+            {url: 正文}（未在时限内完成的 URL 不包含在内）
+        """
+        unique_urls = list(dict.fromkeys(u for u in urls if u))
+        if not unique_urls:
+            return {}
+        future_to_url = {self._executor.submit(self.fetch, url, timeout): url for url in unique_urls}
+        done, _ = wait(future_to_url, timeout=timeout + 1)
+        contents = {}
+        for future in done:
+            try:
+                contents[future_to_url[future]] = future.result()
+            except Exception as e:
+                logger.debug(f"Fetch content failed for {future_to_url[future]}: {e}")
+        return contents
+
+    def shutdown(self) -> None:
+        """关闭下载线程池（未开始的下载直接取消）"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
 
-        # 获取正文
-        text = article.text.strip()
+_article_extractor: Optional[ArticleExtractor] = None
+_article_extractor_lock = threading.Lock()
 
-        # 简单的后处理，去除空行
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        text = '\n'.join(lines)
 
-        return text[:1500]  # 限制返回长度（比 bs4 稍微多一点，因为 newspaper 解析更干净）
-    except Exception as e:
-        logger.debug(f"Fetch content failed for {url}: {e}")
+def get_article_extractor() -> ArticleExtractor:
+    """获取网页正文抽取器单例"""
+    global _article_extractor
+    with _article_extractor_lock:
+        if _article_extractor is None:
+            from src.config import get_config
+            config = get_config()
+            _article_extractor = ArticleExtractor(persist=config.search_cache_persist)
+        return _article_extractor
 
-    return ""
+
+@atexit.register
+def shutdown_article_extractor() -> None:
+    """关闭网页正文抽取器单例（进程退出时自动调用）"""
+    global _article_extractor
+    with _article_extractor_lock:
+        if _article_extractor is not None:
+            _article_extractor.shutdown()
+            _article_extractor = None
+
+
+def fetch_url_content(url: str, timeout: int = 5) -> str:
+    """
+    获取 URL 网页正文内容 (使用 newspaper3k，带缓存)
+    """
+    return get_article_extractor().fetch(url, timeout=timeout)[:1500]
 
 
 @dataclass
@@ -92,6 +300,241 @@ class SearchResponse:
         return "\n".join(lines)
 
 
+def _simhash(text: str, bits: int = 64) -> int:
+    """
+    计算文本的 SimHash 指纹
+
+    以字符二元组为特征（兼容中英文，无需分词），相似文本的指纹汉明距离较小。
+    """
+    normalized = ''.join(ch for ch in text.lower() if ch.isalnum())
+    if not normalized:
+        return 0
+    features = [normalized[i:i + 2] for i in range(max(1, len(normalized) - 1))]
+    weights = [0] * bits
+    for feature in features:
+        h = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=bits // 8).digest(), 'big')
+        for i in range(bits):
+            weights[i] += 1 if (h >> i) & 1 else -1
+    fingerprint = 0
+    for i, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << i
+    return fingerprint
+
+
+def dedup_search_results(
+    responses: Dict[str, 'SearchResponse'],
+    max_distance: int = 3,
+) -> Tuple[Dict[str, 'SearchResponse'], int, int]:
+    """
+    跨维度折叠近似重复的新闻（同一稿件被不同网站转载、不同引擎重复返回）
+
+    按传入顺序保留首次出现的条目；URL 相同或 title+snippet 的 SimHash
+    汉明距离不超过 max_distance 的后续条目被移除。不修改传入的响应对象。
+
+    Returns:
+        (去重后的 {维度: SearchResponse}, 去重前条数, 移除条数)
+    """
+    seen_urls = set()
+    seen_fingerprints: List[int] = []
+    total = 0
+    removed = 0
+    deduped: Dict[str, SearchResponse] = {}
+
+    for dim_name, response in responses.items():
+        if not response or not response.results:
+            deduped[dim_name] = response
+            continue
+        kept = []
+        for item in response.results:
+            total += 1
+            if item.url and item.url in seen_urls:
+                removed += 1
+                continue
+            fingerprint = _simhash(f"{item.title} {item.snippet}")
+            if fingerprint and any(bin(fingerprint ^ fp).count('1') <= max_distance for fp in seen_fingerprints):
+                removed += 1
+                continue
+            if item.url:
+                seen_urls.add(item.url)
+            if fingerprint:
+                seen_fingerprints.append(fingerprint)
+            kept.append(item)
+        deduped[dim_name] = replace(response, results=kept) if len(kept) != len(response.results) else response
+
+    return deduped, total, removed
+
+
+class SearchResultCache:
+    """
+    搜索结果缓存（两级）
+
+    - L1：进程内 LRU（OrderedDict，命中即移到队尾，超限淘汰最久未访问）
+    - L2：可选的 SQLite 持久层（search_cache 表），在 API 服务、Bot、
+      定时任务之间共享，并在重启后保留
+    - 每个条目带独立 TTL，由调用方按搜索维度决定
+    - 统计命中率（L1/L2 命中、未命中）
+    """
+
+    # 每写入多少次触发一次持久层清理
+    _PERSIST_EVICT_EVERY = 50
+
+    def __init__(
+        self,
+        max_entries: int = 500,
+        persist: bool = False,
+        persist_max_entries: int = 5000,
+    ):
+        """
+        Args:
+            max_entries: 内存缓存最大条目数
+            persist: 是否启用 SQLite 持久层
+            persist_max_entries: 持久层最大条目数
+        """
+        self.max_entries = max(1, max_entries)
+        self.persist_max_entries = max(1, persist_max_entries)
+        # {key: (expires_at, SearchResponse)}
+        self._entries: "OrderedDict[str, Tuple[float, SearchResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'memory_hits': 0, 'persistent_hits': 0, 'misses': 0, 'writes': 0}
+        self._repo = None
+        if persist:
+            try:
+                from src.repositories.search_cache_repo import SearchCacheRepository
+                self._repo = SearchCacheRepository()
+            except Exception as e:
+                logger.warning(f"搜索缓存持久层初始化失败，仅使用内存缓存: {e}")
+
+    @staticmethod
+    def make_key(query: str, max_results: int, days: int) -> str:
+        """Build a cache key from query parameters."""
+        raw = f"{query}|{max_results}|{days}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _serialize(response: SearchResponse) -> str:
+        return json.dumps(asdict(response), ensure_ascii=False)
+
+    @staticmethod
+    def _deserialize(payload: str) -> SearchResponse:
+        data = json.loads(payload)
+        data['results'] = [SearchResult(**item) for item in data.get('results', [])]
+        return SearchResponse(**data)
+
+    def get(self, key: str) -> Optional[SearchResponse]:
+        """Return cached SearchResponse if still valid, else None."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, response = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats['memory_hits'] += 1
+                    return response
+                del self._entries[key]
+
+        if self._repo is not None:
+            try:
+                row = self._repo.get(key)
+            except Exception as e:
+                logger.debug(f"读取搜索缓存持久层失败: {e}")
+                row = None
+            if row is not None:
+                try:
+                    response = self._deserialize(row.payload)
+                except (ValueError, TypeError) as e:
+                    logger.debug(f"搜索缓存条目解析失败: {e}")
+                else:
+                    with self._lock:
+                        self._store(key, row.expires_at.timestamp(), response)
+                        self._stats['persistent_hits'] += 1
+                    return response
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def contains(self, key: str) -> bool:
+        """
+        检查缓存中是否有未过期的条目（不计入命中统计）
+
+        持久层命中的条目会载入内存，供随后的 get() 直接命中。
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.time():
+                return True
+
+        if self._repo is None:
+            return False
+        try:
+            row = self._repo.get(key)
+            if row is None:
+                return False
+            response = self._deserialize(row.payload)
+        except Exception as e:
+            logger.debug(f"读取搜索缓存持久层失败: {e}")
+            return False
+        with self._lock:
+            self._store(key, row.expires_at.timestamp(), response)
+        return True
+
+    def put(
+        self,
+        key: str,
+        response: SearchResponse,
+        ttl_seconds: int,
+        dimension: Optional[str] = None,
+    ) -> None:
+        """Store a successful SearchResponse with its own TTL."""
+        with self._lock:
+            self._store(key, time.time() + ttl_seconds, response)
+            self._stats['writes'] += 1
+            should_evict = self._stats['writes'] % self._PERSIST_EVICT_EVERY == 0
+
+        if self._repo is None:
+            return
+        try:
+            self._repo.put(
+                key,
+                self._serialize(response),
+                ttl_seconds,
+                dimension=dimension,
+                query=response.query,
+            )
+            if should_evict:
+                self._repo.evict(self.persist_max_entries)
+        except Exception as e:
+            logger.debug(f"写入搜索缓存持久层失败: {e}")
+
+    def _store(self, key: str, expires_at: float, response: SearchResponse) -> None:
+        """写入内存 LRU（调用方持有锁）"""
+        self._entries[key] = (expires_at, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取缓存命中统计
+
+        Returns:
+            包含 memory_hits / persistent_hits / misses / hit_rate / size 的字典
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['memory_hits'] + stats['persistent_hits'] + stats['misses']
+        hits = stats['memory_hits'] + stats['persistent_hits']
+        stats['hit_rate'] = round(hits / lookups, 4) if lookups else 0.0
+        stats['persistent'] = self._repo is not None
+        return stats
+
+
 class BaseSearchProvider(ABC):
     """搜索引擎基类"""
     
@@ -108,10 +551,18 @@ class BaseSearchProvider(ABC):
         self._key_cycle = cycle(api_keys) if api_keys else None
         self._key_usage: Dict[str, int] = {key: 0 for key in api_keys}
         self._key_errors: Dict[str, int] = {key: 0 for key in api_keys}
+        # Key 轮询与计数在多线程并发搜索时需要加锁
+        self._key_lock = threading.Lock()
+        # 单个搜索引擎的并发上限（避免多维度并发搜索触发限流）
+        self._concurrency = threading.BoundedSemaphore(2)
     
     @property
     def name(self) -> str:
         return self._name
+
+    def set_max_concurrency(self, max_concurrency: int) -> None:
+        """设置该搜索引擎允许的最大并发请求数"""
+        self._concurrency = threading.BoundedSemaphore(max(1, int(max_concurrency)))
     
     @property
     def is_available(self) -> bool:
@@ -127,29 +578,33 @@ class BaseSearchProvider(ABC):
         if not self._key_cycle:
             return None
         
-        # 最多尝试所有 key
-        for _ in range(len(self._api_keys)):
-            key = next(self._key_cycle)
-            # 跳过错误次数过多的 key（超过 3 次）
-            if self._key_errors.get(key, 0) < 3:
-                return key
-        
-        # 所有 key 都有问题，重置错误计数并返回第一个
-        logger.warning(f"[{self._name}] 所有 API Key 都有错误记录，重置错误计数")
-        self._key_errors = {key: 0 for key in self._api_keys}
-        return self._api_keys[0] if self._api_keys else None
+        with self._key_lock:
+            # 最多尝试所有 key
+            for _ in range(len(self._api_keys)):
+                key = next(self._key_cycle)
+                # 跳过错误次数过多的 key（超过 3 次）
+                if self._key_errors.get(key, 0) < 3:
+                    return key
+            
+            # 所有 key 都有问题，重置错误计数并返回第一个
+            logger.warning(f"[{self._name}] 所有 API Key 都有错误记录，重置错误计数")
+            self._key_errors = {key: 0 for key in self._api_keys}
+            return self._api_keys[0] if self._api_keys else None
     
     def _record_success(self, key: str) -> None:
         """记录成功使用"""
-        self._key_usage[key] = self._key_usage.get(key, 0) + 1
-        # 成功后减少错误计数
-        if key in self._key_errors and self._key_errors[key] > 0:
-            self._key_errors[key] -= 1
+        with self._key_lock:
+            self._key_usage[key] = self._key_usage.get(key, 0) + 1
+            # 成功后减少错误计数
+            if key in self._key_errors and self._key_errors[key] > 0:
+                self._key_errors[key] -= 1
     
     def _record_error(self, key: str) -> None:
         """记录错误"""
-        self._key_errors[key] = self._key_errors.get(key, 0) + 1
-        logger.warning(f"[{self._name}] API Key {key[:8]}... 错误计数: {self._key_errors[key]}")
+        with self._key_lock:
+            self._key_errors[key] = self._key_errors.get(key, 0) + 1
+            error_count = self._key_errors[key]
+        logger.warning(f"[{self._name}] API Key {key[:8]}... 错误计数: {error_count}")
     
     @abstractmethod
     def _do_search(self, query: str, api_key: str, max_results: int, days: int = 7) -> SearchResponse:
@@ -178,6 +633,17 @@ class BaseSearchProvider(ABC):
                 error_message=f"{self._name} 未配置 API Key"
             )
         
+        with self._concurrency:
+            start_time = time.time()
+            response = self._search_with_key(query, api_key, max_results, days)
+            get_tracer().record(
+                'search_provider', time.time() - start_time,
+                source=self._name, ok=response.success, error=response.error_message or '',
+            )
+            return response
+
+    def _search_with_key(self, query: str, api_key: str, max_results: int, days: int) -> SearchResponse:
+        """使用指定 Key 执行一次搜索并记录成功/失败"""
         start_time = time.time()
         try:
             response = self._do_search(query, api_key, max_results, days=days)
@@ -440,27 +906,23 @@ class SerpAPISearchProvider(BaseSearchProvider):
             # 4. 解析 Organic Results (自然搜索结果)
             organic_results = response.get('organic_results', [])
 
-            for item in organic_results[:max_results]:
+            # 增强：并发解析全部结果的网页正文（带 URL 缓存），避免逐条串行下载
+            organic_items = organic_results[:max_results]
+            contents = get_article_extractor().fetch_many(
+                [item.get('link', '') for item in organic_items], timeout=5
+            )
+
+            for item in organic_items:
                 link = item.get('link', '')
                 snippet = item.get('snippet', '')
 
-                # 增强：如果需要，解析网页正文
-                # 策略：如果摘要太短，或者为了获取更多信息，可以请求网页
-                # 这里我们对所有结果尝试获取正文，但为了性能，仅获取前1000字符
-                content = ""
-                if link:
-                   try:
-                       fetched_content = fetch_url_content(link, timeout=5)
-                       if fetched_content:
-                           # 如果获取到了正文，将其拼接到 snippet 中，或者替换 snippet
-                           # 这里选择拼接，保留原摘要
-                           content = fetched_content
-                           if len(content) > 500:
-                               snippet = f"{snippet}\n\n【网页详情】\n{content[:500]}..."
-                           else:
-                               snippet = f"{snippet}\n\n【网页详情】\n{content}"
-                   except Exception as e:
-                       logger.debug(f"[SerpAPI] Fetch content failed: {e}")
+                content = contents.get(link, '')[:1500]
+                if content:
+                    # 如果获取到了正文，将其拼接到 snippet 中，保留原摘要
+                    if len(content) > 500:
+                        snippet = f"{snippet}\n\n【网页详情】\n{content[:500]}..."
+                    else:
+                        snippet = f"{snippet}\n\n【网页详情】\n{content}"
 
                 results.append(SearchResult(
                     title=item.get('title', ''),
@@ -900,6 +1362,20 @@ class SearchService:
         "{name} technical analysis",
         "{name} {code} performance volume",
     ]
+
+    # 各搜索维度的缓存有效期（秒）：新闻类时效性强，业绩/行业类可按天复用
+    CACHE_TTL_BY_DIMENSION = {
+        'stock_news': 600,
+        'latest_news': 600,
+        'risk_check': 3600,
+        'market_analysis': 6 * 3600,
+        'earnings': 24 * 3600,
+        'industry': 24 * 3600,
+    }
+    DEFAULT_CACHE_TTL = 600
+
+    # 按行业共享的搜索维度：同一行业的股票共用一次行业级搜索
+    SECTOR_SHARED_DIMENSIONS = ('industry',)
     
     def __init__(
         self,
@@ -908,6 +1384,10 @@ class SearchService:
         brave_keys: Optional[List[str]] = None,
         serpapi_keys: Optional[List[str]] = None,
         news_max_age_days: int = 3,
+        intel_timeout: float = 20.0,
+        provider_max_concurrency: int = 2,
+        cache_persist: bool = False,
+        cache_max_entries: int = 500,
     ):
         """
         初始化搜索服务
@@ -918,9 +1398,15 @@ class SearchService:
             brave_keys: Brave Search API Key 列表
             serpapi_keys: SerpAPI Key 列表
             news_max_age_days: 新闻最大时效（天）
+            intel_timeout: 多维度情报搜索的整体超时（秒），超时后返回已完成的维度
+            provider_max_concurrency: 单个搜索引擎的最大并发请求数
+            cache_persist: 是否将搜索结果缓存持久化到数据库（跨进程、跨重启复用）
+            cache_max_entries: 内存缓存最大条目数（LRU 淘汰）
         """
         self._providers: List[BaseSearchProvider] = []
         self.news_max_age_days = max(1, news_max_age_days)
+        self.intel_timeout = max(1.0, float(intel_timeout))
+        self.provider_max_concurrency = max(1, int(provider_max_concurrency))
 
         # 初始化搜索引擎（按优先级排序）
         # 1. Bocha 优先（中文搜索优化，AI摘要）
@@ -946,10 +1432,20 @@ class SearchService:
         if not self._providers:
             logger.warning("未配置任何搜索引擎 API Key，新闻搜索功能将不可用")
 
-        # In-memory search result cache: {cache_key: (timestamp, SearchResponse)}
-        self._cache: Dict[str, Tuple[float, 'SearchResponse']] = {}
-        # Default cache TTL in seconds (10 minutes)
-        self._cache_ttl: int = 600
+        for provider in self._providers:
+            provider.set_max_concurrency(self.provider_max_concurrency)
+
+        # 搜索结果缓存（内存 LRU + 可选持久层，TTL 按维度区分）
+        self._cache = SearchResultCache(max_entries=cache_max_entries, persist=cache_persist)
+
+        # 行业分组：{股票代码: 行业名称}，以及正在进行中的行业搜索（同一查询只发一次）
+        self._stock_sectors: Dict[str, str] = {}
+        self._sector_lock = threading.Lock()
+        self._sector_inflight: Dict[str, Future] = {}
+
+        # 近似重复新闻折叠统计（每轮运行由调用方重置）
+        self._dedup_lock = threading.Lock()
+        self._dedup_stats = {'total': 0, 'removed': 0}
     
     @staticmethod
     def _is_foreign_stock(stock_code: str) -> bool:
@@ -974,37 +1470,79 @@ class SearchService:
 
     def _cache_key(self, query: str, max_results: int, days: int) -> str:
         """Build a cache key from query parameters."""
-        return f"{query}|{max_results}|{days}"
+        return SearchResultCache.make_key(query, max_results, days)
 
     def _get_cached(self, key: str) -> Optional['SearchResponse']:
         """Return cached SearchResponse if still valid, else None."""
-        entry = self._cache.get(key)
-        if entry is None:
-            return None
-        ts, response = entry
-        if time.time() - ts > self._cache_ttl:
-            del self._cache[key]
-            return None
-        logger.debug(f"Search cache hit: {key[:60]}...")
+        response = self._cache.get(key)
+        if response is not None:
+            logger.debug(f"Search cache hit: {key[:12]}...")
         return response
 
-    def _put_cache(self, key: str, response: 'SearchResponse') -> None:
-        """Store a successful SearchResponse in cache."""
-        # Hard cap: evict oldest entries when cache exceeds limit
-        _MAX_CACHE_SIZE = 500
-        if len(self._cache) >= _MAX_CACHE_SIZE:
-            now = time.time()
-            # First pass: remove expired entries
-            expired = [k for k, (ts, _) in self._cache.items() if now - ts > self._cache_ttl]
-            for k in expired:
-                del self._cache[k]
-            # Second pass: if still over limit, evict oldest entries (FIFO)
-            if len(self._cache) >= _MAX_CACHE_SIZE:
-                excess = len(self._cache) - _MAX_CACHE_SIZE + 1
-                oldest = sorted(self._cache.keys(), key=lambda k: self._cache[k][0])[:excess]
-                for k in oldest:
-                    del self._cache[k]
-        self._cache[key] = (time.time(), response)
+    def _put_cache(self, key: str, response: 'SearchResponse', dimension: str = 'stock_news') -> None:
+        """Store a successful SearchResponse in cache with the dimension's TTL."""
+        ttl = self.CACHE_TTL_BY_DIMENSION.get(dimension, self.DEFAULT_CACHE_TTL)
+        self._cache.put(key, response, ttl, dimension=dimension)
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """获取搜索缓存命中统计"""
+        return self._cache.get_stats()
+
+    def get_dedup_stats(self) -> Dict[str, Any]:
+        """获取近似重复新闻折叠统计（total / removed / ratio）"""
+        with self._dedup_lock:
+            stats = dict(self._dedup_stats)
+        stats['ratio'] = round(stats['removed'] / stats['total'], 4) if stats['total'] else 0.0
+        return stats
+
+    def reset_dedup_stats(self) -> None:
+        """重置去重统计（每轮运行开始时调用）"""
+        with self._dedup_lock:
+            self._dedup_stats = {'total': 0, 'removed': 0}
+
+    def set_stock_sectors(self, stock_sectors: Dict[str, str]) -> None:
+        """
+        登记股票所属行业，用于行业维度搜索的分组共享
+
+        Args:
+            stock_sectors: {股票代码: 行业名称}
+        """
+        with self._sector_lock:
+            self._stock_sectors.update({code: sector for code, sector in stock_sectors.items() if sector})
+
+    def _search_shared(self, provider: BaseSearchProvider, query: str) -> SearchResponse:
+        """
+        执行行业级共享搜索
+
+        同一查询在多只股票并发分析时只实际请求一次，其余调用等待并复用结果；
+        成功结果写入缓存，供同一轮后续股票直接命中。
+        """
+        with self._sector_lock:
+            future = self._sector_inflight.get(query)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._sector_inflight[query] = future
+
+        if not is_owner:
+            return future.result()
+
+        try:
+            response = provider.search(query, max_results=3, days=self.news_max_age_days)
+            if response.success and response.results:
+                self._put_cache(
+                    self._cache_key(query, 3, self.news_max_age_days),
+                    response,
+                    dimension=self.SECTOR_SHARED_DIMENSIONS[0],
+                )
+            future.set_result(response)
+            return response
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._sector_lock:
+                self._sector_inflight.pop(query, None)
     
     def search_stock_news(
         self,
@@ -1133,31 +1671,13 @@ class SearchService:
             error_message="事件搜索失败"
         )
     
-    def search_comprehensive_intel(
-        self,
-        stock_code: str,
-        stock_name: str,
-        max_searches: int = 3
-    ) -> Dict[str, SearchResponse]:
+    def _build_intel_dimensions(self, stock_code: str, stock_name: str) -> List[Dict[str, str]]:
         """
-        多维度情报搜索（同时使用多个引擎、多个维度）
-        
-        搜索维度：
-        1. 最新消息 - 近期新闻动态
-        2. 风险排查 - 减持、处罚、利空
-        3. 业绩预期 - 年报预告、业绩快报
-        
-        Args:
-            stock_code: 股票代码
-            stock_name: 股票名称
-            max_searches: 最大搜索次数
-            
+        构建多维度情报搜索的维度定义
+
         Returns:
-            {维度名称: SearchResponse} 字典
+            [{'name': 维度名称, 'query': 搜索关键词, 'desc': 维度描述}, ...]
         """
-        results = {}
-        search_count = 0
-        
         # 根据股票类型选择搜索关键词语言
         is_foreign = self._is_foreign_stock(stock_code)
 
@@ -1219,38 +1739,211 @@ class SearchService:
                 },
             ]
         
-        logger.info(f"开始多维度情报搜索: {stock_name}({stock_code})")
+
+        # 已知所属行业时，行业维度改为行业级查询，供同行业股票共享
+        sector = None if is_foreign else self._stock_sectors.get(stock_code)
+        if sector:
+            for dim in search_dimensions:
+                if dim['name'] in self.SECTOR_SHARED_DIMENSIONS:
+                    dim['query'] = f"{sector} 行业 竞争格局 市场份额 行业前景"
+                    dim['sector'] = sector
+        return search_dimensions
+
+    def search_comprehensive_intel(
+        self,
+        stock_code: str,
+        stock_name: str,
+        max_searches: int = 3
+    ) -> Dict[str, SearchResponse]:
+        """
+        多维度情报搜索（同时使用多个引擎、多个维度）
         
-        # 轮流使用不同的搜索引擎
-        provider_index = 0
+        各维度并发执行，每个搜索引擎受 provider_max_concurrency 限制；
+        整体超过 intel_timeout 仍未完成的维度将被放弃，只返回已完成的部分结果。
         
-        for dim in search_dimensions:
-            if search_count >= max_searches:
-                break
-            
-            # 选择搜索引擎（轮流使用）
-            available_providers = [p for p in self._providers if p.is_available]
-            if not available_providers:
-                break
-            
-            provider = available_providers[provider_index % len(available_providers)]
-            provider_index += 1
-            
-            logger.info(f"[情报搜索] {dim['desc']}: 使用 {provider.name}")
+        搜索维度：
+        1. 最新消息 - 近期新闻动态
+        2. 风险排查 - 减持、处罚、利空
+        3. 业绩预期 - 年报预告、业绩快报
+        
+        Args:
+            stock_code: 股票代码
+            stock_name: 股票名称
+            max_searches: 最大搜索次数
             
-            response = provider.search(dim['query'], max_results=3, days=self.news_max_age_days)
-            results[dim['name']] = response
-            search_count += 1
+        Returns:
+            {维度名称: SearchResponse} 字典（按维度定义顺序）
+        """
+        search_dimensions = self._build_intel_dimensions(stock_code, stock_name)[:max(0, max_searches)]
+        
+        available_providers = [p for p in self._providers if p.is_available]
+        if not available_providers or not search_dimensions:
+            return {}
+        
+        responses: Dict[str, SearchResponse] = {}
+        cache_keys: Dict[str, str] = {}
+        pending = []
+        for index, dim in enumerate(search_dimensions):
+            cache_key = self._cache_key(dim['query'], 3, self.news_max_age_days)
+            cache_keys[dim['name']] = cache_key
+            cached = self._get_cached(cache_key)
+            if cached is not None:
+                shared = f"（{dim['sector']} 行业共享）" if dim.get('sector') else ""
+                logger.info(f"[情报搜索] {dim['desc']}: 使用缓存结果{shared}")
+                responses[dim['name']] = cached
+            else:
+                pending.append((index, dim))
+        
+        if not pending:
+            ordered = {dim['name']: responses[dim['name']] for dim in search_dimensions}
+            return self._dedup_intel(ordered, stock_name, stock_code)
+        
+        logger.info(f"开始多维度情报搜索: {stock_name}({stock_code})，共 {len(pending)} 个维度并发执行")
+        
+        executor = ThreadPoolExecutor(
+            max_workers=len(pending),
+            thread_name_prefix="intel_search",
+        )
+        future_to_dim = {}
+        try:
+            # 轮流使用不同的搜索引擎
+            for index, dim in pending:
+                provider = available_providers[index % len(available_providers)]
+                logger.info(f"[情报搜索] {dim['desc']}: 使用 {provider.name}")
+                if dim.get('sector'):
+                    future = executor.submit(bind_context(self._search_shared), provider, dim['query'])
+                else:
+                    future = executor.submit(
+                        bind_context(provider.search), dim['query'], max_results=3, days=self.news_max_age_days
+                    )
+                future_to_dim[future] = dim
             
+            done, not_done = wait(future_to_dim, timeout=self.intel_timeout)
+        finally:
+            # 不等待超时的请求，避免拖慢单只股票的分析
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        for future in done:
+            dim = future_to_dim[future]
+            try:
+                response = future.result()
+            except Exception as e:
+                logger.warning(f"[情报搜索] {dim['desc']}: 搜索异常 - {e}")
+                continue
+            responses[dim['name']] = response
             if response.success:
                 logger.info(f"[情报搜索] {dim['desc']}: 获取 {len(response.results)} 条结果")
+                if response.results and not dim.get('sector'):
+                    self._put_cache(cache_keys[dim['name']], response, dimension=dim['name'])
             else:
                 logger.warning(f"[情报搜索] {dim['desc']}: 搜索失败 - {response.error_message}")
-            
-            # 短暂延迟避免请求过快
-            time.sleep(0.5)
         
-        return results
+        if not_done:
+            timed_out = [future_to_dim[f]['desc'] for f in not_done]
+            logger.warning(
+                f"[情报搜索] {stock_name}({stock_code}) 超过 {self.intel_timeout:.0f}s 未完成的维度已跳过: "
+                f"{', '.join(timed_out)}"
+            )
+        
+        # 按维度定义顺序返回，保证报告输出稳定
+        ordered = {dim['name']: responses[dim['name']] for dim in search_dimensions if dim['name'] in responses}
+        return self._dedup_intel(ordered, stock_name, stock_code)
+
+    def _stable_intel_dimensions(
+        self,
+        stock_code: str,
+        stock_name: str,
+        max_searches: int,
+        min_ttl: int,
+    ) -> List[Tuple[int, Dict[str, str]]]:
+        """缓存有效期不短于 min_ttl 的情报维度（保留维度序号，用于与正式运行一致地轮换搜索引擎）"""
+        dimensions = self._build_intel_dimensions(stock_code, stock_name)[:max(0, max_searches)]
+        return [
+            (index, dim) for index, dim in enumerate(dimensions)
+            if self.CACHE_TTL_BY_DIMENSION.get(dim['name'], self.DEFAULT_CACHE_TTL) >= min_ttl
+        ]
+
+    def warm_intel_cache(
+        self,
+        stock_code: str,
+        stock_name: str,
+        max_searches: int = 5,
+        min_ttl: int = 3600,
+    ) -> int:
+        """
+        预热低波动情报维度的搜索缓存（盘前预热任务使用）
+
+        只搜索缓存有效期不短于 min_ttl 的维度（如机构分析、业绩预期、行业分析），
+        查询与缓存键与 search_comprehensive_intel 完全一致，正式运行时可直接命中；
+        时效性强的新闻维度仍在正式运行时实时搜索。
+
+        Args:
+            stock_code: 股票代码
+            stock_name: 股票名称（须与正式运行使用的名称一致）
+            max_searches: 与 search_comprehensive_intel 相同的维度数上限
+            min_ttl: 参与预热的维度最短缓存有效期（秒）
+
+        Returns:
+            本次实际搜索并写入缓存的维度数
+        """
+        available_providers = [p for p in self._providers if p.is_available]
+        if not available_providers:
+            return 0
+
+        warmed = 0
+        for index, dim in self._stable_intel_dimensions(stock_code, stock_name, max_searches, min_ttl):
+            cache_key = self._cache_key(dim['query'], 3, self.news_max_age_days)
+            if self._cache.contains(cache_key):
+                continue
+            provider = available_providers[index % len(available_providers)]
+            try:
+                if dim.get('sector'):
+                    response = self._search_shared(provider, dim['query'])
+                else:
+                    response = provider.search(dim['query'], max_results=3, days=self.news_max_age_days)
+                    if response.success and response.results:
+                        self._put_cache(cache_key, response, dimension=dim['name'])
+            except Exception as e:
+                logger.warning(f"[缓存预热] {stock_name}({stock_code}) {dim['desc']}: 搜索异常 - {e}")
+                continue
+            if response.success and response.results:
+                warmed += 1
+        return warmed
+
+    def count_cached_intel(
+        self,
+        stock_code: str,
+        stock_name: str,
+        max_searches: int = 5,
+        min_ttl: int = 3600,
+    ) -> Tuple[int, int]:
+        """
+        统计低波动情报维度的缓存就绪情况
+
+        Returns:
+            (已缓存维度数, 维度总数)
+        """
+        dimensions = self._stable_intel_dimensions(stock_code, stock_name, max_searches, min_ttl)
+        cached = sum(
+            1 for _, dim in dimensions
+            if self._cache.contains(self._cache_key(dim['query'], 3, self.news_max_age_days))
+        )
+        return cached, len(dimensions)
+
+    def _dedup_intel(
+        self,
+        intel_results: Dict[str, SearchResponse],
+        stock_name: str,
+        stock_code: str,
+    ) -> Dict[str, SearchResponse]:
+        """跨维度折叠近似重复新闻，并累计去重统计"""
+        deduped, total, removed = dedup_search_results(intel_results)
+        with self._dedup_lock:
+            self._dedup_stats['total'] += total
+            self._dedup_stats['removed'] += removed
+        if removed:
+            logger.info(f"[情报搜索] {stock_name}({stock_code}) 折叠近似重复新闻 {removed}/{total} 条")
+        return deduped
     
     def format_intel_report(self, intel_results: Dict[str, SearchResponse], stock_name: str) -> str:
         """
@@ -1522,6 +2215,10 @@ def get_search_service() -> SearchService:
             brave_keys=config.brave_api_keys,
             serpapi_keys=config.serpapi_keys,
             news_max_age_days=config.news_max_age_days,
+            intel_timeout=config.search_intel_timeout,
+            provider_max_concurrency=config.search_provider_max_concurrency,
+            cache_persist=config.search_cache_persist,
+            cache_max_entries=config.search_cache_max_entries,
         )
     
     return _search_service
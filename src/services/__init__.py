@@ -11,10 +11,12 @@
 from src.services.analysis_service import AnalysisService
 from src.services.backtest_service import BacktestService
 from src.services.history_service import HistoryService
+from src.services.run_service import AnalysisRunService
 from src.services.stock_service import StockService
 from src.services.task_service import TaskService, get_task_service
 
 __all__ = [
+    "AnalysisRunService",
     "AnalysisService",
     "BacktestService",
     "HistoryService",
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+复权因子维护服务层
+===================================
+
+职责：
+1. 从数据源刷新复权因子（adj_factors）
+2. 由不复权日线 × 复权因子在本地重建 stock_daily 中的前复权日线（含均线/量比），
+   回测、分析与列式日线存储继续读取 stock_daily，无需改动
+3. 发生分红送转后只刷新复权因子：因子阶梯变化时在本地重算前复权价格，不重新下载历史日线
+4. 已做过不复权回填的股票在日常更新时增量同步不复权日线（sync_raw_daily），不再写入数据源的前复权日线
+
+说明：
+- 只有不复权日线已入库的股票才会重建前复权日线；其余股票只更新因子，并在刷新结果中列出（no_raw_codes）
+- 因子变化时删除不复权日线区间以外的前复权日线（旧复权基准），需要时由数据源按新基准重新获取
+- 回填时不复权日线由 BackfillService 直接入库，复权因子经同一数据源通道（及其限速）获取（fetch_factors），
+  与日线一起在获取成功后入库（save_factors）
+"""
+
+import logging
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from data_provider.base import BaseFetcher, DataFetchError, DataFetcherManager, normalize_stock_code
+from src.core.price_adjust import ADJUST_QFQ, ADJUST_RAW
+from src.storage import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+# 本地重建的前复权日线在 stock_daily 中的 data_source
+LOCAL_ADJUST_SOURCE = "LocalAdjust"
+
+
+class AdjustmentService:
+    """
+    复权因子维护服务
+
+    封装复权因子刷新与前复权日线重建
+    """
+
+    def __init__(
+        self,
+        db_manager: Optional[DatabaseManager] = None,
+        fetcher_manager: Optional[DataFetcherManager] = None,
+    ):
+        """
+        Args:
+            db_manager: 数据库管理器（可选，默认使用单例）
+            fetcher_manager: 数据源管理器（可选，默认创建全部已配置的数据源）
+        """
+        self.db = db_manager or DatabaseManager.get_instance()
+        self._fetcher_manager = fetcher_manager
+
+    @property
+    def fetcher_manager(self) -> DataFetcherManager:
+        if self._fetcher_manager is None:
+            self._fetcher_manager = DataFetcherManager()
+        return self._fetcher_manager
+
+    def rebuild_daily(self, code: str, prune: bool = False) -> int:
+        """
+        由不复权日线与已保存的复权因子重建 stock_daily 中的前复权日线
+
+        均线与量比基于完整的前复权序列重新计算
+
+        Args:
+            code: 股票代码
+            prune: 是否删除不复权日线区间以外的前复权日线（复权因子变化后，这些由数据源提供的
+                   前复权价格仍是旧的复权基准，保留会让同一序列混用两种基准）
+
+        Returns:
+            写入的日线条数（没有不复权日线时为 0）
+        """
+        frame = self.db.get_adjusted_daily_data(code, adjust=ADJUST_QFQ)
+        if frame.empty:
+            return 0
+        if prune:
+            first, last = frame['date'].iloc[0].date(), frame['date'].iloc[-1].date()
+            removed = self.db.delete_daily_outside(code, first, last)
+            if removed:
+                logger.info(f"[复权] {code} 删除 {removed} 条不复权日线区间（{first} ~ {last}）以外的旧基准前复权日线")
+        frame = BaseFetcher._calculate_indicators(frame.drop(columns=['code']))
+        self.db.save_daily_data(frame, code, LOCAL_ADJUST_SOURCE)
+        return len(frame)
+
+    def fetch_factors(self, code: str, fetcher: Optional[BaseFetcher] = None) -> Tuple[pd.DataFrame, str]:
+        """
+        从数据源获取一只股票的复权因子（不入库）
+
+        Args:
+            code: 股票代码
+            fetcher: 指定数据源；为空时按优先级自动切换
+
+        Raises:
+            DataFetchError: 没有数据源能提供复权因子
+
+        Returns:
+            (复权因子, 数据源名称)
+        """
+        code = normalize_stock_code(code)
+        if fetcher is None:
+            return self.fetcher_manager.get_adj_factors(code)
+        factors = fetcher.get_adj_factors(code)
+        if factors is None or factors.empty:
+            raise DataFetchError(f"[{fetcher.name}] 未能获取 {code} 的复权因子")
+        return factors, fetcher.name
+
+    def save_factors(self, code: str, factors: pd.DataFrame, source: str, rebuild: bool = False) -> Dict[str, Any]:
+        """
+        保存已获取的复权因子，因子变化（或 rebuild=True）时重建前复权日线
+
+        Returns:
+            {"code", "changed", "data_source", "rebuilt", "has_raw"}；
+            has_raw 为 False 表示没有不复权日线，前复权日线无法在本地重建
+        """
+        code = normalize_stock_code(code)
+        changed = self.db.save_adj_factors(code, factors, source)
+        has_raw = self.db.get_raw_date_range(code) is not None
+        rebuilt = self.rebuild_daily(code, prune=changed) if has_raw and (changed or rebuild) else 0
+        if rebuilt:
+            logger.info(f"[复权] {code} 已按最新复权因子重建 {rebuilt} 条前复权日线")
+        return {"code": code, "changed": changed, "data_source": source, "rebuilt": rebuilt, "has_raw": has_raw}
+
+    def refresh_factors(
+        self, code: str, rebuild: bool = False, fetcher: Optional[BaseFetcher] = None,
+    ) -> Dict[str, Any]:
+        """
+        从数据源刷新一只股票的复权因子，因子变化（或 rebuild=True）时重建前复权日线
+
+        Args:
+            code: 股票代码
+            rebuild: 因子未变化时是否也重建前复权日线
+            fetcher: 指定数据源；为空时按优先级自动切换
+
+        Raises:
+            DataFetchError: 没有数据源能提供复权因子
+
+        Returns:
+            见 save_factors
+        """
+        factors, source = self.fetch_factors(code, fetcher)
+        return self.save_factors(code, factors, source, rebuild=rebuild)
+
+    def sync_raw_daily(self, code: str) -> Optional[Dict[str, Any]]:
+        """
+        增量同步已做过不复权回填的股票：获取最近的不复权日线并刷新复权因子、重建前复权日线
+
+        这类股票的 stock_daily 完全由本地重建，日常更新不再写入数据源的前复权日线，
+        避免除权后新旧复权基准混在同一序列中
+
+        Raises:
+            DataFetchError: 没有数据源能提供不复权日线或复权因子
+
+        Returns:
+            {"code", "saved", "data_source", "rebuilt", ...}；没有不复权日线的股票返回 None（调用方按前复权日线处理）
+        """
+        code = normalize_stock_code(code)
+        raw_range = self.db.get_raw_date_range(code)
+        if raw_range is None:
+            return None
+        # 从已入库的最后一天开始获取，补齐中间可能缺失的交易日
+        df, source = self.fetcher_manager.get_daily_data(
+            code, start_date=raw_range[1].isoformat(), adjust=ADJUST_RAW,
+        )
+        saved = self.db.save_raw_daily_data(df, code, source)
+        # 复权因子优先取自提供不复权日线的同一数据源
+        fetcher = next((f for f in self.fetcher_manager.fetchers if f.name == source), None)
+        item = self.refresh_factors(code, rebuild=True, fetcher=fetcher)
+        return dict(item, saved=saved, data_source=source)
+
+    def refresh_many(self, codes: Sequence[str]) -> Dict[str, Any]:
+        """
+        批量刷新复权因子（逐只处理，单只失败不影响其他股票）
+
+        Returns:
+            {"total", "changed", "unchanged", "failed", "rebuilt_bars", "failed_codes", "no_raw_codes"}
+        """
+        result: Dict[str, Any] = {
+            "total": 0, "changed": 0, "unchanged": 0, "failed": 0, "rebuilt_bars": 0, "failed_codes": {},
+            "no_raw_codes": [],
+        }
+        for code in dict.fromkeys(normalize_stock_code(c) for c in codes if c and c.strip()):
+            result["total"] += 1
+            try:
+                item = self.refresh_factors(code)
+            except Exception as e:
+                logger.warning(f"[复权] {code} 刷新复权因子失败: {e}")
+                result["failed"] += 1
+                result["failed_codes"][code] = str(e)
+                continue
+            result["changed" if item["changed"] else "unchanged"] += 1
+            result["rebuilt_bars"] += item["rebuilt"]
+            if not item["has_raw"]:
+                result["no_raw_codes"].append(code)
+        logger.info(
+            f"[复权] 刷新完成: 共 {result['total']} 只，因子变化 {result['changed']}，"
+            f"未变化 {result['unchanged']}，失败 {result['failed']}，重建 {result['rebuilt_bars']} 条日线"
+        )
+        if result["no_raw_codes"]:
+            logger.warning(
+                f"[复权] {len(result['no_raw_codes'])} 只股票没有不复权日线，只保存了因子、未重建前复权日线"
+                f"（需先执行 --backfill-raw）: {', '.join(result['no_raw_codes'])}"
+            )
+        return result
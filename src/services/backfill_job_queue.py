@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+历史日线回填后台任务
+===================================
+
+职责：
+1. 基于 CancellableJobQueue（线程池、重复提交保护、SSE 广播与取消），在后台运行 BackfillService.run
+2. 每完成一只股票推送一次进度（含实时吞吐量），支持取消（处理中的股票完成后停止）
+
+说明：
+- 同一时间只运行一个回填任务：各数据源的限速额度由所有回填共享，并行运行只会互相挤占
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import logging
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional
+
+from src.services.task_queue import CancellableJobQueue, TaskInfo
+
+logger = logging.getLogger(__name__)
+
+# 回填任务的重复提交保护键（全局只允许一个回填任务）
+BACKFILL_KEY = "backfill"
+
+
+@dataclass
+class BackfillJobInfo(TaskInfo):
+    """回填任务状态"""
+
+    params: Dict[str, Any] = dataclasses.field(default_factory=dict)
+    total: int = 0
+    processed: int = 0
+    done: int = 0
+    failed: int = 0
+    skipped: int = 0
+    bars: int = 0
+    bars_per_second: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = super().to_dict()
+        for name in ("stock_code", "stock_name", "report_type"):
+            data.pop(name, None)
+        data.update(
+            params=dict(self.params),
+            total=self.total,
+            processed=self.processed,
+            done=self.done,
+            failed=self.failed,
+            skipped=self.skipped,
+            bars=self.bars,
+            bars_per_second=self.bars_per_second,
+            sources=dict((self.result or {}).get("sources", {})),
+        )
+        return data
+
+    def copy(self) -> 'BackfillJobInfo':
+        return dataclasses.replace(self, params=dict(self.params))
+
+
+class BackfillJobQueue(CancellableJobQueue):
+    """
+    回填后台任务队列（单例）
+
+    广播事件：backfill_created、backfill_started、backfill_progress、
+    backfill_completed、backfill_failed、backfill_cancelled
+    """
+
+    _instance: Optional['BackfillJobQueue'] = None
+    _instance_lock = threading.Lock()
+    _thread_name_prefix = "backfill_job_"
+    _event_prefix = "backfill"
+    _log_tag = "[BackfillJobs]"
+    _job_label = "回填"
+    _progress_fields = ("total", "processed", "done", "failed", "skipped", "bars")
+
+    def submit_backfill(
+        self,
+        *,
+        codes: Optional[List[str]],
+        start: date,
+        end: date,
+        resume: bool = True,
+        raw: bool = False,
+    ) -> BackfillJobInfo:
+        """
+        提交回填任务
+
+        Args:
+            codes: 股票代码列表（为空或 "all" 表示全部沪深 A 股）
+            start: 起始日期
+            end: 结束日期
+            resume: 是否跳过检查点中已完成的股票
+            raw: 是否回填不复权日线与复权因子
+
+        Raises:
+            DuplicateTaskError: 已有回填任务在运行
+        """
+        params = {
+            "codes": list(codes or []),
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "resume": resume,
+            "raw": raw,
+        }
+        job = BackfillJobInfo(
+            task_id=uuid.uuid4().hex,
+            stock_code="",
+            message="回填任务已加入队列",
+            report_type="backfill",
+            params=params,
+        )
+        return self._submit_job(BACKFILL_KEY, job, params)
+
+    def _run_job(
+        self,
+        params: Dict[str, Any],
+        progress_callback: Callable[[Dict[str, int]], None],
+        cancel_event: threading.Event,
+    ) -> Dict[str, Any]:
+        # 延迟导入避免循环依赖
+        from src.services.backfill_service import BackfillService
+
+        return BackfillService().run(
+            params["codes"],
+            date.fromisoformat(params["start_date"]),
+            date.fromisoformat(params["end_date"]),
+            resume=params["resume"],
+            raw=params.get("raw", False),
+            progress_callback=progress_callback,
+            cancel_event=cancel_event,
+        )
+
+    def _apply_progress(self, job: BackfillJobInfo, stats: Dict[str, int], elapsed: float) -> None:
+        super()._apply_progress(job, stats, elapsed)
+        job.bars_per_second = round(job.bars / elapsed, 1) if elapsed > 0 else 0.0
+
+    def _apply_result(self, job: BackfillJobInfo, result: Dict[str, Any]) -> None:
+        job.bars_per_second = result.get("bars_per_second", job.bars_per_second)
+
+    def _completed_message(self, job: BackfillJobInfo) -> str:
+        return f"回填完成：成功 {job.done}，失败 {job.failed}，跳过 {job.skipped}"
+
+
+def get_backfill_job_queue() -> BackfillJobQueue:
+    """获取回填任务队列单例"""
+    return BackfillJobQueue()
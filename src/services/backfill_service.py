@@ -0,0 +1,398 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+历史日线回填服务层
+===================================
+
+职责：
+1. 按股票列表（或全部沪深 A 股）与日期区间批量回填 stock_daily
+2. 所有已配置的数据源并行获取：每个数据源一条通道，通道内并发数与限速独立配置，
+   数据源自身的限速（akshare 随机休眠、tushare 每分钟配额等）照常生效
+3. 某只股票在一个数据源失败后重新入队，交给尚未尝试过的数据源；连续报错的数据源退出本次回填
+4. 按股票记录检查点（backfill_checkpoints），中断后重新运行只处理未完成的股票
+5. 统计吞吐量（日线条数/秒），整体与分数据源分别统计
+6. 不复权模式（raw=True）：只使用支持不复权日线的数据源，保存不复权日线与同一数据源的复权因子，
+   再在本地重建前复权日线（之后分红送转只需刷新复权因子）
+
+说明：
+- 检查点不区分复权模式，从前复权回填切换到不复权回填时需关闭续跑（resume=False）
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Set
+
+from data_provider.base import BaseFetcher, DataFetcherManager, normalize_stock_code
+from src.config import get_config
+from src.core.price_adjust import ADJUST_QFQ, ADJUST_RAW
+from src.core.staged_pipeline import RateLimiter
+from src.core.trading_calendar import get_market_for_code
+from src.repositories.backfill_repo import BackfillRepository
+from src.services.adjustment_service import AdjustmentService
+from src.storage import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+# 表示“全部沪深 A 股”的代码列表
+ALL_A_SHARES = "all"
+
+# 数据源连续报错达到该次数后退出本次回填（剩余股票交给其他数据源）
+_MAX_CONSECUTIVE_ERRORS = 5
+
+# 美股只能由该数据源获取
+_US_SOURCE = "YfinanceFetcher"
+
+
+class _NoData(Exception):
+    """数据源返回空数据（股票未上市/停牌等，不计入数据源的连续报错）"""
+
+
+@dataclass
+class _Item:
+    """待回填的股票及已尝试过的数据源"""
+    code: str
+    tried: Set[str] = field(default_factory=set)
+    last_error: str = ""
+
+
+@dataclass
+class _SourceStats:
+    """单个数据源的回填统计"""
+    done: int = 0
+    errors: int = 0
+    bars: int = 0
+    seconds: float = 0.0
+    consecutive_errors: int = 0
+    retired: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "done": self.done,
+            "errors": self.errors,
+            "bars": self.bars,
+            "bars_per_second": round(self.bars / self.seconds, 1) if self.seconds > 0 else 0.0,
+            "retired": self.retired,
+        }
+
+
+class _Scheduler:
+    """
+    多数据源共享的股票调度器（线程安全）
+
+    各数据源通道从同一队列领取自己尚未尝试过的股票；队列中暂无可领取的股票、
+    但仍有其他通道在处理中（可能失败后重新入队）时等待，全部结束后通道退出。
+    """
+
+    def __init__(self, codes: Sequence[str], sources: Sequence[str]):
+        self._pending: Deque[_Item] = deque(_Item(code) for code in codes)
+        self._sources = list(sources)
+        self._retired: Set[str] = set()
+        self._in_flight = 0
+        self._cond = threading.Condition()
+
+    def _eligible(self, item: _Item) -> List[str]:
+        """可处理该股票、尚未尝试且仍在运行的数据源"""
+        if get_market_for_code(item.code) == "us":
+            candidates = [s for s in self._sources if s == _US_SOURCE]
+        else:
+            candidates = self._sources
+        return [s for s in candidates if s not in item.tried and s not in self._retired]
+
+    def take(self, source: str, cancel_event: Optional[threading.Event]) -> Optional[_Item]:
+        """为 source 领取一只股票；没有可领取的股票且无处理中的股票（或已取消/已退出）时返回 None"""
+        with self._cond:
+            while True:
+                if source in self._retired or (cancel_event is not None and cancel_event.is_set()):
+                    return None
+                for item in self._pending:
+                    if source in self._eligible(item):
+                        self._pending.remove(item)
+                        self._in_flight += 1
+                        return item
+                if self._in_flight == 0:
+                    return None
+                self._cond.wait(timeout=1.0)
+
+    def finish(self, item: _Item) -> None:
+        """股票处理完成（成功或已无可尝试的数据源）"""
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def retry(self, item: _Item, source: str, error: str) -> bool:
+        """
+        记录 source 处理失败并重新入队
+
+        Returns:
+            False 表示已没有可尝试的数据源（调用方需记为最终失败）
+        """
+        with self._cond:
+            self._in_flight -= 1
+            item.tried.add(source)
+            item.last_error = f"[{source}] {error}"
+            requeued = bool(self._eligible(item))
+            if requeued:
+                self._pending.appendleft(item)
+            self._cond.notify_all()
+            return requeued
+
+    def retire(self, source: str) -> List[_Item]:
+        """数据源退出本次回填，返回因此再无可尝试数据源的待处理股票（调用方记为失败）"""
+        with self._cond:
+            self._retired.add(source)
+            orphans = [item for item in self._pending if not self._eligible(item)]
+            for item in orphans:
+                self._pending.remove(item)
+            self._cond.notify_all()
+            return orphans
+
+    def drain(self) -> List[_Item]:
+        """取出所有未处理的股票（取消，或没有任何数据源能处理）"""
+        with self._cond:
+            items = list(self._pending)
+            self._pending.clear()
+            return items
+
+
+class BackfillService:
+    """
+    历史日线回填服务
+
+    封装股票列表解析、多数据源并行获取、批量写入与检查点续跑
+    """
+
+    def __init__(
+        self,
+        db_manager: Optional[DatabaseManager] = None,
+        fetcher_manager: Optional[DataFetcherManager] = None,
+        workers_per_source: Optional[int] = None,
+        source_rpm: Optional[float] = None,
+    ):
+        """
+        Args:
+            db_manager: 数据库管理器（可选，默认使用单例）
+            fetcher_manager: 数据源管理器（可选，默认创建全部已配置的数据源）
+            workers_per_source: 每个数据源的并发线程数（默认 BACKFILL_WORKERS_PER_SOURCE）
+            source_rpm: 每个数据源额外的限速，次/分钟（默认 BACKFILL_SOURCE_RPM）
+        """
+        config = get_config()
+        self.db = db_manager or DatabaseManager.get_instance()
+        self.repo = BackfillRepository(self.db)
+        self._fetcher_manager = fetcher_manager
+        self.workers_per_source = max(1, int(
+            workers_per_source if workers_per_source is not None
+            else getattr(config, 'backfill_workers_per_source', 1)
+        ))
+        self.source_rpm = max(0.0, float(
+            source_rpm if source_rpm is not None else getattr(config, 'backfill_source_rpm', 0.0)
+        ))
+
+    @property
+    def fetcher_manager(self) -> DataFetcherManager:
+        if self._fetcher_manager is None:
+            self._fetcher_manager = DataFetcherManager()
+        return self._fetcher_manager
+
+    def resolve_codes(self, codes: Optional[Sequence[str]]) -> List[str]:
+        """
+        解析回填股票列表（去重、标准化）
+
+        Args:
+            codes: 股票代码列表；为空或包含 "all" 时使用全部沪深 A 股
+        """
+        cleaned = [c.strip() for c in (codes or []) if c and c.strip()]
+        if not cleaned or any(c.lower() == ALL_A_SHARES for c in cleaned):
+            return self.fetcher_manager.get_a_share_codes()
+        return list(dict.fromkeys(normalize_stock_code(c) for c in cleaned))
+
+    def run(
+        self,
+        codes: Optional[Sequence[str]],
+        start: date,
+        end: date,
+        *,
+        resume: bool = True,
+        raw: bool = False,
+        progress_callback: Optional[Callable[[Dict[str, int]], None]] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Dict[str, Any]:
+        """
+        回填 [start, end] 区间的日线
+
+        Args:
+            codes: 股票代码列表（为空或 "all" 表示全部沪深 A 股）
+            start: 起始日期
+            end: 结束日期
+            resume: 是否跳过检查点中已完成该区间的股票
+            raw: 是否回填不复权日线与复权因子（前复权日线在本地重建）
+            progress_callback: 每完成一只股票回调一次进度（total/processed/done/failed/skipped/bars）
+            cancel_event: 置位后不再领取新股票，已在处理中的股票完成后返回
+
+        Returns:
+            回填结果统计（含整体与分数据源的吞吐量）
+        """
+        if start > end:
+            raise ValueError(f"起始日期 {start} 晚于结束日期 {end}")
+
+        all_codes = self.resolve_codes(codes)
+        done_codes = self.repo.get_done_codes(all_codes, start, end) if resume else set()
+        todo = [c for c in all_codes if c not in done_codes]
+
+        fetchers = self.fetcher_manager.fetchers
+        adjust = ADJUST_QFQ
+        if raw:
+            fetchers = [f for f in fetchers if f.supports_raw_daily]
+            adjust = ADJUST_RAW
+            adjuster = AdjustmentService(self.db, self.fetcher_manager)
+        source_stats = {f.name: _SourceStats() for f in fetchers}
+        scheduler = _Scheduler(todo, [f.name for f in fetchers])
+        lock = threading.Lock()
+        progress = {
+            "total": len(all_codes),
+            "processed": len(done_codes),
+            "done": 0,
+            "failed": 0,
+            "skipped": len(done_codes),
+            "bars": 0,
+        }
+        failed_codes: Dict[str, str] = {}
+
+        def report() -> None:
+            if progress_callback is None:
+                return
+            with lock:
+                snapshot = dict(progress)
+            try:
+                progress_callback(snapshot)
+            except Exception as e:
+                logger.debug(f"[回填] 进度回调失败: {e}")
+
+        def record_failure(item: _Item) -> None:
+            self.repo.save_checkpoint(
+                item.code, start, end, BackfillRepository.STATUS_FAILED, error=item.last_error,
+            )
+            with lock:
+                progress["processed"] += 1
+                progress["failed"] += 1
+                failed_codes[item.code] = item.last_error
+            logger.warning(f"[回填] {item.code} 回填失败: {item.last_error}")
+
+        def lane(fetcher: BaseFetcher, limiter: RateLimiter) -> None:
+            stats = source_stats[fetcher.name]
+            while True:
+                item = scheduler.take(fetcher.name, cancel_event)
+                if item is None:
+                    return
+                limiter.acquire()
+                began = time.monotonic()
+                try:
+                    df = fetcher.get_daily_data(
+                        stock_code=item.code,
+                        start_date=start.isoformat(),
+                        end_date=end.isoformat(),
+                        adjust=adjust,
+                    )
+                    if df is None or df.empty:
+                        raise _NoData("区间内无数据")
+                    if raw:
+                        # 复权因子由同一数据源提供，与日线共用本通道的限速
+                        limiter.acquire()
+                        factors, _ = adjuster.fetch_factors(item.code, fetcher)
+                except Exception as e:
+                    is_error = not isinstance(e, _NoData)
+                    with lock:
+                        stats.seconds += time.monotonic() - began
+                        if is_error:
+                            stats.errors += 1
+                            stats.consecutive_errors += 1
+                        retire = is_error and stats.consecutive_errors >= _MAX_CONSECUTIVE_ERRORS \
+                            and not stats.retired
+                        if retire:
+                            stats.retired = True
+                    if not scheduler.retry(item, fetcher.name, str(e)):
+                        record_failure(item)
+                    if retire:
+                        logger.warning(f"[回填] {fetcher.name} 连续失败 {stats.consecutive_errors} 次，退出本次回填")
+                        for orphan in scheduler.retire(fetcher.name):
+                            record_failure(orphan)
+                    report()
+                    continue
+
+                # 本地入库失败（数据库锁、磁盘等）与数据源无关：不计入该数据源的错误，也不换源重试，直接记为该股票失败
+                bars = len(df)
+                try:
+                    if raw:
+                        self.db.save_raw_daily_data(df, item.code, fetcher.name)
+                        adjuster.save_factors(item.code, factors, fetcher.name, rebuild=True)
+                    else:
+                        self.db.save_daily_data(df, item.code, fetcher.name)
+                    self.repo.save_checkpoint(
+                        item.code, start, end, BackfillRepository.STATUS_DONE, bars=bars, data_source=fetcher.name,
+                    )
+                except Exception as e:
+                    with lock:
+                        stats.seconds += time.monotonic() - began
+                        stats.consecutive_errors = 0
+                    item.last_error = f"[保存失败] {e}"
+                    scheduler.finish(item)
+                    record_failure(item)
+                    report()
+                    continue
+
+                with lock:
+                    stats.seconds += time.monotonic() - began
+                    stats.done += 1
+                    stats.bars += bars
+                    stats.consecutive_errors = 0
+                    progress["processed"] += 1
+                    progress["done"] += 1
+                    progress["bars"] += bars
+                scheduler.finish(item)
+                report()
+
+        logger.info(
+            f"[回填] {start} ~ {end}{'（不复权）' if raw else ''}: 共 {len(all_codes)} 只，跳过已完成 {len(done_codes)} 只，"
+            f"数据源 {len(fetchers)} 个 × {self.workers_per_source} 线程"
+        )
+        report()
+        began = time.monotonic()
+        threads = []
+        for fetcher in fetchers:
+            limiter = RateLimiter(self.source_rpm)
+            for i in range(self.workers_per_source):
+                thread = threading.Thread(
+                    target=lane, args=(fetcher, limiter), name=f"backfill_{fetcher.name}_{i}", daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - began
+
+        leftover = scheduler.drain()
+        cancelled = bool(cancel_event is not None and cancel_event.is_set() and leftover)
+        if not cancelled:
+            for item in leftover:
+                item.last_error = item.last_error or "没有可处理该股票的数据源"
+                record_failure(item)
+        result: Dict[str, Any] = dict(progress)
+        result.update({
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "raw": raw,
+            "elapsed_seconds": round(elapsed, 2),
+            "bars_per_second": round(progress["bars"] / elapsed, 1) if elapsed > 0 else 0.0,
+            "cancelled": cancelled,
+            "sources": {name: stats.to_dict() for name, stats in source_stats.items()},
+            "failed_codes": failed_codes,
+        })
+        logger.info(
+            f"[回填] 完成: 成功 {result['done']}，失败 {result['failed']}，跳过 {result['skipped']}，"
+            f"{result['bars']} 条日线，{result['elapsed_seconds']}s，{result['bars_per_second']} 条/秒"
+            + ("（已取消）" if cancelled else "")
+        )
+        return result
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""Background backtest jobs.
+
+Built on CancellableJobQueue (thread pool, duplicate-submission guard, SSE
+broadcasting and cancellation): a job runs BacktestService.run_backtest in a
+worker thread, publishes processed/completed/insufficient counts after every
+saved chunk and can be cancelled between chunks.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import logging
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.services.task_queue import CancellableJobQueue, TaskInfo
+
+logger = logging.getLogger(__name__)
+
+# Duplicate-guard key of a job that covers every stock
+ALL_CODES_KEY = "*"
+
+
+@dataclass
+class BacktestJobInfo(TaskInfo):
+    """Backtest job state; stock_code is the requested code ("" for all stocks)."""
+
+    params: Dict[str, Any] = dataclasses.field(default_factory=dict)
+    total: int = 0
+    processed: int = 0
+    saved: int = 0
+    completed: int = 0
+    insufficient: int = 0
+    errors: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = super().to_dict()
+        data.pop("report_type", None)
+        data.pop("stock_name", None)
+        data.update(
+            code=data.pop("stock_code") or None,
+            params=dict(self.params),
+            total=self.total,
+            processed=self.processed,
+            saved=self.saved,
+            completed=self.completed,
+            insufficient=self.insufficient,
+            errors=self.errors,
+        )
+        return data
+
+    def copy(self) -> 'BacktestJobInfo':
+        return dataclasses.replace(self, params=dict(self.params))
+
+
+class BacktestJobQueue(CancellableJobQueue):
+    """Singleton queue of background backtest jobs.
+
+    Events broadcast to subscribers: backtest_created, backtest_started,
+    backtest_progress, backtest_completed, backtest_failed, backtest_cancelled.
+    """
+
+    _instance: Optional['BacktestJobQueue'] = None
+    _instance_lock = threading.Lock()
+    _thread_name_prefix = "backtest_job_"
+    _event_prefix = "backtest"
+    _log_tag = "[BacktestJobs]"
+    _job_label = "回测"
+    _progress_fields = ("total", "processed", "saved", "completed", "insufficient", "errors")
+
+    def submit_backtest(
+        self,
+        *,
+        code: Optional[str] = None,
+        force: bool = False,
+        eval_window_days: Optional[int] = None,
+        min_age_days: Optional[int] = None,
+        limit: int = 200,
+    ) -> BacktestJobInfo:
+        """Queue a backtest run.
+
+        Raises:
+            DuplicateTaskError: an overlapping job is still running (the same code or an
+                all-stocks job; an all-stocks submit conflicts with any running job)
+        """
+        params = {
+            "code": code,
+            "force": force,
+            "eval_window_days": eval_window_days,
+            "min_age_days": min_age_days,
+            "limit": limit,
+        }
+        job = BacktestJobInfo(
+            task_id=uuid.uuid4().hex,
+            stock_code=code or "",
+            message="回测任务已加入队列",
+            report_type="backtest",
+            params=params,
+        )
+        return self._submit_job(code or ALL_CODES_KEY, job, params)
+
+    def _find_conflict(self, key: str) -> Optional[Tuple[str, str]]:
+        """An all-stocks job conflicts with every running job, and every job with a running all-stocks job."""
+        if key == ALL_CODES_KEY:
+            return next(iter(self._analyzing_stocks.items()), None)
+        for scope in (key, ALL_CODES_KEY):
+            task_id = self._analyzing_stocks.get(scope)
+            if task_id is not None:
+                return scope, task_id
+        return None
+
+    def _run_job(
+        self,
+        params: Dict[str, Any],
+        progress_callback: Callable[[Dict[str, int]], None],
+        cancel_event: threading.Event,
+    ) -> Dict[str, Any]:
+        # 延迟导入避免循环依赖
+        from src.services.backtest_service import BacktestService
+
+        return BacktestService().run_backtest(
+            **params,
+            progress_callback=progress_callback,
+            cancel_event=cancel_event,
+        )
+
+
+def get_backtest_job_queue() -> BacktestJobQueue:
+    """Return the backtest job queue singleton."""
+    return BacktestJobQueue()
@@ -5,19 +5,39 @@ from __future__ import annotations
 
 import json
 import logging
+import threading
 from datetime import date, datetime, timedelta
-from typing import Any, Dict, List, Optional
-
-from sqlalchemy import and_, select
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
 from src.config import get_config
-from src.core.backtest_engine import OVERALL_SENTINEL_CODE, BacktestEngine, EvaluationConfig
-from src.repositories.backtest_repo import BacktestRepository
+from src.core.backtest_engine import (
+    OVERALL_SENTINEL_CODE,
+    BacktestEngine,
+    BarArrays,
+    BatchCandidate,
+    EvaluationConfig,
+    SummaryAccumulator,
+)
+from src.core.signal_backtest import backtest_signals
+from src.core.staged_pipeline import Stage, StagedPipelineRunner
+from src.repositories.backtest_repo import BacktestRepository, SummaryMerge
 from src.repositories.stock_repo import StockRepository
 from src.storage import BacktestResult, BacktestSummary, DatabaseManager
 
 logger = logging.getLogger(__name__)
 
+# Metrics reported per grid point by run_sweep
+_SWEEP_METRICS = (
+    "total_evaluations",
+    "completed_count",
+    "insufficient_count",
+    "win_rate_pct",
+    "direction_accuracy_pct",
+    "neutral_rate_pct",
+    "avg_stock_return_pct",
+    "avg_simulated_return_pct",
+)
+
 
 class BacktestService:
     """Service layer to run and query backtests."""
@@ -35,7 +55,15 @@ class BacktestService:
         eval_window_days: Optional[int] = None,
         min_age_days: Optional[int] = None,
         limit: int = 200,
+        progress_callback: Optional[Callable[[Dict[str, int]], None]] = None,
+        cancel_event: Optional[threading.Event] = None,
     ) -> Dict[str, Any]:
+        """Evaluate pending analyses and save results chunk by chunk.
+
+        progress_callback receives total/processed/saved/completed/insufficient/errors
+        after every saved chunk; setting cancel_event stops before the next chunk
+        (already saved chunks are kept and "cancelled" is True in the result).
+        """
         config = get_config()
 
         if eval_window_days is None:
@@ -61,33 +89,81 @@ class BacktestService:
             force=force,
         )
 
-        processed = 0
-        completed = 0
-        insufficient = 0
-        errors = 0
-        touched_codes: set[str] = set()
+        chunk_size = max(1, int(getattr(config, "backtest_chunk_size", 100)))
+        stats = {"processed": 0, "saved": 0, "completed": 0, "insufficient": 0, "errors": 0}
+        cancelled = False
+        if progress_callback is not None:
+            progress_callback({"total": len(candidates), **stats})
+
+        # Each chunk is evaluated and saved on its own, so work done before a
+        # cancellation or crash is kept and counters can be reported as we go.
+        for offset in range(0, len(candidates), chunk_size):
+            if cancel_event is not None and cancel_event.is_set():
+                cancelled = True
+                break
+            chunk = candidates[offset:offset + chunk_size]
+            results_to_save = self._evaluate_chunk(chunk, eval_config, batch_enabled=getattr(config, "backtest_batch_enabled", True))
+
+            statuses = [r.eval_status for r in results_to_save]
+            completed = statuses.count("completed")
+            insufficient = statuses.count("insufficient_data")
+            stats["processed"] += len(chunk)
+            stats["completed"] += completed
+            stats["insufficient"] += insufficient
+            stats["errors"] += len(chunk) - completed - insufficient
+            stats["saved"] += self._save_results(
+                results_to_save,
+                force=force,
+                eval_window_days=int(eval_window_days),
+                engine_version=str(engine_version),
+            )
+            if progress_callback is not None:
+                progress_callback({"total": len(candidates), **stats})
+
+        return {**stats, "cancelled": cancelled}
 
-        results_to_save: List[BacktestResult] = []
+    def _evaluate_chunk(self, candidates: List[Any], eval_config: EvaluationConfig, *, batch_enabled: bool) -> List[BacktestResult]:
+        """Evaluate candidates in batch mode, falling back to sequential evaluation."""
+        results: List[BacktestResult] = []
+        if candidates and batch_enabled:
+            try:
+                results = self._evaluate_batch(candidates, eval_config)
+            except Exception as exc:
+                logger.warning(f"批量回测失败，回退逐条评估: {exc}")
+                results = []
+        if not results:
+            results = self._evaluate_sequential(candidates, eval_config)
+        return results
 
-        for analysis in candidates:
-            processed += 1
-            touched_codes.add(analysis.code)
+    def get_recent_evaluations(self, *, code: Optional[str], eval_window_days: Optional[int] = None, limit: int = 50, page: int = 1) -> Dict[str, Any]:
+        offset = max(page - 1, 0) * limit
+        rows, total = self.repo.get_results_paginated(code=code, eval_window_days=eval_window_days, days=None, offset=offset, limit=limit)
+        items = [self._result_to_dict(r) for r in rows]
+        return {"total": total, "page": page, "limit": limit, "items": items}
+
+    def get_summary(self, *, scope: str, code: Optional[str], eval_window_days: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        config = get_config()
+        engine_version = str(getattr(config, "backtest_engine_version", "v1"))
+        lookup_code = OVERALL_SENTINEL_CODE if scope == "overall" else code
+        summary = self.repo.get_summary(
+            scope=scope,
+            code=lookup_code,
+            eval_window_days=eval_window_days,
+            engine_version=engine_version,
+        )
+        if summary is None:
+            return None
+        return self._summary_to_dict(summary)
 
+    def _evaluate_sequential(self, candidates: List[Any], eval_config: EvaluationConfig) -> List[BacktestResult]:
+        """Evaluate candidates one by one (two queries per analysis)."""
+        eval_window_days = eval_config.eval_window_days
+        results: List[BacktestResult] = []
+        for analysis in candidates:
             try:
                 analysis_date = self._resolve_analysis_date(analysis)
                 if analysis_date is None:
-                    errors += 1
-                    results_to_save.append(
-                        BacktestResult(
-                            analysis_history_id=analysis.id,
-                            code=analysis.code,
-                            eval_window_days=int(eval_window_days),
-                            engine_version=str(engine_version),
-                            eval_status="error",
-                            evaluated_at=datetime.now(),
-                            operation_advice=analysis.operation_advice,
-                        )
-                    )
+                    results.append(self._status_result(analysis, "error", None, eval_config))
                     continue
                 start_daily = self.stock_repo.get_start_daily(code=analysis.code, analysis_date=analysis_date)
 
@@ -96,33 +172,21 @@ class BacktestService:
                     start_daily = self.stock_repo.get_start_daily(code=analysis.code, analysis_date=analysis_date)
 
                 if start_daily is None or start_daily.close is None:
-                    insufficient += 1
-                    results_to_save.append(
-                        BacktestResult(
-                            analysis_history_id=analysis.id,
-                            code=analysis.code,
-                            analysis_date=analysis_date,
-                            eval_window_days=int(eval_window_days),
-                            engine_version=str(engine_version),
-                            eval_status="insufficient_data",
-                            evaluated_at=datetime.now(),
-                            operation_advice=analysis.operation_advice,
-                        )
-                    )
+                    results.append(self._status_result(analysis, "insufficient_data", analysis_date, eval_config))
                     continue
 
                 forward_bars = self.stock_repo.get_forward_bars(
                     code=analysis.code,
                     analysis_date=start_daily.date,
-                    eval_window_days=int(eval_window_days),
+                    eval_window_days=eval_window_days,
                 )
 
-                if len(forward_bars) < int(eval_window_days):
+                if len(forward_bars) < eval_window_days:
                     self._try_fill_daily_data(code=analysis.code, analysis_date=start_daily.date, eval_window_days=eval_window_days)
                     forward_bars = self.stock_repo.get_forward_bars(
                         code=analysis.code,
                         analysis_date=start_daily.date,
-                        eval_window_days=int(eval_window_days),
+                        eval_window_days=eval_window_days,
                     )
 
                 evaluation = BacktestEngine.evaluate_single(
@@ -134,102 +198,274 @@ class BacktestService:
                     take_profit=analysis.take_profit,
                     config=eval_config,
                 )
-
-                status = evaluation.get("eval_status")
-                if status == "insufficient_data":
-                    insufficient += 1
-                elif status == "completed":
-                    completed += 1
-                else:
-                    errors += 1
-
-                results_to_save.append(
-                    BacktestResult(
-                        analysis_history_id=analysis.id,
-                        code=analysis.code,
-                        analysis_date=evaluation.get("analysis_date"),
-                        eval_window_days=int(evaluation.get("eval_window_days") or eval_window_days),
-                        engine_version=str(evaluation.get("engine_version") or engine_version),
-                        eval_status=str(evaluation.get("eval_status") or "error"),
-                        evaluated_at=datetime.now(),
-                        operation_advice=evaluation.get("operation_advice"),
-                        position_recommendation=evaluation.get("position_recommendation"),
-                        start_price=evaluation.get("start_price"),
-                        end_close=evaluation.get("end_close"),
-                        max_high=evaluation.get("max_high"),
-                        min_low=evaluation.get("min_low"),
-                        stock_return_pct=evaluation.get("stock_return_pct"),
-                        direction_expected=evaluation.get("direction_expected"),
-                        direction_correct=evaluation.get("direction_correct"),
-                        outcome=evaluation.get("outcome"),
-                        stop_loss=evaluation.get("stop_loss"),
-                        take_profit=evaluation.get("take_profit"),
-                        hit_stop_loss=evaluation.get("hit_stop_loss"),
-                        hit_take_profit=evaluation.get("hit_take_profit"),
-                        first_hit=evaluation.get("first_hit"),
-                        first_hit_date=evaluation.get("first_hit_date"),
-                        first_hit_trading_days=evaluation.get("first_hit_trading_days"),
-                        simulated_entry_price=evaluation.get("simulated_entry_price"),
-                        simulated_exit_price=evaluation.get("simulated_exit_price"),
-                        simulated_exit_reason=evaluation.get("simulated_exit_reason"),
-                        simulated_return_pct=evaluation.get("simulated_return_pct"),
-                    )
-                )
+                results.append(self._result_from_evaluation(analysis, evaluation, eval_config))
 
             except Exception as exc:
-                errors += 1
                 logger.error(f"回测失败: {analysis.code}#{analysis.id}: {exc}")
-                results_to_save.append(
-                    BacktestResult(
-                        analysis_history_id=analysis.id,
-                        code=analysis.code,
-                        analysis_date=self._resolve_analysis_date(analysis),
-                        eval_window_days=int(eval_window_days),
-                        engine_version=str(engine_version),
-                        eval_status="error",
-                        evaluated_at=datetime.now(),
-                        operation_advice=analysis.operation_advice,
-                    )
+                results.append(
+                    self._status_result(analysis, "error", self._resolve_analysis_date(analysis), eval_config)
                 )
+        return results
 
-        saved = 0
-        if results_to_save:
-            saved = self.repo.save_results_batch(results_to_save, replace_existing=force)
+    def run_sweep(
+        self,
+        *,
+        eval_window_days: Sequence[int],
+        neutral_band_pct: Sequence[float],
+        code: Optional[str] = None,
+        min_age_days: Optional[int] = None,
+        limit: int = 200,
+    ) -> Dict[str, Any]:
+        """Backtest every (window, neutral band) combination in a single pass.
+
+        Candidates and bars are loaded (and gap-filled for the largest window)
+        once and shared by all grid points. Each combination is stored under its
+        own window / engine-version key (see sweep_engine_version), so sweeps
+        never overwrite the regular results.
+
+        Returns:
+            processed/saved counts and one comparison row per combination.
+        """
+        windows = sorted({int(w) for w in eval_window_days})
+        bands = sorted({float(b) for b in neutral_band_pct})
+        if not windows or not bands:
+            raise ValueError("eval_window_days and neutral_band_pct must not be empty")
+        if windows[0] <= 0:
+            raise ValueError("eval_window_days must be positive")
 
-        if saved:
-            self._recompute_summaries(
-                touched_codes=sorted(touched_codes),
-                eval_window_days=int(eval_window_days),
-                engine_version=str(engine_version),
-            )
+        config = get_config()
+        if min_age_days is None:
+            min_age_days = getattr(config, "backtest_min_age_days", 14)
+        base_version = str(getattr(config, "backtest_engine_version", "v1"))
 
-        return {
-            "processed": processed,
-            "saved": saved,
-            "completed": completed,
-            "insufficient": insufficient,
-            "errors": errors,
-        }
+        candidates = self.repo.get_candidates(
+            code=code,
+            min_age_days=int(min_age_days),
+            limit=int(limit),
+            eval_window_days=windows[-1],
+            engine_version=base_version,
+            force=True,
+        )
+        batch, bars = self._preload_batch(candidates, eval_window_days=windows[-1])
 
-    def get_recent_evaluations(self, *, code: Optional[str], eval_window_days: Optional[int] = None, limit: int = 50, page: int = 1) -> Dict[str, Any]:
-        offset = max(page - 1, 0) * limit
-        rows, total = self.repo.get_results_paginated(code=code, eval_window_days=eval_window_days, days=None, offset=offset, limit=limit)
-        items = [self._result_to_dict(r) for r in rows]
-        return {"total": total, "page": page, "limit": limit, "items": items}
+        saved = 0
+        items: List[Dict[str, Any]] = []
+        for window in windows:
+            for band in bands:
+                eval_config = EvaluationConfig(
+                    eval_window_days=window,
+                    neutral_band_pct=band,
+                    engine_version=self.sweep_engine_version(base_version, band),
+                )
+                results = self._batch_results(candidates, batch, bars, eval_config)
+                summary = BacktestEngine.compute_summary(
+                    results=results,
+                    scope="overall",
+                    code=OVERALL_SENTINEL_CODE,
+                    eval_window_days=window,
+                    engine_version=eval_config.engine_version,
+                )
+                saved += self._save_results(
+                    results,
+                    force=True,
+                    eval_window_days=window,
+                    engine_version=eval_config.engine_version,
+                )
+                items.append({
+                    "eval_window_days": window,
+                    "neutral_band_pct": band,
+                    "engine_version": eval_config.engine_version,
+                    **{key: summary[key] for key in _SWEEP_METRICS},
+                })
 
-    def get_summary(self, *, scope: str, code: Optional[str], eval_window_days: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        return {"processed": len(candidates), "saved": saved, "items": items}
+
+    def run_signal_backtest(
+        self,
+        *,
+        codes: Optional[Sequence[str]] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        eval_window_days: Optional[int] = None,
+        neutral_band_pct: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Walk-forward backtest of the rule-based trend signals over stored daily bars.
+
+        Every stored day of every code (default: all codes with bars) gets the
+        analyzer's signal computed from the bars up to that day; each signal is
+        scored on its forward window. Nothing is written to the result tables.
+        """
         config = get_config()
-        engine_version = str(getattr(config, "backtest_engine_version", "v1"))
-        lookup_code = OVERALL_SENTINEL_CODE if scope == "overall" else code
-        summary = self.repo.get_summary(
-            scope=scope,
-            code=lookup_code,
+        eval_config = EvaluationConfig(
+            eval_window_days=int(eval_window_days or getattr(config, "backtest_eval_window_days", 10)),
+            neutral_band_pct=float(
+                neutral_band_pct if neutral_band_pct is not None else getattr(config, "backtest_neutral_band_pct", 2.0)
+            ),
+            engine_version=str(getattr(config, "backtest_engine_version", "v1")),
+        )
+        frames = {
+            code: self.stock_repo.get_ohlcv_frame(code=code, start_date=start_date, end_date=end_date)
+            for code in (codes or self.stock_repo.get_codes())
+        }
+        return backtest_signals(frames, config=eval_config)
+
+    @staticmethod
+    def sweep_engine_version(engine_version: str, neutral_band_pct: float) -> str:
+        """Engine-version key of a sweep grid point, e.g. "v1-nb2.5"."""
+        return f"{engine_version}-nb{float(neutral_band_pct):g}"
+
+    def _save_results(
+        self, results: List[BacktestResult], *, force: bool, eval_window_days: int, engine_version: str
+    ) -> int:
+        """Save results and merge them into the incremental summaries."""
+        if not results:
+            return 0
+
+        def summary_merges(replaced: List[BacktestResult]) -> Dict[Tuple[str, str], SummaryMerge]:
+            # Rows replaced by force are read in the save transaction and subtracted
+            deltas = self._summary_deltas(added=results, removed=replaced)
+            return self._summary_merges(deltas, eval_window_days=eval_window_days, engine_version=engine_version)
+
+        return self.repo.save_results_with_summaries(
+            results,
+            replace_existing=force,
             eval_window_days=eval_window_days,
             engine_version=engine_version,
+            summary_merges=summary_merges,
+        )
+
+    def _evaluate_batch(self, candidates: List[Any], eval_config: EvaluationConfig) -> List[BacktestResult]:
+        """Evaluate all candidates with one bar query per code and array operations."""
+        batch, bars = self._preload_batch(candidates, eval_window_days=eval_config.eval_window_days)
+        return self._batch_results(candidates, batch, bars, eval_config)
+
+    def _preload_batch(
+        self, candidates: List[Any], *, eval_window_days: int
+    ) -> Tuple[List[BatchCandidate], Dict[str, BarArrays]]:
+        """Build batch candidates and load their bars once per code.
+
+        Bars from the earliest analysis date of each code up to the forward
+        window of its latest one are shared by every candidate of that code and
+        loaded for all codes in one panel query.
+        Candidates lacking a start bar or enough forward bars are gap-filled
+        together (one fetch per code over the union of their ranges), after
+        which only the affected codes are reloaded.
+        Candidates whose analysis date cannot be resolved are left out.
+        """
+        batch: List[BatchCandidate] = []
+        ranges: Dict[str, Tuple[date, date]] = {}
+        for idx, analysis in enumerate(candidates):
+            analysis_date = self._resolve_analysis_date(analysis)
+            if analysis_date is None:
+                continue
+            batch.append(
+                BatchCandidate(
+                    key=idx,
+                    code=analysis.code,
+                    operation_advice=analysis.operation_advice,
+                    analysis_date=analysis_date,
+                    stop_loss=analysis.stop_loss,
+                    take_profit=analysis.take_profit,
+                )
+            )
+            since, until = ranges.get(analysis.code, (analysis_date, analysis_date))
+            ranges[analysis.code] = (min(since, analysis_date), max(until, analysis_date))
+
+        bars = self._load_bar_panel(ranges, eval_window_days=eval_window_days)
+        evaluations = BacktestEngine.evaluate_batch(
+            candidates=batch, bars=bars, config=EvaluationConfig(eval_window_days=eval_window_days)
+        )
+
+        gaps: List[Tuple[str, date]] = []
+        for cand, evaluation in zip(batch, evaluations):
+            if evaluation is None:
+                gaps.append((cand.code, cand.analysis_date))
+            elif evaluation.get("eval_status") == "insufficient_data":
+                gaps.append((cand.code, evaluation["analysis_date"]))
+
+        dirty_codes = self._fill_daily_data_grouped(gaps, eval_window_days=eval_window_days) if gaps else set()
+        if dirty_codes:
+            bars.update(self._load_bar_panel(
+                {code: ranges[code] for code in dirty_codes}, eval_window_days=eval_window_days
+            ))
+        return batch, bars
+
+    def _batch_results(
+        self,
+        candidates: List[Any],
+        batch: List[BatchCandidate],
+        bars: Dict[str, BarArrays],
+        eval_config: EvaluationConfig,
+    ) -> List[BacktestResult]:
+        """Evaluate preloaded candidates and build one result per analysis."""
+        results: List[Optional[BacktestResult]] = [None] * len(candidates)
+        evaluations = BacktestEngine.evaluate_batch(candidates=batch, bars=bars, config=eval_config)
+        for cand, evaluation in zip(batch, evaluations):
+            analysis = candidates[cand.key]
+            if evaluation is None:
+                results[cand.key] = self._status_result(analysis, "insufficient_data", cand.analysis_date, eval_config)
+            else:
+                results[cand.key] = self._result_from_evaluation(analysis, evaluation, eval_config)
+        # Analyses left out of the batch have no resolvable analysis date
+        return [
+            result if result is not None else self._status_result(analysis, "error", None, eval_config)
+            for analysis, result in zip(candidates, results)
+        ]
+
+    def _load_bar_panel(
+        self, ranges: Dict[str, Tuple[date, date]], *, eval_window_days: int
+    ) -> Dict[str, BarArrays]:
+        return BarArrays.split_panel(
+            self.stock_repo.get_bar_panel(ranges=ranges, forward_bars=eval_window_days)
+        )
+
+    @staticmethod
+    def _status_result(
+        analysis, status: str, analysis_date: Optional[date], eval_config: EvaluationConfig
+    ) -> BacktestResult:
+        return BacktestResult(
+            analysis_history_id=analysis.id,
+            code=analysis.code,
+            analysis_date=analysis_date,
+            eval_window_days=eval_config.eval_window_days,
+            engine_version=eval_config.engine_version,
+            eval_status=status,
+            evaluated_at=datetime.now(),
+            operation_advice=analysis.operation_advice,
+        )
+
+    @staticmethod
+    def _result_from_evaluation(analysis, evaluation: Dict[str, Any], eval_config: EvaluationConfig) -> BacktestResult:
+        return BacktestResult(
+            analysis_history_id=analysis.id,
+            code=analysis.code,
+            analysis_date=evaluation.get("analysis_date"),
+            eval_window_days=int(evaluation.get("eval_window_days") or eval_config.eval_window_days),
+            engine_version=str(evaluation.get("engine_version") or eval_config.engine_version),
+            eval_status=str(evaluation.get("eval_status") or "error"),
+            evaluated_at=datetime.now(),
+            operation_advice=evaluation.get("operation_advice"),
+            position_recommendation=evaluation.get("position_recommendation"),
+            start_price=evaluation.get("start_price"),
+            end_close=evaluation.get("end_close"),
+            max_high=evaluation.get("max_high"),
+            min_low=evaluation.get("min_low"),
+            stock_return_pct=evaluation.get("stock_return_pct"),
+            direction_expected=evaluation.get("direction_expected"),
+            direction_correct=evaluation.get("direction_correct"),
+            outcome=evaluation.get("outcome"),
+            stop_loss=evaluation.get("stop_loss"),
+            take_profit=evaluation.get("take_profit"),
+            hit_stop_loss=evaluation.get("hit_stop_loss"),
+            hit_take_profit=evaluation.get("hit_take_profit"),
+            first_hit=evaluation.get("first_hit"),
+            first_hit_date=evaluation.get("first_hit_date"),
+            first_hit_trading_days=evaluation.get("first_hit_trading_days"),
+            simulated_entry_price=evaluation.get("simulated_entry_price"),
+            simulated_exit_price=evaluation.get("simulated_exit_price"),
+            simulated_exit_reason=evaluation.get("simulated_exit_reason"),
+            simulated_return_pct=evaluation.get("simulated_return_pct"),
         )
-        if summary is None:
-            return None
-        return self._summary_to_dict(summary)
 
     def _resolve_analysis_date(self, analysis) -> Optional[date]:
         parsed = self.repo.parse_analysis_date_from_snapshot(analysis.context_snapshot)
@@ -240,6 +476,75 @@ class BacktestService:
         logger.warning(f"无法确定分析日期，跳过记录: {analysis.code}#{getattr(analysis, 'id', '?')}")
         return None
 
+    @staticmethod
+    def _plan_gap_fill(gaps: Iterable[Tuple[str, date]], *, eval_window_days: int) -> Dict[str, Tuple[date, date]]:
+        """Union date range to fetch per code, covering every gap's start + forward bars."""
+        padding = timedelta(days=max(eval_window_days * 2, 30))
+        plan: Dict[str, Tuple[date, date]] = {}
+        for code, gap_date in gaps:
+            start, end = plan.get(code, (gap_date, gap_date + padding))
+            plan[code] = (min(start, gap_date), max(end, gap_date + padding))
+        return plan
+
+    def _fill_daily_data_grouped(self, gaps: Iterable[Tuple[str, date]], *, eval_window_days: int) -> Set[str]:
+        """Fetch each code's missing bars once, concurrently, then save them all.
+
+        Fetches run on the staged pipeline runner with the market-data stage's
+        worker count and rate limit (MAX_WORKERS / PIPELINE_DATA_RPM); saving is
+        done afterwards on the calling thread. Returns the codes that got data.
+        """
+        plan = self._plan_gap_fill(gaps, eval_window_days=eval_window_days)
+        if not plan:
+            return set()
+
+        try:
+            from data_provider.base import DataFetcherManager
+
+            manager = DataFetcherManager()
+        except Exception as exc:
+            logger.warning(f"补全日线数据失败: {exc}")
+            return set()
+
+        def fetch(item: Tuple[str, date, date]):
+            code, start_date, end_date = item
+            try:
+                df, source = manager.get_daily_data(
+                    stock_code=code,
+                    start_date=start_date.strftime("%Y-%m-%d"),
+                    end_date=end_date.strftime("%Y-%m-%d"),
+                    use_local_store=False,
+                )
+            except Exception as exc:
+                logger.warning(f"补全日线数据失败({code}): {exc}")
+                return None
+            if df is None or df.empty:
+                return None
+            return code, df, source
+
+        config = get_config()
+        runner = StagedPipelineRunner(
+            [
+                Stage(
+                    "backtest_fill",
+                    fetch,
+                    workers=getattr(config, "max_workers", 3),
+                    rate_per_minute=getattr(config, "pipeline_data_rpm", 0.0),
+                )
+            ],
+            queue_size=getattr(config, "pipeline_queue_size", 8),
+        )
+        fetched = runner.run((code, start, end) for code, (start, end) in sorted(plan.items()))
+        logger.info(f"回测补全日线: 计划 {len(plan)} 只，获取成功 {len(fetched)} 只")
+
+        filled: Set[str] = set()
+        for code, df, source in fetched:
+            try:
+                self.db.save_daily_data(df, code=code, data_source=source)
+                filled.add(code)
+            except Exception as exc:
+                logger.warning(f"保存补全日线失败({code}): {exc}")
+        return filled
+
     def _try_fill_daily_data(self, *, code: str, analysis_date: date, eval_window_days: int) -> None:
         try:
             from data_provider.base import DataFetcherManager
@@ -252,6 +557,7 @@ class BacktestService:
                 start_date=analysis_date.strftime("%Y-%m-%d"),
                 end_date=end_date.strftime("%Y-%m-%d"),
                 days=eval_window_days * 2,
+                use_local_store=False,
             )
             if df is None or df.empty:
                 return
@@ -259,46 +565,112 @@ class BacktestService:
         except Exception as exc:
             logger.warning(f"补全日线数据失败({code}): {exc}")
 
-    def _recompute_summaries(self, *, touched_codes: List[str], eval_window_days: int, engine_version: str) -> None:
-        with self.db.get_session() as session:
-            # overall
-            overall_rows = session.execute(
-                select(BacktestResult).where(
-                    and_(
-                        BacktestResult.eval_window_days == eval_window_days,
-                        BacktestResult.engine_version == engine_version,
+    def rebuild_summaries(
+        self,
+        *,
+        eval_window_days: Optional[int] = None,
+        engine_version: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Rebuild every summary from the full result table.
+
+        Used to verify the incrementally maintained summaries: scopes whose
+        stored metrics differ from the rebuilt ones are reported (and fixed).
+        """
+        rebuilt = 0
+        mismatched: List[str] = []
+        # Incremental merges would race with the full rebuild
+        with self.repo.summary_lock:
+            for window_days, version in self.repo.get_result_keys():
+                if eval_window_days is not None and window_days != int(eval_window_days):
+                    continue
+                if engine_version is not None and version != engine_version:
+                    continue
+
+                accumulators: Dict[str, SummaryAccumulator] = {OVERALL_SENTINEL_CODE: SummaryAccumulator()}
+                for row in self.repo.iter_results(eval_window_days=window_days, engine_version=version):
+                    accumulators[OVERALL_SENTINEL_CODE].add(row)
+                    accumulators.setdefault(row.code, SummaryAccumulator()).add(row)
+
+                for code, accumulator in accumulators.items():
+                    scope = "overall" if code == OVERALL_SENTINEL_CODE else "stock"
+                    state = self.repo.get_summary_state(
+                        scope=scope, code=code, eval_window_days=window_days, engine_version=version
                     )
-                )
-            ).scalars().all()
-            overall_data = BacktestEngine.compute_summary(
-                results=overall_rows,
-                scope="overall",
-                code=OVERALL_SENTINEL_CODE,
-                eval_window_days=eval_window_days,
-                engine_version=engine_version,
-            )
-            overall_summary = self._build_summary_model(overall_data)
-            self.repo.upsert_summary(overall_summary)
-
-            for code in touched_codes:
-                rows = session.execute(
-                    select(BacktestResult).where(
-                        and_(
-                            BacktestResult.code == code,
-                            BacktestResult.eval_window_days == eval_window_days,
-                            BacktestResult.engine_version == engine_version,
+                    if state is not None:
+                        stored = SummaryAccumulator.from_dict(state).to_summary(
+                            scope=scope, code=code, eval_window_days=window_days, engine_version=version
                         )
-                    )
-                ).scalars().all()
-                data = BacktestEngine.compute_summary(
-                    results=rows,
-                    scope="stock",
-                    code=code,
-                    eval_window_days=eval_window_days,
-                    engine_version=engine_version,
-                )
-                summary = self._build_summary_model(data)
-                self.repo.upsert_summary(summary)
+                        fresh = accumulator.to_summary(
+                            scope=scope, code=code, eval_window_days=window_days, engine_version=version
+                        )
+                        if stored != fresh:
+                            mismatched.append(f"{scope}:{code}:{window_days}:{version}")
+                    self._store_summary(scope, code, accumulator, eval_window_days=window_days, engine_version=version)
+                    rebuilt += 1
+
+        if mismatched:
+            logger.warning(f"回测汇总增量结果与全量重建不一致，已修正: {mismatched}")
+        return {"rebuilt": rebuilt, "mismatched": mismatched}
+
+    @staticmethod
+    def _summary_deltas(
+        *, added: List[BacktestResult], removed: List[BacktestResult]
+    ) -> Dict[str, SummaryAccumulator]:
+        """Accumulate saved/replaced rows per scope (overall sentinel + each code)."""
+        deltas: Dict[str, SummaryAccumulator] = {OVERALL_SENTINEL_CODE: SummaryAccumulator()}
+        for rows, sign in ((removed, -1), (added, 1)):
+            for row in rows:
+                deltas[OVERALL_SENTINEL_CODE].add(row, sign)
+                deltas.setdefault(row.code, SummaryAccumulator()).add(row, sign)
+        return deltas
+
+    def _summary_merges(
+        self, deltas: Dict[str, SummaryAccumulator], *, eval_window_days: int, engine_version: str
+    ) -> Dict[Tuple[str, str], SummaryMerge]:
+        """Per-scope merges of the deltas; scopes never built are built from their rows once."""
+        merges: Dict[Tuple[str, str], SummaryMerge] = {}
+        for code, delta in deltas.items():
+            scope = "overall" if code == OVERALL_SENTINEL_CODE else "stock"
+
+            def merge(
+                state: Optional[Dict[str, Any]], rows: Callable[[], Iterator[BacktestResult]],
+                scope: str = scope, code: str = code, delta: SummaryAccumulator = delta,
+            ) -> Tuple[Dict[str, Any], BacktestSummary]:
+                if state is None:
+                    accumulator = SummaryAccumulator()
+                    for row in rows():
+                        accumulator.add(row)
+                else:
+                    accumulator = SummaryAccumulator.from_dict(state)
+                    accumulator.merge(delta)
+                summary = self._build_summary_model(accumulator.to_summary(
+                    scope=scope, code=code, eval_window_days=eval_window_days, engine_version=engine_version
+                ))
+                return accumulator.to_dict(), summary
+
+            merges[(scope, code)] = merge
+        return merges
+
+    def _store_summary(
+        self,
+        scope: str,
+        code: str,
+        accumulator: SummaryAccumulator,
+        *,
+        eval_window_days: int,
+        engine_version: str,
+    ) -> None:
+        self.repo.upsert_summary_state(
+            scope=scope,
+            code=code,
+            eval_window_days=eval_window_days,
+            engine_version=engine_version,
+            state=accumulator.to_dict(),
+        )
+        data = accumulator.to_summary(
+            scope=scope, code=code, eval_window_days=eval_window_days, engine_version=engine_version
+        )
+        self.repo.upsert_summary(self._build_summary_model(data))
 
     @staticmethod
     def _build_summary_model(summary_data: Dict[str, Any]) -> BacktestSummary:
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+分析运行服务层
+===================================
+
+职责：
+1. 查询批量分析运行的进度（各股票完成阶段）
+2. 在后台续跑中断的运行
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from src.repositories.run_repo import AnalysisRunRepository
+from src.storage import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+
+class RunInProgressError(Exception):
+    """运行仍在进行中，不能续跑"""
+
+
+class AnalysisRunService:
+    """
+    分析运行服务
+
+    封装运行检查点的查询与续跑
+    """
+
+    def __init__(self, db_manager: Optional[DatabaseManager] = None):
+        self.db = db_manager or DatabaseManager.get_instance()
+        self.repo = AnalysisRunRepository(self.db)
+
+    def get_run_status(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取运行进度
+
+        Returns:
+            运行状态字典，未找到时返回 None
+        """
+        run = self.repo.get_run(run_id)
+        if run is None:
+            return None
+        stock_codes = run.get_stock_codes()
+        checkpoints = self.repo.get_checkpoints(run_id)
+        stocks = [
+            {
+                'code': code,
+                'stage': checkpoints[code].stage if code in checkpoints else AnalysisRunRepository.STAGE_PENDING,
+                'query_id': checkpoints[code].query_id if code in checkpoints else None,
+            }
+            for code in stock_codes
+        ]
+        completed = sum(1 for item in stocks if item['stage'] == AnalysisRunRepository.STAGE_DONE)
+        return {
+            'run_id': run.run_id,
+            'status': run.status,
+            'query_source': run.query_source,
+            'total': len(stock_codes),
+            'completed': completed,
+            'stocks': stocks,
+            'created_at': run.created_at.isoformat() if run.created_at else None,
+            'finished_at': run.finished_at.isoformat() if run.finished_at else None,
+        }
+
+    def resume_run(self, run_id: str, send_notification: bool = True) -> bool:
+        """
+        在后台线程中续跑指定运行
+
+        Args:
+            run_id: 运行 ID
+            send_notification: 是否发送推送通知
+
+        Returns:
+            是否已提交续跑（运行不存在时返回 False）
+
+        Raises:
+            RunInProgressError: 运行仍在进行中
+        """
+        run = self.repo.get_run(run_id)
+        if run is None:
+            return False
+        if self.repo.is_active(run):
+            raise RunInProgressError(f"运行 {run_id} 仍在进行中")
+
+        def _resume() -> None:
+            try:
+                from src.core.pipeline import StockAnalysisPipeline
+
+                pipeline = StockAnalysisPipeline(query_id=run_id, query_source="api")
+                pipeline.run(send_notification=send_notification, resume_run_id=run_id)
+            except Exception as e:
+                logger.error(f"续跑运行 {run_id} 失败: {e}", exc_info=True)
+
+        thread = threading.Thread(target=_resume, name=f"resume_{run_id[:8]}", daemon=True)
+        thread.start()
+        logger.info(f"已提交续跑任务: {run_id}")
+        return True
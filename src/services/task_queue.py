@@ -9,6 +9,7 @@ A股自选股智能分析系统 - 异步任务队列
 2. 防止相同股票代码重复提交
 3. 提供 SSE 事件广播机制
 4. 任务完成后持久化到数据库
+5. 提供可取消的后台长任务基类（回测、回填任务队列共用）
 """
 
 from __future__ import annotations
@@ -16,12 +17,13 @@ from __future__ import annotations
 import asyncio
 import logging
 import threading
+import time
 import uuid
 from concurrent.futures import ThreadPoolExecutor, Future
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Optional, Dict, Set, List, Callable, Any, TYPE_CHECKING
+from typing import Optional, Dict, Set, List, Callable, Any, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from asyncio import Queue as AsyncQueue
@@ -35,6 +37,7 @@ class TaskStatus(str, Enum):
     PROCESSING = "processing"  # 执行中
     COMPLETED = "completed"    # 已完成
     FAILED = "failed"          # 失败
+    CANCELLED = "cancelled"    # 已取消
 
 
 @dataclass
@@ -118,6 +121,7 @@ class AnalysisTaskQueue:
     
     _instance: Optional['AnalysisTaskQueue'] = None
     _instance_lock = threading.Lock()
+    _thread_name_prefix = "analysis_task_"
     
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
@@ -161,7 +165,7 @@ class AnalysisTaskQueue:
         if self._executor is None:
             self._executor = ThreadPoolExecutor(
                 max_workers=self._max_workers,
-                thread_name_prefix="analysis_task_"
+                thread_name_prefix=self._thread_name_prefix
             )
         return self._executor
     
@@ -312,6 +316,7 @@ class AnalysisTaskQueue:
                 "processing": 0,
                 "completed": 0,
                 "failed": 0,
+                "cancelled": 0,
             }
             for task in self._tasks.values():
                 stats[task.status.value] = stats.get(task.status.value, 0) + 1
@@ -429,7 +434,7 @@ class AnalysisTaskQueue:
             # 按时间排序，删除旧的已完成任务
             completed_tasks = sorted(
                 [t for t in self._tasks.values()
-                 if t.status in (TaskStatus.COMPLETED, TaskStatus.FAILED)],
+                 if t.status in (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED)],
                 key=lambda t: t.created_at
             )
             
@@ -525,6 +530,166 @@ class AnalysisTaskQueue:
             logger.info("[TaskQueue] 线程池已关闭")
 
 
+class CancellableJobQueue(AnalysisTaskQueue):
+    """
+    可取消的后台长任务队列基类（单例由子类各自持有）
+
+    复用 AnalysisTaskQueue 的线程池、重复提交保护与 SSE 广播：
+    - 同一 key 同时只运行一个任务（key 由子类决定，如股票代码或全局唯一键）
+    - 每个任务持有一个取消事件，由 _run_job 在安全点检查
+    - 广播 {event_prefix}_created/started/progress/completed/failed/cancelled 事件
+
+    子类需定义 _instance / _instance_lock 并实现 _run_job；
+    按需覆盖 _apply_progress / _apply_result / _completed_message
+    """
+
+    _instance: Optional['CancellableJobQueue'] = None
+    _instance_lock = threading.Lock()
+
+    # 事件名前缀、日志标签与中文任务名（如 "backtest" / "[BacktestJobs]" / "回测"）
+    _event_prefix = "job"
+    _log_tag = "[Jobs]"
+    _job_label = "后台"
+    # 进度回调中按整数拷贝到任务信息上的统计字段
+    _progress_fields: Tuple[str, ...] = ("total", "processed")
+
+    def __init__(self, max_workers: int = 1):
+        if hasattr(self, '_initialized') and self._initialized:
+            return
+        super().__init__(max_workers=max_workers)
+        self._cancel_events: Dict[str, threading.Event] = {}
+
+    def _submit_job(self, key: str, job: TaskInfo, params: Dict[str, Any]) -> TaskInfo:
+        """
+        登记并提交任务
+
+        Raises:
+            DuplicateTaskError: 同一 key 的任务仍在运行
+        """
+        with self._data_lock:
+            conflict = self._find_conflict(key)
+            if conflict is not None:
+                raise DuplicateTaskError(*conflict)
+
+            self._tasks[job.task_id] = job
+            self._analyzing_stocks[key] = job.task_id
+            self._cancel_events[job.task_id] = threading.Event()
+            self._futures[job.task_id] = self.executor.submit(self._execute_job, job.task_id, key, params)
+            logger.info(f"{self._log_tag} 任务已提交: {key} -> {job.task_id}")
+
+        self._broadcast_event(f"{self._event_prefix}_created", job.to_dict())
+        return job.copy()
+
+    def _find_conflict(self, key: str) -> Optional[Tuple[str, str]]:
+        """
+        查找与 key 冲突的运行中任务（调用时已持有 _data_lock）
+
+        默认只有相同 key 冲突；范围互相包含的子类（如单只股票与全部股票）需覆盖
+
+        Returns:
+            (冲突任务的 key, task_id)，没有冲突时返回 None
+        """
+        task_id = self._analyzing_stocks.get(key)
+        return (key, task_id) if task_id is not None else None
+
+    def cancel_task(self, task_id: str) -> Optional[TaskInfo]:
+        """
+        请求取消：任务在下一个安全点停止
+
+        Returns:
+            任务信息（已结束的任务原样返回），任务不存在时返回 None
+        """
+        with self._data_lock:
+            job = self._tasks.get(task_id)
+            if job is None:
+                return None
+            if job.status in (TaskStatus.PENDING, TaskStatus.PROCESSING):
+                self._cancel_events[task_id].set()
+                job.message = "正在取消..."
+            return job.copy()
+
+    def _run_job(
+        self,
+        params: Dict[str, Any],
+        progress_callback: Callable[[Dict[str, int]], None],
+        cancel_event: threading.Event,
+    ) -> Dict[str, Any]:
+        """在工作线程中执行任务本体，返回结果字典（"cancelled" 为真表示已取消）"""
+        raise NotImplementedError
+
+    def _apply_progress(self, job: TaskInfo, stats: Dict[str, int], elapsed: float) -> None:
+        """把进度回调的统计写到任务信息上（调用时已持有 _data_lock）"""
+        for name in self._progress_fields:
+            setattr(job, name, int(stats.get(name, 0)))
+        job.progress = int(job.processed * 100 / job.total) if job.total else 100
+        job.message = f"已处理 {job.processed}/{job.total}"
+
+    def _apply_result(self, job: TaskInfo, result: Dict[str, Any]) -> None:
+        """任务正常结束（含取消）时补充结果字段（调用时已持有 _data_lock）"""
+
+    def _completed_message(self, job: TaskInfo) -> str:
+        return f"{self._job_label}完成"
+
+    def _execute_job(self, task_id: str, key: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """在工作线程中运行任务并广播状态变化"""
+        prefix = self._event_prefix
+        cancel_event = self._cancel_events[task_id]
+        with self._data_lock:
+            job = self._tasks[task_id]
+            job.status = TaskStatus.PROCESSING
+            job.started_at = datetime.now()
+            job.message = f"正在{self._job_label}..."
+            snapshot = job.to_dict()
+        self._broadcast_event(f"{prefix}_started", snapshot)
+        began = time.monotonic()
+
+        def on_progress(stats: Dict[str, int]) -> None:
+            elapsed = time.monotonic() - began
+            with self._data_lock:
+                job = self._tasks[task_id]
+                self._apply_progress(job, stats, elapsed)
+                snapshot = job.to_dict()
+            self._broadcast_event(f"{prefix}_progress", snapshot)
+
+        try:
+            result = self._run_job(params, on_progress, cancel_event)
+            with self._data_lock:
+                job = self._tasks[task_id]
+                job.completed_at = datetime.now()
+                job.result = result
+                self._apply_result(job, result)
+                if result.get("cancelled"):
+                    job.status = TaskStatus.CANCELLED
+                    job.message = f"已取消，已处理 {job.processed}/{job.total}"
+                    event = f"{prefix}_cancelled"
+                else:
+                    job.status = TaskStatus.COMPLETED
+                    job.progress = 100
+                    job.message = self._completed_message(job)
+                    event = f"{prefix}_completed"
+                snapshot = job.to_dict()
+            self._broadcast_event(event, snapshot)
+            logger.info(f"{self._log_tag} 任务结束: {task_id} ({key}) {event}")
+            return result
+        except Exception as e:
+            error_msg = str(e)
+            logger.error(f"{self._log_tag} 任务失败: {task_id} ({key}), 错误: {error_msg}")
+            with self._data_lock:
+                job = self._tasks[task_id]
+                job.status = TaskStatus.FAILED
+                job.completed_at = datetime.now()
+                job.error = error_msg[:200]
+                job.message = f"{self._job_label}失败: {error_msg[:50]}"
+                snapshot = job.to_dict()
+            self._broadcast_event(f"{prefix}_failed", snapshot)
+            return None
+        finally:
+            with self._data_lock:
+                self._analyzing_stocks.pop(key, None)
+                self._cancel_events.pop(task_id, None)
+            self._cleanup_old_tasks()
+
+
 # ========== 便捷函数 ==========
 
 def get_task_queue() -> AnalysisTaskQueue:
@@ -79,6 +79,44 @@ class RSIStatus(Enum):
     OVERSOLD = "超卖"         # RSI < 30
 
 
+# === 信号评分表（_generate_signal 与 generate_signal_series 共用）===
+TREND_SCORES = {
+    TrendStatus.STRONG_BULL: 30,
+    TrendStatus.BULL: 26,
+    TrendStatus.WEAK_BULL: 18,
+    TrendStatus.CONSOLIDATION: 12,
+    TrendStatus.WEAK_BEAR: 8,
+    TrendStatus.BEAR: 4,
+    TrendStatus.STRONG_BEAR: 0,
+}
+
+VOLUME_SCORES = {
+    VolumeStatus.SHRINK_VOLUME_DOWN: 15,  # 缩量回调最佳
+    VolumeStatus.HEAVY_VOLUME_UP: 12,     # 放量上涨次之
+    VolumeStatus.NORMAL: 10,
+    VolumeStatus.SHRINK_VOLUME_UP: 6,     # 无量上涨较差
+    VolumeStatus.HEAVY_VOLUME_DOWN: 0,    # 放量下跌最差
+}
+
+MACD_SCORES = {
+    MACDStatus.GOLDEN_CROSS_ZERO: 15,  # 零轴上金叉最强
+    MACDStatus.GOLDEN_CROSS: 12,      # 金叉
+    MACDStatus.CROSSING_UP: 10,       # 上穿零轴
+    MACDStatus.BULLISH: 8,            # 多头
+    MACDStatus.BEARISH: 2,            # 空头
+    MACDStatus.CROSSING_DOWN: 0,       # 下穿零轴
+    MACDStatus.DEATH_CROSS: 0,        # 死叉
+}
+
+RSI_SCORES = {
+    RSIStatus.OVERSOLD: 10,       # 超卖最佳
+    RSIStatus.STRONG_BUY: 8,     # 强势
+    RSIStatus.NEUTRAL: 5,        # 中性
+    RSIStatus.WEAK: 3,            # 弱势
+    RSIStatus.OVERBOUGHT: 0,       # 超买最差
+}
+
+
 @dataclass
 class TrendAnalysisResult:
     """趋势分析结果"""
@@ -597,16 +635,7 @@ class StockTrendAnalyzer:
         risks = []
 
         # === 趋势评分（30分）===
-        trend_scores = {
-            TrendStatus.STRONG_BULL: 30,
-            TrendStatus.BULL: 26,
-            TrendStatus.WEAK_BULL: 18,
-            TrendStatus.CONSOLIDATION: 12,
-            TrendStatus.WEAK_BEAR: 8,
-            TrendStatus.BEAR: 4,
-            TrendStatus.STRONG_BEAR: 0,
-        }
-        trend_score = trend_scores.get(result.trend_status, 12)
+        trend_score = TREND_SCORES.get(result.trend_status, 12)
         score += trend_score
 
         if result.trend_status in [TrendStatus.STRONG_BULL, TrendStatus.BULL]:
@@ -663,14 +692,7 @@ class StockTrendAnalyzer:
             )
 
         # === 量能评分（15分）===
-        volume_scores = {
-            VolumeStatus.SHRINK_VOLUME_DOWN: 15,  # 缩量回调最佳
-            VolumeStatus.HEAVY_VOLUME_UP: 12,     # 放量上涨次之
-            VolumeStatus.NORMAL: 10,
-            VolumeStatus.SHRINK_VOLUME_UP: 6,     # 无量上涨较差
-            VolumeStatus.HEAVY_VOLUME_DOWN: 0,    # 放量下跌最差
-        }
-        vol_score = volume_scores.get(result.volume_status, 8)
+        vol_score = VOLUME_SCORES.get(result.volume_status, 8)
         score += vol_score
 
         if result.volume_status == VolumeStatus.SHRINK_VOLUME_DOWN:
@@ -687,16 +709,7 @@ class StockTrendAnalyzer:
             reasons.append("✅ MA10支撑有效")
 
         # === MACD 评分（15分）===
-        macd_scores = {
-            MACDStatus.GOLDEN_CROSS_ZERO: 15,  # 零轴上金叉最强
-            MACDStatus.GOLDEN_CROSS: 12,      # 金叉
-            MACDStatus.CROSSING_UP: 10,       # 上穿零轴
-            MACDStatus.BULLISH: 8,            # 多头
-            MACDStatus.BEARISH: 2,            # 空头
-            MACDStatus.CROSSING_DOWN: 0,       # 下穿零轴
-            MACDStatus.DEATH_CROSS: 0,        # 死叉
-        }
-        macd_score = macd_scores.get(result.macd_status, 5)
+        macd_score = MACD_SCORES.get(result.macd_status, 5)
         score += macd_score
 
         if result.macd_status in [MACDStatus.GOLDEN_CROSS_ZERO, MACDStatus.GOLDEN_CROSS]:
@@ -707,14 +720,7 @@ class StockTrendAnalyzer:
             reasons.append(result.macd_signal)
 
         # === RSI 评分（10分）===
-        rsi_scores = {
-            RSIStatus.OVERSOLD: 10,       # 超卖最佳
-            RSIStatus.STRONG_BUY: 8,     # 强势
-            RSIStatus.NEUTRAL: 5,        # 中性
-            RSIStatus.WEAK: 3,            # 弱势
-            RSIStatus.OVERBOUGHT: 0,       # 超买最差
-        }
-        rsi_score = rsi_scores.get(result.rsi_status, 5)
+        rsi_score = RSI_SCORES.get(result.rsi_status, 5)
         score += rsi_score
 
         if result.rsi_status in [RSIStatus.OVERSOLD, RSIStatus.STRONG_BUY]:
@@ -743,6 +749,203 @@ class StockTrendAnalyzer:
         else:
             result.buy_signal = BuySignal.SELL
     
+    def generate_signal_series(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        逐日计算买入信号（向量化的逐日 analyze）
+
+        对每个交易日 t，结果与 analyze(df[:t+1]) 的 trend_status / signal_score / buy_signal 一致：
+        均线、MACD、RSI 均为因果指标，对全量序列计算一次即可得到每个前缀的末值；
+        其余判断按 analyze 的规则逐列向量化。收盘价缺失的行会先被剔除。
+
+        Args:
+            df: 包含 date/high/low/close/volume 的日线 DataFrame
+
+        Returns:
+            DataFrame（date, close, trend_status, signal_score, buy_signal），
+            仅包含满足 analyze 最少 20 根日线要求的交易日；buy_signal 为 BuySignal.value
+        """
+        columns = ['date', 'close', 'trend_status', 'signal_score', 'buy_signal']
+        if df is None or df.empty:
+            return pd.DataFrame(columns=columns)
+
+        df = df.dropna(subset=['close']).sort_values('date').reset_index(drop=True)
+        if len(df) < 20:
+            return pd.DataFrame(columns=columns)
+
+        df = self._calculate_rsi(self._calculate_macd(self._calculate_mas(df)))
+        n = len(df)
+        index = np.arange(n)
+        close = df['close'].to_numpy(dtype=float)
+        ma5 = df['MA5'].to_numpy(dtype=float)
+        ma10 = df['MA10'].to_numpy(dtype=float)
+        ma20 = df['MA20'].to_numpy(dtype=float)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # 1. 趋势判断（间距对比取 4 根之前的均线，即 df.iloc[-5]）
+            prev_ma5 = np.concatenate([np.full(4, np.nan), ma5[:-4]])
+            prev_ma20 = np.concatenate([np.full(4, np.nan), ma20[:-4]])
+            bull_prev = np.where(prev_ma20 > 0, (prev_ma5 - prev_ma20) / prev_ma20 * 100, 0)
+            bull_curr = np.where(ma20 > 0, (ma5 - ma20) / ma20 * 100, 0)
+            bear_prev = np.where(prev_ma5 > 0, (prev_ma20 - prev_ma5) / prev_ma5 * 100, 0)
+            bear_curr = np.where(ma5 > 0, (ma20 - ma5) / ma5 * 100, 0)
+            bull = (ma5 > ma10) & (ma10 > ma20)
+            bear = (ma5 < ma10) & (ma10 < ma20)
+            trend = np.select(
+                [
+                    bull & (bull_curr > bull_prev) & (bull_curr > 5),
+                    bull,
+                    (ma5 > ma10) & (ma10 <= ma20),
+                    bear & (bear_curr > bear_prev) & (bear_curr > 5),
+                    bear,
+                    (ma5 < ma10) & (ma10 >= ma20),
+                ],
+                [
+                    TrendStatus.STRONG_BULL.value,
+                    TrendStatus.BULL.value,
+                    TrendStatus.WEAK_BULL.value,
+                    TrendStatus.STRONG_BEAR.value,
+                    TrendStatus.BEAR.value,
+                    TrendStatus.WEAK_BEAR.value,
+                ],
+                default=TrendStatus.CONSOLIDATION.value,
+            )
+            trend_enum = [TrendStatus(v) for v in trend]
+            score = np.array([TREND_SCORES[t] for t in trend_enum], dtype=int)
+
+            # 2. 乖离率评分
+            bias = np.where(ma5 > 0, (close - ma5) / ma5 * 100, 0.0)
+            bias = np.where(np.isnan(bias), 0.0, bias)
+            base_threshold = get_config().bias_threshold
+            strong = trend == TrendStatus.STRONG_BULL.value  # 强势多头的趋势强度恒为 90 ≥ 70
+            effective_threshold = np.where(strong, base_threshold * 1.5, base_threshold)
+            score += np.select(
+                [
+                    (bias < 0) & (bias > -3),
+                    (bias < 0) & (bias > -5),
+                    bias < 0,
+                    bias < 2,
+                    bias < base_threshold,
+                    bias > effective_threshold,
+                    (bias > base_threshold) & strong,
+                ],
+                [20, 16, 8, 18, 14, 4, 10],
+                default=4,
+            )
+
+            # 3. 量能评分（当日量 / 前 5 日均量，均量忽略缺失值）
+            volume = df['volume'].to_numpy(dtype=float) if 'volume' in df else np.full(n, np.nan)
+            windows = np.lib.stride_tricks.sliding_window_view(volume, 5)[:-1]  # 第 t 行取 volume[t-5:t]
+            counts = np.sum(~np.isnan(windows), axis=1)
+            avg = np.full(n, np.nan)
+            avg[5:] = np.where(counts > 0, np.nansum(windows, axis=1) / np.maximum(counts, 1), np.nan)
+            ratio = np.where(avg > 0, volume / avg, 0.0)
+            prev_close = np.concatenate([[np.nan], close[:-1]])
+            rising = (close - prev_close) / prev_close * 100 > 0
+            volume_score = np.select(
+                [
+                    (ratio >= self.VOLUME_HEAVY_RATIO) & rising,
+                    ratio >= self.VOLUME_HEAVY_RATIO,
+                    (ratio <= self.VOLUME_SHRINK_RATIO) & rising,
+                    ratio <= self.VOLUME_SHRINK_RATIO,
+                ],
+                [
+                    VOLUME_SCORES[VolumeStatus.HEAVY_VOLUME_UP],
+                    VOLUME_SCORES[VolumeStatus.HEAVY_VOLUME_DOWN],
+                    VOLUME_SCORES[VolumeStatus.SHRINK_VOLUME_UP],
+                    VOLUME_SCORES[VolumeStatus.SHRINK_VOLUME_DOWN],
+                ],
+                default=VOLUME_SCORES[VolumeStatus.NORMAL],
+            )
+            score += volume_score
+
+            # 4. 均线支撑
+            for ma in (ma5, ma10):
+                score += np.where(
+                    (ma > 0) & (np.abs(close - ma) / ma <= self.MA_SUPPORT_TOLERANCE) & (close >= ma), 5, 0
+                )
+
+            # 5. MACD 评分（不足 MACD_SLOW 根时保持默认多头）
+            dif = df['MACD_DIF'].to_numpy(dtype=float)
+            dea = df['MACD_DEA'].to_numpy(dtype=float)
+            diff = dif - dea
+            prev_diff = np.concatenate([[np.nan], diff[:-1]])
+            prev_dif = np.concatenate([[np.nan], dif[:-1]])
+            golden = (prev_diff <= 0) & (diff > 0)
+            death = (prev_diff >= 0) & (diff < 0)
+            crossing_up = (prev_dif <= 0) & (dif > 0)
+            crossing_down = (prev_dif >= 0) & (dif < 0)
+            macd_score = np.select(
+                [
+                    golden & (dif > 0),
+                    crossing_up,
+                    golden,
+                    death,
+                    crossing_down,
+                    (dif > 0) & (dea > 0),
+                    (dif < 0) & (dea < 0),
+                ],
+                [
+                    MACD_SCORES[MACDStatus.GOLDEN_CROSS_ZERO],
+                    MACD_SCORES[MACDStatus.CROSSING_UP],
+                    MACD_SCORES[MACDStatus.GOLDEN_CROSS],
+                    MACD_SCORES[MACDStatus.DEATH_CROSS],
+                    MACD_SCORES[MACDStatus.CROSSING_DOWN],
+                    MACD_SCORES[MACDStatus.BULLISH],
+                    MACD_SCORES[MACDStatus.BEARISH],
+                ],
+                default=MACD_SCORES[MACDStatus.BULLISH],
+            )
+            score += np.where(index + 1 < self.MACD_SLOW, MACD_SCORES[MACDStatus.BULLISH], macd_score)
+
+            # 6. RSI 评分（以 RSI(12) 为主，不足 RSI_LONG 根时保持默认中性）
+            rsi_mid = df[f'RSI_{self.RSI_MID}'].to_numpy(dtype=float)
+            rsi_score = np.select(
+                [
+                    rsi_mid > self.RSI_OVERBOUGHT,
+                    rsi_mid > 60,
+                    rsi_mid >= 40,
+                    rsi_mid >= self.RSI_OVERSOLD,
+                ],
+                [
+                    RSI_SCORES[RSIStatus.OVERBOUGHT],
+                    RSI_SCORES[RSIStatus.STRONG_BUY],
+                    RSI_SCORES[RSIStatus.NEUTRAL],
+                    RSI_SCORES[RSIStatus.WEAK],
+                ],
+                default=RSI_SCORES[RSIStatus.OVERSOLD],
+            )
+            score += np.where(index + 1 < self.RSI_LONG, RSI_SCORES[RSIStatus.NEUTRAL], rsi_score)
+
+        # 7. 综合判断
+        bullish = np.isin(trend, [TrendStatus.STRONG_BULL.value, TrendStatus.BULL.value])
+        bearish = np.isin(trend, [TrendStatus.BEAR.value, TrendStatus.STRONG_BEAR.value])
+        buy_signal = np.select(
+            [
+                (score >= 75) & bullish,
+                (score >= 60) & (bullish | (trend == TrendStatus.WEAK_BULL.value)),
+                score >= 45,
+                score >= 30,
+                bearish,
+            ],
+            [
+                BuySignal.STRONG_BUY.value,
+                BuySignal.BUY.value,
+                BuySignal.HOLD.value,
+                BuySignal.WAIT.value,
+                BuySignal.STRONG_SELL.value,
+            ],
+            default=BuySignal.SELL.value,
+        )
+
+        result = pd.DataFrame({
+            'date': df['date'],
+            'close': close,
+            'trend_status': trend,
+            'signal_score': score,
+            'buy_signal': buy_signal,
+        })
+        return result.iloc[19:].reset_index(drop=True)
+
     def format_analysis(self, result: TrendAnalysisResult) -> str:
         """
         格式化分析结果为文本
@@ -19,6 +19,7 @@ import re
 from datetime import datetime, date, timedelta
 from typing import Optional, List, Dict, Any, TYPE_CHECKING, Tuple
 
+import numpy as np
 import pandas as pd
 from sqlalchemy import (
     create_engine,
@@ -35,6 +36,8 @@ from sqlalchemy import (
     Text,
     select,
     and_,
+    or_,
+    delete,
     desc,
 )
 from sqlalchemy.orm import (
@@ -42,12 +45,31 @@ from sqlalchemy.orm import (
     sessionmaker,
     Session,
 )
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError
 
 from src.config import get_config
+from src.core.bar_store import BAR_COLUMNS, get_bar_store
+from src.core.price_adjust import ADJUST_QFQ, ADJUST_RAW, apply_adjustment, compress_factors
 
 logger = logging.getLogger(__name__)
 
+# stock_daily 中由数据源提供的数值列（UPSERT 时整体覆盖）
+_DAILY_VALUE_COLUMNS = (
+    'open', 'high', 'low', 'close', 'volume', 'amount', 'pct_chg',
+    'ma5', 'ma10', 'ma20', 'volume_ratio',
+)
+
+
+def _to_date(value: Any) -> date:
+    """将字符串 / datetime / Timestamp 解析为 date"""
+    if isinstance(value, str):
+        return datetime.strptime(value[:10], '%Y-%m-%d').date()
+    if isinstance(value, datetime):  # 包含 pd.Timestamp
+        return value.date()
+    return value
+
+
 # SQLAlchemy ORM 基类
 Base = declarative_base()
 
@@ -128,6 +150,61 @@ class StockDaily(Base):
         }
 
 
+class StockDailyRaw(Base):
+    """
+    不复权日线
+
+    与 adj_factors 中的复权因子一起保存：复权价格在读取时计算，
+    分红送转后只需更新复权因子，无需重新下载历史日线
+    """
+    __tablename__ = 'stock_daily_raw'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    code = Column(String(10), nullable=False)
+    date = Column(Date, nullable=False)
+
+    open = Column(Float)
+    high = Column(Float)
+    low = Column(Float)
+    close = Column(Float)
+    volume = Column(Float)
+    amount = Column(Float)
+    pct_chg = Column(Float)
+
+    data_source = Column(String(50))
+
+    created_at = Column(DateTime, default=datetime.now)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+    __table_args__ = (
+        UniqueConstraint('code', 'date', name='uix_raw_code_date'),
+    )
+
+
+class AdjFactor(Base):
+    """
+    复权因子阶梯
+
+    每行为一次因子变化（除权除息日）：date 起适用累计后复权因子 factor，
+    直到下一次变化；早于第一行的日期因子为 1.0
+    """
+    __tablename__ = 'adj_factors'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    code = Column(String(10), nullable=False)
+    date = Column(Date, nullable=False)
+    factor = Column(Float, nullable=False)
+
+    data_source = Column(String(50))
+    updated_at = Column(DateTime, default=datetime.now)
+
+    __table_args__ = (
+        UniqueConstraint('code', 'date', name='uix_adj_factor_code_date'),
+    )
+
+
 class NewsIntel(Base):
     """
     新闻情报数据模型
@@ -176,6 +253,35 @@ class NewsIntel(Base):
         return f"<NewsIntel(code={self.code}, title={self.title[:20]}...)>"
 
 
+class UrlContent(Base):
+    """
+    网页正文缓存
+
+    按 URL 缓存新闻正文抽取结果，并保存 ETag / Last-Modified，
+    再次遇到同一 URL 时通过条件请求判断是否需要重新下载解析。
+    """
+    __tablename__ = 'url_content'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    url = Column(String(1000), nullable=False)
+    content = Column(Text)
+
+    # HTTP 缓存校验
+    etag = Column(String(255))
+    last_modified = Column(String(64))
+
+    fetched_at = Column(DateTime, default=datetime.now)  # 最近一次下载正文
+    checked_at = Column(DateTime, default=datetime.now, index=True)  # 最近一次校验
+
+    __table_args__ = (
+        UniqueConstraint('url', name='uix_url_content_url'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<UrlContent(url={self.url[:40]}...)>"
+
+
 class AnalysisHistory(Base):
     """
     分析结果历史记录模型
@@ -240,6 +346,140 @@ class AnalysisHistory(Base):
         }
 
 
+class AnalysisRun(Base):
+    """
+    分析运行记录（断点续跑）
+
+    以 run_id（即 CLI/API 的 query_id）标识一次批量分析，记录股票列表与状态。
+    """
+    __tablename__ = 'analysis_runs'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    run_id = Column(String(64), nullable=False)
+    query_source = Column(String(32))  # cli/web/bot/system
+    stock_codes = Column(Text)  # JSON 列表
+    status = Column(String(16), nullable=False, default='running', index=True)  # running/completed/incomplete
+
+    created_at = Column(DateTime, default=datetime.now, index=True)
+    updated_at = Column(DateTime, default=datetime.now)
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        UniqueConstraint('run_id', name='uix_analysis_run_id'),
+    )
+
+    def get_stock_codes(self) -> List[str]:
+        try:
+            return list(json.loads(self.stock_codes or '[]'))
+        except (TypeError, ValueError):
+            return []
+
+
+class AnalysisRunStock(Base):
+    """
+    分析运行中单只股票的阶段检查点
+
+    stage: pending → search（情报搜索已完成，news_context 可复用）→ done（分析历史已保存）
+    """
+    __tablename__ = 'analysis_run_stocks'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    run_id = Column(String(64), nullable=False, index=True)
+    code = Column(String(16), nullable=False)
+    query_id = Column(String(64))  # 该股票分析记录的 query_id（续跑时保持不变）
+    stage = Column(String(16), nullable=False, default='pending')
+    news_context = Column(Text)
+
+    updated_at = Column(DateTime, default=datetime.now)
+
+    __table_args__ = (
+        UniqueConstraint('run_id', 'code', name='uix_analysis_run_stock'),
+    )
+
+
+class AnalysisLease(Base):
+    """
+    分片运行的股票租约
+
+    多进程/多主机共享同一数据库时，各分片通过租约领取股票：
+    status: pending → leased（owner 持有至 lease_until）→ done/failed；
+    租约过期未完成的股票可被其他分片重新领取。
+    """
+    __tablename__ = 'analysis_leases'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    run_id = Column(String(64), nullable=False, index=True)
+    code = Column(String(16), nullable=False)
+    status = Column(String(16), nullable=False, default='pending', index=True)
+    owner = Column(String(128))
+    lease_until = Column(DateTime)
+    attempts = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=datetime.now)
+
+    __table_args__ = (
+        UniqueConstraint('run_id', 'code', name='uix_analysis_lease'),
+    )
+
+
+class AnalysisFingerprint(Base):
+    """
+    分析输入指纹
+
+    记录每次分析时增强上下文的关键字段（日线、实时行情、筹码、新闻 URL 集合），
+    下次分析同一股票时与之比较，输入无实质变化则复用上次的分析结果。
+    """
+    __tablename__ = 'analysis_fingerprints'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    code = Column(String(16), nullable=False)
+    query_id = Column(String(64))  # 对应 analysis_history.query_id
+    digest = Column(String(40))  # 特征的 SHA1，便于快速判断完全相同
+    features = Column(Text)  # JSON
+
+    created_at = Column(DateTime, default=datetime.now)
+
+    __table_args__ = (
+        Index('ix_fingerprint_code_time', 'code', 'created_at'),
+    )
+
+    def get_features(self) -> Dict[str, Any]:
+        try:
+            return json.loads(self.features) if self.features else {}
+        except (ValueError, TypeError):
+            return {}
+
+
+class BackfillCheckpoint(Base):
+    """
+    历史日线回填的单股检查点
+
+    每只股票按请求区间记录一行：status=done 表示该区间已完整写入 stock_daily，
+    重新运行同一（或被其覆盖的）区间时跳过；failed 保留最后一次错误，下次运行重试。
+    """
+    __tablename__ = 'backfill_checkpoints'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    code = Column(String(16), nullable=False, index=True)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    status = Column(String(16), nullable=False)  # done/failed
+    bars = Column(Integer, default=0)  # 写入的日线条数
+    data_source = Column(String(50))
+    error = Column(Text)
+
+    updated_at = Column(DateTime, default=datetime.now)
+
+    __table_args__ = (
+        UniqueConstraint('code', 'start_date', 'end_date', name='uix_backfill_code_range'),
+    )
+
+
 class BacktestResult(Base):
     """单条分析记录的回测结果。"""
 
@@ -363,6 +603,69 @@ class BacktestSummary(Base):
     )
 
 
+class BacktestSummaryState(Base):
+    """
+    回测汇总的累加状态（按股票或全局）
+
+    保存计数、求和与分母等可合并的中间量（JSON），每次回测只合并新增/替换的结果，
+    无需重新读取全部 backtest_results；backtest_summaries 中的指标由此状态派生。
+    """
+
+    __tablename__ = 'backtest_summary_states'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    scope = Column(String(16), nullable=False, index=True)  # overall/stock
+    code = Column(String(16), index=True)
+    eval_window_days = Column(Integer, nullable=False, default=10)
+    engine_version = Column(String(16), nullable=False, default='v1')
+
+    state_json = Column(Text, nullable=False)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+    __table_args__ = (
+        UniqueConstraint(
+            'scope',
+            'code',
+            'eval_window_days',
+            'engine_version',
+            name='uix_backtest_summary_state_scope_code_window_version',
+        ),
+    )
+
+
+class SearchCacheEntry(Base):
+    """
+    搜索结果缓存
+
+    持久化搜索引擎返回结果，供 API 服务、Bot、定时任务跨进程复用，
+    减少付费搜索调用。按 last_accessed_at 做 LRU 淘汰。
+    """
+    __tablename__ = 'search_cache'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # 缓存键（查询参数的 SHA1）
+    cache_key = Column(String(64), nullable=False)
+    dimension = Column(String(32), index=True)  # latest_news / earnings / industry / stock_news ...
+    query = Column(String(255))
+
+    # SearchResponse 的 JSON 序列化
+    payload = Column(Text, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.now)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    last_accessed_at = Column(DateTime, default=datetime.now, index=True)
+    hit_count = Column(Integer, default=0)
+
+    __table_args__ = (
+        UniqueConstraint('cache_key', name='uix_search_cache_key'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<SearchCacheEntry(dimension={self.dimension}, query={(self.query or '')[:20]}...)>"
+
+
 class DatabaseManager:
     """
     数据库管理器 - 单例模式
@@ -398,10 +701,13 @@ class DatabaseManager:
             db_url = config.get_db_url()
         
         # 创建数据库引擎
+        # SQLite 在多进程分片运行时存在写锁竞争，适当延长等待时间
+        connect_args = {'timeout': 30} if db_url.startswith('sqlite') else {}
         self._engine = create_engine(
             db_url,
             echo=False,  # 设为 True 可查看 SQL 语句
             pool_pre_ping=True,  # 连接健康检查
+            connect_args=connect_args,
         )
         
         # 创建 Session 工厂
@@ -884,8 +1190,8 @@ class DatabaseManager:
         保存日线数据到数据库
         
         策略：
-        - 使用 UPSERT 逻辑（存在则更新，不存在则插入）
-        - 跳过已存在的数据，避免重复
+        - 批量 UPSERT（INSERT ... ON CONFLICT(code, date) DO UPDATE），按 uix_code_date 唯一约束合并
+        - 同一批中重复的日期以最后一条为准
         
         Args:
             df: 包含日线数据的 DataFrame
@@ -893,81 +1199,244 @@ class DatabaseManager:
             data_source: 数据来源名称
             
         Returns:
-            新增/更新的记录数
+            新增的记录数（已存在的日期只更新，不计入）
         """
         if df is None or df.empty:
             logger.warning(f"保存数据为空，跳过 {code}")
             return 0
         
-        saved_count = 0
+        saved_count, saved_dates = self._upsert_bars(StockDaily, _DAILY_VALUE_COLUMNS, df, code, data_source)
+        logger.info(f"保存 {code} 数据成功，新增 {saved_count} 条")
         
+        self._sync_bar_store(code, saved_dates)
+        return saved_count
+
+    def _upsert_bars(
+        self,
+        model: Any,
+        value_columns: Tuple[str, ...],
+        df: pd.DataFrame,
+        code: str,
+        data_source: str,
+    ) -> Tuple[int, List[date]]:
+        """
+        批量 UPSERT 日线（INSERT ... ON CONFLICT(code, date) DO UPDATE）
+
+        同一批中重复的日期以最后一条为准
+
+        Returns:
+            (新增记录数, 写入的日期列表（升序）)
+        """
+        now = datetime.now()
+        records: Dict[date, Dict[str, Any]] = {}
+        for row in df.to_dict('records'):
+            row_date = _to_date(row.get('date'))
+            record = {'code': code, 'date': row_date, 'data_source': data_source,
+                      'created_at': now, 'updated_at': now}
+            for name in value_columns:
+                value = row.get(name)
+                record[name] = None if value is None or pd.isna(value) else float(value)
+            records[row_date] = record
+        saved_dates = sorted(records)
+
         with self.get_session() as session:
             try:
-                for _, row in df.iterrows():
-                    # 解析日期
-                    row_date = row.get('date')
-                    if isinstance(row_date, str):
-                        row_date = datetime.strptime(row_date, '%Y-%m-%d').date()
-                    elif isinstance(row_date, datetime):
-                        row_date = row_date.date()
-                    elif isinstance(row_date, pd.Timestamp):
-                        row_date = row_date.date()
-                    
-                    # 检查是否已存在
-                    existing = session.execute(
-                        select(StockDaily).where(
-                            and_(
-                                StockDaily.code == code,
-                                StockDaily.date == row_date
-                            )
-                        )
-                    ).scalar_one_or_none()
-                    
-                    if existing:
-                        # 更新现有记录
-                        existing.open = row.get('open')
-                        existing.high = row.get('high')
-                        existing.low = row.get('low')
-                        existing.close = row.get('close')
-                        existing.volume = row.get('volume')
-                        existing.amount = row.get('amount')
-                        existing.pct_chg = row.get('pct_chg')
-                        existing.ma5 = row.get('ma5')
-                        existing.ma10 = row.get('ma10')
-                        existing.ma20 = row.get('ma20')
-                        existing.volume_ratio = row.get('volume_ratio')
-                        existing.data_source = data_source
-                        existing.updated_at = datetime.now()
-                    else:
-                        # 创建新记录
-                        record = StockDaily(
-                            code=code,
-                            date=row_date,
-                            open=row.get('open'),
-                            high=row.get('high'),
-                            low=row.get('low'),
-                            close=row.get('close'),
-                            volume=row.get('volume'),
-                            amount=row.get('amount'),
-                            pct_chg=row.get('pct_chg'),
-                            ma5=row.get('ma5'),
-                            ma10=row.get('ma10'),
-                            ma20=row.get('ma20'),
-                            volume_ratio=row.get('volume_ratio'),
-                            data_source=data_source,
-                        )
-                        session.add(record)
-                        saved_count += 1
-                
+                existing = set(session.execute(
+                    select(model.date).where(and_(
+                        model.code == code,
+                        model.date >= saved_dates[0],
+                        model.date <= saved_dates[-1],
+                    ))
+                ).scalars().all())
+                saved_count = sum(1 for d in saved_dates if d not in existing)
+
+                # 单条语句 + executemany：语句只编译一次，逐行绑定参数
+                stmt = sqlite_insert(model)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=['code', 'date'],
+                    set_={name: stmt.excluded[name] for name in value_columns + ('data_source', 'updated_at')},
+                )
+                session.execute(stmt, [records[d] for d in saved_dates])
                 session.commit()
-                logger.info(f"保存 {code} 数据成功，新增 {saved_count} 条")
-                
             except Exception as e:
                 session.rollback()
                 logger.error(f"保存 {code} 数据失败: {e}")
                 raise
-        
+        return saved_count, saved_dates
+
+    def save_raw_daily_data(self, df: pd.DataFrame, code: str, data_source: str = "Unknown") -> int:
+        """
+        保存不复权日线（批量 UPSERT）
+
+        Returns:
+            新增的记录数
+        """
+        if df is None or df.empty:
+            logger.warning(f"不复权日线为空，跳过 {code}")
+            return 0
+        saved_count, _ = self._upsert_bars(StockDailyRaw, BAR_COLUMNS, df, code, data_source)
+        logger.info(f"保存 {code} 不复权日线成功，新增 {saved_count} 条")
         return saved_count
+
+    def get_raw_date_range(self, code: str) -> Optional[Tuple[date, date]]:
+        """
+        获取不复权日线已入库的日期区间
+
+        Returns:
+            (最早日期, 最晚日期)；该股票没有不复权日线时返回 None
+        """
+        from sqlalchemy import func
+
+        with self.get_session() as session:
+            first, last = session.execute(
+                select(func.min(StockDailyRaw.date), func.max(StockDailyRaw.date))
+                .where(StockDailyRaw.code == code)
+            ).one()
+        return (first, last) if first is not None else None
+
+    def delete_daily_outside(self, code: str, start: date, end: date) -> int:
+        """
+        删除 stock_daily 中 [start, end] 区间以外的日线（如不复权日线未覆盖、复权基准已过期的前复权日线）
+
+        有删除时同时清除本地列式日线存储的覆盖记录，之后的读取回源获取
+
+        Returns:
+            删除的记录数
+        """
+        with self.get_session() as session:
+            try:
+                removed = session.execute(
+                    delete(StockDaily).where(and_(
+                        StockDaily.code == code,
+                        or_(StockDaily.date < start, StockDaily.date > end),
+                    ))
+                ).rowcount
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.error(f"删除 {code} 区间外日线失败: {e}")
+                raise
+        if removed:
+            store = get_bar_store()
+            if store is not None:
+                store.invalidate(code)
+        return removed
+
+    def get_adj_factors(self, code: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        获取复权因子阶梯
+
+        Returns:
+            (dates, factors)：datetime64[D] 日期数组（升序）与对应的累计后复权因子；无记录时为空数组
+        """
+        with self.get_session() as session:
+            rows = session.execute(
+                select(AdjFactor.date, AdjFactor.factor)
+                .where(AdjFactor.code == code)
+                .order_by(AdjFactor.date)
+            ).all()
+        dates = np.array([r[0] for r in rows], dtype='datetime64[D]')
+        factors = np.array([r[1] for r in rows], dtype=np.float64)
+        return dates, factors
+
+    def save_adj_factors(self, code: str, factors: pd.DataFrame, data_source: str = "Unknown") -> bool:
+        """
+        整体替换某只股票的复权因子阶梯
+
+        Args:
+            factors: 含 date / factor 列的 DataFrame（逐日或按事件均可，会压缩为阶梯）
+
+        Returns:
+            因子阶梯是否发生变化（发生变化时调用方需重新计算复权价格）
+        """
+        dates, values = compress_factors(factors)
+        if len(values) == 0:
+            logger.warning(f"复权因子为空，跳过 {code}")
+            return False
+
+        old_dates, old_values = self.get_adj_factors(code)
+        if np.array_equal(old_dates, dates) and np.allclose(old_values, values, rtol=1e-9, atol=0.0):
+            return False
+
+        now = datetime.now()
+        with self.get_session() as session:
+            try:
+                session.execute(delete(AdjFactor).where(AdjFactor.code == code))
+                session.add_all([
+                    AdjFactor(code=code, date=d.astype(date), factor=float(f), data_source=data_source, updated_at=now)
+                    for d, f in zip(dates, values)
+                ])
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.error(f"保存 {code} 复权因子失败: {e}")
+                raise
+        logger.info(f"保存 {code} 复权因子成功，共 {len(values)} 段")
+        return True
+
+    def get_adjusted_daily_data(
+        self,
+        code: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        adjust: str = ADJUST_QFQ,
+    ) -> pd.DataFrame:
+        """
+        由不复权日线与复权因子计算复权日线（读取时向量化计算）
+
+        前复权以已保存的最新因子为基准，与区间无关
+
+        Returns:
+            列为 code/date + BAR_COLUMNS 的 DataFrame（按日期升序），无数据时为空 DataFrame
+        """
+        conditions = [StockDailyRaw.code == code]
+        if start_date is not None:
+            conditions.append(StockDailyRaw.date >= start_date)
+        if end_date is not None:
+            conditions.append(StockDailyRaw.date <= end_date)
+        columns = [StockDailyRaw.date] + [getattr(StockDailyRaw, name) for name in BAR_COLUMNS]
+        with self.get_session() as session:
+            rows = session.execute(
+                select(*columns).where(and_(*conditions)).order_by(StockDailyRaw.date)
+            ).all()
+        frame = pd.DataFrame(rows, columns=['date', *BAR_COLUMNS], dtype=object)
+        frame['date'] = pd.to_datetime(frame['date'])
+        for name in BAR_COLUMNS:
+            frame[name] = pd.to_numeric(frame[name])
+        frame.insert(0, 'code', code)
+        if frame.empty or adjust == ADJUST_RAW:
+            return frame
+        factor_dates, factors = self.get_adj_factors(code)
+        return apply_adjustment(frame, factor_dates, factors, adjust)
+
+    def _sync_bar_store(self, code: str, saved_dates: List[date]) -> None:
+        """
+        将刚写入的年份从 stock_daily 同步到本地列式日线存储，并登记覆盖区间
+
+        同步失败时清除该股票的覆盖记录，之后的读取全部回源，避免返回过期数据；
+        已覆盖的日线价格发生变化（除权后前复权价格重算）时由 BarStore.write_year 清除覆盖记录
+        """
+        store = get_bar_store()
+        if store is None or not saved_dates:
+            return
+        try:
+            columns = [StockDaily.date] + [getattr(StockDaily, name) for name in BAR_COLUMNS]
+            with self.get_session() as session:
+                for year in sorted({d.year for d in saved_dates}):
+                    rows = session.execute(
+                        select(*columns)
+                        .where(and_(
+                            StockDaily.code == code,
+                            StockDaily.date >= date(year, 1, 1),
+                            StockDaily.date <= date(year, 12, 31),
+                        ))
+                        .order_by(StockDaily.date)
+                    ).all()
+                    store.write_year(code, year, rows)
+            store.mark_covered(code, min(saved_dates), max(saved_dates))
+        except Exception as e:
+            logger.warning(f"同步本地日线存储失败 {code}: {e}")
+            store.invalidate(code)
     
     def get_analysis_context(
         self, 
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""Shared factory for StockAnalysisPipeline instances used by the pipeline tests."""
+
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+from src.config import Config
+
+
+def make_pipeline(db: Any = None, max_workers: int = 1, query_source: str = "cli", **config_fields: Any):
+    """
+    Build a StockAnalysisPipeline through its real __init__ with network-facing collaborators mocked.
+
+    Args:
+        db: DatabaseManager to use (defaults to a MagicMock)
+        max_workers: pipeline concurrency
+        query_source: recorded query source
+        **config_fields: Config field overrides (the rest keep their dataclass defaults)
+
+    The data fetcher manager, analyzer, notifier and search service are MagicMocks; tests replace
+    individual methods on the returned pipeline as needed.
+    """
+    from src.core.pipeline import StockAnalysisPipeline
+
+    config = Config(**{"save_context_snapshot": False, **config_fields})
+    with patch("src.core.pipeline.get_db", return_value=db if db is not None else MagicMock()), \
+            patch("src.core.pipeline.DataFetcherManager"), \
+            patch("src.core.pipeline.StockTrendAnalyzer"), \
+            patch("src.core.pipeline.GeminiAnalyzer"), \
+            patch("src.core.pipeline.NotificationService"), \
+            patch("src.core.pipeline.SearchService"):
+        pipeline = StockAnalysisPipeline(config=config, max_workers=max_workers, query_source=query_source)
+    return pipeline
+
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for ArticleExtractor (concurrent fetch, per-domain limit, URL content cache, 304 revalidation).
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Mock newspaper before search_service import (optional dependency)
+if "newspaper" not in sys.modules:
+    mock_np = MagicMock()
+    mock_np.Article = MagicMock()
+    mock_np.Config = MagicMock()
+    sys.modules["newspaper"] = mock_np
+
+from src.config import Config
+import src.search_service as search_service
+from src.search_service import ArticleExtractor, get_article_extractor, shutdown_article_extractor
+from src.storage import DatabaseManager, UrlContent
+
+
+def _http_response(status_code: int = 200, text: str = "<html></html>", headers=None) -> MagicMock:
+    resp = MagicMock()
+    resp.status_code = status_code
+    resp.text = text
+    resp.headers = headers or {}
+    return resp
+
+
+@patch("src.search_service._parse_article_text", side_effect=lambda url, html, timeout=5: f"body of {url}")
+class ArticleExtractorTestCase(unittest.TestCase):
+    """In-memory behaviour of ArticleExtractor."""
+
+    @patch("src.search_service.requests.get")
+    def test_conditional_refetch_uses_cache_on_304(self, mock_get: MagicMock, _parse: MagicMock) -> None:
+        extractor = ArticleExtractor(revalidate_after=0)
+        mock_get.return_value = _http_response(
+            headers={"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}
+        )
+        self.assertEqual(extractor.fetch("https://a.com/x"), "body of https://a.com/x")
+
+        mock_get.return_value = _http_response(status_code=304)
+        self.assertEqual(extractor.fetch("https://a.com/x"), "body of https://a.com/x")
+
+        headers = mock_get.call_args.kwargs["headers"]
+        self.assertEqual(headers["If-None-Match"], '"v1"')
+        self.assertEqual(headers["If-Modified-Since"], "Mon, 01 Jan 2024 00:00:00 GMT")
+        self.assertEqual(_parse.call_count, 1)
+
+    @patch("src.search_service.requests.get")
+    def test_fresh_cache_skips_network(self, mock_get: MagicMock, _parse: MagicMock) -> None:
+        extractor = ArticleExtractor(revalidate_after=3600)
+        mock_get.return_value = _http_response()
+        extractor.fetch("https://a.com/x")
+        extractor.fetch("https://a.com/x")
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch("src.search_service.requests.get")
+    def test_fetch_many_is_concurrent_and_domain_bounded(self, mock_get: MagicMock, _parse: MagicMock) -> None:
+        active = {}
+        peak = {}
+        lock = threading.Lock()
+
+        def slow_get(url, headers=None, timeout=5):
+            domain = url.split("/")[2]
+            with lock:
+                active[domain] = active.get(domain, 0) + 1
+                peak[domain] = max(peak.get(domain, 0), active[domain])
+            time.sleep(0.2)
+            with lock:
+                active[domain] -= 1
+            return _http_response()
+
+        mock_get.side_effect = slow_get
+        extractor = ArticleExtractor(max_workers=8, per_domain_limit=2)
+        urls = [f"https://a.com/{i}" for i in range(4)] + [f"https://b.com/{i}" for i in range(2)] + [""]
+
+        start = time.time()
+        contents = extractor.fetch_many(urls)
+        elapsed = time.time() - start
+
+        self.assertEqual(len(contents), 6)
+        self.assertEqual(peak["a.com"], 2)
+        # a.com needs two rounds of 0.2s; serial would take 1.2s
+        self.assertLess(elapsed, 0.8)
+
+    def test_shutdown_closes_executor_and_resets_singleton(self, _parse: MagicMock) -> None:
+        with patch.object(search_service, "_article_extractor", ArticleExtractor()):
+            extractor = get_article_extractor()
+            shutdown_article_extractor()
+            self.assertIsNone(search_service._article_extractor)
+            with self.assertRaises(RuntimeError):
+                extractor._executor.submit(time.sleep, 0)
+
+
+@patch("src.search_service._parse_article_text", side_effect=lambda url, html, timeout=5: "persisted body")
+class ArticleExtractorPersistenceTestCase(unittest.TestCase):
+    """URL content is stored in the url_content table and reused by new extractor instances."""
+
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_PATH"] = os.path.join(self._temp_dir.name, "test_article_extractor.db")
+        Config._instance = None
+        DatabaseManager.reset_instance()
+        self.db = DatabaseManager.get_instance()
+
+    def tearDown(self) -> None:
+        DatabaseManager.reset_instance()
+        self._temp_dir.cleanup()
+
+    @patch("src.search_service.requests.get")
+    def test_content_reused_across_instances(self, mock_get: MagicMock, _parse: MagicMock) -> None:
+        mock_get.return_value = _http_response(headers={"ETag": '"abc"'})
+        ArticleExtractor(persist=True).fetch("https://a.com/x")
+
+        mock_get.reset_mock()
+        mock_get.return_value = _http_response(status_code=304)
+        content = ArticleExtractor(persist=True, revalidate_after=0).fetch("https://a.com/x")
+
+        self.assertEqual(content, "persisted body")
+        self.assertEqual(mock_get.call_args.kwargs["headers"]["If-None-Match"], '"abc"')
+        with self.db.get_session() as session:
+            row = session.query(UrlContent).filter_by(url="https://a.com/x").one()
+            self.assertEqual(row.etag, '"abc"')
+
+
+if __name__ == "__main__":
+    unittest.main()
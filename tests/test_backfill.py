@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""Tests for the bulk daily-bar upsert and the historical backfill service/job."""
+
+import os
+import tempfile
+import threading
+import unittest
+from datetime import date, timedelta
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+from data_provider.base import DataFetcherManager
+from src.config import Config
+from src.repositories.backfill_repo import BackfillRepository
+from src.services.backfill_job_queue import BackfillJobQueue
+from src.services.backfill_service import BackfillService
+from src.services.task_queue import DuplicateTaskError, TaskStatus
+from src.storage import BackfillCheckpoint, DatabaseManager, StockDaily
+
+START = date(2024, 1, 1)
+END = date(2024, 1, 31)
+
+
+def _frame(start: date, days: int, base: float = 10.0) -> pd.DataFrame:
+    dates = [d for d in (start + timedelta(days=i) for i in range(days)) if d.weekday() < 5]
+    return pd.DataFrame({
+        "date": pd.to_datetime(dates),
+        "open": base, "high": base + 1, "low": base - 1,
+        "close": [base + i * 0.1 for i in range(len(dates))],
+        "volume": 1000, "amount": 1e4, "pct_chg": float("nan"),
+    })
+
+
+def _fetcher(name: str, priority: int, handler) -> MagicMock:
+    fetcher = MagicMock(priority=priority)
+    fetcher.name = name
+    fetcher.get_daily_data.side_effect = lambda stock_code, start_date, end_date, **_: handler(stock_code)
+    return fetcher
+
+
+class BackfillTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_PATH"] = os.path.join(self._temp_dir.name, "test_backfill.db")
+        Config._instance = None
+        DatabaseManager.reset_instance()
+        BackfillJobQueue._instance = None
+        self.db = DatabaseManager.get_instance()
+
+    def tearDown(self) -> None:
+        if BackfillJobQueue._instance is not None:
+            BackfillJobQueue._instance.shutdown()
+            BackfillJobQueue._instance = None
+        DatabaseManager.reset_instance()
+        self._temp_dir.cleanup()
+
+    def _rows(self, code: str):
+        with self.db.get_session() as session:
+            return session.query(StockDaily).filter(StockDaily.code == code).order_by(StockDaily.date).all()
+
+    def test_bulk_upsert_counts_new_rows_and_overwrites_existing(self) -> None:
+        self.assertEqual(self.db.save_daily_data(_frame(START, 10), "600519", "A"), 8)
+
+        # Overlapping frame with a duplicated date: only the 5 later weekdays are new, the last duplicate wins
+        updated = _frame(START + timedelta(days=7), 10, base=20.0)
+        updated = pd.concat([updated, updated.tail(1).assign(close=99.0)], ignore_index=True)
+        self.assertEqual(self.db.save_daily_data(updated, "600519", "B"), 5)
+
+        rows = self._rows("600519")
+        self.assertEqual(len(rows), 13)
+        self.assertEqual(rows[0].data_source, "A")
+        self.assertEqual(rows[5].close, 20.0)
+        self.assertEqual(rows[5].data_source, "B")
+        self.assertEqual(rows[-1].close, 99.0)
+        self.assertIsNone(rows[-1].pct_chg)
+
+    def test_failed_codes_move_to_other_sources_and_checkpoint(self) -> None:
+        def flaky(code):
+            if code == "000001":
+                raise RuntimeError("blocked")
+            return _frame(START, 31) if code != "300999" else None
+
+        primary = _fetcher("PrimaryFetcher", 0, flaky)
+        secondary = _fetcher("SecondaryFetcher", 1, lambda code: _frame(START, 31) if code != "300999" else None)
+        service = BackfillService(self.db, DataFetcherManager(fetchers=[primary, secondary]))
+
+        updates = []
+        result = service.run(["600519", "sz000001", "300999"], START, END, progress_callback=updates.append)
+
+        self.assertEqual((result["total"], result["done"], result["failed"]), (3, 2, 1))
+        self.assertEqual(result["bars"], 2 * 23)
+        self.assertEqual(len(self._rows("000001")), 23)
+        self.assertEqual(self._rows("000001")[0].data_source, "SecondaryFetcher")
+        self.assertIn("300999", result["failed_codes"])
+        # Sources run in parallel, so the secondary may have taken 000001 before the primary tried it
+        self.assertLessEqual(result["sources"]["PrimaryFetcher"]["errors"], 1)
+        self.assertEqual(result["sources"]["SecondaryFetcher"]["done"], 2 - result["sources"]["PrimaryFetcher"]["done"])
+        self.assertGreater(result["bars_per_second"], 0)
+        self.assertEqual(updates[-1]["processed"], 3)
+
+        # Done codes are skipped on the next run; only the failed one is retried
+        primary.get_daily_data.reset_mock()
+        secondary.get_daily_data.reset_mock()
+        rerun = service.run(["600519", "000001", "300999"], START, END)
+        self.assertEqual((rerun["skipped"], rerun["failed"]), (2, 1))
+        called = {c.kwargs["stock_code"] for c in primary.get_daily_data.call_args_list}
+        self.assertEqual(called, {"300999"})
+
+        # A narrower range is covered by the finished checkpoint
+        done = BackfillRepository(self.db).get_done_codes(["600519", "300999"], START + timedelta(days=3), END)
+        self.assertEqual(done, {"600519"})
+
+    def test_us_codes_only_go_to_yfinance_and_failing_source_retires(self) -> None:
+        retired = threading.Event()
+
+        def down(code):
+            if broken.get_daily_data.call_count >= 5:
+                retired.set()
+            raise RuntimeError("down")
+
+        def slow(code):
+            # Let the broken source hit its error limit before the other lane drains the queue
+            retired.wait(5)
+            return _frame(START, 31)
+
+        broken = _fetcher("BrokenFetcher", 0, down)
+        yfinance = _fetcher("YfinanceFetcher", 4, slow)
+        service = BackfillService(self.db, DataFetcherManager(fetchers=[broken, yfinance]))
+
+        codes = ["AAPL"] + [f"6000{i:02d}" for i in range(8)]
+        result = service.run(codes, START, END)
+
+        self.assertEqual(result["done"], len(codes))
+        self.assertNotIn("AAPL", {c.kwargs["stock_code"] for c in broken.get_daily_data.call_args_list})
+        self.assertTrue(result["sources"]["BrokenFetcher"]["retired"])
+        self.assertEqual(result["sources"]["BrokenFetcher"]["errors"], 5)
+
+    def test_save_failures_fail_the_code_without_retiring_the_source(self) -> None:
+        fetcher = _fetcher("PrimaryFetcher", 0, lambda code: _frame(START, 31))
+        service = BackfillService(self.db, DataFetcherManager(fetchers=[fetcher]))
+        codes = [f"6000{i:02d}" for i in range(8)]
+        save_daily_data = self.db.save_daily_data
+
+        def locked(df, code, data_source):
+            if code in codes[:6]:
+                raise RuntimeError("database is locked")
+            return save_daily_data(df, code, data_source)
+
+        with patch.object(self.db, "save_daily_data", side_effect=locked):
+            result = service.run(codes, START, END)
+
+        self.assertEqual((result["done"], result["failed"]), (2, 6))
+        self.assertFalse(result["sources"]["PrimaryFetcher"]["retired"])
+        self.assertEqual(result["sources"]["PrimaryFetcher"]["errors"], 0)
+        self.assertTrue(result["failed_codes"]["600000"].startswith("[保存失败]"))
+        # The fetched data was fine, so the code is not handed to (and re-fetched by) another source
+        self.assertEqual(fetcher.get_daily_data.call_count, len(codes))
+
+    def test_all_resolves_to_a_share_codes(self) -> None:
+        lister = _fetcher("ListFetcher", 0, lambda code: None)
+        lister.get_stock_list.return_value = pd.DataFrame({"code": ["600519", "000001", "300750", "688981", "000300",
+                                                                     "830799", "510300"]})
+        service = BackfillService(self.db, DataFetcherManager(fetchers=[lister]))
+        self.assertEqual(service.resolve_codes(["all"]),
+                         ["600519", "000001", "300750", "688981", "000300"])
+
+    def test_job_reports_progress_and_blocks_concurrent_backfills(self) -> None:
+        gate = threading.Event()
+
+        def gated(code):
+            gate.wait(5)
+            return _frame(START, 31)
+
+        manager = DataFetcherManager(fetchers=[_fetcher("MockFetcher", 0, gated)])
+        queue = BackfillJobQueue()
+        original_init = BackfillService.__init__
+
+        def init(service, *args, **kwargs):
+            original_init(service, self.db, manager)
+
+        with patch.object(BackfillService, "__init__", init):
+            job = queue.submit_backfill(codes=["600519", "000001"], start=START, end=END)
+            with self.assertRaises(DuplicateTaskError):
+                queue.submit_backfill(codes=["600000"], start=START, end=END)
+            gate.set()
+            queue._futures[job.task_id].result(timeout=10)
+
+        finished = queue.get_task(job.task_id).to_dict()
+        self.assertEqual(finished["status"], TaskStatus.COMPLETED.value)
+        self.assertEqual((finished["done"], finished["bars"], finished["progress"]), (2, 46, 100))
+        self.assertIn("MockFetcher", finished["sources"])
+        with self.db.get_session() as session:
+            self.assertEqual(session.query(BackfillCheckpoint).filter_by(status="done").count(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+"""Parity tests for the vectorized batch backtest evaluation.
+
+The batch path must produce exactly what evaluate_single returns for the same
+start bar and forward window, including missing prices and SL/TP edge cases.
+"""
+
+import os
+import random
+import tempfile
+import unittest
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Optional
+from unittest.mock import patch
+
+import numpy as np
+
+from src.config import Config
+from src.core.backtest_engine import BacktestEngine, BarArrays, BatchCandidate, EvaluationConfig
+from src.repositories.stock_repo import StockRepository
+from src.services.backtest_service import BacktestService
+from src.storage import AnalysisHistory, BacktestResult, DatabaseManager, StockDaily
+
+
+@dataclass
+class Bar:
+    date: date
+    high: Optional[float]
+    low: Optional[float]
+    close: Optional[float]
+
+
+_ADVICES = ["买入", "持有", "卖出", "观望", "buy", "strong sell", "不要买入", None, "unknown"]
+
+
+def _random_bars(rng: random.Random, count: int, missing_rate: float = 0.05) -> list:
+    bars = []
+    day = date(2024, 1, 1)
+    price = 100.0
+    for _ in range(count):
+        price = max(1.0, price * (1 + rng.uniform(-0.05, 0.05)))
+        high = price * (1 + rng.uniform(0, 0.03))
+        low = price * (1 - rng.uniform(0, 0.03))
+        bars.append(Bar(
+            date=day,
+            high=None if rng.random() < missing_rate else round(high, 2),
+            low=None if rng.random() < missing_rate else round(low, 2),
+            close=None if rng.random() < missing_rate else round(price, 2),
+        ))
+        day += timedelta(days=rng.choice([1, 1, 1, 3]))
+    return bars
+
+
+def _arrays(bars: list) -> BarArrays:
+    def column(name: str) -> np.ndarray:
+        return np.array([np.nan if getattr(b, name) is None else getattr(b, name) for b in bars], dtype=np.float64)
+
+    return BarArrays(
+        dates=np.array([b.date for b in bars], dtype="datetime64[D]"),
+        high=column("high"),
+        low=column("low"),
+        close=column("close"),
+    )
+
+
+def _expected(bars: list, cand: BatchCandidate, config: EvaluationConfig) -> Optional[dict]:
+    starts = [i for i, b in enumerate(bars) if b.date <= cand.analysis_date]
+    if not starts or bars[starts[-1]].close is None:
+        return None
+    start = starts[-1]
+    return BacktestEngine.evaluate_single(
+        operation_advice=cand.operation_advice,
+        analysis_date=bars[start].date,
+        start_price=float(bars[start].close),
+        forward_bars=bars[start + 1:start + 1 + config.eval_window_days],
+        stop_loss=cand.stop_loss,
+        take_profit=cand.take_profit,
+        config=config,
+    )
+
+
+class EvaluateBatchParityTestCase(unittest.TestCase):
+    def test_matches_evaluate_single_on_random_data(self) -> None:
+        rng = random.Random(20240101)
+        config = EvaluationConfig(eval_window_days=5, neutral_band_pct=2.0)
+        series = {code: _random_bars(rng, 80) for code in ("600519", "000001", "AAPL")}
+        series["00700"] = _random_bars(rng, 4)  # never enough forward bars
+
+        candidates = []
+        for key in range(400):
+            code = rng.choice(sorted(series))
+            bars = series[code]
+            ref = rng.choice(bars).close or 100.0
+            candidates.append(BatchCandidate(
+                key=key,
+                code=code,
+                operation_advice=rng.choice(_ADVICES),
+                analysis_date=bars[0].date + timedelta(days=rng.randint(-5, 130)),
+                stop_loss=None if rng.random() < 0.3 else round(ref * rng.uniform(0.85, 1.0), 2),
+                take_profit=None if rng.random() < 0.3 else round(ref * rng.uniform(1.0, 1.15), 2),
+            ))
+        candidates.append(BatchCandidate(
+            key="missing", code="UNKNOWN", operation_advice="买入", analysis_date=date(2024, 2, 1),
+            stop_loss=None, take_profit=None,
+        ))
+
+        arrays = {code: _arrays(bars) for code, bars in series.items()}
+        results = BacktestEngine.evaluate_batch(candidates=candidates, bars=arrays, config=config)
+
+        statuses = set()
+        for cand, result in zip(candidates, results):
+            expected = _expected(series.get(cand.code, []), cand, config)
+            self.assertEqual(result, expected, msg=f"candidate {cand}")
+            if result is not None:
+                statuses.add(result.get("first_hit") or result["eval_status"])
+        # The random sample covers the interesting branches
+        self.assertTrue({"stop_loss", "take_profit", "neither", "not_applicable", "insufficient_data"} <= statuses)
+
+    def test_same_bar_touch_is_ambiguous_and_zero_price_is_error(self) -> None:
+        config = EvaluationConfig(eval_window_days=2)
+        bars = [
+            Bar(date(2024, 1, 1), 10.0, 10.0, 10.0),
+            Bar(date(2024, 1, 2), 12.0, 8.0, 10.0),
+            Bar(date(2024, 1, 3), 10.0, 10.0, 10.0),
+            Bar(date(2024, 1, 4), 10.0, 10.0, 0.0),
+            Bar(date(2024, 1, 5), 10.0, 10.0, 10.0),
+        ]
+        candidates = [
+            BatchCandidate("a", "X", "买入", date(2024, 1, 1), 9.0, 11.0),
+            BatchCandidate("b", "X", "买入", date(2024, 1, 4), None, None),
+        ]
+        results = BacktestEngine.evaluate_batch(
+            candidates=candidates, bars={"X": _arrays(bars)}, config=config
+        )
+        self.assertEqual(results[0]["first_hit"], "ambiguous")
+        self.assertEqual(results[0]["first_hit_date"], date(2024, 1, 2))
+        self.assertEqual(results[1]["eval_status"], "error")
+        for cand, result in zip(candidates, results):
+            self.assertEqual(result, _expected(bars, cand, config))
+
+
+class BatchServiceParityTestCase(unittest.TestCase):
+    """run_backtest stores identical results on the batch and sequential paths."""
+
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_PATH"] = os.path.join(self._temp_dir.name, "test_backtest_batch.db")
+        os.environ["BACKTEST_EVAL_WINDOW_DAYS"] = "3"
+        Config._instance = None
+        DatabaseManager.reset_instance()
+        self.db = DatabaseManager.get_instance()
+
+        rng = random.Random(7)
+        with self.db.get_session() as session:
+            for code in ("600519", "000001"):
+                for bar in _random_bars(rng, 20, missing_rate=0.0):
+                    session.add(StockDaily(code=code, date=bar.date, high=bar.high, low=bar.low, close=bar.close))
+            for i in range(12):
+                code = "600519" if i % 2 else "000001"
+                day = date(2024, 1, 1) + timedelta(days=2 * i)
+                session.add(AnalysisHistory(
+                    query_id=f"q{i}", code=code, name=code, report_type="simple", sentiment_score=60,
+                    operation_advice=_ADVICES[i % len(_ADVICES)], trend_prediction="看多", analysis_summary="test",
+                    stop_loss=95.0 if i % 3 else None, take_profit=105.0, created_at=datetime(2024, 1, 1),
+                    context_snapshot=f'{{"enhanced_context": {{"date": "{day.isoformat()}"}}}}',
+                ))
+            # No bars at all for this code: gap-fill is attempted, then insufficient_data
+            session.add(AnalysisHistory(
+                query_id="qx", code="300750", name="x", report_type="simple", sentiment_score=60,
+                operation_advice="买入", trend_prediction="看多", analysis_summary="test",
+                created_at=datetime(2024, 1, 1), context_snapshot='{"enhanced_context": {"date": "2024-01-05"}}',
+            ))
+            session.commit()
+
+    def tearDown(self) -> None:
+        DatabaseManager.reset_instance()
+        os.environ.pop("BACKTEST_EVAL_WINDOW_DAYS", None)
+        os.environ.pop("BACKTEST_BATCH_ENABLED", None)
+        self._temp_dir.cleanup()
+
+    def _run(self, batch: bool):
+        os.environ["BACKTEST_BATCH_ENABLED"] = "true" if batch else "false"
+        Config._instance = None
+        service = BacktestService(self.db)
+        if batch:
+            # The batch path must not silently fall back to per-query evaluation
+            service._evaluate_sequential = None
+        with patch.object(BacktestService, "_try_fill_daily_data"), \
+                patch("data_provider.base.DataFetcherManager") as manager_cls:
+            manager_cls.return_value.get_daily_data.return_value = (None, None)
+            stats = service.run_backtest(force=True)
+        with self.db.get_session() as session:
+            rows = session.query(BacktestResult).order_by(BacktestResult.analysis_history_id).all()
+            snapshot = [
+                {k: v for k, v in vars(r).items() if k not in ("_sa_instance_state", "id", "evaluated_at")}
+                for r in rows
+            ]
+        return stats, snapshot, manager_cls.return_value.get_daily_data
+
+    def test_batch_and_sequential_results_match(self) -> None:
+        batch_stats, batch_rows, batch_fill = self._run(batch=True)
+        seq_stats, seq_rows, _ = self._run(batch=False)
+        self.assertEqual(batch_stats, seq_stats)
+        self.assertEqual(batch_rows, seq_rows)
+        self.assertEqual(batch_stats["processed"], 13)
+        self.assertGreater(batch_stats["completed"], 0)
+        self.assertGreater(batch_stats["insufficient"], 0)
+        # Gap-fill fetches each code once, over the union of its missing ranges
+        fetched = [c.kwargs["stock_code"] for c in batch_fill.call_args_list]
+        self.assertEqual(len(fetched), len(set(fetched)))
+        self.assertIn("300750", fetched)
+
+
+    def test_missing_bars_are_fetched_once_per_code_then_evaluated(self) -> None:
+        import pandas as pd
+
+        frame = pd.DataFrame({
+            "date": [date(2024, 1, 1) + timedelta(days=i) for i in range(20)],
+            "open": 50.0, "high": 51.0, "low": 49.0, "close": 50.0, "volume": 1000, "amount": 5e4, "pct_chg": 0.0,
+        })
+        with self.db.get_session() as session:
+            session.add(AnalysisHistory(
+                query_id="qy", code="300750", name="x", report_type="simple", sentiment_score=60,
+                operation_advice="持有", trend_prediction="看多", analysis_summary="test",
+                created_at=datetime(2024, 1, 1), context_snapshot='{"enhanced_context": {"date": "2024-01-09"}}',
+            ))
+            session.commit()
+
+        with patch("data_provider.base.DataFetcherManager") as manager_cls:
+            manager_cls.return_value.get_daily_data.return_value = (frame, "MockFetcher")
+            BacktestService(self.db).run_backtest(code="300750")
+
+        calls = manager_cls.return_value.get_daily_data.call_args_list
+        self.assertEqual(len(calls), 1)
+        # Union range: earliest gap (01-05) to the latest gap (01-09) plus the forward padding
+        self.assertEqual(calls[0].kwargs["start_date"], "2024-01-05")
+        self.assertEqual(calls[0].kwargs["end_date"], "2024-02-08")
+        with self.db.get_session() as session:
+            statuses = {r.eval_status for r in session.query(BacktestResult).filter_by(code="300750")}
+        self.assertEqual(statuses, {"completed"})
+
+
+    def test_bar_panel_matches_per_code_queries(self) -> None:
+        repo = StockRepository(self.db)
+        ranges = {
+            "600519": (date(2024, 1, 4), date(2024, 1, 8)),
+            "000001": (date(2023, 12, 1), date(2024, 1, 2)),
+            "300750": (date(2024, 1, 1), date(2024, 1, 1)),
+        }
+        with patch("src.repositories.stock_repo._PANEL_CODES_PER_QUERY", 2):
+            panel = BarArrays.split_panel(repo.get_bar_panel(ranges=ranges, forward_bars=3))
+            tail = BarArrays.split_panel(repo.get_bar_panel(ranges=ranges, forward_bars=100))
+
+        self.assertEqual(sorted(panel), ["000001", "600519"])
+        for code in panel:
+            since, until = ranges[code]
+            start = repo.get_start_daily(code=code, analysis_date=since)
+            start_date = start.date if start is not None else since
+            with self.db.get_session() as session:
+                rows = (
+                    session.query(StockDaily)
+                    .filter(StockDaily.code == code, StockDaily.date >= start_date)
+                    .order_by(StockDaily.date)
+                    .all()
+                )
+            # Up to the third stored bar after until; with too few later bars, to the latest one
+            later = [i for i, row in enumerate(rows) if row.date > until]
+            expected = _arrays(rows[:later[2] + 1])
+            for name in ("dates", "high", "low", "close"):
+                self.assertEqual(getattr(panel[code], name).tolist(), getattr(expected, name).tolist())
+            self.assertEqual(tail[code].dates.tolist(), _arrays(rows).dates.tolist())
+            self.assertLess(len(panel[code]), len(rows))
+
+    def test_candidates_exclude_evaluated_analyses(self) -> None:
+        self._run(batch=True)
+        repo = BacktestService(self.db).repo
+        kwargs = dict(code=None, min_age_days=0, limit=100, eval_window_days=3, engine_version="v1")
+        self.assertEqual(repo.get_candidates(force=False, **kwargs), [])
+        self.assertEqual(len(repo.get_candidates(force=False, **dict(kwargs, eval_window_days=5))), 13)
+        self.assertEqual(len(repo.get_candidates(force=True, **kwargs)), 13)
+
+    def test_sweep_shares_one_preload_and_matches_individual_runs(self) -> None:
+        service = BacktestService(self.db)
+        with patch.object(BacktestService, "_try_fill_daily_data"), \
+                patch("data_provider.base.DataFetcherManager") as manager_cls, \
+                patch.object(StockRepository, "get_bar_panel", autospec=True,
+                             side_effect=StockRepository.get_bar_panel) as bars_mock:
+            manager_cls.return_value.get_daily_data.return_value = (None, None)
+            report = service.run_sweep(eval_window_days=[3, 2], neutral_band_pct=[1.0, 2.5])
+
+        # One panel query covers every code for the whole grid (300750 has no bars and no fetched data)
+        self.assertEqual(bars_mock.call_count, 1)
+        self.assertEqual(report["processed"], 13)
+        self.assertEqual(report["saved"], 13 * 4)
+        self.assertEqual(
+            [(i["eval_window_days"], i["neutral_band_pct"], i["engine_version"]) for i in report["items"]],
+            [(2, 1.0, "v1-nb1"), (2, 2.5, "v1-nb2.5"), (3, 1.0, "v1-nb1"), (3, 2.5, "v1-nb2.5")],
+        )
+
+        # Each grid point equals a regular run configured with the same parameters
+        with self.db.get_session() as session:
+            swept = {
+                (r.analysis_history_id, r.eval_window_days, r.engine_version): (r.outcome, r.stock_return_pct)
+                for r in session.query(BacktestResult)
+            }
+        os.environ.update({"BACKTEST_EVAL_WINDOW_DAYS": "2", "BACKTEST_NEUTRAL_BAND_PCT": "2.5",
+                           "BACKTEST_ENGINE_VERSION": "plain"})
+        try:
+            Config._instance = None
+            with patch("data_provider.base.DataFetcherManager") as manager_cls:
+                manager_cls.return_value.get_daily_data.return_value = (None, None)
+                BacktestService(self.db).run_backtest(force=True)
+        finally:
+            os.environ.pop("BACKTEST_NEUTRAL_BAND_PCT", None)
+            os.environ.pop("BACKTEST_ENGINE_VERSION", None)
+        with self.db.get_session() as session:
+            plain = session.query(BacktestResult).filter_by(engine_version="plain").all()
+            self.assertEqual(len(plain), 13)
+            for row in plain:
+                self.assertEqual(swept[(row.analysis_history_id, 2, "v1-nb2.5")], (row.outcome, row.stock_return_pct))
+
+
+if __name__ == "__main__":
+    unittest.main()
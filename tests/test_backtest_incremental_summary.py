@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""Integration tests for incrementally maintained backtest summaries."""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+from src.config import Config
+from src.core.backtest_engine import OVERALL_SENTINEL_CODE, BacktestEngine
+from src.repositories.backtest_repo import BacktestRepository
+from src.services.backtest_service import BacktestService
+from src.storage import AnalysisHistory, BacktestResult, BacktestSummary, DatabaseManager, StockDaily
+
+
+class IncrementalSummaryTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_PATH"] = os.path.join(self._temp_dir.name, "test_backtest_incremental.db")
+        os.environ["BACKTEST_EVAL_WINDOW_DAYS"] = "3"
+        Config._instance = None
+        DatabaseManager.reset_instance()
+        self.db = DatabaseManager.get_instance()
+
+        with self.db.get_session() as session:
+            for code, drift in (("600519", 1.5), ("000001", -1.0)):
+                for i in range(30):
+                    close = 100.0 + drift * i
+                    session.add(StockDaily(code=code, date=date(2024, 1, 1) + timedelta(days=i),
+                                           high=close + 2, low=close - 2, close=close))
+            session.commit()
+
+    def tearDown(self) -> None:
+        DatabaseManager.reset_instance()
+        os.environ.pop("BACKTEST_EVAL_WINDOW_DAYS", None)
+        self._temp_dir.cleanup()
+
+    def _add_analyses(self, start: int, count: int) -> None:
+        with self.db.get_session() as session:
+            for i in range(start, start + count):
+                code = "600519" if i % 2 else "000001"
+                day = date(2024, 1, 1) + timedelta(days=i)
+                session.add(AnalysisHistory(
+                    query_id=f"q{i}", code=code, name=code, report_type="simple", sentiment_score=60,
+                    operation_advice=("买入", "持有", "卖出")[i % 3], trend_prediction="看多", analysis_summary="t",
+                    stop_loss=97.0 if i % 4 else None, take_profit=104.0, created_at=datetime(2024, 1, 1),
+                    context_snapshot=f'{{"enhanced_context": {{"date": "{day.isoformat()}"}}}}',
+                ))
+            session.commit()
+
+    def _full_summary(self, code: str) -> dict:
+        with self.db.get_session() as session:
+            query = session.query(BacktestResult)
+            if code != OVERALL_SENTINEL_CODE:
+                query = query.filter(BacktestResult.code == code)
+            rows = query.all()
+            return BacktestEngine.compute_summary(
+                results=rows,
+                scope="overall" if code == OVERALL_SENTINEL_CODE else "stock",
+                code=code,
+                eval_window_days=3,
+                engine_version="v1",
+            )
+
+    def _stored_summary(self, code: str) -> dict:
+        scope = "overall" if code == OVERALL_SENTINEL_CODE else "stock"
+        return BacktestService(self.db).get_summary(scope=scope, code=code, eval_window_days=3)
+
+    def _assert_summaries_match_full_recompute(self) -> None:
+        for code in (OVERALL_SENTINEL_CODE, "600519", "000001"):
+            full = self._full_summary(code)
+            stored = self._stored_summary(code)
+            for key in ("total_evaluations", "completed_count", "win_count", "loss_count", "win_rate_pct",
+                        "direction_accuracy_pct", "avg_stock_return_pct", "avg_simulated_return_pct",
+                        "stop_loss_trigger_rate", "take_profit_trigger_rate", "avg_days_to_first_hit"):
+                self.assertEqual(stored[key], full[key], msg=f"{code}.{key}")
+            self.assertEqual(stored["advice_breakdown"], full["advice_breakdown"])
+
+    def test_incremental_runs_only_read_new_results(self) -> None:
+        service = BacktestService(self.db)
+        self._add_analyses(0, 6)
+        service.run_backtest()
+        self._assert_summaries_match_full_recompute()
+
+        self._add_analyses(6, 8)
+        with patch.object(BacktestRepository, "iter_results") as iter_mock:
+            stats = service.run_backtest()
+        self.assertEqual(stats["processed"], 8)
+        iter_mock.assert_not_called()
+        self._assert_summaries_match_full_recompute()
+
+        # Forced re-run replaces rows: old ones are subtracted, not double counted
+        service.run_backtest(force=True, code="600519")
+        self._assert_summaries_match_full_recompute()
+        self.assertEqual(self._stored_summary(OVERALL_SENTINEL_CODE)["total_evaluations"], 14)
+
+        report = service.rebuild_summaries()
+        self.assertEqual(report, {"rebuilt": 3, "mismatched": []})
+
+    def test_rebuild_detects_and_fixes_drift(self) -> None:
+        service = BacktestService(self.db)
+        self._add_analyses(0, 6)
+        service.run_backtest()
+
+        BacktestRepository(self.db).upsert_summary_state(
+            scope="stock", code="600519", eval_window_days=3, engine_version="v1", state={}
+        )
+        report = service.rebuild_summaries(eval_window_days=3)
+        self.assertEqual(report["mismatched"], ["stock:600519:3:v1"])
+        self._assert_summaries_match_full_recompute()
+        self.assertEqual(service.rebuild_summaries()["mismatched"], [])
+
+    def test_concurrent_merges_do_not_lose_updates(self) -> None:
+        repo = BacktestRepository(self.db)
+
+        def merge(state, rows):
+            count = (state or {}).get("count", 0)
+            time.sleep(0.001)  # widen the read-merge-write window
+            summary = BacktestSummary(scope="overall", code=OVERALL_SENTINEL_CODE, eval_window_days=3,
+                                      engine_version="v1", computed_at=datetime.now(), total_evaluations=count + 1)
+            return {"count": count + 1}, summary
+
+        def worker(offset: int) -> None:
+            for i in range(10):
+                BacktestRepository(self.db).save_results_with_summaries(
+                    [BacktestResult(analysis_history_id=offset + i, code="600519", eval_window_days=3,
+                                    engine_version="v1", eval_status="completed")],
+                    replace_existing=False, eval_window_days=3, engine_version="v1",
+                    summary_merges=lambda replaced: {("overall", OVERALL_SENTINEL_CODE): merge},
+                )
+
+        threads = [threading.Thread(target=worker, args=(n * 100,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        state = repo.get_summary_state(scope="overall", code=OVERALL_SENTINEL_CODE, eval_window_days=3,
+                                       engine_version="v1")
+        self.assertEqual(state, {"count": 40})
+        summary = repo.get_summary(scope="overall", code=OVERALL_SENTINEL_CODE, eval_window_days=3, engine_version="v1")
+        self.assertEqual(summary.total_evaluations, 40)
+
+    def test_forced_save_reads_replaced_rows_under_the_write_lock(self) -> None:
+        service = BacktestService(self.db)
+        self._add_analyses(0, 6)
+        service.run_backtest()
+
+        seen = {}
+        summary_merges = service._summary_merges
+
+        def spy(deltas, **kwargs):
+            # Another writer must not be able to change the rows between this read and the save
+            other = sqlite3.connect(os.environ["DATABASE_PATH"], timeout=0)
+            try:
+                other.execute("UPDATE backtest_results SET stock_return_pct = 0")
+                seen["other_writer"] = "committed"
+            except sqlite3.OperationalError:
+                seen["other_writer"] = "locked"
+            finally:
+                other.close()
+            return summary_merges(deltas, **kwargs)
+
+        with patch.object(service, "_summary_merges", side_effect=spy):
+            service.run_backtest(force=True, code="600519")
+        self.assertEqual(seen["other_writer"], "locked")
+        self._assert_summaries_match_full_recompute()
+        self.assertEqual(self._stored_summary(OVERALL_SENTINEL_CODE)["total_evaluations"], 6)
+
+    def test_concurrent_backtest_runs_keep_summaries_exact(self) -> None:
+        self._add_analyses(0, 12)
+        threads = [
+            threading.Thread(target=BacktestService(self.db).run_backtest, kwargs={"code": code})
+            for code in ("600519", "000001")
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self._assert_summaries_match_full_recompute()
+        self.assertEqual(self._stored_summary(OVERALL_SENTINEL_CODE)["total_evaluations"], 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""Tests for chunked backtest runs and background backtest jobs."""
+
+import os
+import tempfile
+import threading
+import unittest
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+from src.config import Config
+from src.services.backtest_job_queue import BacktestJobQueue
+from src.services.backtest_service import BacktestService
+from src.services.task_queue import DuplicateTaskError, TaskStatus
+from src.storage import AnalysisHistory, BacktestResult, DatabaseManager, StockDaily
+
+
+class BacktestJobsTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_PATH"] = os.path.join(self._temp_dir.name, "test_backtest_jobs.db")
+        os.environ["BACKTEST_EVAL_WINDOW_DAYS"] = "3"
+        os.environ["BACKTEST_CHUNK_SIZE"] = "2"
+        Config._instance = None
+        DatabaseManager.reset_instance()
+        BacktestJobQueue._instance = None
+        self.db = DatabaseManager.get_instance()
+
+        with self.db.get_session() as session:
+            for i in range(20):
+                close = 100.0 + i
+                session.add(StockDaily(code="600519", date=date(2024, 1, 1) + timedelta(days=i),
+                                       high=close + 2, low=close - 2, close=close))
+            for i in range(5):
+                day = date(2024, 1, 1) + timedelta(days=i)
+                session.add(AnalysisHistory(
+                    query_id=f"q{i}", code="600519", name="贵州茅台", report_type="simple", sentiment_score=60,
+                    operation_advice="买入", trend_prediction="看多", analysis_summary="t",
+                    created_at=datetime(2024, 1, 1),
+                    context_snapshot=f'{{"enhanced_context": {{"date": "{day.isoformat()}"}}}}',
+                ))
+            session.commit()
+
+    def tearDown(self) -> None:
+        if BacktestJobQueue._instance is not None:
+            BacktestJobQueue._instance.shutdown()
+            BacktestJobQueue._instance = None
+        DatabaseManager.reset_instance()
+        os.environ.pop("BACKTEST_EVAL_WINDOW_DAYS", None)
+        os.environ.pop("BACKTEST_CHUNK_SIZE", None)
+        self._temp_dir.cleanup()
+
+    def _saved_count(self) -> int:
+        with self.db.get_session() as session:
+            return session.query(BacktestResult).count()
+
+    def test_progress_is_reported_per_saved_chunk(self) -> None:
+        updates = []
+        stats = BacktestService(self.db).run_backtest(progress_callback=lambda s: updates.append((s, self._saved_count())))
+
+        self.assertEqual([u["processed"] for u, _ in updates], [0, 2, 4, 5])
+        self.assertEqual([saved for _, saved in updates], [0, 2, 4, 5])
+        self.assertTrue(all(u["total"] == 5 for u, _ in updates))
+        self.assertEqual(stats, {"processed": 5, "saved": 5, "completed": 5, "insufficient": 0, "errors": 0,
+                                 "cancelled": False})
+
+    def test_cancel_keeps_saved_chunks(self) -> None:
+        cancel = threading.Event()
+
+        def on_progress(stats):
+            if stats["processed"] >= 2:
+                cancel.set()
+
+        stats = BacktestService(self.db).run_backtest(progress_callback=on_progress, cancel_event=cancel)
+        self.assertTrue(stats["cancelled"])
+        self.assertEqual(stats["processed"], 2)
+        self.assertEqual(self._saved_count(), 2)
+
+        # A later run picks up only the remaining analyses
+        self.assertEqual(BacktestService(self.db).run_backtest()["processed"], 3)
+
+    def test_job_runs_in_background_and_can_be_cancelled(self) -> None:
+        queue = BacktestJobQueue()
+        gate = threading.Event()
+        original = BacktestService._evaluate_chunk
+
+        def gated(service, *args, **kwargs):
+            gate.wait(5)
+            return original(service, *args, **kwargs)
+
+        with patch.object(BacktestService, "_evaluate_chunk", gated):
+            job = queue.submit_backtest()
+            with self.assertRaises(DuplicateTaskError):
+                queue.submit_backtest()
+            queue.cancel_task(job.task_id)
+            gate.set()
+            queue._futures[job.task_id].result(timeout=10)
+
+        finished = queue.get_task(job.task_id)
+        self.assertEqual(finished.status, TaskStatus.CANCELLED)
+        self.assertLess(finished.processed, 5)
+        self.assertEqual(finished.to_dict()["saved"], self._saved_count())
+
+        # The scope is free again once the job ended
+        second = queue.submit_backtest()
+        queue._futures[second.task_id].result(timeout=10)
+        done = queue.get_task(second.task_id).to_dict()
+        self.assertEqual(done["status"], "completed")
+        self.assertEqual(done["progress"], 100)
+        self.assertEqual(self._saved_count(), 5)
+
+    def _blocked_queue(self):
+        queue = BacktestJobQueue()
+        gate = threading.Event()
+        original = BacktestService._evaluate_chunk
+
+        def gated(service, *args, **kwargs):
+            gate.wait(5)
+            return original(service, *args, **kwargs)
+
+        return queue, gate, patch.object(BacktestService, "_evaluate_chunk", gated)
+
+    def test_all_stocks_job_conflicts_with_running_code_job(self) -> None:
+        queue, gate, gated = self._blocked_queue()
+        with gated:
+            job = queue.submit_backtest(code="600519")
+            with self.assertRaises(DuplicateTaskError) as ctx:
+                queue.submit_backtest()
+            self.assertEqual(ctx.exception.existing_task_id, job.task_id)
+            gate.set()
+            queue._futures[job.task_id].result(timeout=10)
+
+    def test_code_job_conflicts_with_running_all_stocks_job(self) -> None:
+        queue, gate, gated = self._blocked_queue()
+        with gated:
+            job = queue.submit_backtest()
+            with self.assertRaises(DuplicateTaskError) as ctx:
+                queue.submit_backtest(code="600519")
+            self.assertEqual(ctx.exception.existing_task_id, job.task_id)
+            gate.set()
+            queue._futures[job.task_id].result(timeout=10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,7 @@
 import unittest
 from dataclasses import dataclass
 
-from src.core.backtest_engine import BacktestEngine
+from src.core.backtest_engine import BacktestEngine, SummaryAccumulator
 
 
 @dataclass
@@ -47,6 +47,37 @@ class BacktestSummaryTestCase(unittest.TestCase):
         # ambiguous_rate denominator should be 2 (any target applicable)
         self.assertEqual(summary["ambiguous_rate"], 0.0)
 
+    def test_accumulator_merge_and_remove_match_full_recompute(self) -> None:
+        rows = [
+            FakeRow(),
+            FakeRow(outcome="loss", direction_correct=False, stock_return_pct=-3.5, simulated_return_pct=-2.0,
+                    hit_stop_loss=True, first_hit="stop_loss", first_hit_trading_days=2),
+            FakeRow(position_recommendation="cash", outcome="neutral", direction_correct=None,
+                    simulated_return_pct=0.0, hit_stop_loss=None, hit_take_profit=None,
+                    first_hit="not_applicable", operation_advice="观望"),
+            FakeRow(eval_status="insufficient_data", outcome=None, direction_correct=None, stock_return_pct=None,
+                    simulated_return_pct=None, first_hit=None, operation_advice=None),
+            FakeRow(hit_take_profit=True, hit_stop_loss=True, first_hit="ambiguous", first_hit_trading_days=1,
+                    stock_return_pct=4.25),
+        ]
+        kwargs = dict(scope="stock", code="600519", eval_window_days=3, engine_version="v1")
+
+        merged = SummaryAccumulator()
+        for chunk in (rows[:2], rows[2:]):
+            delta = SummaryAccumulator()
+            for row in chunk:
+                delta.add(row)
+            merged.merge(SummaryAccumulator.from_dict(delta.to_dict()))
+        self.assertEqual(merged.to_summary(**kwargs), BacktestEngine.compute_summary(results=rows, **kwargs))
+
+        # Replacing a row (force re-run) is a remove + add
+        replacement = FakeRow(outcome="loss", direction_correct=False, operation_advice="卖出",
+                              position_recommendation="cash", hit_stop_loss=None, hit_take_profit=None)
+        merged.remove(rows[1])
+        merged.add(replacement)
+        expected = BacktestEngine.compute_summary(results=[rows[0], replacement, *rows[2:]], **kwargs)
+        self.assertEqual(merged.to_summary(**kwargs), expected)
+
 
 if __name__ == "__main__":
     unittest.main()
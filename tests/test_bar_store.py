@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""Tests for the local columnar bar store and its read-through use."""
+
+import os
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from data_provider.base import BAR_STORE_SOURCE, DataFetcherManager
+from src.config import Config
+from src.core.bar_store import BarStore, get_bar_store
+from src.core.trading_calendar import CN_CALENDAR
+from src.storage import DatabaseManager
+from tests.pipeline_helpers import make_pipeline
+
+
+def _frame(start: date, days: int, base: float = 10.0) -> pd.DataFrame:
+    dates = [d for d in (start + timedelta(days=i) for i in range(days)) if d.weekday() < 5]
+    return pd.DataFrame({
+        "date": dates,
+        "open": base, "high": base + 1, "low": base - 1,
+        "close": [base + i * 0.1 for i in range(len(dates))],
+        "volume": 1000.0, "amount": 1e4, "pct_chg": 0.5,
+    })
+
+
+class BarStoreTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.store = BarStore(Path(self._temp_dir.name))
+
+    def tearDown(self) -> None:
+        self._temp_dir.cleanup()
+
+    def test_round_trip_across_years(self) -> None:
+        rows = [(date(2023, 12, 29), 1, 2, 0.5, 1.5, 100, 150, None), (date(2024, 1, 2), 2, 3, 1, 2.5, 200, 500, 1.0)]
+        self.store.write_year("600519", 2023, rows[:1])
+        self.store.write_year("600519", 2024, rows[1:])
+        self.store.mark_covered("600519", date(2023, 12, 29), date(2024, 1, 2))
+
+        df = self.store.load("600519", date(2023, 12, 29), date(2024, 1, 2))
+        self.assertEqual(list(df["date"].dt.date), [date(2023, 12, 29), date(2024, 1, 2)])
+        self.assertEqual(list(df["close"]), [1.5, 2.5])
+        self.assertTrue(pd.isna(df["pct_chg"][0]))
+        self.assertEqual(set(df["code"]), {"600519"})
+
+    def test_only_fully_covered_ranges_are_served(self) -> None:
+        self.store.write_year("600519", 2024, [(date(2024, 1, 2), 1, 1, 1, 1, 1, 1, 1)])
+        # Friday and the following Monday: the weekend in between is not a gap
+        self.store.mark_covered("600519", date(2024, 1, 1), date(2024, 1, 5))
+        self.store.mark_covered("600519", date(2024, 1, 8), date(2024, 1, 12))
+
+        self.assertIsNotNone(self.store.load("600519", date(2024, 1, 2), date(2024, 1, 12)))
+        # Weekend days around the range do not need coverage
+        self.assertIsNotNone(self.store.load("600519", date(2023, 12, 30), date(2024, 1, 14)))
+        self.assertIsNone(self.store.load("600519", date(2024, 1, 2), date(2024, 1, 15)))
+        self.assertIsNone(self.store.load("000001", date(2024, 1, 2), date(2024, 1, 5)))
+
+        self.store.invalidate("600519")
+        self.assertIsNone(self.store.load("600519", date(2024, 1, 2), date(2024, 1, 5)))
+
+    def test_intraday_bar_is_not_settled(self) -> None:
+        tz = ZoneInfo("Asia/Shanghai")
+        # 2025-06-04 is a Wednesday: its bar settles only after the close
+        self.assertEqual(CN_CALENDAR.latest_settled_bar_date(datetime(2025, 6, 4, 10, 0, tzinfo=tz)), date(2025, 6, 3))
+        self.assertEqual(CN_CALENDAR.latest_settled_bar_date(datetime(2025, 6, 4, 15, 5, tzinfo=tz)), date(2025, 6, 4))
+
+
+class BarStoreReadThroughTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_PATH"] = os.path.join(self._temp_dir.name, "test_bar_store.db")
+        Config._instance = None
+        DatabaseManager.reset_instance()
+        self.db = DatabaseManager.get_instance()
+
+    def tearDown(self) -> None:
+        DatabaseManager.reset_instance()
+        self._temp_dir.cleanup()
+
+    def test_saved_history_is_served_without_upstream(self) -> None:
+        self.db.save_daily_data(_frame(date(2023, 11, 1), 120), "600519", "MockFetcher")
+        self.assertTrue((Path(self._temp_dir.name) / "bars" / "600519" / "2024.npy").exists())
+
+        fetcher = MagicMock(priority=0)
+        fetcher.name = "MockFetcher"
+        fetcher.get_daily_data.return_value = _frame(date(2024, 2, 1), 60)
+        manager = DataFetcherManager(fetchers=[fetcher])
+
+        df, source = manager.get_daily_data("600519", start_date="2023-11-06", end_date="2024-02-20")
+        self.assertEqual(source, BAR_STORE_SOURCE)
+        fetcher.get_daily_data.assert_not_called()
+        self.assertEqual(df["date"].iloc[0].date(), date(2023, 11, 6))
+        self.assertEqual(df["date"].iloc[-1].date(), date(2024, 2, 20))
+        self.assertIn("ma20", df.columns)
+
+        # Beyond the synced range: falls through to the data source
+        _, source = manager.get_daily_data("600519", start_date="2024-02-01", end_date="2024-03-29")
+        self.assertEqual(source, "MockFetcher")
+        fetcher.get_daily_data.assert_called_once()
+
+    def test_bypass_skips_the_store(self) -> None:
+        self.db.save_daily_data(_frame(date(2023, 11, 1), 120), "600519", "MockFetcher")
+        fetcher = MagicMock(priority=0)
+        fetcher.name = "MockFetcher"
+        fetcher.get_daily_data.return_value = _frame(date(2023, 11, 6), 20)
+        manager = DataFetcherManager(fetchers=[fetcher])
+
+        _, source = manager.get_daily_data(
+            "600519", start_date="2023-11-06", end_date="2023-11-24", use_local_store=False,
+        )
+        self.assertEqual(source, "MockFetcher")
+        fetcher.get_daily_data.assert_called_once()
+
+    def test_store_follows_database_updates(self) -> None:
+        self.db.save_daily_data(_frame(date(2024, 1, 1), 10), "600519", "MockFetcher")
+        updated = _frame(date(2024, 1, 1), 10, base=20.0)
+        self.db.save_daily_data(updated, "600519", "MockFetcher")
+
+        df = get_bar_store().load("600519", date(2024, 1, 1), date(2024, 1, 10))
+        self.assertEqual(list(df["close"]), list(updated["close"]))
+
+    def test_rebased_prices_drop_earlier_coverage(self) -> None:
+        self.db.save_daily_data(_frame(date(2024, 1, 1), 30), "600519", "MockFetcher")
+        self.assertIsNotNone(get_bar_store().load("600519", date(2024, 1, 1), date(2024, 1, 30)))
+
+        # After an ex-dividend date the source returns the overlapping qfq history on a new price basis
+        self.db.save_daily_data(_frame(date(2024, 1, 15), 20, base=5.0), "600519", "MockFetcher")
+        store = get_bar_store()
+        self.assertIsNone(store.load("600519", date(2024, 1, 1), date(2024, 1, 30)))
+        self.assertIsNotNone(store.load("600519", date(2024, 1, 15), date(2024, 2, 2)))
+
+    def test_identical_overlap_keeps_coverage(self) -> None:
+        self.db.save_daily_data(_frame(date(2024, 1, 1), 30), "600519", "MockFetcher")
+        self.db.save_daily_data(_frame(date(2024, 1, 1), 30).iloc[10:], "600519", "MockFetcher")
+        self.assertIsNotNone(get_bar_store().load("600519", date(2024, 1, 1), date(2024, 1, 30)))
+
+
+class PipelineBarStoreTestCase(unittest.TestCase):
+    """fetch_and_save_stock_data never writes bar-store hits back to stock_daily."""
+
+    def test_store_hit_is_not_saved_and_force_refresh_bypasses_it(self) -> None:
+        db = MagicMock()
+        db.has_today_data.return_value = False
+        db.get_raw_date_range.return_value = None
+        pipeline = make_pipeline(db=db)
+        pipeline.fetcher_manager.get_daily_data.return_value = (_frame(date(2024, 1, 1), 10), BAR_STORE_SOURCE)
+
+        self.assertEqual(pipeline.fetch_and_save_stock_data("600519"), (True, None))
+        self.assertTrue(pipeline.fetcher_manager.get_daily_data.call_args.kwargs["use_local_store"])
+        db.save_daily_data.assert_not_called()
+
+        pipeline.fetcher_manager.get_daily_data.return_value = (_frame(date(2024, 1, 1), 10), "MockFetcher")
+        self.assertEqual(pipeline.fetch_and_save_stock_data("600519", force_refresh=True), (True, None))
+        self.assertFalse(pipeline.fetcher_manager.get_daily_data.call_args.kwargs["use_local_store"])
+        self.assertEqual(db.save_daily_data.call_args.args[2], "MockFetcher")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the pre-market cache warm-up job and the cache-readiness report.
+"""
+
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+# Mock newspaper before search_service import (optional dependency)
+if "newspaper" not in sys.modules:
+    mock_np = MagicMock()
+    mock_np.Article = MagicMock()
+    mock_np.Config = MagicMock()
+    sys.modules["newspaper"] = mock_np
+
+from data_provider import base as data_base
+from data_provider import efinance_fetcher
+from data_provider.base import DataFetcherManager
+from src.analyzer import STOCK_NAME_MAP
+from src.config import Config
+from src.core.warmup import LOW_VOLATILITY_MIN_TTL, format_readiness_report, warm_caches
+from src.search_service import SearchResponse, SearchResult, SearchService
+
+
+def _response(query: str) -> SearchResponse:
+    return SearchResponse(
+        query=query,
+        results=[SearchResult(title=query, snippet="snippet", url=f"https://example.com/{hash(query)}",
+                              source="example.com", published_date="2025-01-01")],
+        provider="Mock",
+        success=True,
+    )
+
+
+class WarmIntelCacheTestCase(unittest.TestCase):
+    """SearchService warms only the low-volatility intel dimensions."""
+
+    def setUp(self) -> None:
+        self.service = SearchService(bocha_keys=["k"])
+        self.search = MagicMock(side_effect=lambda q, **kw: _response(q))
+        self.service._providers[0].search = self.search
+
+    def test_warm_skips_news_dimensions_and_real_run_hits_cache(self) -> None:
+        self.assertEqual(self.service.count_cached_intel("600519", "贵州茅台"), (0, 4))
+
+        warmed = self.service.warm_intel_cache("600519", "贵州茅台", min_ttl=LOW_VOLATILITY_MIN_TTL)
+
+        self.assertEqual(warmed, 4)
+        self.assertEqual(self.service.count_cached_intel("600519", "贵州茅台"), (4, 4))
+        queried = " ".join(c.args[0] for c in self.search.call_args_list)
+        self.assertNotIn("最新 新闻", queried)
+
+        # The real run only searches the time-sensitive news dimension
+        self.search.reset_mock()
+        results = self.service.search_comprehensive_intel("600519", "贵州茅台", max_searches=5)
+        self.assertEqual(len(results), 5)
+        self.assertEqual(self.search.call_count, 1)
+        self.assertIn("最新 新闻", self.search.call_args.args[0])
+
+    def test_readiness_probe_does_not_touch_hit_stats(self) -> None:
+        self.service.warm_intel_cache("600519", "贵州茅台")
+        self.service.count_cached_intel("600519", "贵州茅台")
+
+        stats = self.service.get_cache_stats()
+        self.assertEqual(stats["memory_hits"] + stats["persistent_hits"] + stats["misses"], 0)
+
+    def test_warm_is_idempotent(self) -> None:
+        self.service.warm_intel_cache("600519", "贵州茅台")
+        self.search.reset_mock()
+
+        self.assertEqual(self.service.warm_intel_cache("600519", "贵州茅台"), 0)
+        self.search.assert_not_called()
+
+
+class WarmCachesTestCase(unittest.TestCase):
+    """warm_caches drives market data and search warm-up through the staged runner."""
+
+    def setUp(self) -> None:
+        self._names = dict(STOCK_NAME_MAP)
+
+    def tearDown(self) -> None:
+        STOCK_NAME_MAP.clear()
+        STOCK_NAME_MAP.update(self._names)
+
+    def _pipeline(self) -> MagicMock:
+        pipeline = MagicMock()
+        pipeline.config = Config(pipeline_search_workers=2, search_sector_sharing=False)
+        pipeline.max_workers = 2
+        pipeline.fetch_and_save_stock_data.side_effect = (
+            lambda code: (False, "empty") if code == "000002" else (True, None)
+        )
+        manager = pipeline.fetcher_manager
+        manager.batch_get_stock_names.return_value = {"900001": "测试股份"}
+        manager.get_realtime_quote.side_effect = (
+            lambda code: SimpleNamespace(name="实时名称") if code == "000001" else None
+        )
+        manager.get_chip_distribution.return_value = object()
+        pipeline.search_service.is_available = True
+        pipeline.search_service.warm_intel_cache.return_value = 2
+        return pipeline
+
+    def test_warm_populates_each_cache(self) -> None:
+        pipeline = self._pipeline()
+
+        stats = warm_caches(pipeline, ["000001", "000002", "900001"])
+
+        self.assertEqual(stats.stocks, 3)
+        self.assertEqual(stats.bars, 2)
+        self.assertEqual(stats.failed, 1)
+        self.assertEqual(stats.realtime, 1)
+        self.assertEqual(stats.chips, 3)
+        self.assertEqual(stats.names, 1)
+        self.assertEqual(stats.intel_dimensions, 6)
+        self.assertEqual(STOCK_NAME_MAP["900001"], "测试股份")
+        pipeline.fetcher_manager.prefetch_realtime_quotes.assert_called_once()
+
+        # Search keys use the same name the real run would resolve
+        names = {c.args[0]: c.args[1] for c in pipeline.search_service.warm_intel_cache.call_args_list}
+        self.assertEqual(names["000001"], "实时名称")
+        self.assertEqual(names["900001"], "测试股份")
+        self.assertEqual(names["000002"], "股票000002")
+
+    def test_search_stage_skipped_without_providers(self) -> None:
+        pipeline = self._pipeline()
+        pipeline.search_service.is_available = False
+
+        stats = warm_caches(pipeline, ["000001"])
+
+        self.assertEqual(stats.intel_dimensions, 0)
+        pipeline.search_service.warm_intel_cache.assert_not_called()
+
+
+class ReadinessReportTestCase(unittest.TestCase):
+    """format_readiness_report summarises hits and lists misses."""
+
+    def test_report_lists_missing_caches(self) -> None:
+        readiness = {
+            'stocks': [
+                {'code': '600519', 'name': True, 'bars': True, 'chip': True, 'intel_cached': 4, 'intel_total': 4},
+                {'code': '000001', 'name': True, 'bars': False, 'chip': False, 'intel_cached': 1, 'intel_total': 4},
+            ],
+            'realtime_snapshot': {
+                'efinance': {'age': 120, 'ttl': 600, 'fresh': True},
+                'akshare_em': {'age': None, 'ttl': 1200, 'fresh': False},
+            },
+            'chip_enabled': True,
+            'search_enabled': True,
+        }
+
+        report = format_readiness_report(readiness)
+
+        self.assertIn("日线 1/2", report)
+        self.assertIn("低波动情报 5/8 维度", report)
+        self.assertIn("efinance 120s/600s ✓", report)
+        self.assertIn("akshare_em 未填充", report)
+        self.assertIn("000001(日线,筹码,情报1/4)", report)
+        self.assertNotIn("600519(", report)
+
+
+class ProbeCacheTestCase(unittest.TestCase):
+    """Readiness probes read the same cache entries the fetch paths write."""
+
+    def test_chip_cache_keyed_by_normalized_code(self) -> None:
+        fetcher = MagicMock(priority=0)
+        fetcher.name = "AkshareFetcher"
+        fetcher.get_chip_distribution.return_value = chip = object()
+        manager = DataFetcherManager(fetchers=[fetcher])
+
+        with patch.dict(data_base._chip_cache['data'], clear=True), \
+                patch("src.config.get_config", return_value=Config(enable_chip_distribution=True)):
+            self.assertIs(manager.get_chip_distribution("SH600519"), chip)
+            self.assertTrue(DataFetcherManager.has_cached_chip("600519.SH"))
+            self.assertIs(manager.get_chip_distribution("600519"), chip)
+        fetcher.get_chip_distribution.assert_called_once_with("600519")
+
+    def test_realtime_cache_status_uses_public_accessor(self) -> None:
+        with patch.dict(efinance_fetcher._realtime_cache, {'data': None, 'timestamp': 0, 'ttl': 600}):
+            self.assertEqual(
+                DataFetcherManager.get_realtime_cache_status()['efinance'],
+                {'age': None, 'ttl': 600, 'fresh': False},
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for input change-detection and reuse of unchanged analyses.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+# Mock newspaper before search_service import (optional dependency)
+if "newspaper" not in sys.modules:
+    mock_np = MagicMock()
+    mock_np.Article = MagicMock()
+    mock_np.Config = MagicMock()
+    sys.modules["newspaper"] = mock_np
+
+from src.analyzer import AnalysisResult
+from src.config import Config
+from src.core.change_detection import (
+    ReuseTolerance,
+    build_fingerprint,
+    collect_news_urls,
+    compare_fingerprints,
+)
+from src.enums import ReportType
+from src.storage import DatabaseManager
+from tests.pipeline_helpers import make_pipeline
+
+
+def _context(price: float = 10.0, volume_ratio: float = 1.2, profit_ratio: float = 0.6) -> dict:
+    return {
+        'code': '600519',
+        'date': '2026-03-02',
+        'today': {'close': 10.0, 'pct_chg': 1.0, 'volume': 100000},
+        'realtime': {'price': price, 'change_pct': 1.0, 'volume_ratio': volume_ratio, 'turnover_rate': 0.8},
+        'chip': {'profit_ratio': profit_ratio, 'avg_cost': 9.5, 'concentration_90': 0.12},
+    }
+
+
+def _intel(*urls: str) -> dict:
+    return {
+        'latest_news': SimpleNamespace(success=True, results=[SimpleNamespace(url=u) for u in urls]),
+        'risk_check': SimpleNamespace(success=False, results=[SimpleNamespace(url='https://ignored')]),
+    }
+
+
+class CompareFingerprintsTestCase(unittest.TestCase):
+    """Tolerance handling for each feature group."""
+
+    def setUp(self) -> None:
+        self.tolerance = ReuseTolerance(price_pct=0.5, volume_pct=10.0, chip=0.02, news_overlap=1.0)
+        self.base = build_fingerprint(_context(), ['https://a', 'https://b'])
+
+    def test_small_drift_within_tolerance_is_unchanged(self) -> None:
+        current = build_fingerprint(_context(price=10.04, volume_ratio=1.25, profit_ratio=0.61), ['https://b', 'https://a'])
+        self.assertEqual(compare_fingerprints(current, self.base, self.tolerance), (True, ""))
+
+    def test_changes_beyond_tolerance_are_detected(self) -> None:
+        cases = [
+            (_context(price=10.1), ['https://a', 'https://b'], 'realtime.price'),
+            (_context(volume_ratio=1.5), ['https://a', 'https://b'], 'realtime.volume_ratio'),
+            (_context(profit_ratio=0.7), ['https://a', 'https://b'], 'chip.profit_ratio'),
+            (_context(), ['https://a', 'https://c'], '新闻重合度'),
+            (_context(), None, '新闻集合未知'),
+        ]
+        for context, urls, reason in cases:
+            unchanged, message = compare_fingerprints(build_fingerprint(context, urls), self.base, self.tolerance)
+            self.assertFalse(unchanged)
+            self.assertIn(reason, message)
+
+        next_day = dict(_context(), date='2026-03-03')
+        self.assertFalse(compare_fingerprints(build_fingerprint(next_day, ['https://a', 'https://b']),
+                                              self.base, self.tolerance)[0])
+
+    def test_news_overlap_threshold(self) -> None:
+        current = build_fingerprint(_context(), ['https://a', 'https://b', 'https://c'])
+        self.assertFalse(compare_fingerprints(current, self.base, self.tolerance)[0])
+        loose = ReuseTolerance(news_overlap=0.6)
+        self.assertTrue(compare_fingerprints(current, self.base, loose)[0])
+
+    def test_collect_news_urls_skips_failed_dimensions(self) -> None:
+        self.assertEqual(collect_news_urls(_intel('https://b', 'https://a', 'https://a')), ['https://a', 'https://b'])
+        self.assertEqual(collect_news_urls(None), [])
+
+
+class PipelineReuseTestCase(unittest.TestCase):
+    """StockAnalysisPipeline reuses the stored result when inputs are unchanged."""
+
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_PATH"] = os.path.join(self._temp_dir.name, "test_change_detection.db")
+        Config._instance = None
+        DatabaseManager.reset_instance()
+        self.db = DatabaseManager.get_instance()
+
+    def tearDown(self) -> None:
+        DatabaseManager.reset_instance()
+        self._temp_dir.cleanup()
+
+    def _pipeline(self, context: dict, **config_fields):
+        pipeline = make_pipeline(db=self.db, **{"analysis_reuse_enabled": True, **config_fields})
+        pipeline.analyzer.analyze.return_value = AnalysisResult(
+            code='600519', name='贵州茅台', sentiment_score=72, trend_prediction='看多', operation_advice='买入'
+        )
+        pipeline._enhance_context = MagicMock(return_value=context)
+        return pipeline
+
+    def _analyze(self, pipeline, query_id: str, intel: dict, force_refresh: bool = False):
+        from src.core.pipeline import _StockJob
+
+        job = _StockJob(
+            code='600519', query_id=query_id, report_type=ReportType.SIMPLE, intel_results=intel,
+            force_refresh=force_refresh,
+        )
+        pipeline._run_llm(job)
+        pipeline._save_analysis_history(job)
+        return job.result
+
+    def test_unchanged_inputs_reuse_previous_result(self) -> None:
+        first = self._pipeline(_context())
+        self.assertFalse(self._analyze(first, 'q1', _intel('https://a')).reused)
+        first.analyzer.analyze.assert_called_once()
+
+        second = self._pipeline(_context(price=10.02))
+        result = self._analyze(second, 'q2', _intel('https://a'))
+        second.analyzer.analyze.assert_not_called()
+        self.assertTrue(result.reused)
+        self.assertEqual(result.operation_advice, '买入')
+        self.assertEqual(result.current_price, 10.02)
+        # The reused result is still recorded under the new query_id
+        self.assertEqual(len(self.db.get_analysis_history(code='600519', query_id='q2')), 1)
+
+        changed = self._pipeline(_context())
+        self.assertFalse(self._analyze(changed, 'q3', _intel('https://a', 'https://new')).reused)
+        changed.analyzer.analyze.assert_called_once()
+
+    def test_reuse_disabled_by_config(self) -> None:
+        self._analyze(self._pipeline(_context()), 'q1', _intel('https://a'))
+
+        pipeline = self._pipeline(_context(), analysis_reuse_enabled=False)
+        self.assertFalse(self._analyze(pipeline, 'q2', _intel('https://a')).reused)
+        pipeline.analyzer.analyze.assert_called_once()
+        self.assertFalse(Config().analysis_reuse_enabled)
+
+    def test_force_refresh_skips_reuse(self) -> None:
+        self._analyze(self._pipeline(_context()), 'q1', _intel('https://a'))
+
+        pipeline = self._pipeline(_context())
+        self.assertFalse(self._analyze(pipeline, 'q2', _intel('https://a'), force_refresh=True).reused)
+        pipeline.analyzer.analyze.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
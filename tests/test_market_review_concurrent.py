@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for running the market review as a concurrent branch of the daily job.
+"""
+
+import sys
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+# Mock newspaper before search_service import (optional dependency)
+if "newspaper" not in sys.modules:
+    mock_np = MagicMock()
+    mock_np.Article = MagicMock()
+    mock_np.Config = MagicMock()
+    sys.modules["newspaper"] = mock_np
+
+import main
+from src.config import Config
+from src.core.tracing import trace_span
+
+
+def _args(**overrides) -> SimpleNamespace:
+    values = dict(
+        single_notify=False, no_market_review=False, no_context_snapshot=False, resume=None,
+        workers=None, shards=None, dry_run=False, no_notify=False, debug=False,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+class MarketReviewBranchTestCase(unittest.TestCase):
+    """run_full_analysis overlaps the market review with per-stock analysis."""
+
+    def setUp(self) -> None:
+        self.pipeline = MagicMock()
+        self.pipeline.run.side_effect = lambda **kw: time.sleep(0.3) or [
+            MagicMock(code="600519", sentiment_score=80)
+        ]
+        self.pipeline.notifier.generate_dashboard_report.return_value = "dashboard"
+        self.review = MagicMock(side_effect=lambda **kw: time.sleep(0.3) or "market report")
+
+    def _run(self, config: Config) -> float:
+        start = time.time()
+        with patch.object(main, "StockAnalysisPipeline", return_value=self.pipeline), \
+                patch.object(main, "run_market_review", self.review):
+            main.run_full_analysis(config, _args(), ["600519"])
+        return time.time() - start
+
+    def test_review_overlaps_stock_analysis_and_joins_before_merge(self) -> None:
+        config = Config(merge_email_notification=True, market_review_concurrent=True, analysis_delay=1.0)
+        elapsed = self._run(config)
+
+        self.assertLess(elapsed, 0.55)
+        self.review.assert_called_once()
+        self.assertTrue(self.review.call_args.kwargs["merge_notification"])
+        combined = self.pipeline.notifier.send.call_args.args[0]
+        self.assertIn("market report", combined)
+        self.assertIn("dashboard", combined)
+
+    def test_sequential_mode_kept_as_fallback(self) -> None:
+        config = Config(market_review_concurrent=False, analysis_delay=0.0)
+        elapsed = self._run(config)
+
+        self.assertGreaterEqual(elapsed, 0.6)
+        self.review.assert_called_once()
+
+    def test_branch_spans_join_the_run_trace(self) -> None:
+        def review(**kw):
+            with trace_span("market_review"):
+                return "market report"
+
+        def run(**kw):
+            with trace_span("analysis"):
+                time.sleep(0.05)
+            return []
+
+        self.review.side_effect = review
+        self.pipeline.run.side_effect = run
+        self._run(Config(market_review_concurrent=True))
+
+        tracer = self.pipeline.save_trace_report.call_args.args[0]
+        self.assertEqual(sorted(s.stage for s in tracer.get_spans()), ["analysis", "market_review"])
+
+    def test_review_executor_shut_down_when_analysis_fails(self) -> None:
+        self.pipeline.run.side_effect = RuntimeError("boom")
+        executors = []
+
+        def make_executor(*args, **kwargs) -> ThreadPoolExecutor:
+            executors.append(ThreadPoolExecutor(*args, **kwargs))
+            return executors[-1]
+
+        with patch.object(main, "ThreadPoolExecutor", side_effect=make_executor):
+            self._run(Config(market_review_concurrent=True))
+
+        self.assertEqual(len(executors), 1)
+        self.assertTrue(executors[0]._shutdown)
+
+
+if __name__ == "__main__":
+    unittest.main()
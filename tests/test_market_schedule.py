@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for per-market scheduling aligned to each exchange's close.
+"""
+
+import sys
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from zoneinfo import ZoneInfo
+
+# Mock newspaper before search_service import (optional dependency)
+if "newspaper" not in sys.modules:
+    mock_np = MagicMock()
+    mock_np.Article = MagicMock()
+    mock_np.Config = MagicMock()
+    sys.modules["newspaper"] = mock_np
+
+import main
+from src.config import Config
+from src.core.trading_calendar import CN_CALENDAR, US_CALENDAR, split_by_market
+from src.scheduler import Scheduler
+
+SHANGHAI = ZoneInfo("Asia/Shanghai")
+NEW_YORK = ZoneInfo("America/New_York")
+
+
+class AfterCloseTestCase(unittest.TestCase):
+    """Run times follow each exchange's close and skip non-trading days."""
+
+    def test_next_after_close(self) -> None:
+        friday = datetime(2026, 3, 6, 15, 10, tzinfo=SHANGHAI)
+        self.assertEqual(CN_CALENDAR.next_after_close(30, friday), datetime(2026, 3, 6, 15, 30, tzinfo=SHANGHAI))
+        later = datetime(2026, 3, 6, 15, 40, tzinfo=SHANGHAI)
+        self.assertEqual(CN_CALENDAR.next_after_close(30, later), datetime(2026, 3, 9, 15, 30, tzinfo=SHANGHAI))
+        # Warm-up offsets before the close are allowed
+        self.assertEqual(CN_CALENDAR.next_after_close(-10, friday), datetime(2026, 3, 9, 14, 50, tzinfo=SHANGHAI))
+
+    def test_us_close_tracks_new_york_daylight_saving(self) -> None:
+        winter = US_CALENDAR.next_after_close(30, datetime(2026, 3, 6, 12, 0, tzinfo=NEW_YORK))
+        summer = US_CALENDAR.next_after_close(30, datetime(2026, 3, 9, 12, 0, tzinfo=NEW_YORK))
+        self.assertEqual(winter.astimezone(SHANGHAI).hour, 5)
+        self.assertEqual(summer.astimezone(SHANGHAI).hour, 4)
+
+    def test_split_by_market(self) -> None:
+        self.assertEqual(
+            split_by_market(["600519", "AAPL", "00700", "000001", "hk1810"]),
+            {"cn": ["600519", "000001"], "us": ["AAPL"], "hk": ["00700", "hk1810"]},
+        )
+
+
+class SchedulerMarketJobTestCase(unittest.TestCase):
+    """Scheduler runs due market jobs and reschedules them to the next close."""
+
+    def test_due_jobs_run_and_reschedule(self) -> None:
+        scheduler = Scheduler()
+        cn_task, us_task, cn_warmup = MagicMock(), MagicMock(), MagicMock()
+        start = datetime(2026, 3, 6, 15, 0, tzinfo=SHANGHAI)
+        scheduler.add_market_task("cn", cn_task, delay_minutes=30, warmup_task=cn_warmup, warmup_lead_minutes=10)
+        scheduler.add_market_task("us", us_task, delay_minutes=30)
+        for job in scheduler._market_jobs:
+            job.schedule_next(start)
+
+        scheduler._run_pending_market_jobs(datetime(2026, 3, 6, 15, 25, tzinfo=SHANGHAI))
+        cn_warmup.assert_called_once()
+        cn_task.assert_not_called()
+
+        scheduler._run_pending_market_jobs(datetime(2026, 3, 6, 15, 31, tzinfo=SHANGHAI))
+        cn_task.assert_called_once()
+        us_task.assert_not_called()
+        cn_job = next(job for job in scheduler._market_jobs if job.task is cn_task)
+        self.assertEqual(cn_job.next_run, datetime(2026, 3, 9, 15, 30, tzinfo=SHANGHAI))
+
+        scheduler._run_pending_market_jobs(datetime(2026, 3, 7, 5, 31, tzinfo=SHANGHAI))
+        us_task.assert_called_once()
+        self.assertEqual(cn_task.call_count, 1)
+
+
+class PerMarketScheduleTestCase(unittest.TestCase):
+    """Each market task analyzes only its slice of the watchlist."""
+
+    def test_market_tasks_receive_their_slice(self) -> None:
+        config = Config(schedule_per_market=True, market_review_region="cn")
+        args = SimpleNamespace(no_market_review=False)
+        with patch("src.scheduler.run_with_market_schedule") as schedule_mock, \
+                patch.object(main, "run_full_analysis") as analysis_mock:
+            main.run_per_market_schedule(config, args, ["600519", "AAPL", "000001"], run_immediately=False)
+            tasks = schedule_mock.call_args.kwargs["market_tasks"]
+            self.assertEqual(set(tasks), {"cn", "hk", "us"})
+
+            tasks["cn"]()
+            tasks["hk"]()
+            tasks["us"]()
+
+        self.assertEqual(
+            [(c.args[2], c.kwargs["market"]) for c in analysis_mock.call_args_list],
+            [(["600519", "000001"], "cn"), (["AAPL"], "us")],
+        )
+        self.assertIsNone(schedule_mock.call_args.kwargs["warmup_tasks"])
+
+
+if __name__ == "__main__":
+    unittest.main()
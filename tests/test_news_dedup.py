@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for SimHash-based near-duplicate news suppression across intel dimensions.
+"""
+
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+# Mock newspaper before search_service import (optional dependency)
+if "newspaper" not in sys.modules:
+    mock_np = MagicMock()
+    mock_np.Article = MagicMock()
+    mock_np.Config = MagicMock()
+    sys.modules["newspaper"] = mock_np
+
+from src.search_service import SearchResponse, SearchResult, SearchService, _simhash, dedup_search_results
+
+
+def _result(title: str, snippet: str, url: str) -> SearchResult:
+    return SearchResult(title=title, snippet=snippet, url=url, source="example.com")
+
+
+STORY = (
+    "贵州茅台发布2024年年度业绩预告，预计全年实现营业总收入约1738亿元，同比增长约15.7%，"
+    "归母净利润约862亿元，同比增长约15.4%，业绩符合市场预期。"
+)
+STORY_REPOST = (
+    "贵州茅台发布2024年年度业绩预告：预计全年实现营业总收入约1738亿元，同比增长约15.7%；"
+    "归母净利润约862亿元，同比增长约15.4%，业绩符合市场预期"
+)
+OTHER = "白酒行业库存去化仍在进行，渠道反馈春节动销平稳，高端酒价格带整体保持稳定，次高端分化明显。"
+
+
+class NewsDedupTestCase(unittest.TestCase):
+    """Tests for dedup_search_results and SearchService dedup stats."""
+
+    def test_simhash_close_for_reposted_story(self) -> None:
+        near = bin(_simhash(STORY) ^ _simhash(STORY_REPOST)).count("1")
+        far = bin(_simhash(STORY) ^ _simhash(OTHER)).count("1")
+        self.assertLessEqual(near, 3)
+        self.assertGreater(far, 10)
+
+    def test_duplicates_collapsed_across_dimensions(self) -> None:
+        responses = {
+            "latest_news": SearchResponse(
+                query="q1",
+                results=[_result("茅台业绩预告", STORY, "https://a.com/1"), _result("行业动态", OTHER, "https://a.com/2")],
+                provider="Bocha",
+            ),
+            "earnings": SearchResponse(
+                query="q2",
+                results=[
+                    _result("茅台业绩预告", STORY_REPOST, "https://b.com/9"),
+                    _result("行业动态", OTHER, "https://a.com/2"),
+                ],
+                provider="Tavily",
+            ),
+        }
+
+        deduped, total, removed = dedup_search_results(responses)
+
+        self.assertEqual(total, 4)
+        self.assertEqual(removed, 2)
+        self.assertEqual(len(deduped["latest_news"].results), 2)
+        self.assertEqual(deduped["earnings"].results, [])
+        # Input responses are not mutated (they may be shared through the search cache)
+        self.assertEqual(len(responses["earnings"].results), 2)
+
+    def test_comprehensive_intel_reports_dedup_ratio(self) -> None:
+        service = SearchService(bocha_keys=["k"])
+        service._providers[0].search = MagicMock(
+            side_effect=lambda q, **kw: SearchResponse(
+                query=q,
+                results=[_result("茅台业绩预告", STORY, f"https://x.com/{hash(q)}")],
+                provider="Mock",
+            )
+        )
+
+        results = service.search_comprehensive_intel("600519", "贵州茅台", max_searches=3)
+
+        self.assertEqual(sum(len(r.results) for r in results.values()), 1)
+        stats = service.get_dedup_stats()
+        self.assertEqual(stats["total"], 3)
+        self.assertEqual(stats["removed"], 2)
+        self.assertAlmostEqual(stats["ratio"], 0.6667, places=4)
+
+        service.reset_dedup_stats()
+        self.assertEqual(service.get_dedup_stats()["total"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
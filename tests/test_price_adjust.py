@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""Tests for adjustment-factor compression, qfq/hfq on read and local rebuild of stock_daily."""
+
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+
+from data_provider.base import DataFetcherManager
+from src.config import Config
+from src.core.price_adjust import (
+    ADJUST_HFQ,
+    ADJUST_QFQ,
+    ADJUST_RAW,
+    apply_adjustment,
+    compress_factors,
+    factors_on,
+)
+from src.services.adjustment_service import LOCAL_ADJUST_SOURCE, AdjustmentService
+from src.services.backfill_service import BackfillService
+from src.storage import DatabaseManager, StockDaily
+
+DATES = pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"])
+
+
+def _raw_frame() -> pd.DataFrame:
+    # 2024-01-04 除权：收盘价从 20 跳到 10，对应后复权因子从 1 变为 2
+    return pd.DataFrame({
+        "date": DATES,
+        "open": [20.0, 20.0, 10.0, 10.0],
+        "high": [21.0, 21.0, 11.0, 11.0],
+        "low": [19.0, 19.0, 9.0, 9.0],
+        "close": [20.0, 20.0, 10.0, 11.0],
+        "volume": [100.0, 100.0, 200.0, 200.0],
+        "amount": [2000.0, 2000.0, 2000.0, 2200.0],
+        "pct_chg": [0.0, 0.0, 0.0, 10.0],
+    })
+
+
+def _factors(*values: float) -> pd.DataFrame:
+    return pd.DataFrame({"date": DATES, "factor": list(values)})
+
+
+class PriceAdjustTestCase(unittest.TestCase):
+    def test_compress_keeps_only_change_points(self) -> None:
+        frame = pd.concat([_factors(1.0, 1.0, 2.0, 2.0), pd.DataFrame({"date": [None], "factor": [3.0]})])
+        dates, factors = compress_factors(frame.sample(frac=1.0, random_state=1))
+        self.assertEqual(list(dates.astype(str)), ["2024-01-02", "2024-01-04"])
+        self.assertEqual(list(factors), [1.0, 2.0])
+
+        lookup = factors_on(np.array(["2023-12-29", "2024-01-03", "2024-01-04", "2024-02-01"], dtype="datetime64[D]"),
+                            dates, factors)
+        self.assertEqual(list(lookup), [1.0, 1.0, 2.0, 2.0])
+
+    def test_qfq_and_hfq_scale_prices_only(self) -> None:
+        dates, factors = compress_factors(_factors(1.0, 1.0, 2.0, 2.0))
+        raw = _raw_frame()
+
+        qfq = apply_adjustment(raw, dates, factors, ADJUST_QFQ)
+        self.assertEqual(list(qfq["close"]), [10.0, 10.0, 10.0, 11.0])
+        self.assertEqual(list(qfq["volume"]), list(raw["volume"]))
+
+        hfq = apply_adjustment(raw, dates, factors, ADJUST_HFQ)
+        self.assertEqual(list(hfq["close"]), [20.0, 20.0, 20.0, 22.0])
+        self.assertTrue(apply_adjustment(raw, dates, factors, ADJUST_RAW).equals(raw))
+        with self.assertRaises(ValueError):
+            apply_adjustment(raw, dates, factors, "bfq")
+
+
+class AdjustmentStoreTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_PATH"] = os.path.join(self._temp_dir.name, "test_price_adjust.db")
+        Config._instance = None
+        DatabaseManager.reset_instance()
+        self.db = DatabaseManager.get_instance()
+
+    def tearDown(self) -> None:
+        DatabaseManager.reset_instance()
+        self._temp_dir.cleanup()
+
+    def _fetcher(self, factors: pd.DataFrame) -> MagicMock:
+        fetcher = MagicMock(priority=0, supports_raw_daily=True)
+        fetcher.name = "RawFetcher"
+        fetcher.get_daily_data.return_value = _raw_frame()
+        fetcher.get_adj_factors.return_value = factors
+        return fetcher
+
+    def _closes(self, code: str):
+        with self.db.get_session() as session:
+            rows = session.query(StockDaily).filter(StockDaily.code == code).order_by(StockDaily.date).all()
+            return [(r.close, r.data_source) for r in rows]
+
+    def test_factor_store_round_trip_and_adjusted_read(self) -> None:
+        self.assertEqual(self.db.save_raw_daily_data(_raw_frame(), "600519", "RawFetcher"), 4)
+        self.assertTrue(self.db.save_adj_factors("600519", _factors(1.0, 1.0, 2.0, 2.0), "RawFetcher"))
+        self.assertFalse(self.db.save_adj_factors("600519", _factors(1.0, 1.0, 2.0, 2.0), "RawFetcher"))
+
+        dates, factors = self.db.get_adj_factors("600519")
+        self.assertEqual(len(factors), 2)
+        frame = self.db.get_adjusted_daily_data("600519", start_date=date(2024, 1, 3), adjust=ADJUST_QFQ)
+        self.assertEqual(list(frame["close"]), [10.0, 10.0, 11.0])
+        self.assertEqual(list(self.db.get_adjusted_daily_data("600519", adjust=ADJUST_HFQ)["close"]),
+                         [20.0, 20.0, 20.0, 22.0])
+
+    def test_raw_backfill_then_factor_refresh_rebuilds_without_refetching_bars(self) -> None:
+        fetcher = self._fetcher(_factors(1.0, 1.0, 2.0, 2.0))
+        qfq_only = MagicMock(priority=1, supports_raw_daily=False)
+        qfq_only.name = "QfqFetcher"
+        manager = DataFetcherManager(fetchers=[fetcher, qfq_only])
+
+        result = BackfillService(self.db, manager).run(["600519"], date(2024, 1, 1), date(2024, 1, 31), raw=True)
+        self.assertEqual(result["done"], 1)
+        self.assertEqual(fetcher.get_daily_data.call_args.kwargs["adjust"], ADJUST_RAW)
+        qfq_only.get_daily_data.assert_not_called()
+        qfq_only.get_adj_factors.assert_not_called()
+        self.assertEqual(self._closes("600519"), [(c, LOCAL_ADJUST_SOURCE) for c in (10.0, 10.0, 10.0, 11.0)])
+
+        # 新的除权事件：只刷新因子，前复权价格在本地重算
+        fetcher.get_daily_data.reset_mock()
+        fetcher.get_adj_factors.return_value = _factors(1.0, 1.0, 2.0, 2.2)
+        report = AdjustmentService(self.db, manager).refresh_many(["600519", "600519"])
+        self.assertEqual((report["total"], report["changed"], report["rebuilt_bars"]), (1, 1, 4))
+        fetcher.get_daily_data.assert_not_called()
+        closes = [c for c, _ in self._closes("600519")]
+        np.testing.assert_allclose(closes, [20 / 2.2, 20 / 2.2, 20 / 2.2, 11.0])
+
+        unchanged = AdjustmentService(self.db, manager).refresh_many(["600519"])
+        self.assertEqual((unchanged["unchanged"], unchanged["rebuilt_bars"]), (1, 0))
+
+    def test_raw_backfill_fetches_factors_through_the_owning_lane(self) -> None:
+        empty = self._fetcher(_factors(1.0, 1.0, 1.0, 1.0))
+        empty.get_daily_data.return_value = None
+        owner = self._fetcher(_factors(1.0, 1.0, 2.0, 2.0))
+        owner.priority = 1
+        owner.name = "OwnerFetcher"
+        manager = DataFetcherManager(fetchers=[empty, owner])
+
+        limiters = []
+
+        def make_limiter(rpm):
+            limiters.append(MagicMock())
+            return limiters[-1]
+
+        with patch("src.services.backfill_service.RateLimiter", side_effect=make_limiter):
+            result = BackfillService(self.db, manager).run(
+                ["600519"], date(2024, 1, 1), date(2024, 1, 31), raw=True,
+            )
+        self.assertEqual(result["done"], 1)
+        # 因子请求来自提供日线的数据源，而不是按优先级切换到的第一个数据源
+        empty.get_adj_factors.assert_not_called()
+        owner.get_adj_factors.assert_called_once_with("600519")
+        # 日线与因子各占用一次本通道的限速
+        self.assertEqual([limiter.acquire.call_count for limiter in limiters], [1, 2])
+        self.assertEqual([c for c, _ in self._closes("600519")], [10.0, 10.0, 10.0, 11.0])
+
+    def test_factor_change_prunes_old_basis_rows_outside_raw_range(self) -> None:
+        fetcher = self._fetcher(_factors(1.0, 1.0, 2.0, 2.0))
+        manager = DataFetcherManager(fetchers=[fetcher])
+        BackfillService(self.db, manager).run(["600519"], date(2024, 1, 1), date(2024, 1, 31), raw=True)
+        # 日常更新写入的数据源前复权日线（不复权回填区间之后）
+        vendor = _raw_frame().assign(date=pd.to_datetime(["2024-02-01", "2024-02-02", "2024-02-05", "2024-02-06"]))
+        self.db.save_daily_data(vendor, "600519", "VendorQfq")
+
+        fetcher.get_adj_factors.return_value = _factors(1.0, 1.0, 2.0, 2.2)
+        report = AdjustmentService(self.db, manager).refresh_many(["600519"])
+        self.assertEqual((report["changed"], report["no_raw_codes"]), (1, []))
+        self.assertEqual({source for _, source in self._closes("600519")}, {LOCAL_ADJUST_SOURCE})
+        self.assertEqual(len(self._closes("600519")), 4)
+
+    def test_codes_without_raw_bars_are_reported(self) -> None:
+        fetcher = self._fetcher(_factors(1.0, 1.0, 2.0, 2.0))
+        self.db.save_daily_data(_raw_frame(), "000001", "VendorQfq")
+
+        report = AdjustmentService(self.db, DataFetcherManager(fetchers=[fetcher])).refresh_many(["000001"])
+        self.assertEqual((report["changed"], report["rebuilt_bars"]), (1, 0))
+        self.assertEqual(report["no_raw_codes"], ["000001"])
+        # 没有不复权日线时不删除、不改写数据源的前复权日线
+        self.assertEqual({source for _, source in self._closes("000001")}, {"VendorQfq"})
+
+    def test_incremental_sync_extends_raw_bars_and_rebuilds(self) -> None:
+        fetcher = self._fetcher(_factors(1.0, 1.0, 2.0, 2.0))
+        service = AdjustmentService(self.db, DataFetcherManager(fetchers=[fetcher]))
+        self.assertIsNone(service.sync_raw_daily("600519"))
+
+        self.db.save_raw_daily_data(_raw_frame().iloc[:2], "600519", "RawFetcher")
+        result = service.sync_raw_daily("600519")
+        self.assertEqual(fetcher.get_daily_data.call_args.kwargs["adjust"], ADJUST_RAW)
+        self.assertEqual(fetcher.get_daily_data.call_args.kwargs["start_date"], "2024-01-03")
+        self.assertEqual((result["saved"], result["data_source"], result["rebuilt"]), (2, "RawFetcher", 4))
+        self.assertEqual(self._closes("600519"), [(c, LOCAL_ADJUST_SOURCE) for c in (10.0, 10.0, 10.0, 11.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for deadline-driven run budgeting and graceful degradation.
+"""
+
+import sys
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+# Mock newspaper before search_service import (optional dependency)
+if "newspaper" not in sys.modules:
+    mock_np = MagicMock()
+    mock_np.Article = MagicMock()
+    mock_np.Config = MagicMock()
+    sys.modules["newspaper"] = mock_np
+
+from src.analyzer import AnalysisResult
+from src.config import Config
+from src.core.run_budget import (
+    DEGRADE_CHIP,
+    DEGRADE_REPORT,
+    DEGRADE_SEARCH,
+    DEGRADED_INTEL_MAX_SEARCHES,
+    RunBudget,
+    parse_deadline,
+)
+from src.enums import ReportType
+from tests.pipeline_helpers import make_pipeline
+
+
+def _budget(deadline_in: float, sequential: bool = False, priority=()) -> RunBudget:
+    return RunBudget(
+        datetime.now() + timedelta(seconds=deadline_in),
+        total=10,
+        stage_budgets={'data': 20.0, 'search': 30.0, 'llm': 60.0},
+        stage_workers={'data': 2, 'search': 4, 'llm': 4},
+        sequential=sequential,
+        priority_codes=priority,
+    )
+
+
+class RunBudgetTestCase(unittest.TestCase):
+    """Projection and degradation decisions."""
+
+    def test_staged_projection_uses_bottleneck_stage(self) -> None:
+        now = time.time()
+        budget = _budget(3600)
+        # llm: 10 * 60 / 4 = 150s is the bottleneck
+        projected = budget.projected_finish(now)
+        self.assertAlmostEqual((projected - datetime.fromtimestamp(now)).total_seconds(), 150, places=3)
+
+    def test_sequential_projection_sums_stages(self) -> None:
+        now = time.time()
+        budget = _budget(3600, sequential=True)
+        # 10 * 20 / 2 + 10 * 30 / 4 + 10 * 60 / 4 = 100 + 75 + 150
+        projected = budget.projected_finish(now)
+        self.assertAlmostEqual((projected - datetime.fromtimestamp(now)).total_seconds(), 325, places=3)
+
+    def test_observed_durations_replace_budget_prior(self) -> None:
+        now = time.time()
+        budget = _budget(3600)
+        budget.record('llm', '600519', 200.0)
+        budget.record('llm', '000001', 100.0)
+        # 8 stocks left * 150s / 4 workers = 300s
+        projected = budget.projected_finish(now)
+        self.assertAlmostEqual((projected - datetime.fromtimestamp(now)).total_seconds(), 300, places=3)
+
+    def test_degrade_only_low_priority_when_behind(self) -> None:
+        on_time = _budget(3600, priority=['600519'])
+        self.assertFalse(on_time.should_degrade('000001'))
+
+        behind = _budget(60, priority=['600519'])
+        self.assertTrue(behind.should_degrade('000001'))
+        self.assertFalse(behind.should_degrade('600519'))
+
+        behind.mark_degraded('000001', DEGRADE_CHIP)
+        behind.mark_degraded('000001', DEGRADE_CHIP)
+        self.assertEqual(behind.get_degraded(), {'000001': [DEGRADE_CHIP]})
+        self.assertIn('000001(筹码分布)', behind.format_summary())
+
+    def test_from_config_picks_earliest_deadline(self) -> None:
+        now = datetime(2026, 3, 2, 17, 0)
+        config = Config(run_deadline='18:30', run_budget_minutes=45)
+        budget = RunBudget.from_config(config, total=5, max_workers=3, staged=True, now=now)
+        self.assertEqual(budget.deadline, datetime(2026, 3, 2, 17, 45))
+
+        self.assertIsNone(RunBudget.from_config(Config(), total=5, max_workers=3, staged=True, now=now))
+        self.assertIsNone(parse_deadline('18h30'))
+
+    def test_deadline_already_passed_rolls_to_next_day(self) -> None:
+        now = datetime(2026, 3, 2, 23, 0)
+        self.assertEqual(parse_deadline('01:00', now=now), datetime(2026, 3, 3, 1, 0))
+        self.assertEqual(parse_deadline('23:30', now=now), datetime(2026, 3, 2, 23, 30))
+
+
+class PipelineDegradationTestCase(unittest.TestCase):
+    """StockAnalysisPipeline skips optional steps for degraded stocks."""
+
+    def _make_pipeline(self, behind: bool):
+        db = MagicMock()
+        db.get_analysis_context.return_value = None
+        pipeline = make_pipeline(db=db)
+        pipeline._run_budget = _budget(60 if behind else 3600, priority=['600519'])
+        pipeline.fetcher_manager.get_realtime_quote.return_value = None
+        pipeline.fetcher_manager.get_chip_distribution.return_value = None
+        pipeline.search_service.search_comprehensive_intel.return_value = {}
+        pipeline.analyzer.analyze.return_value = AnalysisResult(
+            code='000001', name='平安银行', sentiment_score=60, trend_prediction='震荡', operation_advice='持有'
+        )
+        pipeline._enhance_context = MagicMock(return_value={'realtime': {}})
+        return pipeline
+
+    def _job(self, code: str):
+        from src.core.pipeline import _StockJob
+
+        return _StockJob(code=code, query_id='q', report_type=ReportType.FULL)
+
+    def test_behind_schedule_degrades_low_priority_stock(self) -> None:
+        pipeline = self._make_pipeline(behind=True)
+        job = self._job('000001')
+
+        pipeline._collect_market_data(job)
+        pipeline._search_intel(job)
+        pipeline._run_llm(job)
+
+        pipeline.fetcher_manager.get_chip_distribution.assert_not_called()
+        self.assertEqual(
+            pipeline.search_service.search_comprehensive_intel.call_args.kwargs['max_searches'],
+            DEGRADED_INTEL_MAX_SEARCHES,
+        )
+        self.assertEqual(job.report_type, ReportType.SIMPLE)
+        self.assertEqual(job.result.degraded, [DEGRADE_CHIP, DEGRADE_SEARCH, DEGRADE_REPORT])
+        self.assertIn('000001', pipeline._run_budget.get_degraded())
+
+    def test_priority_stock_and_on_time_run_keep_full_analysis(self) -> None:
+        for behind, code in ((True, '600519'), (False, '000001')):
+            pipeline = self._make_pipeline(behind=behind)
+            job = self._job(code)
+
+            pipeline._collect_market_data(job)
+            pipeline._search_intel(job)
+            pipeline._run_llm(job)
+
+            pipeline.fetcher_manager.get_chip_distribution.assert_called_once()
+            self.assertEqual(job.report_type, ReportType.FULL)
+            self.assertEqual(job.result.degraded, [])
+
+    def test_dashboard_report_lists_degraded_stocks(self) -> None:
+        from src.notification import NotificationService
+
+        degraded = AnalysisResult(
+            code='000001', name='平安银行', sentiment_score=60, trend_prediction='震荡', operation_advice='持有',
+            degraded=[DEGRADE_CHIP, DEGRADE_SEARCH],
+        )
+        full = AnalysisResult(
+            code='600519', name='贵州茅台', sentiment_score=70, trend_prediction='看多', operation_advice='买入',
+        )
+        notifier = NotificationService.__new__(NotificationService)
+        notifier._report_summary_only = True
+        notifier._get_signal_level = lambda r: ('持有', '🟡', 'hold')
+        notifier._escape_md = lambda text: text
+
+        report = notifier.generate_dashboard_report([degraded, full])
+
+        self.assertIn('降级说明', report)
+        self.assertIn('平安银行(000001)：跳过筹码分布、扩展情报维度', report)
+        self.assertNotIn('贵州茅台(600519)：跳过', report)
+
+
+if __name__ == "__main__":
+    unittest.main()
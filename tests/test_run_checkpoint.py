@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for checkpointed, resumable analysis runs.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+
+# Mock newspaper before search_service import (optional dependency)
+if "newspaper" not in sys.modules:
+    mock_np = MagicMock()
+    mock_np.Article = MagicMock()
+    mock_np.Config = MagicMock()
+    sys.modules["newspaper"] = mock_np
+
+from src.analyzer import AnalysisResult
+from src.config import Config
+from src.repositories.run_repo import AnalysisRunRepository
+from src.storage import AnalysisRun, DatabaseManager
+from tests.pipeline_helpers import make_pipeline
+
+
+def _result(code: str) -> AnalysisResult:
+    return AnalysisResult(
+        code=code,
+        name=f"股票{code}",
+        sentiment_score=70,
+        trend_prediction="看多",
+        operation_advice="买入",
+    )
+
+
+class RunCheckpointTestCase(unittest.TestCase):
+    """Run checkpoints are persisted per stock and reused on resume."""
+
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_PATH"] = os.path.join(self._temp_dir.name, "test_run_checkpoint.db")
+        Config._instance = None
+        DatabaseManager.reset_instance()
+        self.db = DatabaseManager.get_instance()
+        self.repo = AnalysisRunRepository(self.db)
+
+    def tearDown(self) -> None:
+        DatabaseManager.reset_instance()
+        self._temp_dir.cleanup()
+
+    def _make_pipeline(self, staged: bool = True, query_source: str = "cli"):
+        pipeline = make_pipeline(
+            db=self.db,
+            query_source=query_source,
+            pipeline_staged=staged,
+            run_checkpoint_enabled=True,
+            pipeline_search_workers=2,
+            pipeline_llm_workers=2,
+            pipeline_queue_size=4,
+        )
+        pipeline.search_service.is_available = True
+        pipeline.search_service.get_cache_stats.return_value = {
+            "hit_rate": 0.0, "memory_hits": 0, "persistent_hits": 0, "misses": 0,
+        }
+        pipeline.search_service.get_dedup_stats.return_value = {"ratio": 0.0, "removed": 0, "total": 0}
+        pipeline.search_service.search_comprehensive_intel.return_value = {"latest_news": MagicMock()}
+        pipeline.search_service.format_intel_report.side_effect = lambda intel, name: f"intel for {name}"
+        pipeline.fetch_and_save_stock_data = MagicMock(return_value=(True, None))
+        pipeline._collect_market_data = MagicMock()
+        pipeline._save_news_intel = MagicMock()
+        pipeline._notify_single_stock = MagicMock()
+        pipeline._send_notifications = MagicMock()
+        return pipeline
+
+    def test_repository_roundtrip(self) -> None:
+        self.repo.start_run("run-1", ["600519", "000001"], query_source="cli")
+        self.repo.save_checkpoint("run-1", "600519", AnalysisRunRepository.STAGE_SEARCH, query_id="q1", news_context="ctx")
+        self.repo.save_checkpoint("run-1", "600519", AnalysisRunRepository.STAGE_DONE)
+        self.repo.finish_run("run-1")
+
+        run = self.repo.get_run("run-1")
+        self.assertEqual(run.status, "completed")
+        self.assertEqual(run.get_stock_codes(), ["600519", "000001"])
+        checkpoint = self.repo.get_checkpoints("run-1")["600519"]
+        self.assertEqual((checkpoint.stage, checkpoint.query_id, checkpoint.news_context), ("done", "q1", "ctx"))
+
+    def test_claim_refuses_active_run_and_takes_over_stale_one(self) -> None:
+        self.assertIsNotNone(self.repo.start_run("run-1", ["600519"]))
+        self.assertIsNone(self.repo.start_run("run-1", ["600519"]))
+
+        with self.db.get_session() as session:
+            session.query(AnalysisRun).update(
+                {AnalysisRun.updated_at: datetime.now() - AnalysisRunRepository.STALE_AFTER * 2}
+            )
+            session.commit()
+        self.assertIsNotNone(self.repo.start_run("run-1", ["600519"]))
+
+        self.repo.finish_run("run-1", AnalysisRunRepository.RUN_INCOMPLETE)
+        self.assertFalse(self.repo.is_active(self.repo.get_run("run-1")))
+        self.assertIsNotNone(self.repo.start_run("run-1", ["600519"]))
+
+        pipeline = self._make_pipeline()
+        pipeline._run_llm = MagicMock()
+        self.assertEqual(pipeline.run(resume_run_id="run-1"), [])
+        pipeline._run_llm.assert_not_called()
+
+    def test_ad_hoc_queries_do_not_checkpoint(self) -> None:
+        pipeline = self._make_pipeline(query_source="api")
+        pipeline._run_llm = MagicMock(side_effect=lambda job: setattr(job, "result", _result(job.code)))
+        pipeline.query_id = "adhoc"
+        self.assertEqual(len(pipeline.run(stock_codes=["600519"])), 1)
+        self.assertIsNone(self.repo.get_run("adhoc"))
+
+    def test_non_staged_resume_reuses_search_and_marks_failures_incomplete(self) -> None:
+        pipeline = self._make_pipeline(staged=False)
+        pipeline._run_llm = MagicMock(side_effect=lambda job: setattr(
+            job, "result", None if job.code == "000002" else _result(job.code)
+        ))
+        pipeline.run(stock_codes=["000001", "000002"], resume_run_id="run-3")
+        self.assertEqual(self.repo.get_run("run-3").status, AnalysisRunRepository.RUN_INCOMPLETE)
+        self.assertEqual(self.repo.get_checkpoints("run-3")["000002"].stage, AnalysisRunRepository.STAGE_SEARCH)
+
+        pipeline.search_service.search_comprehensive_intel.reset_mock()
+        pipeline._run_llm.side_effect = lambda job: setattr(job, "result", _result(job.code))
+        resumed = pipeline.run(resume_run_id="run-3")
+
+        self.assertEqual(sorted(r.code for r in resumed), ["000001", "000002"])
+        pipeline.search_service.search_comprehensive_intel.assert_not_called()
+        self.assertEqual(pipeline._run_llm.call_args.args[0].news_context, "intel for ")
+        self.assertEqual(self.repo.get_run("run-3").status, AnalysisRunRepository.RUN_COMPLETED)
+
+    def test_resume_skips_done_and_reuses_search(self) -> None:
+        pipeline = self._make_pipeline()
+        interrupted = {"000002"}
+
+        def run_llm(job):
+            # First run: LLM for 000002 "crashes" after its search finished
+            job.result = None if job.code in interrupted else _result(job.code)
+
+        pipeline._run_llm = MagicMock(side_effect=run_llm)
+        first = pipeline.run(stock_codes=["000001", "000002"], resume_run_id="run-2")
+        self.assertEqual([r.code for r in first], ["000001"])
+
+        checkpoints = self.repo.get_checkpoints("run-2")
+        self.assertEqual(checkpoints["000001"].stage, AnalysisRunRepository.STAGE_DONE)
+        self.assertEqual(checkpoints["000002"].stage, AnalysisRunRepository.STAGE_SEARCH)
+
+        # Resume: stock list comes from the stored run
+        interrupted.clear()
+        pipeline.search_service.search_comprehensive_intel.reset_mock()
+        pipeline._run_llm.reset_mock()
+        pipeline._send_notifications.reset_mock()
+
+        resumed = pipeline.run(resume_run_id="run-2")
+
+        self.assertEqual(sorted(r.code for r in resumed), ["000001", "000002"])
+        self.assertEqual([c.args[0].code for c in pipeline._run_llm.call_args_list], ["000002"])
+        pipeline.search_service.search_comprehensive_intel.assert_not_called()
+        self.assertEqual(pipeline._run_llm.call_args.args[0].query_id, checkpoints["000002"].query_id)
+        # Summary notification covers the whole run
+        notified = pipeline._send_notifications.call_args.args[0]
+        self.assertEqual(sorted(r.code for r in notified), ["000001", "000002"])
+        self.assertEqual(self.repo.get_run("run-2").status, "completed")
+
+    def test_from_dict_ignores_unknown_fields(self) -> None:
+        data = _result("600519").to_dict()
+        data.update({"data_sources": "x", "unknown": 1})
+        restored = AnalysisResult.from_dict(data)
+        self.assertEqual(restored.code, "600519")
+        self.assertEqual(restored.operation_advice, "买入")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for SearchResultCache (LRU, per-dimension TTL, SQLite persistence, hit-rate stats).
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Mock newspaper before search_service import (optional dependency)
+if "newspaper" not in sys.modules:
+    mock_np = MagicMock()
+    mock_np.Article = MagicMock()
+    mock_np.Config = MagicMock()
+    sys.modules["newspaper"] = mock_np
+
+from src.config import Config
+from src.search_service import SearchResponse, SearchResult, SearchResultCache, SearchService
+from src.storage import DatabaseManager, SearchCacheEntry
+
+
+def _response(query: str = "q") -> SearchResponse:
+    return SearchResponse(
+        query=query,
+        results=[
+            SearchResult(
+                title="Title",
+                snippet="snippet",
+                url="https://example.com/1",
+                source="example.com",
+                published_date="2025-01-01",
+            )
+        ],
+        provider="Mock",
+        success=True,
+    )
+
+
+class SearchResultCacheTestCase(unittest.TestCase):
+    """In-memory behaviour of SearchResultCache."""
+
+    def test_lru_evicts_least_recently_used(self) -> None:
+        cache = SearchResultCache(max_entries=2)
+        cache.put("a", _response("a"), 600)
+        cache.put("b", _response("b"), 600)
+        # Touch "a" so that "b" becomes least recently used
+        self.assertIsNotNone(cache.get("a"))
+        cache.put("c", _response("c"), 600)
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+
+    @patch("src.search_service.time.time")
+    def test_entry_expires_after_its_ttl(self, mock_time: MagicMock) -> None:
+        mock_time.return_value = 1000.0
+        cache = SearchResultCache()
+        cache.put("short", _response(), 60)
+        cache.put("long", _response(), 3600)
+
+        mock_time.return_value = 1100.0
+        self.assertIsNone(cache.get("short"))
+        self.assertIsNotNone(cache.get("long"))
+
+    def test_hit_rate_stats(self) -> None:
+        cache = SearchResultCache()
+        cache.put("a", _response(), 600)
+        cache.get("a")
+        cache.get("a")
+        cache.get("missing")
+
+        stats = cache.get_stats()
+        self.assertEqual(stats["memory_hits"], 2)
+        self.assertEqual(stats["misses"], 1)
+        self.assertAlmostEqual(stats["hit_rate"], 0.6667, places=4)
+        self.assertFalse(stats["persistent"])
+
+    def test_intel_dimensions_use_dimension_ttl(self) -> None:
+        service = SearchService(bocha_keys=["k"])
+        service._providers[0].search = MagicMock(side_effect=lambda q, **kw: _response(q))
+        service._cache.put = MagicMock(wraps=service._cache.put)
+
+        service.search_comprehensive_intel("600519", "贵州茅台", max_searches=5)
+
+        ttls = {c.kwargs["dimension"]: c.args[2] for c in service._cache.put.call_args_list}
+        self.assertEqual(ttls["latest_news"], SearchService.CACHE_TTL_BY_DIMENSION["latest_news"])
+        self.assertEqual(ttls["industry"], SearchService.CACHE_TTL_BY_DIMENSION["industry"])
+        self.assertGreater(ttls["earnings"], ttls["latest_news"])
+
+        # Second run is served entirely from cache
+        service._providers[0].search.reset_mock()
+        results = service.search_comprehensive_intel("600519", "贵州茅台", max_searches=5)
+        self.assertEqual(len(results), 5)
+        service._providers[0].search.assert_not_called()
+
+
+class SearchResultCachePersistenceTestCase(unittest.TestCase):
+    """SQLite-backed layer shared across SearchResultCache instances."""
+
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_PATH"] = os.path.join(self._temp_dir.name, "test_search_cache.db")
+        Config._instance = None
+        DatabaseManager.reset_instance()
+        self.db = DatabaseManager.get_instance()
+
+    def tearDown(self) -> None:
+        DatabaseManager.reset_instance()
+        self._temp_dir.cleanup()
+
+    def test_entry_survives_new_cache_instance(self) -> None:
+        writer = SearchResultCache(persist=True)
+        writer.put("k1", _response("贵州茅台 业绩"), 3600, dimension="earnings")
+
+        reader = SearchResultCache(persist=True)
+        cached = reader.get("k1")
+
+        self.assertIsNotNone(cached)
+        self.assertEqual(cached.query, "贵州茅台 业绩")
+        self.assertEqual(cached.results[0].url, "https://example.com/1")
+        self.assertEqual(reader.get_stats()["persistent_hits"], 1)
+
+        # Promoted to memory: the next lookup does not hit the DB layer
+        reader.get("k1")
+        self.assertEqual(reader.get_stats()["memory_hits"], 1)
+
+    def test_persistent_eviction_is_lru(self) -> None:
+        cache = SearchResultCache(persist=True, persist_max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.put(key, _response(key), 3600)
+        # Access "a" through a fresh instance so its last_accessed_at is refreshed
+        SearchResultCache(persist=True).get("a")
+
+        removed = cache._repo.evict(2)
+
+        self.assertEqual(removed, 1)
+        with self.db.get_session() as session:
+            keys = {row.cache_key for row in session.query(SearchCacheEntry).all()}
+        self.assertEqual(keys, {"a", "c"})
+
+
+if __name__ == "__main__":
+    unittest.main()
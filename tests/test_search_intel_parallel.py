@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for concurrent multi-dimension intel search in SearchService.
+"""
+
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+# Mock newspaper before search_service import (optional dependency)
+if "newspaper" not in sys.modules:
+    mock_np = MagicMock()
+    mock_np.Article = MagicMock()
+    mock_np.Config = MagicMock()
+    sys.modules["newspaper"] = mock_np
+
+from src.search_service import BaseSearchProvider, SearchResponse, SearchResult, SearchService
+
+
+def _response(query: str) -> SearchResponse:
+    return SearchResponse(query=query, results=[], provider="Mock", success=True)
+
+
+class SearchIntelParallelTestCase(unittest.TestCase):
+    """Tests for parallel dimensions, partial results on timeout and provider concurrency."""
+
+    def test_dimensions_run_concurrently(self) -> None:
+        """Five dimensions sleeping 0.3s each should finish well under the serial 1.5s."""
+        service = SearchService(bocha_keys=["k"], provider_max_concurrency=5)
+
+        def slow_search(query, max_results=3, days=7):
+            time.sleep(0.3)
+            return _response(query)
+
+        service._providers[0].search = MagicMock(side_effect=slow_search)
+
+        start = time.time()
+        results = service.search_comprehensive_intel("600519", "贵州茅台", max_searches=5)
+        elapsed = time.time() - start
+
+        self.assertEqual(
+            list(results.keys()),
+            ["latest_news", "market_analysis", "risk_check", "earnings", "industry"],
+        )
+        self.assertLess(elapsed, 1.0)
+
+    def test_timeout_returns_partial_results(self) -> None:
+        """Dimensions still running at the deadline are dropped; finished ones are kept."""
+        service = SearchService(bocha_keys=["k"], intel_timeout=1.0, provider_max_concurrency=5)
+        release = threading.Event()
+
+        def search(query, max_results=3, days=7):
+            if "风险" in query:
+                release.wait(5)
+            return _response(query)
+
+        service._providers[0].search = MagicMock(side_effect=search)
+        try:
+            results = service.search_comprehensive_intel("600519", "贵州茅台", max_searches=5)
+        finally:
+            release.set()
+
+        self.assertNotIn("risk_check", results)
+        self.assertEqual(
+            list(results.keys()),
+            ["latest_news", "market_analysis", "earnings", "industry"],
+        )
+
+    def test_failed_dimension_does_not_break_others(self) -> None:
+        """An exception raised by one dimension is logged and skipped."""
+        service = SearchService(bocha_keys=["k"])
+
+        def search(query, max_results=3, days=7):
+            if "研报" in query:
+                raise RuntimeError("boom")
+            return _response(query)
+
+        service._providers[0].search = MagicMock(side_effect=search)
+        results = service.search_comprehensive_intel("600519", "贵州茅台", max_searches=3)
+        self.assertEqual(list(results.keys()), ["latest_news", "risk_check"])
+
+    def test_provider_concurrency_is_bounded(self) -> None:
+        """BaseSearchProvider.search never runs more than max_concurrency requests at once."""
+        active = {"now": 0, "peak": 0}
+        lock = threading.Lock()
+
+        class _Provider(BaseSearchProvider):
+            def _do_search(self, query, api_key, max_results, days=7):
+                with lock:
+                    active["now"] += 1
+                    active["peak"] = max(active["peak"], active["now"])
+                time.sleep(0.1)
+                with lock:
+                    active["now"] -= 1
+                return _response(query)
+
+        provider = _Provider(["k1", "k2"], "Mock")
+        provider.set_max_concurrency(2)
+        threads = [threading.Thread(target=provider.search, args=(f"q{i}",)) for i in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(active["peak"], 2)
+        self.assertEqual(sum(provider._key_usage.values()), 6)
+
+
+class SectorSharedSearchTestCase(unittest.TestCase):
+    """Industry dimension is searched once per sector and fanned out to each stock."""
+
+    def test_same_sector_issues_one_industry_query(self) -> None:
+        service = SearchService(bocha_keys=["k"], provider_max_concurrency=5)
+        service.set_stock_sectors({"600519": "白酒", "000858": "白酒", "601398": "银行"})
+
+        def search(query, max_results=3, days=7):
+            time.sleep(0.05)
+            return SearchResponse(
+                query=query,
+                results=[SearchResult(title="t", snippet="s", url=f"https://e.com/{query}", source="e")],
+                provider="Mock",
+                success=True,
+            )
+
+        mock_search = MagicMock(side_effect=search)
+        service._providers[0].search = mock_search
+
+        threads = [
+            threading.Thread(
+                target=service.search_comprehensive_intel, args=(code, name), kwargs={"max_searches": 5}
+            )
+            for code, name in (("600519", "贵州茅台"), ("000858", "五粮液"), ("601398", "工商银行"))
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        industry_queries = [c.args[0] for c in mock_search.call_args_list if "行业前景" in c.args[0]]
+        self.assertEqual(len(industry_queries), 2)
+        self.assertTrue(any(q.startswith("白酒") for q in industry_queries))
+
+        # Fan-out: a later stock in the same sector gets the shared industry result from cache
+        mock_search.reset_mock()
+        results = service.search_comprehensive_intel("000858", "五粮液", max_searches=5)
+        self.assertIn("industry", results)
+        mock_search.assert_not_called()
+
+    def test_unknown_sector_keeps_stock_query(self) -> None:
+        service = SearchService(bocha_keys=["k"])
+        dims = {d["name"]: d for d in service._build_intel_dimensions("600519", "贵州茅台")}
+        self.assertIn("贵州茅台", dims["industry"]["query"])
+        self.assertNotIn("sector", dims["industry"])
+
+
+if __name__ == "__main__":
+    unittest.main()
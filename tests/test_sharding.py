@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for DB-lease based watchlist sharding.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from dataclasses import replace
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+# Mock newspaper before search_service import (optional dependency)
+if "newspaper" not in sys.modules:
+    mock_np = MagicMock()
+    mock_np.Article = MagicMock()
+    mock_np.Config = MagicMock()
+    sys.modules["newspaper"] = mock_np
+
+from data_provider.base import DataFetcherManager
+from src.analyzer import AnalysisResult
+from src.config import Config
+from src.core.sharding import run_shard_worker, run_sharded, shard_capacity, slice_budget
+from src.repositories.lease_repo import AnalysisLeaseRepository
+from src.storage import AnalysisLease, DatabaseManager
+from tests.pipeline_helpers import make_pipeline
+
+
+class _DbTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_PATH"] = os.path.join(self._temp_dir.name, "test_sharding.db")
+        Config._instance = None
+        DatabaseManager.reset_instance()
+        self.db = DatabaseManager.get_instance()
+        self.leases = AnalysisLeaseRepository(self.db)
+
+    def tearDown(self) -> None:
+        DatabaseManager.reset_instance()
+        self._temp_dir.cleanup()
+
+
+class LeaseRepositoryTestCase(_DbTestCase):
+    """Atomic claiming, expiry takeover and completion."""
+
+    def test_concurrent_claims_do_not_overlap(self) -> None:
+        codes = [f"{i:06d}" for i in range(40)]
+        self.assertEqual(self.leases.register("run", codes), 40)
+        self.assertEqual(self.leases.register("run", codes[:5]), 0)
+
+        claimed = {}
+        lock = threading.Lock()
+
+        def worker(owner: str) -> None:
+            while True:
+                got = self.leases.claim("run", owner, limit=3)
+                if not got:
+                    return
+                with lock:
+                    claimed.setdefault(owner, []).extend(got)
+
+        threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        all_claimed = [c for got in claimed.values() for c in got]
+        self.assertEqual(sorted(all_claimed), codes)
+        self.assertEqual(self.leases.count_outstanding("run"), 40)  # leased, not yet completed
+
+    def test_expired_lease_taken_over_and_stale_owner_rejected(self) -> None:
+        self.leases.register("run", ["600519"])
+        self.assertEqual(self.leases.claim("run", "a", lease_seconds=600), ["600519"])
+        self.assertEqual(self.leases.claim("run", "b"), [])
+
+        with self.db.get_session() as session:
+            session.query(AnalysisLease).update({"lease_until": datetime.now() - timedelta(seconds=1)})
+            session.commit()
+
+        self.assertEqual(self.leases.claim("run", "b"), ["600519"])
+        self.assertFalse(self.leases.complete("run", "600519", "a"))
+        self.assertTrue(self.leases.complete("run", "600519", "b"))
+        self.assertEqual(self.leases.count_outstanding("run"), 0)
+
+    def test_max_attempts_stops_retrying(self) -> None:
+        self.leases.register("run", ["000001"])
+        for _ in range(2):
+            self.leases.claim("run", "a", lease_seconds=0, max_attempts=2)
+        self.assertEqual(self.leases.claim("run", "a", lease_seconds=0, max_attempts=2), [])
+        self.assertEqual(self.leases.count_outstanding("run", max_attempts=2), 0)
+
+
+class SliceBudgetTestCase(unittest.TestCase):
+    def _config(self, **overrides) -> Config:
+        fields = dict(
+            max_workers=7,
+            pipeline_search_workers=4,
+            pipeline_llm_workers=3,
+            pipeline_llm_rpm=30.0,
+            pipeline_data_rpm=0.0,
+            analysis_delay=2.0,
+            search_provider_max_concurrency=3,
+            tushare_rate_limit_per_minute=80,
+        )
+        fields.update(overrides)
+        return Config(**fields)
+
+    def test_budget_divided_between_shards(self) -> None:
+        config = self._config()
+        shards = [slice_budget(config, 3, index) for index in range(3)]
+        self.assertEqual([s.max_workers for s in shards], [3, 2, 2])
+        self.assertEqual([s.pipeline_search_workers for s in shards], [2, 1, 1])
+        self.assertEqual([s.pipeline_llm_workers for s in shards], [1, 1, 1])
+        self.assertEqual(sum(s.tushare_rate_limit_per_minute for s in shards), 80)
+        sliced = shards[0]
+        self.assertAlmostEqual(sliced.pipeline_llm_rpm, 10.0)
+        self.assertEqual(sliced.pipeline_data_rpm, 0.0)
+        self.assertEqual(sliced.analysis_delay, 6.0)
+        self.assertEqual((sliced.efinance_sleep_min, sliced.akshare_sleep_max), (4.5, 15.0))
+        self.assertEqual(config.max_workers, 7)
+        self.assertIs(slice_budget(config, 1), config)
+
+    def test_shards_beyond_the_concurrency_budget_are_refused(self) -> None:
+        config = self._config(pipeline_llm_workers=2)
+        self.assertEqual(shard_capacity(config), 2)
+        self.assertEqual(shard_capacity(replace(config, pipeline_staged=False), max_workers=5), 3)
+        with self.assertRaises(ValueError):
+            slice_budget(config, 3)
+
+    def test_fetcher_throttles_follow_the_sliced_config(self) -> None:
+        sliced = slice_budget(self._config(), 2, 1)
+        with patch("data_provider.efinance_fetcher.EfinanceFetcher") as efinance, \
+                patch("data_provider.akshare_fetcher.AkshareFetcher") as akshare, \
+                patch("data_provider.tushare_fetcher.TushareFetcher") as tushare, \
+                patch("data_provider.pytdx_fetcher.PytdxFetcher") as pytdx, \
+                patch("data_provider.baostock_fetcher.BaostockFetcher") as baostock, \
+                patch("data_provider.yfinance_fetcher.YfinanceFetcher") as yfinance:
+            for fetcher in (efinance, akshare, tushare, pytdx, baostock, yfinance):
+                fetcher.return_value.priority = 0
+            DataFetcherManager(config=sliced)
+        efinance.assert_called_once_with(sleep_min=3.0, sleep_max=6.0)
+        akshare.assert_called_once_with(sleep_min=4.0, sleep_max=10.0)
+        tushare.assert_called_once_with(rate_limit_per_minute=40)
+
+
+class ShardedRunTestCase(_DbTestCase):
+    """Shards analyze disjoint stocks; the coordinator merges results for one summary."""
+
+    def _make_pipeline(self):
+        pipeline = make_pipeline(
+            db=self.db,
+            max_workers=2,
+            shard_batch_size=2,
+            pipeline_search_workers=2,
+            pipeline_llm_workers=2,
+            pipeline_queue_size=2,
+        )
+        pipeline.search_service = MagicMock(is_available=False)
+        pipeline.fetch_and_save_stock_data = MagicMock(return_value=(True, None))
+        pipeline._collect_market_data = MagicMock()
+        pipeline._save_news_intel = MagicMock()
+        pipeline._run_llm = MagicMock(side_effect=lambda job: setattr(job, "result", AnalysisResult(
+            code=job.code, name=job.code, sentiment_score=60, trend_prediction="震荡", operation_advice="持有",
+        )))
+        pipeline._send_notifications = MagicMock()
+        return pipeline
+
+    @patch("src.core.sharding.WAIT_POLL_SECONDS", 0.05)
+    def test_worker_and_coordinator_merge(self) -> None:
+        codes = ["600519", "000001", "300750", "002594", "600036", "601318"]
+        coordinator = self._make_pipeline()
+        remote = self._make_pipeline()
+        self.leases.register("run-s", codes)
+
+        # A shard on another host works on the same run concurrently with the coordinator
+        remote_thread = threading.Thread(target=run_shard_worker, args=("run-s", remote))
+        remote_thread.start()
+        results = run_sharded(codes, 2, coordinator, run_id="run-s", local_shards=0)
+        remote_thread.join()
+
+        # Every stock is analyzed exactly once across shards
+        self.assertEqual(coordinator._run_llm.call_count + remote._run_llm.call_count, len(codes))
+        self.assertEqual([r.code for r in results], codes)
+        coordinator._send_notifications.assert_called_once()
+        self.assertEqual(len(coordinator._send_notifications.call_args.args[0]), len(codes))
+        remote._send_notifications.assert_not_called()
+        self.assertEqual(self.leases.count_outstanding("run-s"), 0)
+        self.assertEqual(coordinator.run_repo.get_run("run-s").status, "completed")
+
+    def test_local_shards_receive_the_coordinator_config(self) -> None:
+        coordinator = self._make_pipeline()
+        coordinator.max_workers = 3
+        coordinator.save_context_snapshot = True
+        context = MagicMock()
+        with patch("src.core.sharding.multiprocessing.get_context", return_value=context):
+            run_sharded(["600519", "000001"], 2, coordinator, run_id="run-c", send_notification=False)
+
+        configs = [call.kwargs["args"][1] for call in context.Process.call_args_list]
+        self.assertEqual([c.max_workers for c in configs], [2, 1])
+        self.assertTrue(all(c.save_context_snapshot for c in configs))
+        self.assertEqual([c.shard_batch_size for c in configs], [2, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
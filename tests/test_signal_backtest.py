@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the vectorized trend signals and their walk-forward backtest.
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from src.config import Config
+from src.core.backtest_engine import BacktestEngine, EvaluationConfig
+from src.core.signal_backtest import backtest_signals
+from src.services.backtest_service import BacktestService
+from src.stock_analyzer import BuySignal, StockTrendAnalyzer
+from src.storage import DatabaseManager, StockDaily
+
+
+def _frame(seed: int, n: int = 120, missing_volume: bool = False) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = np.round(100 * np.cumprod(1 + rng.normal(0, 0.02 + 0.01 * (seed % 3), n)), 2)
+    volume = rng.integers(1000, 5000, n).astype(float)
+    if missing_volume:
+        volume[rng.integers(0, n, 8)] = np.nan
+    return pd.DataFrame({
+        "date": [date(2024, 1, 1) + timedelta(days=i) for i in range(n)],
+        "open": close,
+        "high": np.round(close * 1.01, 2),
+        "low": np.round(close * 0.99, 2),
+        "close": close,
+        "volume": volume,
+    })
+
+
+class SignalSeriesParityTestCase(unittest.TestCase):
+    """generate_signal_series matches analyze() on every prefix."""
+
+    def test_matches_daily_analyze(self) -> None:
+        analyzer = StockTrendAnalyzer()
+        for seed, missing in ((1, False), (2, True), (3, False)):
+            df = _frame(seed, n=90, missing_volume=missing)
+            series = analyzer.generate_signal_series(df)
+            self.assertEqual(len(series), len(df) - 19)
+            for offset, row in series.iterrows():
+                result = analyzer.analyze(df.iloc[:offset + 20], "600519")
+                self.assertEqual(
+                    (row["trend_status"], row["signal_score"], row["buy_signal"]),
+                    (result.trend_status.value, result.signal_score, result.buy_signal.value),
+                    msg=f"seed={seed} day={row['date']}",
+                )
+
+    def test_short_history_has_no_signals(self) -> None:
+        self.assertTrue(StockTrendAnalyzer().generate_signal_series(_frame(1, n=19)).empty)
+
+
+class BacktestSignalsTestCase(unittest.TestCase):
+    def test_signals_are_scored_on_forward_window(self) -> None:
+        config = EvaluationConfig(eval_window_days=5)
+        df = _frame(4, n=100)
+        report = backtest_signals({"600519": df}, config=config)
+
+        self.assertEqual(report["signals"], 81)
+        self.assertEqual(report["overall"]["total_evaluations"], 81)
+        self.assertEqual(report["overall"]["insufficient_count"], 5)
+        self.assertEqual(sum(r["total_evaluations"] for r in report["by_signal"]), 81)
+        self.assertEqual([r["buy_signal"] for r in report["by_signal"]], [s.value for s in BuySignal])
+
+        # With 20 + 5 bars only the first signal day has a full forward window
+        short = df.iloc[:25]
+        first_signal = StockTrendAnalyzer().generate_signal_series(short)["buy_signal"][0]
+        expected = BacktestEngine.evaluate_single(
+            operation_advice=first_signal,
+            analysis_date=short["date"][19],
+            start_price=float(short["close"][19]),
+            forward_bars=list(short.iloc[20:25].itertuples()),
+            stop_loss=None,
+            take_profit=None,
+            config=config,
+        )
+        single = backtest_signals({"600519": short}, config=config)
+        self.assertEqual(single["overall"]["completed_count"], 1)
+        self.assertEqual(single["overall"]["avg_stock_return_pct"], round(expected["stock_return_pct"], 4))
+        bucket = next(r for r in single["by_signal"] if r["buy_signal"] == first_signal)
+        self.assertEqual(bucket["completed_count"], 1)
+
+    def test_service_reads_stored_bars(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.environ["DATABASE_PATH"] = os.path.join(temp_dir, "test_signal_backtest.db")
+            Config._instance = None
+            DatabaseManager.reset_instance()
+            db = DatabaseManager.get_instance()
+            try:
+                with db.get_session() as session:
+                    for code, seed in (("600519", 5), ("000001", 6)):
+                        for row in _frame(seed, n=60).itertuples():
+                            session.add(StockDaily(code=code, date=row.date, open=row.open, high=row.high,
+                                                   low=row.low, close=row.close, volume=row.volume))
+                    session.commit()
+
+                report = BacktestService(db).run_signal_backtest(eval_window_days=3)
+                self.assertEqual(report["codes"], 2)
+                self.assertEqual(report["signals"], 2 * 41)
+                expected = backtest_signals(
+                    {"600519": _frame(5, n=60), "000001": _frame(6, n=60)},
+                    config=EvaluationConfig(eval_window_days=3),
+                )
+                self.assertEqual(report["overall"], expected["overall"])
+            finally:
+                DatabaseManager.reset_instance()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the staged pipeline runner and StockAnalysisPipeline._run_staged.
+"""
+
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+# Mock newspaper before search_service import (optional dependency)
+if "newspaper" not in sys.modules:
+    mock_np = MagicMock()
+    mock_np.Article = MagicMock()
+    mock_np.Config = MagicMock()
+    sys.modules["newspaper"] = mock_np
+
+from src.core.staged_pipeline import RateLimiter, Stage, StagedPipelineRunner
+from tests.pipeline_helpers import make_pipeline
+
+
+class _ConcurrencyProbe:
+    """Records the peak number of concurrent calls."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, item):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return item
+
+
+class StagedPipelineRunnerTestCase(unittest.TestCase):
+    """Tests for StagedPipelineRunner."""
+
+    def test_items_flow_through_all_stages(self) -> None:
+        runner = StagedPipelineRunner([
+            Stage("double", lambda x: x * 2, workers=2),
+            Stage("inc", lambda x: x + 1, workers=3),
+        ])
+        outputs = runner.run(range(10))
+        self.assertEqual(sorted(outputs), [x * 2 + 1 for x in range(10)])
+        stats = {s["name"]: s for s in runner.get_stats()}
+        self.assertEqual(stats["double"]["processed"], 10)
+        self.assertEqual(stats["inc"]["processed"], 10)
+
+    def test_per_stage_worker_counts(self) -> None:
+        narrow = _ConcurrencyProbe(0.02)
+        wide = _ConcurrencyProbe(0.1)
+        runner = StagedPipelineRunner(
+            [Stage("data", narrow, workers=1), Stage("llm", wide, workers=4)],
+            queue_size=8,
+        )
+        runner.run(range(8))
+        self.assertEqual(narrow.peak, 1)
+        self.assertGreater(wide.peak, 1)
+        self.assertLessEqual(wide.peak, 4)
+
+    def test_none_and_exceptions_stop_item(self) -> None:
+        def check(x):
+            if x == 3:
+                raise ValueError("bad item")
+            return None if x % 2 else x
+
+        runner = StagedPipelineRunner([Stage("check", check), Stage("out", lambda x: x)])
+        outputs = runner.run(range(6))
+
+        self.assertEqual(sorted(outputs), [0, 2, 4])
+        stats = runner.get_stats()[0]
+        self.assertEqual(stats["failed"], 1)
+        self.assertEqual(stats["dropped"], 2)
+
+    def test_queue_depth_bounded_by_queue_size(self) -> None:
+        runner = StagedPipelineRunner(
+            [Stage("fast", lambda x: x, workers=2), Stage("slow", _ConcurrencyProbe(0.02), workers=1)],
+            queue_size=2,
+        )
+        runner.run(range(10))
+        stats = {s["name"]: s for s in runner.get_stats()}
+        self.assertLessEqual(stats["slow"]["max_queue_depth"], 2)
+        self.assertGreaterEqual(stats["slow"]["max_queue_depth"], 1)
+        self.assertIn("队列深度", runner.format_stats())
+
+    def test_rate_limiter_spaces_calls(self) -> None:
+        limiter = RateLimiter(rate_per_minute=600)  # 0.1s interval
+        start = time.monotonic()
+        for _ in range(4):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.29)
+        self.assertEqual(RateLimiter(0).acquire(), 0.0)
+
+
+class PipelineRunStagedTestCase(unittest.TestCase):
+    """StockAnalysisPipeline._run_staged wiring with mocked collaborators."""
+
+    def _make_pipeline(self):
+        pipeline = make_pipeline(pipeline_search_workers=2, pipeline_llm_workers=2, pipeline_queue_size=4)
+        pipeline.fetch_and_save_stock_data = MagicMock(return_value=(True, None))
+        pipeline._collect_market_data = MagicMock()
+        pipeline._search_intel = MagicMock()
+        pipeline._save_news_intel = MagicMock()
+        pipeline._save_analysis_history = MagicMock()
+        pipeline._notify_single_stock = MagicMock()
+        return pipeline
+
+    def test_results_and_persistence(self) -> None:
+        from src.analyzer import AnalysisResult
+        from src.enums import ReportType
+
+        pipeline = self._make_pipeline()
+
+        def run_llm(job):
+            if job.code == "000002":
+                job.result = None
+                return
+            job.result = MagicMock(spec=AnalysisResult, code=job.code, operation_advice="持有", sentiment_score=60)
+
+        pipeline._run_llm = MagicMock(side_effect=run_llm)
+
+        results = pipeline._run_staged(
+            ["000001", "000002", "000003"],
+            dry_run=False,
+            single_stock_notify=True,
+            report_type=ReportType.SIMPLE,
+        )
+
+        self.assertEqual(sorted(r.code for r in results), ["000001", "000003"])
+        # News intel is still persisted for the stock whose LLM call failed
+        self.assertEqual(pipeline._save_news_intel.call_count, 3)
+        self.assertEqual(pipeline._notify_single_stock.call_count, 2)
+        self.assertEqual([s["name"] for s in pipeline.last_stage_stats],
+                         ["data", "search", "llm", "persist", "notify"])
+
+    def test_dry_run_only_fetches_data(self) -> None:
+        from src.enums import ReportType
+
+        pipeline = self._make_pipeline()
+        pipeline._run_llm = MagicMock()
+
+        results = pipeline._run_staged(
+            ["000001", "000002"], dry_run=True, single_stock_notify=False, report_type=ReportType.SIMPLE
+        )
+
+        self.assertEqual(results, [])
+        self.assertEqual(pipeline.fetch_and_save_stock_data.call_count, 2)
+        pipeline._run_llm.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
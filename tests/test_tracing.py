@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the lightweight tracing layer and run performance report.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from src.core.tracing import Tracer, _percentile, bind_context, get_tracer, trace_span, tracing_run
+
+
+class TracerTestCase(unittest.TestCase):
+    """Tests for Tracer spans, summaries and exports."""
+
+    def test_percentile_interpolates(self) -> None:
+        values = [float(v) for v in range(1, 101)]
+        self.assertAlmostEqual(_percentile(values, 50), 50.5)
+        self.assertAlmostEqual(_percentile(values, 95), 95.05)
+        self.assertEqual(_percentile([], 95), 0.0)
+        self.assertEqual(_percentile([2.0], 95), 2.0)
+
+    def test_span_records_failure_and_reraises(self) -> None:
+        tracer = Tracer()
+        with self.assertRaises(ValueError):
+            with tracer.span("get_realtime_quote", source="efinance", code="600519"):
+                raise ValueError("timeout")
+        span = tracer.get_spans()[0]
+        self.assertFalse(span.ok)
+        self.assertIn("timeout", span.error)
+        self.assertEqual(tracer.summarize_by_source()[0]["errors"], 1)
+
+    def test_nested_spans_not_double_counted_per_stock(self) -> None:
+        tracer = Tracer()
+        with tracer.span("fetch_and_save_stock_data", code="600519"):
+            with tracer.span("db_write", code="600519"):
+                time.sleep(0.02)
+            with tracer.span("daily_data", source="EfinanceFetcher", code="600519"):
+                time.sleep(0.01)
+        tracer.record("llm_analyze", 0.5, code="600519")
+
+        by_stage = {r["stage"]: r for r in tracer.summarize_by_stage()}
+        self.assertEqual(set(by_stage), {"fetch_and_save_stock_data", "db_write", "llm_analyze"})
+        self.assertEqual(tracer.summarize_by_source()[0]["source"], "EfinanceFetcher")
+
+        stock = tracer.summarize_by_stock()[0]
+        expected = by_stage["fetch_and_save_stock_data"]["total"] + 0.5
+        self.assertAlmostEqual(stock["total"], expected, places=2)
+        self.assertEqual(stock["slowest_stage"], "llm_analyze")
+
+    def test_thread_safety_and_reset(self) -> None:
+        tracer = Tracer()
+
+        def work(i: int) -> None:
+            for _ in range(50):
+                with tracer.span("search_comprehensive_intel", code=str(i)):
+                    pass
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(tracer.get_spans()), 200)
+        self.assertTrue(all(not s.parent for s in tracer.get_spans()))
+
+    def test_disabled_tracer_records_nothing(self) -> None:
+        tracer = Tracer(enabled=False)
+        with tracer.span("llm_analyze"):
+            pass
+        tracer.record("notify", 1.0)
+        self.assertEqual(tracer.get_spans(), [])
+
+    def test_report_and_json_export(self) -> None:
+        tracer = Tracer()
+        for d in (0.1, 0.2, 0.3):
+            tracer.record("search_provider", d, source="Tavily")
+            tracer.record("llm_analyze", d * 10, code="000001")
+
+        report = tracer.format_report()
+        self.assertIn("## 按步骤", report)
+        self.assertIn("| search_provider | Tavily | 3 |", report)
+        self.assertIn("| 000001 |", report)
+        self.assertIn("llm_analyze", tracer.format_summary())
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = tracer.export_json(os.path.join(tmp, "trace.json"))
+            with open(path, encoding="utf-8") as f:
+                payload = json.load(f)
+        self.assertEqual(len(payload["spans"]), 6)
+        self.assertEqual(payload["by_source"][0]["count"], 3)
+        self.assertAlmostEqual(payload["by_stage"][0]["p50"], 2.0)
+
+
+
+class TracingRunTestCase(unittest.TestCase):
+    """Each run collects its own spans; nothing is recorded outside a run."""
+
+    def test_spans_outside_a_run_are_dropped(self) -> None:
+        with trace_span("get_realtime_quote", code="600519"):
+            pass
+        get_tracer().record("notify", 1.0)
+        self.assertEqual(get_tracer().get_spans(), [])
+
+    def test_concurrent_runs_are_isolated_and_threads_inherit_the_run(self) -> None:
+        collected = {}
+        started = threading.Barrier(2)
+
+        def work(stage: str) -> None:
+            with trace_span(stage):
+                pass
+
+        def run(name: str, count: int) -> None:
+            with tracing_run() as tracer:
+                started.wait(5)
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    for _ in range(count):
+                        executor.submit(bind_context(work), name)
+                    # Not bound to the run: recorded nowhere
+                    executor.submit(work, name).result()
+                with tracing_run() as nested:
+                    self.assertIs(nested, tracer)
+            collected[name] = tracer
+
+        threads = [threading.Thread(target=run, args=("a", 3)), threading.Thread(target=run, args=("b", 5))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual([s.stage for s in collected["a"].get_spans()], ["a"] * 3)
+        self.assertEqual([s.stage for s in collected["b"].get_spans()], ["b"] * 5)
+
+    def test_disabled_run_records_nothing(self) -> None:
+        with tracing_run(enabled=False) as tracer:
+            with trace_span("llm_analyze"):
+                pass
+        self.assertEqual(tracer.get_spans(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
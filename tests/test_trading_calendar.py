@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the per-market trading calendar and its use in fetch/TTL decisions.
+"""
+
+import sys
+import unittest
+from datetime import date, datetime
+from unittest.mock import MagicMock, patch
+from zoneinfo import ZoneInfo
+
+# Mock newspaper before search_service import (optional dependency)
+if "newspaper" not in sys.modules:
+    mock_np = MagicMock()
+    mock_np.Article = MagicMock()
+    mock_np.Config = MagicMock()
+    sys.modules["newspaper"] = mock_np
+
+import pandas as pd
+
+from data_provider.base import BaseFetcher
+from src.core import trading_calendar
+from src.core.trading_calendar import (
+    CN_CALENDAR,
+    HK_CALENDAR,
+    US_CALENDAR,
+    get_calendar_for_code,
+    get_market_for_code,
+)
+from tests.pipeline_helpers import make_pipeline
+
+SHANGHAI = ZoneInfo("Asia/Shanghai")
+NEW_YORK = ZoneInfo("America/New_York")
+
+
+class TradingCalendarTestCase(unittest.TestCase):
+    """Trading days, sessions and cache TTLs."""
+
+    def test_market_detection(self) -> None:
+        self.assertEqual(get_market_for_code("600519"), "cn")
+        self.assertEqual(get_market_for_code("00700"), "hk")
+        self.assertEqual(get_market_for_code("hk1810"), "hk")
+        self.assertEqual(get_market_for_code("AAPL"), "us")
+        self.assertEqual(get_market_for_code("SPX"), "us")
+        self.assertIs(get_calendar_for_code("00700"), HK_CALENDAR)
+
+    def test_latest_bar_date_skips_weekends_and_holidays(self) -> None:
+        # National Day holiday: the latest bar is the last trading day before it
+        self.assertEqual(CN_CALENDAR.latest_bar_date(datetime(2026, 10, 3, 10, 0, tzinfo=SHANGHAI)), date(2026, 9, 30))
+        # Before the open the latest bar is the previous trading day
+        self.assertEqual(CN_CALENDAR.latest_bar_date(datetime(2026, 3, 2, 9, 0, tzinfo=SHANGHAI)), date(2026, 2, 27))
+        self.assertEqual(CN_CALENDAR.latest_bar_date(datetime(2026, 3, 2, 9, 45, tzinfo=SHANGHAI)), date(2026, 3, 2))
+        # US bars follow New York time, not the host's date
+        self.assertEqual(US_CALENDAR.latest_bar_date(datetime(2026, 3, 3, 8, 0, tzinfo=SHANGHAI)), date(2026, 3, 2))
+
+    def test_bars_start_date_counts_trading_days(self) -> None:
+        self.assertEqual(CN_CALENDAR.bars_start_date(date(2026, 10, 9), 5), date(2026, 9, 28))
+        # A non-trading end date counts back from the previous trading day
+        self.assertEqual(CN_CALENDAR.bars_start_date(date(2026, 3, 1), 1), date(2026, 2, 27))
+
+    def test_cache_ttl_extends_until_next_open_when_closed(self) -> None:
+        self.assertEqual(CN_CALENDAR.cache_ttl(600, datetime(2026, 3, 2, 10, 0, tzinfo=SHANGHAI)), 600)
+        # Lunch break: valid until the afternoon session opens
+        self.assertEqual(CN_CALENDAR.cache_ttl(600, datetime(2026, 3, 2, 11, 45, tzinfo=SHANGHAI)), 75 * 60)
+        # Friday after the close: valid until Monday 09:30
+        friday_close = datetime(2026, 3, 6, 15, 30, tzinfo=SHANGHAI)
+        self.assertEqual(CN_CALENDAR.next_open(friday_close), datetime(2026, 3, 9, 9, 30, tzinfo=SHANGHAI))
+        self.assertEqual(CN_CALENDAR.cache_ttl(600, friday_close.timestamp()), 66 * 3600)
+        self.assertFalse(US_CALENDAR.is_open(datetime(2026, 7, 3, 11, 0, tzinfo=NEW_YORK)))
+
+
+class _RecordingFetcher(BaseFetcher):
+    name = "RecordingFetcher"
+
+    def __init__(self):
+        self.requested = None
+
+    def _fetch_raw_data(self, stock_code, start_date, end_date):
+        self.requested = (start_date, end_date)
+        return pd.DataFrame({
+            'date': ['2026-10-09'], 'open': [1.0], 'high': [1.0], 'low': [1.0],
+            'close': [1.0], 'volume': [100], 'amount': [100.0], 'pct_chg': [0.0],
+        })
+
+    def _normalize_data(self, df, stock_code):
+        return df
+
+
+class FetcherRangeTestCase(unittest.TestCase):
+    """BaseFetcher requests the trading-day range plus padding for suspensions."""
+
+    def test_start_date_is_n_trading_days_back_plus_padding(self) -> None:
+        self.assertEqual(CN_CALENDAR.bars_start_date(date(2026, 10, 9), 5), date(2026, 9, 28))
+        fetcher = _RecordingFetcher()
+        fetcher.get_daily_data("600519", end_date="2026-10-09", days=5)
+        # 5 bars + 5 padding, skipping the National Day and 2026-09-25 closures
+        self.assertEqual(fetcher.requested, ("2026-09-18", "2026-10-09"))
+
+    def test_default_end_date_is_latest_bar_date(self) -> None:
+        fetcher = _RecordingFetcher()
+        with patch.object(type(CN_CALENDAR), "latest_bar_date", return_value=date(2026, 9, 30)):
+            fetcher.get_daily_data("600519", days=3)
+        self.assertEqual(fetcher.requested, ("2026-09-18", "2026-09-30"))
+
+    def test_uncovered_year_warns_once(self) -> None:
+        with patch.object(trading_calendar, "_warned_years", set()), \
+                self.assertLogs(trading_calendar.logger, level="WARNING") as logs:
+            self.assertTrue(HK_CALENDAR.is_trading_day(date(2031, 3, 3)))
+            self.assertFalse(HK_CALENDAR.is_trading_day(date(2031, 3, 8)))
+            HK_CALENDAR.is_trading_day(date(2026, 3, 3))
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("2031", logs.output[0])
+
+
+class PipelineSkipTestCase(unittest.TestCase):
+    """Closed days reuse the last trading day's bar instead of refetching."""
+
+    def test_existing_latest_bar_skips_upstream_fetch(self) -> None:
+        db = MagicMock()
+        db.has_today_data.side_effect = lambda code, day: day == date(2026, 9, 30)
+        pipeline = make_pipeline(db=db)
+
+        with patch.object(type(CN_CALENDAR), "latest_bar_date", return_value=date(2026, 9, 30)):
+            self.assertEqual(pipeline.fetch_and_save_stock_data("600519"), (True, None))
+        pipeline.fetcher_manager.get_daily_data.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()